@@ -15,6 +15,10 @@ if (!process.env.TURSO_AUTH_TOKEN) {
 export default {
   schema: "./src/lib/schema.ts",
   out: "./drizzle",
+  // FTS5 table and shadow tables created by extractor/registry.py, not by migrations
+  tablesFilter: ["!icons_fts*"],
+  // icons.embedding (F32_BLOB) and icons_embedding_idx are declared in schema.ts so push leaves them alone;
+  // on a database still holding an untyped embedding blob, run extractor/native_vectors.py --migrate before push
   dialect: "turso",
   dbCredentials: {
     url: process.env.TURSO_DATABASE_URL,
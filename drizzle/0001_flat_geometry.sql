@@ -0,0 +1,10 @@
+ALTER TABLE `icons` ADD `bbox_min_x` real;--> statement-breakpoint
+ALTER TABLE `icons` ADD `bbox_min_y` real;--> statement-breakpoint
+ALTER TABLE `icons` ADD `bbox_max_x` real;--> statement-breakpoint
+ALTER TABLE `icons` ADD `bbox_max_y` real;--> statement-breakpoint
+ALTER TABLE `icons` ADD `node_count` integer;--> statement-breakpoint
+ALTER TABLE `icons` ADD `segment_count` integer;--> statement-breakpoint
+ALTER TABLE `icons` ADD `element_count` integer;--> statement-breakpoint
+ALTER TABLE `icons` ADD `byte_size` integer;--> statement-breakpoint
+ALTER TABLE `icons` ADD `complexity` real;--> statement-breakpoint
+CREATE INDEX `icons_complexity_idx` ON `icons` (`complexity`);
\ No newline at end of file
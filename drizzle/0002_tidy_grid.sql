@@ -0,0 +1,5 @@
+ALTER TABLE `icons` ADD `normalized_content` text;--> statement-breakpoint
+ALTER TABLE `icons` ADD `normalized_path_data` text;--> statement-breakpoint
+ALTER TABLE `icons` ADD `normalized_stroke_width` text;--> statement-breakpoint
+ALTER TABLE `variants` ADD `normalized_content` text;--> statement-breakpoint
+ALTER TABLE `variants` ADD `normalized_path_data` text;
\ No newline at end of file
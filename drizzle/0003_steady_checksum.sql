@@ -0,0 +1,3 @@
+ALTER TABLE `icons` ADD `content_hash` text;--> statement-breakpoint
+ALTER TABLE `sources` ADD `manifest_hash` text;--> statement-breakpoint
+ALTER TABLE `variants` ADD `content_hash` text;
\ No newline at end of file
@@ -0,0 +1,23 @@
+CREATE TABLE `concept_cluster_members` (
+	`cluster_id` integer NOT NULL,
+	`icon_id` text NOT NULL,
+	`source_id` text NOT NULL,
+	`score` real NOT NULL,
+	PRIMARY KEY(`cluster_id`, `icon_id`),
+	FOREIGN KEY (`cluster_id`) REFERENCES `concept_clusters`(`id`) ON UPDATE no action ON DELETE cascade,
+	FOREIGN KEY (`icon_id`) REFERENCES `icons`(`id`) ON UPDATE no action ON DELETE cascade
+);
+--> statement-breakpoint
+CREATE UNIQUE INDEX `concept_cluster_members_icon_idx` ON `concept_cluster_members` (`icon_id`);--> statement-breakpoint
+CREATE INDEX `concept_cluster_members_source_idx` ON `concept_cluster_members` (`source_id`);--> statement-breakpoint
+CREATE TABLE `concept_clusters` (
+	`id` integer PRIMARY KEY AUTOINCREMENT NOT NULL,
+	`canonical_name` text NOT NULL,
+	`canonical_icon_id` text NOT NULL,
+	`size` integer NOT NULL,
+	`source_count` integer NOT NULL,
+	`confidence` real NOT NULL,
+	FOREIGN KEY (`canonical_icon_id`) REFERENCES `icons`(`id`) ON UPDATE no action ON DELETE cascade
+);
+--> statement-breakpoint
+CREATE INDEX `concept_clusters_canonical_idx` ON `concept_clusters` (`canonical_name`);
\ No newline at end of file
@@ -0,0 +1,4 @@
+ALTER TABLE `icons` ADD `mapped_generation` integer;--> statement-breakpoint
+ALTER TABLE `mappings` ADD `reviewed` integer NOT NULL DEFAULT false;--> statement-breakpoint
+ALTER TABLE `mappings` ADD `generation` integer;--> statement-breakpoint
+CREATE UNIQUE INDEX `mappings_lucide_idx` ON `mappings` (`lucide_id`);
\ No newline at end of file
@@ -0,0 +1,18 @@
+CREATE TABLE `related_icons` (
+	`icon_id` text NOT NULL,
+	`related_id` text NOT NULL,
+	`kind` text NOT NULL,
+	`rank` integer NOT NULL,
+	`score` real NOT NULL,
+	PRIMARY KEY(`icon_id`, `kind`, `rank`),
+	FOREIGN KEY (`icon_id`) REFERENCES `icons`(`id`) ON UPDATE no action ON DELETE cascade,
+	FOREIGN KEY (`related_id`) REFERENCES `icons`(`id`) ON UPDATE no action ON DELETE cascade
+);
+--> statement-breakpoint
+CREATE INDEX `related_icons_related_idx` ON `related_icons` (`related_id`);--> statement-breakpoint
+CREATE TABLE `related_icons_state` (
+	`icon_id` text PRIMARY KEY NOT NULL,
+	`embedding_hash` text NOT NULL,
+	`computed_at` integer NOT NULL,
+	FOREIGN KEY (`icon_id`) REFERENCES `icons`(`id`) ON UPDATE no action ON DELETE cascade
+);
@@ -0,0 +1,2 @@
+ALTER TABLE `icons` ADD `geometry_hash` text;--> statement-breakpoint
+CREATE INDEX `icons_geometry_hash_idx` ON `icons` (`geometry_hash`);
\ No newline at end of file
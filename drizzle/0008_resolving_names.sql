@@ -0,0 +1,12 @@
+CREATE TABLE `name_lookup` (
+	`name` text NOT NULL,
+	`source_id` text NOT NULL,
+	`icon_id` text NOT NULL,
+	`rank` integer NOT NULL,
+	`kind` text NOT NULL,
+	PRIMARY KEY(`name`, `source_id`, `icon_id`),
+	FOREIGN KEY (`icon_id`) REFERENCES `icons`(`id`) ON UPDATE no action ON DELETE cascade
+);
+--> statement-breakpoint
+CREATE INDEX `name_lookup_resolve_idx` ON `name_lookup` (`name`,`source_id`,`rank`,`icon_id`);--> statement-breakpoint
+CREATE INDEX `name_lookup_icon_idx` ON `name_lookup` (`icon_id`);
\ No newline at end of file
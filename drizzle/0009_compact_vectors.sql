@@ -0,0 +1,3 @@
+ALTER TABLE `icons` ADD `embedding_short` blob;--> statement-breakpoint
+ALTER TABLE `icons` ADD `embedding_int8` blob;--> statement-breakpoint
+ALTER TABLE `icons` ADD `embedding_binary` blob;
\ No newline at end of file
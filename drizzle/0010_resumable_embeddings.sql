@@ -0,0 +1,21 @@
+CREATE TABLE `embedding_jobs` (
+	`job_key` text PRIMARY KEY NOT NULL,
+	`last_icon_id` text NOT NULL DEFAULT '',
+	`embedded` integer NOT NULL DEFAULT 0,
+	`failed` integer NOT NULL DEFAULT 0,
+	`started_at` integer NOT NULL,
+	`updated_at` integer NOT NULL,
+	`finished_at` integer
+);
+--> statement-breakpoint
+CREATE TABLE `embedding_quarantine` (
+	`icon_id` text PRIMARY KEY NOT NULL,
+	`model` text NOT NULL,
+	`error` text NOT NULL,
+	`attempts` integer NOT NULL DEFAULT 1,
+	`first_failed_at` integer NOT NULL,
+	`last_failed_at` integer NOT NULL,
+	FOREIGN KEY (`icon_id`) REFERENCES `icons`(`id`) ON UPDATE no action ON DELETE cascade
+);
+--> statement-breakpoint
+CREATE INDEX `icons_source_keyset_idx` ON `icons` (`source_id`,`id`);
\ No newline at end of file
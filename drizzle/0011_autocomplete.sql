@@ -0,0 +1,32 @@
+CREATE TABLE `autocomplete_prefixes` (
+	`prefix` text NOT NULL,
+	`term` text NOT NULL,
+	`score` real NOT NULL,
+	`icon_id` text NOT NULL,
+	PRIMARY KEY(`prefix`, `term`),
+	FOREIGN KEY (`term`) REFERENCES `autocomplete_terms`(`term`) ON UPDATE no action ON DELETE cascade
+);
+--> statement-breakpoint
+CREATE INDEX `autocomplete_prefixes_lookup_idx` ON `autocomplete_prefixes` (`prefix`,`score`,`term`,`icon_id`);--> statement-breakpoint
+CREATE INDEX `autocomplete_prefixes_term_idx` ON `autocomplete_prefixes` (`term`);--> statement-breakpoint
+CREATE TABLE `autocomplete_terms` (
+	`term` text PRIMARY KEY NOT NULL,
+	`kind` text NOT NULL,
+	`icon_id` text NOT NULL,
+	`icon_count` integer NOT NULL,
+	`searches` integer NOT NULL DEFAULT 0,
+	`score` real NOT NULL,
+	FOREIGN KEY (`icon_id`) REFERENCES `icons`(`id`) ON UPDATE no action ON DELETE cascade
+);
+--> statement-breakpoint
+CREATE TABLE `autocomplete_trigrams` (
+	`trigram` text NOT NULL,
+	`term` text NOT NULL,
+	`trigram_count` integer NOT NULL,
+	`score` real NOT NULL,
+	PRIMARY KEY(`trigram`, `term`),
+	FOREIGN KEY (`term`) REFERENCES `autocomplete_terms`(`term`) ON UPDATE no action ON DELETE cascade
+);
+--> statement-breakpoint
+CREATE INDEX `autocomplete_trigrams_lookup_idx` ON `autocomplete_trigrams` (`trigram`,`term`,`trigram_count`,`score`);--> statement-breakpoint
+CREATE INDEX `autocomplete_trigrams_term_idx` ON `autocomplete_trigrams` (`term`);
\ No newline at end of file
@@ -0,0 +1,12 @@
+CREATE TABLE `precomputed_results` (
+	`query_key` text NOT NULL,
+	`source_filter` text NOT NULL DEFAULT '',
+	`search_type` text NOT NULL,
+	`icon_ids` text NOT NULL,
+	`searches` integer NOT NULL,
+	`avg_miss_ms` real,
+	`reason` text NOT NULL,
+	`corpus_version` text NOT NULL,
+	`computed_at` integer NOT NULL,
+	PRIMARY KEY(`query_key`, `source_filter`)
+);
@@ -0,0 +1,39 @@
+CREATE TABLE `search_analytics_daily` (
+	`bucket_start` integer NOT NULL,
+	`query` text NOT NULL,
+	`search_type` text NOT NULL,
+	`source_filter` text NOT NULL DEFAULT '',
+	`searches` integer NOT NULL,
+	`cache_hits` integer NOT NULL,
+	`zero_results` integer NOT NULL,
+	`result_sum` integer NOT NULL,
+	`latency_count` integer NOT NULL,
+	`latency_sum` integer NOT NULL,
+	`miss_latency_count` integer NOT NULL,
+	`miss_latency_sum` integer NOT NULL,
+	`latency_sketch` blob NOT NULL,
+	PRIMARY KEY(`bucket_start`, `query`, `search_type`, `source_filter`)
+);
+--> statement-breakpoint
+CREATE TABLE `search_analytics_hourly` (
+	`bucket_start` integer NOT NULL,
+	`query` text NOT NULL,
+	`search_type` text NOT NULL,
+	`source_filter` text NOT NULL DEFAULT '',
+	`searches` integer NOT NULL,
+	`cache_hits` integer NOT NULL,
+	`zero_results` integer NOT NULL,
+	`result_sum` integer NOT NULL,
+	`latency_count` integer NOT NULL,
+	`latency_sum` integer NOT NULL,
+	`miss_latency_count` integer NOT NULL,
+	`miss_latency_sum` integer NOT NULL,
+	`latency_sketch` blob NOT NULL,
+	PRIMARY KEY(`bucket_start`, `query`, `search_type`, `source_filter`)
+);
+--> statement-breakpoint
+CREATE TABLE `search_analytics_rollup` (
+	`name` text PRIMARY KEY NOT NULL,
+	`last_id` integer NOT NULL DEFAULT 0,
+	`updated_at` integer NOT NULL
+);
@@ -0,0 +1,4 @@
+-- Records icons.embedding as F32_BLOB(3072) with the icons_embedding_idx vector index in the schema snapshot.
+-- The column is retyped and the index built by `python extractor/native_vectors.py --migrate`,
+-- which keeps existing embeddings; a drizzle table rebuild would not.
+SELECT 1;
@@ -0,0 +1,381 @@
+#!/usr/bin/env python3
+"""
+Roll search_analytics up into hourly and daily summaries and enforce retention.
+
+Raw rows (one per search) are folded into search_analytics_hourly and
+search_analytics_daily, one row per (bucket, query, search type, source
+filter) with:
+
+    searches, cache_hits, zero_results, result_sum    counts and sums
+    latency_count, latency_sum                        mean response time
+    miss_latency_count, miss_latency_sum              same, cache misses only
+    latency_sketch                                    log-bucket histogram
+
+The sketch keeps response times in buckets whose bounds grow by
+SKETCH_GAMMA, so any quantile comes back within SKETCH_ACCURACY (1%)
+relative error and two sketches merge by adding bucket counts. Buckets
+therefore merge across runs, and hours merge into any longer window.
+
+search_analytics_rollup holds the watermark: the last raw id folded in.
+Each batch updates the summaries and advances the watermark in one
+transaction, so an interrupted run neither loses nor double-counts rows.
+Retention deletes raw rows (only ones already rolled up) and old hourly
+rows in bounded batches; daily rows are kept.
+
+query_stats() gives the other jobs (autocomplete.py, precompute_results.py)
+per-query totals from the summaries plus the not yet rolled up raw tail.
+
+Usage:
+    python analytics_rollup.py                       # Roll up, then apply retention
+    python analytics_rollup.py --raw-days 14 --hourly-days 60
+    python analytics_rollup.py --report 7            # Summary with latency percentiles
+"""
+import os
+import re
+import sys
+import math
+import time
+import struct
+import argparse
+from collections import Counter
+from pathlib import Path
+
+
+HOUR_MS = 3600 * 1000
+DAY_MS = 24 * HOUR_MS
+
+RAW_RETENTION_DAYS = 30
+HOURLY_RETENTION_DAYS = 90
+ROLLUP_BATCH_ROWS = 20000  # Raw rows folded in per transaction
+DELETE_BATCH_ROWS = 5000  # Rows deleted per statement
+DELETE_PAUSE_SECONDS = 0.05  # Between delete batches, to leave room for the app's writes
+
+SKETCH_ACCURACY = 0.01
+SKETCH_GAMMA = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+SKETCH_ENTRY = struct.Struct("<HI")  # bucket index, count
+
+WATERMARK = "search_analytics"
+TABLES = {"hourly": ("search_analytics_hourly", HOUR_MS), "daily": ("search_analytics_daily", DAY_MS)}
+KEY_COLUMNS = ("bucket_start", "query", "search_type", "source_filter")
+SUM_COLUMNS = (
+    "searches", "cache_hits", "zero_results", "result_sum",
+    "latency_count", "latency_sum", "miss_latency_count", "miss_latency_sum",
+)
+
+WHITESPACE = re.compile(r"\s+")
+
+
+def query_key(query: str) -> str:
+    """Summaries are keyed by the lowercased, trimmed query with single spaces."""
+    return WHITESPACE.sub(" ", query.strip().lower())
+
+
+class LatencySketch:
+    """
+    Mergeable log-bucket histogram of response times in ms.
+
+    Bucket i > 0 holds (gamma^(i-1), gamma^i]; bucket 0 holds times of
+    1 ms and less.
+    """
+
+    def __init__(self, counts: Counter | None = None):
+        self.counts = counts if counts is not None else Counter()
+
+    @staticmethod
+    def bucket(ms: float) -> int:
+        return 0 if ms <= 1 else math.ceil(math.log(ms) / math.log(SKETCH_GAMMA))
+
+    @staticmethod
+    def value(bucket: int) -> float:
+        """Bucket midpoint, within SKETCH_ACCURACY of everything in it."""
+        return 0.0 if bucket == 0 else 2 * SKETCH_GAMMA ** bucket / (SKETCH_GAMMA + 1)
+
+    def add(self, ms: float, count: int = 1):
+        self.counts[self.bucket(ms)] += count
+
+    def merge(self, other: "LatencySketch"):
+        self.counts.update(other.counts)
+
+    def quantile(self, q: float) -> float | None:
+        total = sum(self.counts.values())
+        if not total:
+            return None
+        rank = q * (total - 1)
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen > rank:
+                return self.value(bucket)
+        return self.value(max(self.counts))
+
+    def to_bytes(self) -> bytes:
+        return b"".join(SKETCH_ENTRY.pack(bucket, count) for bucket, count in sorted(self.counts.items()))
+
+    @classmethod
+    def from_bytes(cls, data: bytes | None) -> "LatencySketch":
+        counts = Counter()
+        for bucket, count in SKETCH_ENTRY.iter_unpack(data or b""):
+            counts[bucket] = count
+        return cls(counts)
+
+
+def read_watermark(conn) -> int:
+    row = conn.execute("SELECT last_id FROM search_analytics_rollup WHERE name = ?", (WATERMARK,)).fetchone()
+    return row[0] if row else 0
+
+
+def fold(rows: list[tuple], bucket_ms: int) -> dict[tuple, list]:
+    """Aggregate raw rows into {key: [sums..., LatencySketch]} for one bucket size."""
+    summaries: dict[tuple, list] = {}
+    for _, query, search_type, source_filter, result_count, cache_hit, response_ms, timestamp in rows:
+        key = (timestamp - timestamp % bucket_ms, query_key(query), search_type, source_filter or "")
+        summary = summaries.get(key)
+        if summary is None:
+            summary = summaries[key] = [0] * len(SUM_COLUMNS) + [LatencySketch()]
+        summary[0] += 1
+        summary[1] += bool(cache_hit)
+        summary[2] += result_count == 0
+        summary[3] += result_count
+        if response_ms is not None:
+            summary[4] += 1
+            summary[5] += response_ms
+            if not cache_hit:
+                summary[6] += 1
+                summary[7] += response_ms
+            summary[8].add(response_ms)
+    return summaries
+
+
+def merge_into(conn, table: str, summaries: dict[tuple, list]):
+    """Add `summaries` to the stored rows (sketches merge, sums add)."""
+    if not summaries:
+        return
+    starts = [key[0] for key in summaries]
+    for row in conn.execute(
+        f"""
+        SELECT {', '.join(KEY_COLUMNS + SUM_COLUMNS)}, latency_sketch FROM {table}
+        WHERE bucket_start BETWEEN ? AND ?
+        """,
+        (min(starts), max(starts)),
+    ).fetchall():
+        summary = summaries.get(tuple(row[: len(KEY_COLUMNS)]))
+        if summary is None:
+            continue
+        stored = row[len(KEY_COLUMNS) :]
+        for i in range(len(SUM_COLUMNS)):
+            summary[i] += stored[i]
+        summary[-1].merge(LatencySketch.from_bytes(stored[-1]))
+
+    columns = KEY_COLUMNS + SUM_COLUMNS + ("latency_sketch",)
+    updates = ", ".join(f"{column} = excluded.{column}" for column in SUM_COLUMNS + ("latency_sketch",))
+    conn.executemany(
+        f"""
+        INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})
+        ON CONFLICT({', '.join(KEY_COLUMNS)}) DO UPDATE SET {updates}
+        """,
+        [(*key, *summary[:-1], summary[-1].to_bytes()) for key, summary in summaries.items()],
+    )
+
+
+def rollup(conn, batch_rows: int = ROLLUP_BATCH_ROWS) -> int:
+    """Fold every raw row past the watermark into the summaries. Returns rows folded."""
+    last_id = read_watermark(conn)
+    folded = 0
+    while True:
+        rows = conn.execute(
+            """
+            SELECT id, query, search_type, source_filter, result_count, cache_hit, response_time_ms, timestamp
+            FROM search_analytics
+            WHERE id > ?
+            ORDER BY id
+            LIMIT ?
+            """,
+            (last_id, batch_rows),
+        ).fetchall()
+        if not rows:
+            return folded
+
+        for table, bucket_ms in TABLES.values():
+            merge_into(conn, table, fold(rows, bucket_ms))
+        last_id = rows[-1][0]
+        conn.execute(
+            """
+            INSERT INTO search_analytics_rollup (name, last_id, updated_at) VALUES (?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET last_id = excluded.last_id, updated_at = excluded.updated_at
+            """,
+            (WATERMARK, last_id, int(time.time() * 1000)),
+        )
+        conn.commit()
+        folded += len(rows)
+        print(f"  Rolled up {folded} rows (through id {last_id})")
+
+
+def delete_batched(conn, table: str, where: str, params: tuple, batch_rows: int = DELETE_BATCH_ROWS,
+                   pause: float = DELETE_PAUSE_SECONDS) -> int:
+    """DELETE in batches of at most `batch_rows` rowids, committing each. Returns rows deleted."""
+    deleted = 0
+    while True:
+        cursor = conn.execute(
+            f"DELETE FROM {table} WHERE rowid IN (SELECT rowid FROM {table} WHERE {where} LIMIT ?)",
+            (*params, batch_rows),
+        )
+        conn.commit()
+        deleted += cursor.rowcount
+        if cursor.rowcount < batch_rows:
+            return deleted
+        time.sleep(pause)
+
+
+def apply_retention(conn, raw_days: int = RAW_RETENTION_DAYS, hourly_days: int = HOURLY_RETENTION_DAYS,
+                    batch_rows: int = DELETE_BATCH_ROWS) -> tuple[int, int]:
+    """Delete rolled-up raw rows older than raw_days and hourly rows older than hourly_days."""
+    now = int(time.time() * 1000)
+    raw = delete_batched(
+        conn, "search_analytics", "timestamp < ? AND id <= ?",
+        (now - raw_days * DAY_MS, read_watermark(conn)), batch_rows,
+    )
+    hourly = delete_batched(
+        conn, "search_analytics_hourly", "bucket_start < ?", (now - hourly_days * DAY_MS,), batch_rows
+    )
+    return raw, hourly
+
+
+def summary_table(conn, since_ms: int) -> tuple[str, int]:
+    """(table, bucket ms): hourly rows when they reach back to since_ms, daily rows otherwise."""
+    oldest = conn.execute("SELECT MIN(bucket_start) FROM search_analytics_hourly").fetchone()[0]
+    return TABLES["hourly"] if oldest is None or oldest <= since_ms else TABLES["daily"]
+
+
+def query_stats(conn, since_ms: int) -> dict[tuple[str, str], list[int]]:
+    """
+    {(query key, source filter): [searches, with_results, cache_hits,
+    miss_latency_count, miss_latency_sum]} since `since_ms`. Summaries
+    cover what is rolled up, raw rows past the watermark the rest.
+    """
+    table, bucket_ms = summary_table(conn, since_ms)
+    rows = conn.execute(
+        f"""
+        SELECT query, source_filter, SUM(searches), SUM(searches - zero_results), SUM(cache_hits),
+               SUM(miss_latency_count), SUM(miss_latency_sum)
+        FROM {table}
+        WHERE bucket_start >= ?
+        GROUP BY query, source_filter
+        """,
+        (since_ms - since_ms % bucket_ms,),
+    ).fetchall()
+    tail = conn.execute(
+        """
+        SELECT query, COALESCE(source_filter, ''), COUNT(*), SUM(result_count > 0), SUM(cache_hit),
+               COUNT(CASE WHEN cache_hit = 0 THEN response_time_ms END),
+               SUM(CASE WHEN cache_hit = 0 THEN response_time_ms END)
+        FROM search_analytics
+        WHERE id > ? AND timestamp >= ?
+        GROUP BY query, source_filter
+        """,
+        (read_watermark(conn), since_ms),
+    ).fetchall()
+
+    stats: dict[tuple[str, str], list[int]] = {}
+    for query, source_filter, *values in rows + tail:
+        key = (query_key(query), source_filter)
+        if not key[0]:
+            continue
+        totals = stats.setdefault(key, [0] * 5)
+        for i, value in enumerate(values):
+            totals[i] += value or 0
+    return stats
+
+
+def print_report(conn, days: int, top: int = 15):
+    """Totals, latency percentiles and top queries for the last `days` from the summaries."""
+    since = int(time.time() * 1000) - days * DAY_MS
+    table, bucket_ms = summary_table(conn, since)
+    rows = conn.execute(
+        f"""
+        SELECT query, search_type, {', '.join(SUM_COLUMNS)}, latency_sketch
+        FROM {table}
+        WHERE bucket_start >= ?
+        """,
+        (since - since % bucket_ms,),
+    ).fetchall()
+
+    totals = [0] * len(SUM_COLUMNS)
+    by_type: Counter = Counter()
+    by_query: Counter = Counter()
+    sketch = LatencySketch()
+    for query, search_type, *values in rows:
+        for i in range(len(SUM_COLUMNS)):
+            totals[i] += values[i]
+        by_type[search_type] += values[0]
+        by_query[query] += values[0]
+        sketch.merge(LatencySketch.from_bytes(values[-1]))
+
+    searches, cache_hits, zero_results, result_sum, latency_count, latency_sum = totals[:6]
+    print("\n" + "=" * 50)
+    print(f"Search analytics, last {days} days ({len(rows)} rows of {table})")
+    print("=" * 50)
+    if not searches:
+        print("  No searches rolled up in this window")
+        return
+    print(f"  Searches:      {searches} ({', '.join(f'{count} {kind}' for kind, count in by_type.most_common())})")
+    print(f"  Unique:        {len(by_query)} queries")
+    print(f"  Cache hits:    {cache_hits / searches:.1%}")
+    print(f"  Zero results:  {zero_results / searches:.1%}")
+    print(f"  Avg results:   {result_sum / searches:.1f}")
+    if latency_count:
+        percentiles = ", ".join(f"p{q} {sketch.quantile(q / 100):.0f}" for q in (50, 95, 99))
+        print(f"  Latency ms:    mean {latency_sum / latency_count:.0f}, {percentiles}")
+    print(f"\n  Top queries:")
+    for query, count in by_query.most_common(top):
+        print(f"    {count:>7}  {query}")
+
+
+def main():
+    import libsql_experimental as libsql
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Roll up search_analytics and enforce retention")
+    parser.add_argument("--raw-days", type=int, default=RAW_RETENTION_DAYS,
+                        help=f"Keep raw rows this many days (default: {RAW_RETENTION_DAYS})")
+    parser.add_argument("--hourly-days", type=int, default=HOURLY_RETENTION_DAYS,
+                        help=f"Keep hourly summaries this many days (default: {HOURLY_RETENTION_DAYS})")
+    parser.add_argument("--batch-rows", type=int, default=ROLLUP_BATCH_ROWS,
+                        help=f"Raw rows rolled up per transaction (default: {ROLLUP_BATCH_ROWS})")
+    parser.add_argument("--delete-batch-rows", type=int, default=DELETE_BATCH_ROWS,
+                        help=f"Rows deleted per statement (default: {DELETE_BATCH_ROWS})")
+    parser.add_argument("--no-retention", action="store_true", help="Roll up without deleting anything")
+    parser.add_argument("--report", type=int, metavar="DAYS", help="Print a summary instead of rolling up")
+    args = parser.parse_args()
+
+    load_dotenv(Path(__file__).parent.parent / ".env.local")
+
+    turso_url = os.environ.get("TURSO_DATABASE_URL")
+    auth_token = os.environ.get("TURSO_AUTH_TOKEN")
+
+    if not turso_url or not auth_token:
+        print("Error: TURSO_DATABASE_URL and TURSO_AUTH_TOKEN must be set")
+        sys.exit(1)
+
+    conn = libsql.connect(turso_url, auth_token=auth_token)
+
+    if args.report is not None:
+        print_report(conn, args.report)
+        return
+
+    print("\n" + "=" * 50)
+    print("Rolling up search_analytics...")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    folded = rollup(conn, args.batch_rows)
+    print(f"✓ Rolled up {folded} rows in {time.perf_counter() - start:.1f}s (watermark: id {read_watermark(conn)})")
+
+    if not args.no_retention:
+        start = time.perf_counter()
+        raw, hourly = apply_retention(conn, args.raw_days, args.hourly_days, args.delete_batch_rows)
+        print(f"✓ Deleted {raw} raw rows older than {args.raw_days} days and {hourly} hourly rows "
+              f"older than {args.hourly_days} days in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+Materialize the autocomplete tables.
+
+Type-ahead suggestions are served from three tables derived from
+name_lookup (names, style-stripped names, aliases and synonyms) and recent
+searches (the search_analytics rollups):
+
+    autocomplete_terms     one row per suggestable term: its best icon, how
+                           many icons it reaches, recent searches and score
+    autocomplete_prefixes  edge n-grams: each prefix (up to PREFIX_LENGTH
+                           characters) of a term and of every word in it,
+                           keeping the TERMS_PER_PREFIX best terms per prefix
+    autocomplete_trigrams  trigrams of " term " for infix and misspelled input
+
+A prefix lookup is one range of autocomplete_prefixes_lookup_idx
+(prefix, score, term, icon_id); a misspelling is one range of
+autocomplete_trigrams_lookup_idx per query trigram. Terms score
+    POPULARITY_WEIGHT * log(1 + searches) + log(1 + icons) - kind penalty
+so popular queries rise once analytics exist and widely available names
+lead before then.
+
+Usage:
+    python autocomplete.py                        # Sync the tables
+    python autocomplete.py --complete arr         # Show suggestions
+    python autocomplete.py --complete "aroow rig"
+    python autocomplete.py --benchmark --db ./local.db   # Lookup latency vs the LIKE search
+"""
+import os
+import re
+import sys
+import math
+import time
+import argparse
+from pathlib import Path
+import numpy as np
+from analytics_rollup import query_stats
+from bm25_index import like_search, percentile_ms
+
+
+PREFIX_LENGTH = 8
+TERMS_PER_PREFIX = 20
+POPULARITY_DAYS = 90
+POPULARITY_WEIGHT = 2.0
+KIND_PENALTY = {"name": 0.0, "style": 0.25, "alias": 0.5, "synonym": 1.0}
+MIN_COVERAGE = 0.4  # Share of the query's trigrams a fuzzy match must contain
+WRITE_BATCH_ROWS = 5000
+
+WORD_SEPARATOR = re.compile(r"[\s_-]+")
+
+
+def normalize_query(query: str) -> str:
+    """Terms are kebab-case: 'Arrow  Right' -> 'arrow-right'."""
+    return WORD_SEPARATOR.sub("-", query.strip().lower())
+
+
+def trigrams(term: str) -> set[str]:
+    padded = f" {term} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def load_popularity(conn, days: int = POPULARITY_DAYS) -> dict[str, int]:
+    """Searches with results per normalized query over the last `days`, from the analytics rollups."""
+    since = int((time.time() - days * 86400) * 1000)
+    popularity: dict[str, int] = {}
+    for (query, _), (_, with_results, *_) in query_stats(conn, since).items():
+        key = normalize_query(query)
+        popularity[key] = popularity.get(key, 0) + with_results
+    return popularity
+
+
+def build_terms(lookup_rows: list[tuple], popularity: dict[str, int]) -> dict[str, tuple]:
+    """
+    {term: (kind, icon_id, icon_count, searches, score)} from name_lookup
+    (name, source_id, icon_id, rank, kind) rows.
+
+    PascalCase keys ('arrowright') are left out; they duplicate names.
+    The icon shown is the term's best-ranked one, Lucide first on ties.
+    """
+    best: dict[str, tuple] = {}
+    icons: dict[str, set[str]] = {}
+    for name, source_id, icon_id, rank, kind in lookup_rows:
+        if kind == "pascal":
+            continue
+        candidate = (rank, source_id != "lucide", icon_id, kind)
+        if name not in best or candidate < best[name]:
+            best[name] = candidate
+        icons.setdefault(name, set()).add(icon_id)
+
+    terms = {}
+    for term, (_, _, icon_id, kind) in best.items():
+        searches = popularity.get(term, 0)
+        score = POPULARITY_WEIGHT * math.log1p(searches) + math.log1p(len(icons[term])) - KIND_PENALTY[kind]
+        terms[term] = (kind, icon_id, len(icons[term]), searches, round(score, 4))
+    return terms
+
+
+def build_prefixes(terms: dict[str, tuple], length: int = PREFIX_LENGTH,
+                   per_prefix: int = TERMS_PER_PREFIX) -> dict[tuple[str, str], tuple]:
+    """{(prefix, term): (score, icon_id)}, the best `per_prefix` terms for each prefix."""
+    candidates: dict[str, list[tuple[float, str]]] = {}
+    for term, (_, _, _, _, score) in terms.items():
+        starts = [0] + [match.end() for match in WORD_SEPARATOR.finditer(term)]
+        # 'arrow-' is kept too: it is what 'arrow ' normalizes to while typing
+        for gram in {term[start : start + size] for start in starts for size in range(1, length + 1)}:
+            candidates.setdefault(gram, []).append((score, term))
+
+    rows = {}
+    for prefix, scored in candidates.items():
+        scored.sort(reverse=True)  # Same order as the lookup query
+        for score, term in scored[:per_prefix]:
+            rows[(prefix, term)] = (score, terms[term][1])
+    return rows
+
+
+def build_trigrams(terms: dict[str, tuple]) -> dict[tuple[str, str], tuple]:
+    """{(trigram, term): (trigram_count, score)}."""
+    rows = {}
+    for term, (_, _, _, _, score) in terms.items():
+        grams = trigrams(term)
+        for gram in grams:
+            rows[(gram, term)] = (len(grams), score)
+    return rows
+
+
+def sync_rows(conn, table: str, key_columns: tuple[str, ...], value_columns: tuple[str, ...],
+              wanted: dict[tuple, tuple]) -> tuple[int, int]:
+    """Diff `wanted` against the table and write only the difference. Returns (written, removed)."""
+    columns = key_columns + value_columns
+    stored = {
+        row[: len(key_columns)]: row[len(key_columns) :]
+        for row in conn.execute(f"SELECT {', '.join(columns)} FROM {table}").fetchall()
+    }
+    removed = [key for key in stored if key not in wanted]
+    changed = [key + value for key, value in wanted.items() if stored.get(key) != value]
+
+    key_match = " AND ".join(f"{column} = ?" for column in key_columns)
+    updates = ", ".join(f"{column} = excluded.{column}" for column in value_columns)
+    for start in range(0, len(removed), WRITE_BATCH_ROWS):
+        conn.executemany(f"DELETE FROM {table} WHERE {key_match}", removed[start : start + WRITE_BATCH_ROWS])
+        conn.commit()
+    for start in range(0, len(changed), WRITE_BATCH_ROWS):
+        conn.executemany(
+            f"""
+            INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})
+            ON CONFLICT({', '.join(key_columns)}) DO UPDATE SET {updates}
+            """,
+            changed[start : start + WRITE_BATCH_ROWS],
+        )
+        conn.commit()
+    return len(changed), len(removed)
+
+
+def sync_autocomplete(conn, prefix_length: int = PREFIX_LENGTH, per_prefix: int = TERMS_PER_PREFIX) -> int:
+    """
+    Bring the autocomplete tables in line with name_lookup and recent searches.
+    Run after sync_name_lookup. Returns the number of terms.
+    """
+    lookup_rows = conn.execute("SELECT name, source_id, icon_id, rank, kind FROM name_lookup").fetchall()
+    terms = build_terms(lookup_rows, load_popularity(conn))
+
+    # Terms first so the prefix and trigram rows' icon references exist
+    written, removed = sync_rows(
+        conn, "autocomplete_terms", ("term",), ("kind", "icon_id", "icon_count", "searches", "score"),
+        {(term,): value for term, value in terms.items()},
+    )
+    prefixes = build_prefixes(terms, prefix_length, per_prefix)
+    prefix_written, prefix_removed = sync_rows(
+        conn, "autocomplete_prefixes", ("prefix", "term"), ("score", "icon_id"), prefixes
+    )
+    grams = build_trigrams(terms)
+    gram_written, gram_removed = sync_rows(
+        conn, "autocomplete_trigrams", ("trigram", "term"), ("trigram_count", "score"), grams
+    )
+
+    popular = sum(1 for value in terms.values() if value[3])
+    print(f"✓ Autocomplete: {len(terms)} terms ({popular} with searches), {len(prefixes)} prefix rows, "
+          f"{len(grams)} trigram rows ({written + prefix_written + gram_written} written, "
+          f"{removed + prefix_removed + gram_removed} removed)")
+    return len(terms)
+
+
+def complete_prefix(conn, query: str, limit: int = 10, prefix_length: int = PREFIX_LENGTH) -> list[tuple]:
+    """(term, icon_id, score) for terms starting with the query (or with a word starting with it)."""
+    query = normalize_query(query)
+    if not query:
+        return []
+    if len(query) <= prefix_length:
+        return conn.execute(
+            """
+            SELECT term, icon_id, score FROM autocomplete_prefixes
+            WHERE prefix = ?
+            ORDER BY score DESC, term DESC  -- Index order read backwards, no sort step
+            LIMIT ?
+            """,
+            (query, limit),
+        ).fetchall()
+    # Longer than any stored prefix: few terms match, so a primary key range is enough
+    return conn.execute(
+        """
+        SELECT term, icon_id, score FROM autocomplete_terms
+        WHERE term >= ? AND term < ?
+        ORDER BY score DESC, term DESC  -- Same tie order as the prefix table
+        LIMIT ?
+        """,
+        (query, query + "\uffff", limit),
+    ).fetchall()
+
+
+def complete_fuzzy(conn, query: str, limit: int = 10, min_coverage: float = MIN_COVERAGE) -> list[tuple]:
+    """
+    (term, icon_id, score) for terms sharing most of the query's trigrams,
+    for infix input and typos. Ranked by coverage of the query, then
+    Jaccard similarity, then score.
+    """
+    grams = sorted(trigrams(normalize_query(query)))
+    if not grams or not normalize_query(query):
+        return []
+    placeholders = ", ".join("?" for _ in grams)
+    return conn.execute(
+        f"""
+        SELECT matches.term, terms.icon_id, terms.score
+        FROM (
+            SELECT term, COUNT(*) AS shared, MAX(trigram_count) AS trigram_count
+            FROM autocomplete_trigrams
+            WHERE trigram IN ({placeholders})
+            GROUP BY term
+            HAVING COUNT(*) >= ?
+        ) AS matches
+        JOIN autocomplete_terms AS terms ON terms.term = matches.term
+        ORDER BY matches.shared DESC,
+                 matches.shared * 1.0 / (? + matches.trigram_count - matches.shared) DESC,
+                 terms.score DESC, matches.term
+        LIMIT ?
+        """,
+        (*grams, max(1, math.ceil(len(grams) * min_coverage)), len(grams), limit),
+    ).fetchall()
+
+
+def complete(conn, query: str, limit: int = 10) -> list[tuple]:
+    """Prefix suggestions, topped up with fuzzy matches when there are too few."""
+    results = complete_prefix(conn, query, limit)
+    if len(results) < limit:
+        seen = {row[0] for row in results}
+        for row in complete_fuzzy(conn, query, limit):
+            if row[0] not in seen and len(results) < limit:
+                results.append(row)
+                seen.add(row[0])
+    return results
+
+
+def sample_inputs(terms: list[str], count: int, seed: int = 0) -> tuple[list[str], list[str]]:
+    """(prefixes as typed, misspellings with one character dropped) drawn from terms."""
+    rng = np.random.default_rng(seed)
+    prefixes, typos = [], []
+    for term in rng.choice(terms, size=count):
+        prefixes.append(term[: int(rng.integers(1, min(len(term), 6) + 1))])
+    long_terms = [term for term in terms if len(term) >= 5]
+    for term in rng.choice(long_terms, size=count) if long_terms else []:
+        drop = int(rng.integers(1, len(term)))
+        typos.append(term[:drop] + term[drop + 1 :])
+    return prefixes, typos
+
+
+def run_benchmark(conn, count: int, limit: int):
+    terms = [row[0] for row in conn.execute("SELECT term FROM autocomplete_terms").fetchall()]
+    if not terms:
+        print("Error: autocomplete tables are empty (run without --benchmark first)")
+        sys.exit(1)
+    prefixes, typos = sample_inputs(terms, count)
+
+    def timed(lookup, inputs):
+        times, answered = [], 0
+        for query in inputs:
+            start = time.perf_counter()
+            answered += bool(lookup(query))
+            times.append(time.perf_counter() - start)
+        return times, answered
+
+    cases = [
+        ("prefix", *timed(lambda q: complete_prefix(conn, q, limit), prefixes)),
+        ("LIKE prefix", *timed(lambda q: like_search(conn, q, limit), prefixes)),
+        ("fuzzy", *timed(lambda q: complete_fuzzy(conn, q, limit), typos)),
+        ("LIKE typo", *timed(lambda q: like_search(conn, q, limit), typos)),
+    ]
+
+    print("\n" + "=" * 50)
+    print(f"Autocomplete vs LIKE search: {count} inputs each, limit {limit}")
+    print("=" * 50)
+    print(f"  {'':<12} {'p50 ms':>8} {'p95 ms':>8} {'answered':>9}")
+    for label, times, answered in cases:
+        print(f"  {label:<12} {percentile_ms(times, 50):>8.2f} {percentile_ms(times, 95):>8.2f} "
+              f"{answered / max(1, len(times)):>9.1%}")
+
+
+def main():
+    import libsql_experimental as libsql
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Materialize the autocomplete prefix and trigram tables")
+    parser.add_argument("--complete", metavar="TEXT", help="Show suggestions instead of syncing")
+    parser.add_argument("--benchmark", action="store_true", help="Time lookups against the LIKE search")
+    parser.add_argument("--inputs", type=int, default=500, help="Inputs per case for --benchmark (default: 500)")
+    parser.add_argument("--limit", type=int, default=10, help="Suggestions per lookup (default: 10)")
+    parser.add_argument("--prefix-length", type=int, default=PREFIX_LENGTH,
+                        help=f"Longest stored prefix (default: {PREFIX_LENGTH})")
+    parser.add_argument("--per-prefix", type=int, default=TERMS_PER_PREFIX,
+                        help=f"Terms kept per prefix (default: {TERMS_PER_PREFIX})")
+    parser.add_argument("--db", type=Path, help="Use a local database file instead of TURSO_DATABASE_URL")
+    args = parser.parse_args()
+
+    if args.db:
+        if not args.db.exists():
+            print(f"Error: {args.db} not found")
+            sys.exit(1)
+        turso_url, auth_token = str(args.db), ""
+    else:
+        load_dotenv(Path(__file__).parent.parent / ".env.local")
+
+        turso_url = os.environ.get("TURSO_DATABASE_URL")
+        auth_token = os.environ.get("TURSO_AUTH_TOKEN")
+
+        if not turso_url or not auth_token:
+            print("Error: TURSO_DATABASE_URL and TURSO_AUTH_TOKEN must be set (or pass --db)")
+            sys.exit(1)
+
+    conn = libsql.connect(turso_url, auth_token=auth_token)
+
+    if args.complete is not None:
+        for term, icon_id, score in complete(conn, args.complete, args.limit):
+            print(f"  {score:6.2f}  {term:<30} {icon_id}")
+        return
+
+    if args.benchmark:
+        run_benchmark(conn, args.inputs, args.limit)
+        return
+
+    print("\n" + "=" * 50)
+    print("Syncing autocomplete tables...")
+    print("=" * 50)
+
+    sync_autocomplete(conn, args.prefix_length, args.per_prefix)
+
+
+if __name__ == "__main__":
+    main()
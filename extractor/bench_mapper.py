@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Benchmark and quality harness for cross-library name matching.
+
+Runs mapper configurations (scorer plus candidate generation) over
+labelled datasets and reports precision/recall at several thresholds
+next to wall time, peak memory and the number of candidate pairs
+scored. Results are written as JSON so runs can be compared over time.
+
+Datasets:
+    confirmed   Lucide -> Phosphor / HugeIcons pairs from mappings.json rows
+                with needs_review = false. A null target is a labelled
+                "no equivalent". Choices are every target name in the file.
+    synthetic   Generated names with a known match (a renamed copy, as
+                another library would name it) or none, plus distractors.
+
+Usage:
+    python bench_mapper.py
+    python bench_mapper.py --sizes 1000 4000 --configs ratio ratio-blocked
+    python bench_mapper.py --thresholds 70 80 90 --output run.json
+    python bench_mapper.py --compare bench_results/mapper-20261001-120000.json
+"""
+import gc
+import re
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import subprocess
+import tracemalloc
+import multiprocessing
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import Callable
+import numpy as np
+import rapidfuzz
+from rapidfuzz import fuzz, process
+from clusters import BlockingIndex, ConceptEntry
+from mapper import top_matches
+
+
+SUFFIXES = ["01", "02", "03", "alt", "line", "fill", "bold", "2", "square", "circle"]
+DEFAULT_THRESHOLDS = [70, 75, 80, 85, 90, 95]
+CONFIRMED_LIBRARIES = ["phosphor", "hugeicons"]
+
+PROC_STATUS = Path("/proc/self/status")
+PROC_CLEAR_REFS = Path("/proc/self/clear_refs")  # Writing "5" resets VmHWM (Linux)
+
+# (index into choices, score) for the best choice, or None
+Match = tuple[int, float] | None
+
+
+@dataclass
+class Dataset:
+    """Query names, choice names and the expected choice per query."""
+
+    name: str
+    queries: list[str]
+    choices: list[str]
+    expected: list[int | None]  # Index into choices; None = no equivalent
+
+
+@dataclass
+class MapperConfig:
+    """A way of picking the best choice per query."""
+
+    description: str
+    # (queries, choices, score_cutoff) -> (best match per query, candidate pairs scored)
+    match: Callable[[list[str], list[str], float], tuple[list[Match], int]]
+
+
+def load_seed_names() -> list[str]:
+    """Canonical names from mappings.json, or a small built-in list."""
+    path = Path(__file__).parent / "mappings.json"
+    if path.exists():
+        names = sorted({m["canonical_name"] for m in json.loads(path.read_text())})
+        if names:
+            return names
+    return ["arrow-right", "arrow-left", "check", "x", "plus", "minus", "search", "home", "user", "settings"]
+
+
+def mutate(rng: random.Random, name: str) -> str:
+    """Derive a plausible name from another library's naming scheme."""
+    roll = rng.random()
+    if roll < 0.3:
+        return name
+    if roll < 0.6:
+        return f"{name}-{rng.choice(SUFFIXES)}"
+    if roll < 0.8:
+        return name.replace("-", "")
+    words = name.split("-")
+    rng.shuffle(words)
+    return "-".join(words)
+
+
+def make_labelled_corpus(
+    seed_names: list[str],
+    size: int,
+    seed: int,
+    match_rate: float = 0.7,
+) -> Dataset:
+    """
+    Build `size` queries and about 2x as many choices with known answers.
+
+    Names are random 1-3 word combinations of the words in `seed_names`.
+    A `match_rate` share of queries gets a mutated copy among the choices;
+    the rest have no equivalent. Distractors are fresh random names.
+    """
+    rng = random.Random(seed)
+    words = sorted({word for name in seed_names for word in name.split("-") if word})
+
+    def random_name() -> str:
+        return "-".join(rng.sample(words, rng.choice([1, 2, 2, 3])))
+
+    queries: dict[str, None] = {}
+    while len(queries) < size:
+        queries[random_name()] = None
+
+    choices: dict[str, None] = {}
+    expected_names = []
+    for query in queries:
+        target = None
+        if rng.random() < match_rate:
+            for _ in range(3):
+                candidate = mutate(rng, query)
+                if candidate not in choices:
+                    target = candidate
+                    choices[target] = None
+                    break
+        expected_names.append(target)
+
+    while len(choices) < size * 2:
+        name = random_name()
+        if name not in queries:
+            choices[name] = None
+
+    choice_list = list(choices)
+    rng.shuffle(choice_list)
+    index = {name: i for i, name in enumerate(choice_list)}
+    return Dataset(
+        name=f"synthetic-{size}",
+        queries=list(queries),
+        choices=choice_list,
+        expected=[index[name] if name else None for name in expected_names],
+    )
+
+
+def icon_name(icon_id: str) -> str:
+    """'phosphor:arrow-down' -> 'arrow-down'."""
+    return icon_id.split(":", 1)[1]
+
+
+def load_confirmed_datasets(path: Path) -> list[Dataset]:
+    """One labelled dataset per target library from confirmed mappings.json rows."""
+    if not path.exists():
+        print(f"Warning: {path} not found, skipping confirmed datasets")
+        return []
+
+    mappings = json.loads(path.read_text())
+    confirmed = [m for m in mappings if not m["needs_review"] and m["lucide_id"]]
+
+    datasets = []
+    for library in CONFIRMED_LIBRARIES:
+        key = f"{library}_id"
+        choices = sorted({icon_name(m[key]) for m in mappings if m[key]})
+        index = {name: i for i, name in enumerate(choices)}
+        datasets.append(Dataset(
+            name=f"confirmed-{library}",
+            queries=[icon_name(m["lucide_id"]) for m in confirmed],
+            choices=choices,
+            expected=[index[icon_name(m[key])] if m[key] else None for m in confirmed],
+        ))
+    return datasets
+
+
+def spaced(name: str) -> str:
+    """Hyphens to spaces, so token-based scorers see words."""
+    return name.replace("-", " ")
+
+
+def match_matrix(
+    queries: list[str],
+    choices: list[str],
+    score_cutoff: float,
+    scorer=fuzz.ratio,
+    prepare: Callable[[str], str] | None = None,
+) -> tuple[list[Match], int]:
+    """Score the full queries x choices matrix (mapper.top_matches)."""
+    if prepare:
+        queries = [prepare(name) for name in queries]
+        choices = [prepare(name) for name in choices]
+    rows = top_matches(queries, choices, score_cutoff=score_cutoff, scorer=scorer)
+    return [row[0] if row else None for row in rows], len(queries) * len(choices)
+
+
+def match_loop(queries: list[str], choices: list[str], score_cutoff: float) -> tuple[list[Match], int]:
+    """One process.extractOne call per query, as auto_map used to run."""
+    results = []
+    for query in queries:
+        match = process.extractOne(query, choices, scorer=fuzz.ratio, score_cutoff=score_cutoff)
+        results.append((match[2], match[1]) if match else None)
+    return results, len(queries) * len(choices)
+
+
+def match_blocked(queries: list[str], choices: list[str], score_cutoff: float) -> tuple[list[Match], int]:
+    """Score only pairs that share enough name trigrams (clusters.BlockingIndex)."""
+    entries = [ConceptEntry("query", name) for name in queries] + [ConceptEntry("choice", name) for name in choices]
+    index = BlockingIndex(entries)
+
+    results = []
+    candidate_pairs = 0
+    for row, query in enumerate(queries):
+        # Choices sit after every query, so they all pass the higher-index filter
+        candidates = [entry - len(queries) for entry in index.candidates(row, score_cutoff)]
+        candidate_pairs += len(candidates)
+        if not candidates:
+            results.append(None)
+            continue
+
+        scores = process.cdist(
+            [query],
+            [choices[c] for c in candidates],
+            scorer=fuzz.ratio,
+            score_cutoff=score_cutoff,
+            dtype=np.float64,
+        )[0]
+        # Candidates are ascending, so argmax breaks ties towards the earlier choice
+        best = int(scores.argmax())
+        score = float(scores[best])
+        results.append((candidates[best], score) if score > 0 and score >= score_cutoff else None)
+    return results, candidate_pairs
+
+
+CONFIGS = {
+    "ratio": MapperConfig(
+        "fuzz.ratio over the full cdist matrix (current auto_map)",
+        match_matrix,
+    ),
+    "ratio-loop": MapperConfig(
+        "fuzz.ratio with one extractOne call per query (previous auto_map)",
+        match_loop,
+    ),
+    "ratio-blocked": MapperConfig(
+        "fuzz.ratio on trigram-blocked candidate pairs (concept clustering)",
+        match_blocked,
+    ),
+    "token-sort": MapperConfig(
+        "fuzz.token_sort_ratio on hyphen-separated words",
+        partial(match_matrix, scorer=fuzz.token_sort_ratio, prepare=spaced),
+    ),
+    "wratio": MapperConfig(
+        "fuzz.WRatio on hyphen-separated words",
+        partial(match_matrix, scorer=fuzz.WRatio, prepare=spaced),
+    ),
+}
+
+
+def evaluate(predicted: list[Match], expected: list[int | None], thresholds: list[float]) -> list[dict]:
+    """
+    Precision/recall per threshold.
+
+    A match below the threshold counts as "no match". A wrong match is
+    both a false positive and, if the query had an answer, a false negative.
+    """
+    metrics = []
+    for threshold in thresholds:
+        tp = fp = fn = 0
+        for match, answer in zip(predicted, expected):
+            guess = match[0] if match and match[1] >= threshold else None
+            if guess is not None and guess == answer:
+                tp += 1
+                continue
+            if guess is not None:
+                fp += 1
+            if answer is not None:
+                fn += 1
+
+        precision = tp / (tp + fp) if tp + fp else 1.0
+        recall = tp / (tp + fn) if tp + fn else 1.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        metrics.append({
+            "threshold": threshold,
+            "precision": round(precision, 4),
+            "recall": round(recall, 4),
+            "f1": round(f1, 4),
+            "tp": tp,
+            "fp": fp,
+            "fn": fn,
+        })
+    return metrics
+
+
+def _proc_status_mb(field: str) -> float:
+    match = re.search(rf"^{field}:\s+(\d+) kB", PROC_STATUS.read_text(), re.M)
+    return int(match.group(1)) / 1024
+
+
+def _peak_memory_child(config: MapperConfig, dataset: Dataset, cutoff: float, queue):
+    gc.collect()
+    if PROC_CLEAR_REFS.exists():
+        # Reset the RSS high-water mark, then read it back after matching
+        PROC_CLEAR_REFS.write_text("5")
+        baseline = _proc_status_mb("VmRSS")
+        config.match(dataset.queries, dataset.choices, cutoff)
+        queue.put(max(0.0, _proc_status_mb("VmHWM") - baseline))
+        return
+
+    tracemalloc.start()
+    config.match(dataset.queries, dataset.choices, cutoff)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    queue.put(peak / (1024 * 1024))
+
+
+def peak_memory_mb(config: MapperConfig, dataset: Dataset, cutoff: float) -> float:
+    """
+    Peak memory growth while matching, measured in a fresh process.
+
+    On Linux this is RSS growth, which also counts the natively allocated
+    cdist score matrices; elsewhere it falls back to tracemalloc, which
+    only sees Python allocations. A spawned child starts with a clean heap,
+    so memory freed by earlier runs cannot hide a later run's peak.
+    """
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    child = context.Process(target=_peak_memory_child, args=(config, dataset, cutoff, queue))
+    child.start()
+    peak = queue.get()
+    child.join()
+    return peak
+
+
+def run_config(name: str, config: MapperConfig, dataset: Dataset, thresholds: list[float]) -> dict:
+    """
+    Time one configuration on one dataset, then measure its peak memory.
+
+    The match runs once at the lowest threshold; higher thresholds only
+    drop weaker best matches, so one pass scores the whole sweep.
+    """
+    cutoff = min(thresholds)
+
+    gc.collect()
+    start = time.perf_counter()
+    predicted, candidate_pairs = config.match(dataset.queries, dataset.choices, cutoff)
+    wall_time = time.perf_counter() - start
+
+    peak_memory = peak_memory_mb(config, dataset, cutoff)
+
+    return {
+        "dataset": dataset.name,
+        "config": name,
+        "queries": len(dataset.queries),
+        "choices": len(dataset.choices),
+        "labelled_matches": sum(answer is not None for answer in dataset.expected),
+        "candidate_pairs": candidate_pairs,
+        "wall_time_s": round(wall_time, 4),
+        "peak_memory_mb": round(peak_memory, 2),
+        "metrics": evaluate(predicted, dataset.expected, thresholds),
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=Path(__file__).parent, check=True,
+        )
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_run(run: dict):
+    print(f"\n{run['dataset']} / {run['config']}: {run['queries']} queries x {run['choices']} choices, "
+          f"{run['candidate_pairs']} pairs, {run['wall_time_s']:.3f}s, {run['peak_memory_mb']:.1f} MB peak")
+    print(f"  {'threshold':>9} {'precision':>9} {'recall':>7} {'f1':>6} {'tp':>6} {'fp':>6} {'fn':>6}")
+    for m in run["metrics"]:
+        print(f"  {m['threshold']:>9g} {m['precision']:>9.3f} {m['recall']:>7.3f} {m['f1']:>6.3f} "
+              f"{m['tp']:>6} {m['fp']:>6} {m['fn']:>6}")
+
+
+def compare_runs(previous: dict, current: dict):
+    """Print time and best-F1 changes for runs present in both result files."""
+    before = {(run["dataset"], run["config"]): run for run in previous["runs"]}
+
+    print("\n" + "=" * 50)
+    print(f"Compared with {previous.get('git_revision') or 'unknown'} ({previous.get('created_at')})")
+    print("=" * 50)
+    print(f"{'dataset':<22} {'config':<14} {'time':>16} {'best f1':>16}")
+    for run in current["runs"]:
+        old = before.get((run["dataset"], run["config"]))
+        if not old:
+            continue
+        old_f1 = max(m["f1"] for m in old["metrics"])
+        new_f1 = max(m["f1"] for m in run["metrics"])
+        print(f"{run['dataset']:<22} {run['config']:<14} "
+              f"{old['wall_time_s']:>7.3f}->{run['wall_time_s']:<7.3f} "
+              f"{old_f1:>7.3f}->{new_f1:<7.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fuzzy name matching speed and accuracy")
+    parser.add_argument("--configs", nargs="+", choices=list(CONFIGS), default=list(CONFIGS),
+                        help="Mapper configurations to run (default: all)")
+    parser.add_argument("--datasets", nargs="+", choices=["confirmed", "synthetic"],
+                        default=["confirmed", "synthetic"])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 1000, 2000, 4000],
+                        help="Synthetic query counts (choices are 2x)")
+    parser.add_argument("--thresholds", type=float, nargs="+", default=DEFAULT_THRESHOLDS)
+    parser.add_argument("--mappings", type=Path, default=Path(__file__).parent / "mappings.json",
+                        help="Mappings export with confirmed pairs")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="Results file (default: bench_results/mapper-<time>.json)")
+    parser.add_argument("--compare", type=Path, metavar="RESULTS", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    thresholds = sorted(args.thresholds)
+    datasets = []
+    if "confirmed" in args.datasets:
+        datasets.extend(load_confirmed_datasets(args.mappings))
+    if "synthetic" in args.datasets:
+        seed_names = load_seed_names()
+        datasets.extend(make_labelled_corpus(seed_names, size, args.seed + size) for size in args.sizes)
+
+    if not datasets:
+        print("Error: no datasets to run")
+        sys.exit(1)
+
+    print("=" * 50)
+    print(f"Running {len(args.configs)} configs on {len(datasets)} datasets")
+    print("=" * 50)
+
+    runs = []
+    for dataset in datasets:
+        for name in args.configs:
+            run = run_config(name, CONFIGS[name], dataset, thresholds)
+            print_run(run)
+            runs.append(run)
+
+    created_at = datetime.now(timezone.utc)
+    results = {
+        "created_at": created_at.isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "rapidfuzz": rapidfuzz.__version__,
+        "seed": args.seed,
+        "thresholds": thresholds,
+        "configs": {name: CONFIGS[name].description for name in args.configs},
+        "runs": runs,
+    }
+
+    output = args.output or Path("bench_results") / f"mapper-{created_at:%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"\n✓ Wrote results to {output}")
+
+    if args.compare:
+        compare_runs(json.loads(args.compare.read_text()), results)
+
+
+if __name__ == "__main__":
+    main()
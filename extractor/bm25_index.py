@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+BM25 inverted index over icon names, tags and categories.
+
+LIKE '%term%' queries can neither rank nor use an index for infix terms.
+This builds a standalone keyword index instead, as a directory of plain
+files:
+
+    terms.txt         sorted term dictionary, one term per line
+    terms.npy         (n_terms, 2) int64: postings byte offset, document frequency
+                      (a term's postings end at the next term's offset)
+    postings.bin      per term: doc id deltas, then per-field term counts,
+                      all unsigned LEB128 varints
+    norms.npy         (n_docs, n_fields) float32 BM25 length norms,
+                      1 - b + b * field_length / average_field_length
+    ids.json          icon id of each document
+    manifest.json     fields, boosts, k1, b, counts, build time
+
+Documents are icons in id order. Fields, highest boost first: the name
+(normalized and PascalCase-split), tags, category, and synonyms of the
+name words from the extractors' SYNONYMS and SYNONYM_GROUPS in
+src/lib/synonyms.ts. Scores are BM25F: per-field counts are boosted and
+length-normalized, summed, then saturated once with k1.
+
+Usage:
+    python bm25_index.py --build                    # Export from the database
+    python bm25_index.py --query "shopping cart" --k 10
+    python bm25_index.py --benchmark                # Build time and query latency vs LIKE
+"""
+import os
+import re
+import sys
+import json
+import time
+import heapq
+import shutil
+import argparse
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from pathlib import Path
+import numpy as np
+from name_lookup import load_synonyms
+
+
+DEFAULT_INDEX_DIR = Path(__file__).parent / ".cache" / "bm25-index"
+SYNONYMS_PATH = Path(__file__).parent.parent / "src" / "lib" / "synonyms.ts"
+
+FIELDS = ("name", "tags", "category", "synonyms")
+BOOSTS = (3.0, 1.5, 1.0, 0.5)
+K1 = 1.2
+B = 0.75
+
+TOKEN = re.compile(r"[a-z0-9]+")
+CAMEL_BOUNDARY = re.compile(r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])")
+GROUP = re.compile(r"\[([^\[\]]*)\]")
+QUOTED = re.compile(r"""["']([^"']+)["']""")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase alphanumeric runs; camelCase and kebab-case both split into words."""
+    return TOKEN.findall(CAMEL_BOUNDARY.sub(" ", text).lower())
+
+
+def load_synonym_groups(path: Path = SYNONYMS_PATH) -> list[list[str]]:
+    """Parse SYNONYM_GROUPS (arrays of related terms) out of synonyms.ts."""
+    if not path.exists():
+        print(f"Warning: {path} not found, skipping synonym groups")
+        return []
+
+    source = path.read_text()
+    start = source.find("SYNONYM_GROUPS")
+    start = source.find("= [", start)
+    end = source.find("\n]", start)
+    if start == -1 or end == -1:
+        print(f"Warning: SYNONYM_GROUPS not found in {path}, skipping synonym groups")
+        return []
+
+    body = re.sub(r"//[^\n]*", "", source[start + 3 : end])
+    return [QUOTED.findall(group) for group in GROUP.findall(body)]
+
+
+def build_synonym_map() -> dict[str, set[str]]:
+    """
+    {word: synonym tokens} from SYNONYM_GROUPS (every group member maps to
+    the rest of its group) and the extractors' SYNONYMS (name -> terms).
+    """
+    synonyms: dict[str, set[str]] = defaultdict(set)
+    for group in load_synonym_groups():
+        tokens = {token for term in group for token in tokenize(term)}
+        for term in group:
+            for word in tokenize(term):
+                synonyms[word] |= tokens - {word}
+    for term, names in load_synonyms().items():
+        term_tokens = set(tokenize(term))
+        for name in names:
+            for word in tokenize(name):
+                synonyms[word] |= term_tokens - {word}
+    return dict(synonyms)
+
+
+def document_fields(icon: tuple, synonyms: dict[str, set[str]]) -> tuple[list[str], ...]:
+    """Field token lists for an (id, name, normalized_name, category, tags) row."""
+    _, name, normalized_name, category, tags = icon
+    name_tokens = list(dict.fromkeys(tokenize(normalized_name) + tokenize(name)))
+    tag_tokens = [token for tag in (json.loads(tags) if tags else []) for token in tokenize(tag)]
+    category_tokens = tokenize(category or "")
+
+    known = set(name_tokens)
+    synonym_tokens = sorted({s for word in name_tokens for s in synonyms.get(word, ())} - known)
+    return name_tokens, tag_tokens, category_tokens, synonym_tokens
+
+
+def encode_varints(values: np.ndarray) -> bytes:
+    """Unsigned LEB128: 7 bits per byte, high bit set on all but the last byte."""
+    values = np.asarray(values, dtype=np.uint64)
+    out = bytearray()
+    for value in values.tolist():
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+    return bytes(out)
+
+
+def decode_varints(data: np.ndarray, count: int) -> tuple[np.ndarray, int]:
+    """
+    First `count` varints of a uint8 array, vectorized.
+    Returns (values, bytes consumed).
+    """
+    ends = np.flatnonzero(data < 0x80)[:count]
+    if len(ends) < count:
+        raise ValueError("truncated postings")
+    used = int(ends[-1]) + 1 if count else 0
+    starts = np.concatenate([[0], ends[:-1] + 1])
+    position = np.arange(used) - np.repeat(starts, ends - starts + 1)
+    payload = (data[:used] & 0x7F).astype(np.int64) << (7 * position)
+    return np.add.reduceat(payload, starts) if count else payload[:0], used
+
+
+def build_index(icons: list[tuple], out_dir: Path, k1: float = K1, b: float = B) -> dict:
+    """
+    Write an index of (id, name, normalized_name, category, tags) rows to out_dir.
+
+    The new index is written to a sibling directory and swapped in, so a
+    reader never sees a half-written one. Returns the manifest.
+    """
+    start = time.perf_counter()
+    icons = sorted(icons, key=lambda icon: icon[0])
+    synonyms = build_synonym_map()
+
+    n_fields = len(FIELDS)
+    lengths = np.zeros((len(icons), n_fields), dtype=np.float32)
+    postings: dict[str, list[tuple[int, list[int]]]] = defaultdict(list)
+    for doc, icon in enumerate(icons):
+        counts: dict[str, list[int]] = {}
+        for field, tokens in enumerate(document_fields(icon, synonyms)):
+            lengths[doc, field] = len(tokens)
+            for token, count in Counter(tokens).items():
+                counts.setdefault(token, [0] * n_fields)[field] = count
+        for token, field_counts in counts.items():
+            postings[token].append((doc, field_counts))
+
+    averages = lengths.mean(axis=0) if len(icons) else np.zeros(n_fields, dtype=np.float32)
+    norms = (1 - b + b * lengths / np.maximum(averages, 1e-9)).astype(np.float32)
+
+    terms = sorted(postings)
+    dictionary = np.zeros((len(terms), 2), dtype=np.int64)
+    blob = bytearray()
+    for position, term in enumerate(terms):
+        docs = np.array([doc for doc, _ in postings[term]], dtype=np.int64)
+        field_counts = np.array([counts for _, counts in postings[term]], dtype=np.int64)
+        dictionary[position] = (len(blob), len(docs))
+        blob += encode_varints(np.diff(docs, prepend=0))
+        blob += encode_varints(field_counts.ravel())
+
+    manifest = {
+        "count": len(icons),
+        "terms": len(terms),
+        "postings": int(dictionary[:, 1].sum()) if len(terms) else 0,
+        "fields": list(FIELDS),
+        "boosts": list(BOOSTS),
+        "average_lengths": [float(a) for a in averages],
+        "k1": k1,
+        "b": b,
+        "postings_bytes": len(blob),
+        "built_at": int(time.time()),
+    }
+
+    staging = out_dir.with_name(out_dir.name + ".tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    (staging / "terms.txt").write_text("\n".join(terms))
+    np.save(staging / "terms.npy", dictionary)
+    (staging / "postings.bin").write_bytes(bytes(blob))
+    np.save(staging / "norms.npy", norms)
+    (staging / "ids.json").write_text(json.dumps([icon[0] for icon in icons]))
+    manifest["build_seconds"] = round(time.perf_counter() - start, 3)
+    (staging / "manifest.json").write_text(json.dumps(manifest, indent=2))
+
+    previous = out_dir.with_name(out_dir.name + ".old")
+    shutil.rmtree(previous, ignore_errors=True)
+    if out_dir.exists():
+        out_dir.rename(previous)
+    staging.rename(out_dir)
+    shutil.rmtree(previous, ignore_errors=True)
+    return manifest
+
+
+def load_icons(conn) -> list[tuple]:
+    return conn.execute("SELECT id, name, normalized_name, category, tags FROM icons ORDER BY id").fetchall()
+
+
+def export_index(conn, out_dir: Path = DEFAULT_INDEX_DIR) -> dict:
+    """Build the index from the icons table. Returns the manifest."""
+    return build_index(load_icons(conn), out_dir)
+
+
+class BM25Index:
+    """Read-only view of an index directory."""
+
+    def __init__(self, index_dir: Path = DEFAULT_INDEX_DIR):
+        self.manifest = json.loads((index_dir / "manifest.json").read_text())
+        text = (index_dir / "terms.txt").read_text()
+        self.terms = text.split("\n") if text else []
+        self.dictionary = np.load(index_dir / "terms.npy")
+        self.postings = np.fromfile(index_dir / "postings.bin", dtype=np.uint8)
+        self.norms = np.load(index_dir / "norms.npy")
+        self.ids: list[str] = json.loads((index_dir / "ids.json").read_text())
+        self.boosts = np.array(self.manifest["boosts"], dtype=np.float32)
+        self.k1 = self.manifest["k1"]
+
+    def lookup(self, term: str) -> tuple[int, int, int] | None:
+        """(postings start, postings end, document frequency), by binary search of the dictionary."""
+        position = bisect_left(self.terms, term)
+        if position == len(self.terms) or self.terms[position] != term:
+            return None
+        offset, df = self.dictionary[position]
+        # Postings are written in term order, so a term's bytes end where the next term's start
+        end = self.dictionary[position + 1, 0] if position + 1 < len(self.dictionary) else len(self.postings)
+        return int(offset), int(end), int(df)
+
+    def term_postings(self, term: str) -> tuple[np.ndarray, np.ndarray] | None:
+        """(doc ids, (df, n_fields) counts) for a term, or None if absent."""
+        entry = self.lookup(term)
+        if entry is None:
+            return None
+        start, end, df = entry
+        n_fields = len(self.boosts)
+        data = self.postings[start:end]
+        deltas, used = decode_varints(data, df)
+        counts, _ = decode_varints(data[used:], df * n_fields)
+        return np.cumsum(deltas), counts.reshape(df, n_fields)
+
+    def idf(self, df: int) -> float:
+        n = len(self.ids)
+        return float(np.log1p((n - df + 0.5) / (df + 0.5)))
+
+    def search(self, query: str, k: int = 10) -> list[tuple[str, float]]:
+        """Top k (icon id, score) for the query's tokens, best first."""
+        scores: dict[int, float] = defaultdict(float)
+        for term in dict.fromkeys(tokenize(query)):
+            found = self.term_postings(term)
+            if found is None:
+                continue
+            docs, counts = found
+            tf = (counts * self.boosts / self.norms[docs]).sum(axis=1)
+            term_scores = self.idf(len(docs)) * tf * (self.k1 + 1) / (tf + self.k1)
+            for doc, score in zip(docs.tolist(), term_scores.tolist()):
+                scores[doc] += score
+        best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(self.ids[doc], score) for doc, score in best]
+
+
+def like_search(conn, query: str, k: int = 10) -> list[str]:
+    """The web app's substring match (search route fallback), for comparison."""
+    term = f"%{query.lower()}%"
+    rows = conn.execute(
+        """
+        SELECT id FROM icons
+        WHERE lower(normalized_name) LIKE ? OR lower(name) LIKE ? OR lower(tags) LIKE ? OR lower(category) LIKE ?
+        ORDER BY name LIMIT ?
+        """,
+        (term, term, term, term, k),
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+def sample_queries(icons: list[tuple], count: int, seed: int = 0) -> list[str]:
+    """Queries drawn from name words and word pairs, as users type them."""
+    rng = np.random.default_rng(seed)
+    words = [tokenize(icon[2]) for icon in icons]
+    queries = []
+    for row in rng.choice(len(icons), size=min(count, len(icons)), replace=len(icons) < count):
+        tokens = words[row]
+        queries.append(" ".join(tokens[:2]) if len(tokens) > 1 and rng.random() < 0.5 else tokens[0])
+    return queries
+
+
+def percentile_ms(samples: list[float], q: float) -> float:
+    return float(np.percentile(samples, q)) * 1000 if samples else 0.0
+
+
+def run_benchmark(conn, out_dir: Path, query_count: int, k: int):
+    """Build over the full corpus, then time BM25 and LIKE on the same queries."""
+    icons = load_icons(conn)
+    manifest = build_index(icons, out_dir)
+    size = sum(path.stat().st_size for path in out_dir.iterdir())
+
+    print("\n" + "=" * 50)
+    print(f"BM25 index: {manifest['count']} icons, {manifest['terms']} terms, {manifest['postings']} postings")
+    print("=" * 50)
+    print(f"  Build:     {manifest['build_seconds']:.2f}s")
+    print(f"  Size:      {size / 1024:.0f} KiB on disk ({manifest['postings_bytes'] / 1024:.0f} KiB postings)")
+
+    start = time.perf_counter()
+    index = BM25Index(out_dir)
+    print(f"  Load:      {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    queries = sample_queries(icons, query_count)
+    bm25_times, like_times = [], []
+    bm25_found = like_found = 0
+    for query in queries:
+        start = time.perf_counter()
+        bm25_found += bool(index.search(query, k))
+        bm25_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        like_found += bool(like_search(conn, query, k))
+        like_times.append(time.perf_counter() - start)
+
+    print(f"\n  {len(queries)} queries, k={k}")
+    print(f"  {'':<6} {'p50 ms':>8} {'p95 ms':>8} {'answered':>9}")
+    for label, times, found in (("bm25", bm25_times, bm25_found), ("LIKE", like_times, like_found)):
+        print(f"  {label:<6} {percentile_ms(times, 50):>8.2f} {percentile_ms(times, 95):>8.2f} "
+              f"{found / max(1, len(queries)):>9.1%}")
+
+
+def main():
+    import libsql_experimental as libsql
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="BM25 keyword index over icon names, tags and categories")
+    parser.add_argument("--build", action="store_true", help="Build the index from the database")
+    parser.add_argument("--query", help="Search the index")
+    parser.add_argument("--benchmark", action="store_true", help="Time the build and queries against LIKE")
+    parser.add_argument("--queries", type=int, default=1000, help="Queries for --benchmark (default: 1000)")
+    parser.add_argument("--k", type=int, default=10, help="Results per query (default: 10)")
+    parser.add_argument("--index-dir", type=Path, default=DEFAULT_INDEX_DIR,
+                        help="Index directory (default: extractor/.cache/bm25-index)")
+    args = parser.parse_args()
+
+    if not (args.build or args.query or args.benchmark):
+        parser.error("nothing to do: pass --build, --query and/or --benchmark")
+
+    if args.query and not (args.build or args.benchmark):
+        # Querying needs only the index files
+        for icon_id, score in BM25Index(args.index_dir).search(args.query, args.k):
+            print(f"  {score:7.3f}  {icon_id}")
+        return
+
+    load_dotenv(Path(__file__).parent.parent / ".env.local")
+
+    turso_url = os.environ.get("TURSO_DATABASE_URL")
+    auth_token = os.environ.get("TURSO_AUTH_TOKEN")
+
+    if not turso_url or not auth_token:
+        print("Error: TURSO_DATABASE_URL and TURSO_AUTH_TOKEN must be set")
+        sys.exit(1)
+
+    conn = libsql.connect(turso_url, auth_token=auth_token)
+
+    if args.benchmark:
+        run_benchmark(conn, args.index_dir, args.queries, args.k)
+    elif args.build:
+        manifest = export_index(conn, args.index_dir)
+        print(f"✓ BM25 index: {manifest['count']} icons, {manifest['terms']} terms "
+              f"in {manifest['build_seconds']:.2f}s -> {args.index_dir}")
+
+    if args.query:
+        for icon_id, score in BM25Index(args.index_dir).search(args.query, args.k):
+            print(f"  {score:7.3f}  {icon_id}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+"""Cross-library concept clusters built from blocked fuzzy name matching."""
+from collections import defaultdict
+from dataclasses import dataclass, field
+import numpy as np
+from rapidfuzz import fuzz, process
+from extractors.base import ExtractedIcon
+
+
+# Clustering order; the first library present in a cluster names it
+SOURCE_PRIORITY = [
+    "lucide",
+    "phosphor",
+    "hugeicons",
+    "heroicons",
+    "tabler",
+    "feather",
+    "remix",
+    "simple-icons",
+    "iconoir",
+]
+
+# Libraries that encode their style in the icon name. The first suffix is
+# the primary style; the others are attached to the same concept.
+STYLE_SUFFIXES = {
+    "heroicons": ("-outline", "-solid"),
+    "iconoir": ("-regular", "-solid"),
+    "remix": ("-line", "-fill"),
+}
+
+QGRAM = 3
+
+
+def match_name(source_id: str, normalized_name: str) -> str:
+    """Strip a library's style suffix, e.g. heroicons 'home-outline' -> 'home'."""
+    for suffix in STYLE_SUFFIXES.get(source_id, ()):
+        if normalized_name.endswith(suffix) and len(normalized_name) > len(suffix):
+            return normalized_name[: -len(suffix)]
+    return normalized_name
+
+
+def qgrams(name: str) -> set[str]:
+    """Padded character trigrams of a name, ignoring separators."""
+    compact = "$" + name.replace("-", "") + "$"
+    return {compact[i : i + QGRAM] for i in range(max(1, len(compact) - QGRAM + 1))}
+
+
+def max_edits(length, other_length, threshold: float):
+    """
+    Most indel edits fuzz.ratio allows between names of these lengths at `threshold`.
+
+    fuzz.ratio is 100 * (1 - edits / (la + lb)) on the full names, '-' included.
+    Works on ints and numpy arrays alike.
+    """
+    return np.floor((length + other_length) * (100 - threshold) / 100 + 1e-9)
+
+
+def min_shared_qgrams(grams, other_grams, edits):
+    """
+    Lower bound on indexed trigrams two names share when `edits` indels apart.
+
+    `grams` counts a name's distinct trigrams that are still in the index.
+    An indel changes at most one character of the compact name (none for a
+    '-'), destroying at most QGRAM of its trigrams (q-gram lemma); the rest
+    also occur in the other name. A bound <= 0 means blocking cannot rule
+    the pair out.
+    """
+    return np.maximum(grams, other_grams) - edits * QGRAM
+
+
+@dataclass
+class ConceptEntry:
+    """One library's take on a concept: its primary icon plus style siblings."""
+
+    source_id: str
+    name: str  # Match name, style suffix removed
+    icon_ids: list[str] = field(default_factory=list)
+
+
+@dataclass
+class ConceptCluster:
+    """Icons from different libraries that depict the same concept."""
+
+    canonical_name: str
+    canonical_icon_id: str
+    confidence: float
+    members: list[tuple[str, str, float]]  # (icon_id, source_id, score)
+
+    @property
+    def source_count(self) -> int:
+        return len({source_id for _, source_id, _ in self.members})
+
+
+class UnionFind:
+    """Disjoint sets over entry indices that refuse to merge two entries from the same library."""
+
+    def __init__(self, entries: list[ConceptEntry]):
+        self.parent = list(range(len(entries)))
+        self.sources = [{entry.source_id} for entry in entries]
+
+    def find(self, x: int) -> int:
+        root = x
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[x] != root:
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, a: int, b: int) -> bool:
+        """Merge the sets holding a and b. Returns False if they share a library."""
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b or self.sources[root_a] & self.sources[root_b]:
+            return False
+        if len(self.sources[root_a]) < len(self.sources[root_b]):
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.sources[root_a] |= self.sources[root_b]
+        return True
+
+
+class BlockingIndex:
+    """
+    Inverted index from name trigrams to concept entries.
+
+    Candidate pairs must share enough trigrams to possibly reach the score
+    threshold (see min_shared_qgrams). Trigrams shared by more than
+    `max_block_size` entries (e.g. '$ar', 'row') are purged since they say
+    little about a match, which keeps candidate generation far below
+    all-pairs. The bound only counts indexed trigrams, so purging never
+    rejects a pair that shares one; pairs sharing only purged trigrams are
+    not compared.
+    """
+
+    def __init__(self, entries: list[ConceptEntry], threshold: float, max_block_size: int = 500):
+        self.entries = entries
+        self.threshold = threshold
+        # Same string fuzz.ratio scores, separators included
+        self.lengths = np.array([len(entry.name) for entry in entries], dtype=np.int64)
+        source_ids = {source_id: i for i, source_id in enumerate(sorted({e.source_id for e in entries}))}
+        self.sources = np.array([source_ids[entry.source_id] for entry in entries], dtype=np.int64)
+        self.entry_qgrams = [sorted(qgrams(entry.name)) for entry in entries]
+
+        postings: dict[str, list[int]] = defaultdict(list)
+        for index, grams in enumerate(self.entry_qgrams):
+            for gram in grams:
+                postings[gram].append(index)
+        self.postings = {
+            gram: np.array(ids, dtype=np.int64)
+            for gram, ids in postings.items()
+            if len(ids) <= max_block_size
+        }
+        self.indexed = np.array(
+            [sum(gram in self.postings for gram in grams) for grams in self.entry_qgrams], dtype=np.int64
+        )
+
+    def candidates(self, index: int) -> list[int]:
+        """Entries from other libraries that may match entry `index`, with higher indices only."""
+        lists = [self.postings[gram] for gram in self.entry_qgrams[index] if gram in self.postings]
+        if not lists:
+            return []
+
+        others, shared = np.unique(np.concatenate(lists), return_counts=True)
+        edits = max_edits(int(self.lengths[index]), self.lengths[others], self.threshold)
+        needed = min_shared_qgrams(int(self.indexed[index]), self.indexed[others], edits)
+
+        keep = (others > index) & (self.sources[others] != self.sources[index]) & (shared >= needed)
+        return others[keep].tolist()
+
+
+class ClusterBuilder:
+    """Groups equivalent icons from all libraries into concept clusters."""
+
+    def __init__(self, threshold: float = 80, max_block_size: int = 500):
+        self.threshold = threshold
+        self.max_block_size = max_block_size
+        self.candidate_pairs = 0
+
+    @staticmethod
+    def entries_from_icons(icons_by_source: dict[str, dict[str, str]]) -> list[ConceptEntry]:
+        """
+        Build concept entries from {source_id: {normalized_name: icon_id}}.
+
+        Style siblings (heroicons outline/solid, ...) share one entry, led by
+        the primary style.
+        """
+        entries = []
+        for source_id in sorted(icons_by_source, key=source_rank):
+            grouped: dict[str, list[tuple[int, str, str]]] = defaultdict(list)
+            suffixes = STYLE_SUFFIXES.get(source_id, ())
+            for normalized_name, icon_id in icons_by_source[source_id].items():
+                name = match_name(source_id, normalized_name)
+                style = len(suffixes)
+                for rank, suffix in enumerate(suffixes):
+                    if normalized_name == name + suffix:
+                        style = rank
+                grouped[name].append((style, normalized_name, icon_id))
+
+            for name in sorted(grouped):
+                siblings = sorted(grouped[name])
+                entries.append(ConceptEntry(source_id, name, [icon_id for _, _, icon_id in siblings]))
+        return entries
+
+    @staticmethod
+    def names_from_extracted(icons: list[ExtractedIcon]) -> dict[str, str]:
+        """Get {normalized_name: icon_id} for freshly extracted base icons."""
+        return {
+            icon.normalized_name: f"{icon.source}:{icon.normalized_name}"
+            for icon in icons
+            if icon.variant is None
+        }
+
+    def score_edges(self, entries: list[ConceptEntry]) -> list[tuple[float, int, int]]:
+        """
+        Score blocked candidate pairs and keep the plausible edges.
+
+        An edge survives if it reaches the threshold and is the best match
+        for at least one end within the other end's library.
+        """
+        index = BlockingIndex(entries, self.threshold, self.max_block_size)
+        best: dict[tuple[int, str], float] = {}
+        scored = []
+        self.candidate_pairs = 0
+
+        for a in range(len(entries)):
+            candidates = index.candidates(a)
+            if not candidates:
+                continue
+            self.candidate_pairs += len(candidates)
+
+            scores = process.cdist(
+                [entries[a].name],
+                [entries[b].name for b in candidates],
+                scorer=fuzz.ratio,
+                score_cutoff=self.threshold,
+                dtype=np.float64,
+            )[0]
+            for hit in np.flatnonzero(scores).tolist():
+                b, score = candidates[hit], float(scores[hit])
+                scored.append((score, a, b))
+                for this, other in ((a, b), (b, a)):
+                    key = (this, entries[other].source_id)
+                    if score > best.get(key, 0):
+                        best[key] = score
+
+        edges = [
+            (score, a, b)
+            for score, a, b in scored
+            if score >= best[(a, entries[b].source_id)] or score >= best[(b, entries[a].source_id)]
+        ]
+        # Strongest first; ties broken by entry order for deterministic clusters
+        edges.sort(key=lambda edge: (-edge[0], edge[1], edge[2]))
+        return edges
+
+    def build(self, icons_by_source: dict[str, dict[str, str]]) -> list[ConceptCluster]:
+        """Cluster icons from {source_id: {normalized_name: icon_id}}."""
+        entries = self.entries_from_icons(icons_by_source)
+        edges = self.score_edges(entries)
+
+        # Kruskal-style: strongest edges merge first, at most one entry per library
+        sets = UnionFind(entries)
+        joined_at = {}
+        for score, a, b in edges:
+            if sets.union(a, b):
+                joined_at.setdefault(a, score)
+                joined_at.setdefault(b, score)
+
+        groups: dict[int, list[int]] = defaultdict(list)
+        for member in joined_at:
+            groups[sets.find(member)].append(member)
+
+        clusters = []
+        for members in groups.values():
+            members.sort(key=lambda i: (source_rank(entries[i].source_id), entries[i].name))
+            lead = entries[members[0]]
+            clusters.append(ConceptCluster(
+                canonical_name=lead.name,
+                canonical_icon_id=lead.icon_ids[0],
+                confidence=min(joined_at[i] for i in members),
+                members=[
+                    (icon_id, entries[i].source_id, joined_at[i])
+                    for i in members
+                    for icon_id in entries[i].icon_ids
+                ],
+            ))
+
+        clusters.sort(key=lambda cluster: (cluster.canonical_name, cluster.canonical_icon_id))
+        print(f"✓ Built {len(clusters)} concept clusters from {len(entries)} names "
+              f"({self.candidate_pairs} candidate pairs, {len(edges)} edges)")
+        return clusters
+
+
+def source_rank(source_id: str) -> int:
+    """Position of a library in SOURCE_PRIORITY (unknown libraries last)."""
+    try:
+        return SOURCE_PRIORITY.index(source_id)
+    except ValueError:
+        return len(SOURCE_PRIORITY)
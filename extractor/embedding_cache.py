@@ -0,0 +1,82 @@
+"""Content-addressed embedding cache in a local SQLite file."""
+import time
+import sqlite3
+import hashlib
+from pathlib import Path
+
+
+DEFAULT_CACHE_PATH = Path(__file__).parent / ".cache" / "embeddings.sqlite"
+
+
+def text_hash(text: str) -> str:
+    """Cache key for a search text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Embeddings keyed by (model, dimensions, sha256(text)), stored as F32 blobs.
+
+    The cache outlives the icons table, so clearing and re-extracting a
+    source re-embeds nothing whose search text is unchanged.
+    """
+
+    LOOKUP_CHUNK = 500  # Keys per IN (...) query
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                dimensions INTEGER NOT NULL,
+                text_hash TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                created_at INTEGER NOT NULL,
+                PRIMARY KEY (model, dimensions, text_hash)
+            ) WITHOUT ROWID
+            """
+        )
+        self.conn.commit()
+
+    def get_many(self, model: str, dimensions: int, texts: list[str]) -> dict[str, bytes]:
+        """Cached F32 blobs for whichever of `texts` are present."""
+        by_hash = {text_hash(text): text for text in texts}
+        hashes = list(by_hash)
+        found = {}
+        for start in range(0, len(hashes), self.LOOKUP_CHUNK):
+            chunk = hashes[start : start + self.LOOKUP_CHUNK]
+            placeholders = ", ".join("?" for _ in chunk)
+            rows = self.conn.execute(
+                f"""
+                SELECT text_hash, embedding FROM embeddings
+                WHERE model = ? AND dimensions = ? AND text_hash IN ({placeholders})
+                """,
+                (model, dimensions, *chunk),
+            ).fetchall()
+            for key, blob in rows:
+                found[by_hash[key]] = blob
+        return found
+
+    def put_many(self, model: str, dimensions: int, items: list[tuple[str, bytes]]):
+        """Store (text, F32 blob) pairs."""
+        now = int(time.time())
+        self.conn.executemany(
+            """
+            INSERT OR REPLACE INTO embeddings (model, dimensions, text_hash, embedding, created_at)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            [(model, dimensions, text_hash(text), blob, now) for text, blob in items],
+        )
+        self.conn.commit()
+
+    def count(self, model: str | None = None) -> int:
+        if model:
+            return self.conn.execute("SELECT COUNT(*) FROM embeddings WHERE model = ?", (model,)).fetchone()[0]
+        return self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+"""
+Concurrent, rate-limited client for OpenAI-compatible /embeddings endpoints.
+
+Texts are packed into batches by estimated token count, sent from a
+thread pool, and throttled by token buckets for requests and tokens per
+minute. 429, 5xx and connection errors are retried with jittered
+exponential backoff, honouring Retry-After; a 413 splits the batch. A
+batch that still fails is reported back instead of aborting the run.
+
+Usage (throughput check against a local stand-in server):
+    python embedding_client.py --stand-in
+    python embedding_client.py --stand-in --texts 5000 --latency 0.1 --error-rate 0.2
+    python embedding_client.py --stand-in --concurrency 1 4 16 --rpm 600
+"""
+import sys
+import json
+import math
+import time
+import random
+import hashlib
+import argparse
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 UTF-8 bytes per token), good enough for batching and budgets."""
+    return max(1, math.ceil(len(text.encode("utf-8")) / 4))
+
+
+class EmbeddingAPIError(RuntimeError):
+    """An embedding request that failed for good."""
+
+    def __init__(self, message: str, status: int | None = None):
+        super().__init__(message)
+        self.status = status
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `per_minute`.
+
+    The bucket starts full and holds at most `capacity` (a minute's worth
+    by default). debit() may push it negative, so usage reported after a
+    request is charged against future acquisitions.
+    """
+
+    def __init__(self, per_minute: float, capacity: float | None = None):
+        self.rate = per_minute / 60
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount: float = 1):
+        """Block until `amount` tokens are available, then take them."""
+        amount = min(amount, self.capacity)
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                wait = (amount - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def debit(self, amount: float):
+        """Take (or with a negative amount, return) tokens without waiting."""
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits, plus a shared pause after a 429."""
+
+    def __init__(self, requests_per_minute: float | None = None, tokens_per_minute: float | None = None):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def pause(self, seconds: float):
+        """Hold every worker back, e.g. for a server-sent Retry-After."""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def acquire(self, tokens: int):
+        wait = self.paused_until - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        if self.requests:
+            self.requests.acquire(1)
+        if self.tokens:
+            self.tokens.acquire(tokens)
+
+    def record_usage(self, estimated: int, actual: int):
+        """Correct the token bucket once the server reports real usage."""
+        if self.tokens and actual:
+            self.tokens.debit(actual - estimated)
+
+
+@dataclass
+class BatchResult:
+    """Embeddings for one batch, keyed by positions in the input texts."""
+
+    indices: list[int]
+    embeddings: list[list[float]] | None = None
+    error: Exception | None = None
+
+
+@dataclass
+class ClientStats:
+    requests: int = 0
+    retries: int = 0
+    splits: int = 0
+    failed_batches: int = 0
+    tokens: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, **counts: int):
+        with self.lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+
+class EmbeddingClient:
+    """Concurrent client for an OpenAI-compatible embeddings API."""
+
+    DEFAULT_CONCURRENCY = 4
+    DEFAULT_REQUESTS_PER_MINUTE = 3000
+    DEFAULT_TOKENS_PER_MINUTE = 1_000_000
+    DEFAULT_MAX_BATCH_TOKENS = 20_000
+    MAX_BATCH_ITEMS = 2048  # API limit on inputs per request
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str = "https://api.openai.com/v1",
+        model: str = "text-embedding-3-small",
+        dimensions: int | None = None,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        requests_per_minute: float | None = DEFAULT_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float | None = DEFAULT_TOKENS_PER_MINUTE,
+        max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+        max_batch_items: int = MAX_BATCH_ITEMS,
+        max_retries: int = 6,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        timeout: float = 60.0,
+    ):
+        self.api_key = api_key
+        self.url = f"{base_url.rstrip('/')}/embeddings"
+        self.model = model
+        self.dimensions = dimensions
+        self.concurrency = max(1, concurrency)
+        self.limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+        # A batch can never need more than one minute of token budget
+        self.max_batch_tokens = min(max_batch_tokens, tokens_per_minute or max_batch_tokens)
+        self.max_batch_items = min(max_batch_items, self.MAX_BATCH_ITEMS)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.stats = ClientStats()
+
+    def plan_batches(self, texts: list[str]) -> list[list[int]]:
+        """Pack text positions into batches under the token and item limits, in order."""
+        batches = []
+        current: list[int] = []
+        current_tokens = 0
+        for index, text in enumerate(texts):
+            tokens = estimate_tokens(text)
+            if current and (current_tokens + tokens > self.max_batch_tokens or len(current) >= self.max_batch_items):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(index)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def _post(self, texts: list[str]) -> tuple[list[list[float]], int]:
+        """One HTTP request. Returns embeddings in input order and the reported token usage."""
+        body = {"model": self.model, "input": texts}
+        if self.dimensions:
+            body["dimensions"] = self.dimensions
+
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(body).encode("utf-8"),
+            headers={
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {self.api_key}",
+            },
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            result = json.loads(response.read().decode("utf-8"))
+
+        # Sort by index to ensure correct order
+        data = sorted(result["data"], key=lambda item: item["index"])
+        if len(data) != len(texts):
+            raise EmbeddingAPIError(f"Expected {len(texts)} embeddings, got {len(data)}")
+        usage = result.get("usage") or {}
+        return [item["embedding"] for item in data], int(usage.get("total_tokens") or 0)
+
+    def _backoff(self, attempt: int, retry_after: float | None) -> float:
+        """Full-jitter exponential backoff, or the server's Retry-After plus a little jitter."""
+        if retry_after is not None:
+            return retry_after + random.uniform(0, self.backoff_base)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def _retry_after(error: urllib.error.HTTPError) -> float | None:
+        headers = error.headers or {}
+        for name, scale in (("retry-after-ms", 0.001), ("Retry-After", 1.0)):
+            value = headers.get(name)
+            if value:
+                try:
+                    return max(0.0, float(value) * scale)
+                except ValueError:
+                    pass  # HTTP-date form; fall back to our own backoff
+        return None
+
+    def embed(self, texts: list[str]) -> list[list[float]]:
+        """
+        Embed one batch, retrying transient failures.
+
+        Raises EmbeddingAPIError once retries run out or on a permanent
+        error (bad key, bad request).
+        """
+        estimated = sum(estimate_tokens(text) for text in texts)
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire(estimated)
+            self.stats.add(requests=1)
+            try:
+                embeddings, used = self._post(texts)
+                self.limiter.record_usage(estimated, used)
+                self.stats.add(tokens=used or estimated)
+                return embeddings
+            except urllib.error.HTTPError as e:
+                if e.code == 413 and len(texts) > 1:
+                    # Too large for one request: halve it
+                    self.stats.add(splits=1)
+                    middle = len(texts) // 2
+                    return self.embed(texts[:middle]) + self.embed(texts[middle:])
+
+                error_body = e.read().decode("utf-8", "replace") if e.fp else "No error body"
+                if e.code not in RETRYABLE_STATUS or attempt == self.max_retries:
+                    raise EmbeddingAPIError(f"Embedding API error {e.code}: {error_body}", e.code) from e
+
+                retry_after = self._retry_after(e)
+                if e.code == 429 and retry_after is not None:
+                    self.limiter.pause(retry_after)
+                delay = self._backoff(attempt, retry_after)
+            except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+                if attempt == self.max_retries:
+                    raise EmbeddingAPIError(f"Embedding API unreachable: {e}") from e
+                delay = self._backoff(attempt, None)
+
+            self.stats.add(retries=1)
+            time.sleep(delay)
+
+        raise EmbeddingAPIError("Retries exhausted")  # Unreachable; keeps type checkers happy
+
+    def embed_all(self, texts: list[str]) -> Iterator[BatchResult]:
+        """
+        Embed every text with up to `concurrency` requests in flight.
+
+        Yields one BatchResult per batch as it completes (not in input
+        order). Failed batches carry the error instead of embeddings.
+        """
+        batches = self.plan_batches(texts)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = {
+                pool.submit(self.embed, [texts[i] for i in batch]): batch
+                for batch in batches
+            }
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    yield BatchResult(batch, embeddings=future.result())
+                except EmbeddingAPIError as e:
+                    self.stats.add(failed_batches=1)
+                    yield BatchResult(batch, error=e)
+
+
+def fake_embedding(text: str, dimensions: int) -> list[float]:
+    """Deterministic stand-in vector, so results can be checked against their texts."""
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return [digest[i % len(digest)] / 255 for i in range(dimensions)]
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Fake /embeddings endpoint with configurable latency and injected errors."""
+
+    latency = 0.05
+    error_rate = 0.1
+    retry_after = 0.2  # Seconds, sent with every 429
+    max_inputs: int | None = None  # Larger requests get a 413
+    dimensions = 8
+    rng = random.Random(0)
+    rng_lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        texts = body["input"]
+        time.sleep(self.latency)
+
+        if self.max_inputs is not None and len(texts) > self.max_inputs:
+            self._reply(413, {"error": {"message": "Request too large"}})
+            return
+        status = self.injected_status(texts)
+        if status == 429:
+            self._reply(429, {"error": {"message": "Rate limit reached"}}, {"Retry-After": str(self.retry_after)})
+            return
+        if status is not None:
+            self._reply(status, {"error": {"message": f"Injected error {status}"}})
+            return
+
+        self._reply(200, {
+            "data": [
+                {"index": i, "embedding": fake_embedding(text, self.dimensions)}
+                for i, text in enumerate(texts)
+            ],
+            "usage": {"total_tokens": sum(estimate_tokens(text) for text in texts)},
+        })
+
+    def injected_status(self, texts: list[str]) -> int | None:
+        """Error status to answer with instead of embeddings: 429 or 503 at `error_rate`."""
+        with self.rng_lock:
+            roll = self.rng.random()
+        if roll < self.error_rate / 2:
+            return 429
+        if roll < self.error_rate:
+            return 503
+        return None
+
+    def _reply(self, status: int, payload: dict, headers: dict | None = None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run_stand_in(
+    text_count: int,
+    concurrency_levels: list[int],
+    latency: float,
+    error_rate: float,
+    max_batch_tokens: int,
+    requests_per_minute: float | None,
+) -> bool:
+    """
+    Embed synthetic texts against a local stand-in server at several concurrency levels.
+
+    Returns True if every level embedded every text correctly.
+    """
+    StandInHandler.latency = latency
+    StandInHandler.error_rate = error_rate
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    rng = random.Random(42)
+    words = ["arrow", "left", "right", "home", "user", "settings", "file", "chart", "cloud", "lock", "mail"]
+    texts = [" ".join(rng.choices(words, k=rng.randint(3, 12))) + f" {i}" for i in range(text_count)]
+
+    print("=" * 50)
+    print(f"Stand-in: {text_count} texts, {latency * 1000:.0f}ms latency, {error_rate:.0%} errors")
+    print("=" * 50)
+    print(f"{'workers':>7} {'batches':>7} {'requests':>8} {'retries':>7} {'failed':>6} {'time (s)':>8} {'texts/s':>8}  ok")
+
+    all_ok = True
+    try:
+        for concurrency in concurrency_levels:
+            client = EmbeddingClient(
+                "stand-in",
+                base_url=base_url,
+                dimensions=StandInHandler.dimensions,
+                concurrency=concurrency,
+                requests_per_minute=requests_per_minute,
+                tokens_per_minute=None,
+                max_batch_tokens=max_batch_tokens,
+                backoff_base=0.05,
+                max_retries=8,
+            )
+            batches = len(client.plan_batches(texts))
+            results: list[list[float] | None] = [None] * len(texts)
+
+            start = time.perf_counter()
+            for result in client.embed_all(texts):
+                if result.embeddings:
+                    for index, embedding in zip(result.indices, result.embeddings):
+                        results[index] = embedding
+            elapsed = time.perf_counter() - start
+
+            stats = client.stats
+            ok = stats.failed_batches == 0 and all(
+                embedding == fake_embedding(text, StandInHandler.dimensions)
+                for text, embedding in zip(texts, results)
+            )
+            all_ok = all_ok and ok
+            print(f"{concurrency:>7} {batches:>7} {stats.requests:>8} {stats.retries:>7} {stats.failed_batches:>6} "
+                  f"{elapsed:>8.2f} {text_count / elapsed:>8.0f}  {'yes' if ok else 'NO'}")
+    finally:
+        server.shutdown()
+    return all_ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding client throughput check")
+    parser.add_argument("--stand-in", action="store_true", required=True,
+                        help="Run against a local fake /embeddings server")
+    parser.add_argument("--texts", type=int, default=2000, help="Texts to embed (default: 2000)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per request (default: 0.05)")
+    parser.add_argument("--error-rate", type=float, default=0.1, help="Share of 429/503 replies (default: 0.1)")
+    parser.add_argument("--max-batch-tokens", type=int, default=400,
+                        help="Token budget per request; small so the run has many batches")
+    parser.add_argument("--rpm", type=float, help="Requests-per-minute limit (default: none)")
+    args = parser.parse_args()
+
+    if not run_stand_in(args.texts, args.concurrency, args.latency, args.error_rate, args.max_batch_tokens, args.rpm):
+        print("Error: some texts were not embedded correctly")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Embedding providers: the OpenAI-compatible API, or a fully offline local embedder.
+
+The local embedder hashes each search text into word and character
+n-gram features, weights them with TF-IDF and projects them onto a
+truncated SVD fitted on the icon corpus (latent semantic analysis).
+It needs nothing but NumPy; the fitted projection is saved as an .npz
+artifact so every run embeds into the same space.
+
+Local vectors live in a different space than API vectors, so the web
+app's query embeddings can't search them; they are meant for offline
+development, CI and benchmarks of the vector jobs (related.py, ...).
+
+Usage (benchmark the local embedder on synthetic icon texts):
+    python embedding_providers.py --benchmark 30000
+    python embedding_providers.py --benchmark 30000 --dims 128
+"""
+import time
+import zlib
+import hashlib
+import argparse
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterator
+import numpy as np
+from embedding_client import BatchResult, EmbeddingClient
+
+
+DEFAULT_LOCAL_MODEL_PATH = Path(__file__).parent / ".cache" / "local-embedder.npz"
+
+
+class EmbeddingProvider(ABC):
+    """Turns search texts into fixed-size embedding vectors."""
+
+    # Identifies the vector space; part of the embedding cache key
+    model: str
+    dimensions: int
+
+    @abstractmethod
+    def embed_all(self, texts: list[str]) -> Iterator[BatchResult]:
+        """Yield embeddings batch by batch (in any order) for every text."""
+
+    def plan_batches(self, texts: list[str]) -> list[list[int]]:
+        """How embed_all would split `texts`, for progress and reporting."""
+        return [list(range(len(texts)))] if texts else []
+
+    def describe(self) -> str:
+        return f"{self.model} ({self.dimensions} dimensions)"
+
+    def summary(self) -> str | None:
+        """One line of request statistics after a run, if there is anything to say."""
+        return None
+
+
+class OpenAIProvider(EmbeddingProvider):
+    """OpenAI-compatible /embeddings endpoint (OpenAI or the AI Gateway)."""
+
+    EMBEDDING_MODEL = "text-embedding-3-small"
+    EMBEDDING_DIMENSIONS = 1536  # OpenAI text-embedding-3-small dimensions
+
+    def __init__(self, api_key: str, gateway_url: str | None = None, **client_options):
+        self.model = self.EMBEDDING_MODEL
+        self.dimensions = self.EMBEDDING_DIMENSIONS
+        self.client = EmbeddingClient(
+            api_key,
+            # Default to OpenAI endpoint if no gateway specified
+            base_url=gateway_url or "https://api.openai.com/v1",
+            model=self.model,
+            **client_options,
+        )
+
+    def embed_all(self, texts: list[str]) -> Iterator[BatchResult]:
+        return self.client.embed_all(texts)
+
+    def plan_batches(self, texts: list[str]) -> list[list[int]]:
+        return self.client.plan_batches(texts)
+
+    def describe(self) -> str:
+        return f"{super().describe()}, {self.client.concurrency} concurrent requests"
+
+    def summary(self) -> str | None:
+        stats = self.client.stats
+        if not stats.requests:
+            return None
+        return f"{stats.requests} requests, {stats.retries} retries, {stats.splits} splits, ~{stats.tokens} tokens"
+
+
+class HashedFeatures:
+    """
+    Word and character n-gram counts hashed into `n_features` buckets.
+
+    Words are padded with spaces before n-grams are taken, so 'arrow'
+    yields ' ar', 'arr', ..., 'ow '. CRC32 keeps bucket ids stable across
+    processes (Python's hash() is salted).
+    """
+
+    def __init__(self, n_features: int = 2 ** 15, ngram_range: tuple[int, int] = (3, 5)):
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self._word_buckets: dict[str, np.ndarray] = {}
+
+    def word_buckets(self, word: str) -> np.ndarray:
+        buckets = self._word_buckets.get(word)
+        if buckets is None:
+            padded = f" {word} "
+            grams = [f"w:{word}"]
+            low, high = self.ngram_range
+            for n in range(low, high + 1):
+                grams.extend(padded[i : i + n] for i in range(len(padded) - n + 1))
+            buckets = np.array([zlib.crc32(g.encode("utf-8")) % self.n_features for g in grams], dtype=np.int64)
+            self._word_buckets[word] = buckets
+        return buckets
+
+    def counts(self, texts: list[str]) -> "SparseRows":
+        """Bucket counts per text as CSR rows."""
+        indptr = np.zeros(len(texts) + 1, dtype=np.int64)
+        indices_parts, counts_parts = [], []
+        for row, text in enumerate(texts):
+            words = text.lower().split()
+            buckets, counts = np.unique(
+                np.concatenate([self.word_buckets(word) for word in words] or [np.empty(0, dtype=np.int64)]),
+                return_counts=True,
+            )
+            indices_parts.append(buckets)
+            counts_parts.append(counts)
+            indptr[row + 1] = indptr[row] + len(buckets)
+        return SparseRows.from_parts(indptr, indices_parts, counts_parts, self.n_features)
+
+    def decompose(self, texts: list[str]) -> tuple["SparseRows", "SparseRows", list[str]]:
+        """
+        Factor the bucket counts as (texts x words) @ (words x buckets).
+
+        Icon texts reuse a small vocabulary, so products through the
+        factors touch far fewer values than products with the counts.
+        """
+        vocabulary: dict[str, int] = {}
+        indptr = np.zeros(len(texts) + 1, dtype=np.int64)
+        indices_parts, counts_parts = [], []
+        for row, text in enumerate(texts):
+            ids = [vocabulary.setdefault(word, len(vocabulary)) for word in text.lower().split()]
+            word_ids, counts = np.unique(np.array(ids, dtype=np.int64), return_counts=True)
+            indices_parts.append(word_ids)
+            counts_parts.append(counts)
+            indptr[row + 1] = indptr[row] + len(word_ids)
+        words = list(vocabulary)
+        text_words = SparseRows.from_parts(indptr, indices_parts, counts_parts, len(words))
+
+        indptr = np.zeros(len(words) + 1, dtype=np.int64)
+        indices_parts, counts_parts = [], []
+        for row, word in enumerate(words):
+            buckets, counts = np.unique(self.word_buckets(word), return_counts=True)
+            indices_parts.append(buckets)
+            counts_parts.append(counts)
+            indptr[row + 1] = indptr[row] + len(buckets)
+        word_buckets = SparseRows.from_parts(indptr, indices_parts, counts_parts, self.n_features)
+        return text_words, word_buckets, words
+
+
+class SparseRows:
+    """
+    Minimal CSR matrix with the two products randomized SVD needs.
+
+    Products gather dense rows per non-zero and sum them with
+    np.add.reduceat, a chunk of rows at a time to bound memory.
+    """
+
+    CHUNK_NNZ = 1 << 18
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, n_cols: int):
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.shape = (len(indptr) - 1, n_cols)
+        self._by_column = None
+
+    @classmethod
+    def from_parts(cls, indptr: np.ndarray, indices_parts: list, data_parts: list, n_cols: int) -> "SparseRows":
+        indices = np.concatenate(indices_parts) if indices_parts else np.empty(0, dtype=np.int64)
+        data = np.concatenate(data_parts).astype(np.float32) if data_parts else np.empty(0, dtype=np.float32)
+        return cls(indptr, indices, data, n_cols)
+
+    @staticmethod
+    def _reduce(values: np.ndarray, starts: np.ndarray, ends: np.ndarray, out: np.ndarray, rows: np.ndarray):
+        """out[rows] = sums of values[starts:ends] (non-empty ranges only)."""
+        keep = ends > starts
+        if keep.any():
+            out[rows[keep]] = np.add.reduceat(values, starts[keep], axis=0)
+
+    def _row_chunks(self):
+        """[start_row, end_row) ranges holding about CHUNK_NNZ non-zeros each."""
+        n_rows = self.shape[0]
+        start = 0
+        while start < n_rows:
+            limit = self.indptr[start] + self.CHUNK_NNZ
+            end = max(start + 1, int(np.searchsorted(self.indptr, limit, side="right")) - 1)
+            end = min(end, n_rows)
+            yield start, end
+            start = end
+
+    def dot(self, dense: np.ndarray) -> np.ndarray:
+        """self @ dense, for dense of shape (n_cols, k)."""
+        out = np.zeros((self.shape[0], dense.shape[1]), dtype=np.float32)
+        for start, end in self._row_chunks():
+            lo, hi = self.indptr[start], self.indptr[end]
+            if lo == hi:
+                continue
+            values = dense[self.indices[lo:hi]] * self.data[lo:hi, None]
+            starts = self.indptr[start:end] - lo
+            ends = self.indptr[start + 1 : end + 1] - lo
+            self._reduce(values, starts, ends, out, np.arange(start, end))
+        return out
+
+    def tdot(self, dense: np.ndarray) -> np.ndarray:
+        """self.T @ dense, for dense of shape (n_rows, k)."""
+        if self._by_column is None:
+            rows = np.repeat(np.arange(self.shape[0]), np.diff(self.indptr))
+            order = np.argsort(self.indices, kind="stable")
+            cols = self.indices[order]
+            col_ptr = np.searchsorted(cols, np.arange(self.shape[1] + 1))
+            self._by_column = (rows[order], self.data[order], col_ptr)
+
+        rows, data, col_ptr = self._by_column
+        out = np.zeros((self.shape[1], dense.shape[1]), dtype=np.float32)
+        chunk_cols = max(1, self.shape[1] * self.CHUNK_NNZ // max(1, len(data)))
+        for start in range(0, self.shape[1], chunk_cols):
+            end = min(start + chunk_cols, self.shape[1])
+            lo, hi = col_ptr[start], col_ptr[end]
+            if lo == hi:
+                continue
+            values = dense[rows[lo:hi]] * data[lo:hi, None]
+            self._reduce(values, col_ptr[start:end] - lo, col_ptr[start + 1 : end + 1] - lo, out, np.arange(start, end))
+        return out
+
+    def scale_columns(self, weights: np.ndarray):
+        self.data = self.data * weights[self.indices]
+        self._by_column = None
+
+    def select_rows(self, rows: list[int]) -> "SparseRows":
+        starts, ends = self.indptr[rows], self.indptr[np.array(rows) + 1]
+        indptr = np.concatenate([[0], np.cumsum(ends - starts)])
+        take = np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)]) if rows else np.empty(0, dtype=np.int64)
+        return SparseRows(indptr, self.indices[take], self.data[take], self.shape[1])
+
+    def row_norms(self) -> np.ndarray:
+        """Euclidean norm of each row (1 for empty rows)."""
+        squares = np.bincount(
+            np.repeat(np.arange(self.shape[0]), np.diff(self.indptr)), weights=self.data ** 2, minlength=self.shape[0]
+        )
+        norms = np.sqrt(squares)
+        norms[norms == 0] = 1
+        return norms.astype(np.float32)
+
+
+def orthonormalize(matrix: np.ndarray) -> np.ndarray:
+    """
+    Orthonormal basis for the columns of a tall matrix.
+
+    Cholesky QR is a few BLAS calls, several times faster than
+    Householder QR at this shape; fall back to the latter when the Gram
+    matrix is too ill-conditioned to factor.
+    """
+    gram = (matrix.T @ matrix).astype(np.float64)
+    try:
+        lower = np.linalg.cholesky(gram + np.eye(len(gram)) * 1e-10 * np.trace(gram))
+    except np.linalg.LinAlgError:
+        return np.linalg.qr(matrix)[0]
+    return (matrix @ np.linalg.inv(lower).T).astype(np.float32)
+
+
+class LocalProvider(EmbeddingProvider):
+    """
+    Offline TF-IDF + truncated SVD embedder fitted on the icon corpus.
+
+    A text's features are the sum of its words' features and the output
+    is L2-normalised, so a text embeds as the normalised sum of its
+    words' projections. Those are computed once per word.
+    """
+
+    BATCH_SIZE = 4096
+
+    def __init__(
+        self,
+        components: np.ndarray,
+        idf: np.ndarray,
+        ngram_range: tuple[int, int] = (3, 5),
+    ):
+        self.components = components.astype(np.float32)  # (dimensions, n_features)
+        self.idf = idf.astype(np.float32)
+        self.features = HashedFeatures(idf.shape[0], ngram_range)
+        self.dimensions = components.shape[0]
+        # A refit changes the space, so the fingerprint is part of the model id
+        fingerprint = hashlib.sha256(self.components.tobytes()).hexdigest()[:12]
+        self.model = f"local-tfidf-svd-{self.dimensions}-{fingerprint}"
+        self._projection = (self.components * self.idf).T  # IDF-weighted bucket -> vector
+        self._word_vectors: dict[str, np.ndarray] = {}
+
+    @classmethod
+    def fit(
+        cls,
+        texts: list[str],
+        dimensions: int = 256,
+        n_features: int = 2 ** 15,
+        ngram_range: tuple[int, int] = (3, 5),
+        oversample: int = 16,
+        power_iterations: int = 2,
+        seed: int = 0,
+    ) -> "LocalProvider":
+        """
+        Fit IDF weights and an SVD projection on `texts`.
+
+        Uses randomized range finding (Halko et al.) on the factored
+        matrix X = diag(1/norms) @ text_words @ word_buckets @ diag(idf),
+        so the TF-IDF matrix is never materialised.
+        """
+        texts = list(dict.fromkeys(texts))  # Duplicate texts would skew IDF
+        features = HashedFeatures(n_features, ngram_range)
+        counts = features.counts(texts)
+        n_docs = counts.shape[0]
+
+        document_frequency = np.bincount(counts.indices, minlength=n_features)
+        idf = (np.log((1 + n_docs) / (1 + document_frequency)) + 1).astype(np.float32)
+        counts.scale_columns(idf)
+        inverse_norms = (1 / counts.row_norms())[:, None]
+
+        text_words, word_buckets, _ = features.decompose(texts)
+        word_buckets.scale_columns(idf)
+
+        def project(dense):  # X @ dense
+            return text_words.dot(word_buckets.dot(dense)) * inverse_norms
+
+        def project_transposed(dense):  # X.T @ dense
+            return word_buckets.tdot(text_words.tdot(dense * inverse_norms))
+
+        rank = min(dimensions + oversample, n_docs, n_features)
+        rng = np.random.default_rng(seed)
+        q = orthonormalize(project(rng.standard_normal((n_features, rank), dtype=np.float32)))
+        for _ in range(power_iterations):
+            q = orthonormalize(project(orthonormalize(project_transposed(q))))
+
+        # B = Q^T X is small (rank x n_features); its top right singular vectors are the components
+        b = project_transposed(q).T
+        eigenvalues, eigenvectors = np.linalg.eigh(b @ b.T)
+        order = np.argsort(eigenvalues)[::-1][: min(dimensions, rank)]
+        singular = np.sqrt(np.maximum(eigenvalues[order], 1e-12))
+        components = (eigenvectors[:, order].T @ b) / singular[:, None]
+
+        if components.shape[0] < dimensions:
+            # Tiny corpora: pad so vectors always have the requested size
+            components = np.vstack([components, np.zeros((dimensions - components.shape[0], n_features))])
+        return cls(components, idf, ngram_range)
+
+    def save(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            components=self.components,
+            idf=self.idf,
+            ngram_range=np.array(self.features.ngram_range),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "LocalProvider":
+        with np.load(path) as artifact:
+            low, high = artifact["ngram_range"].tolist()
+            return cls(artifact["components"], artifact["idf"], (low, high))
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """Unit-length (len(texts), dimensions) float32 vectors."""
+        text_words, word_buckets, words = self.features.decompose(texts)
+        new = [i for i, word in enumerate(words) if word not in self._word_vectors]
+        if new:
+            rows = word_buckets.select_rows(new)
+            for word_id, vector in zip(new, rows.dot(self._projection)):
+                self._word_vectors[words[word_id]] = vector
+
+        word_vectors = np.array([self._word_vectors[word] for word in words], dtype=np.float32)
+        vectors = text_words.dot(word_vectors.reshape(len(words), self.dimensions))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return vectors / norms
+
+    def plan_batches(self, texts: list[str]) -> list[list[int]]:
+        return [list(range(start, min(start + self.BATCH_SIZE, len(texts)))) for start in range(0, len(texts), self.BATCH_SIZE)]
+
+    def embed_all(self, texts: list[str]) -> Iterator[BatchResult]:
+        for batch in self.plan_batches(texts):
+            yield BatchResult(batch, embeddings=list(self.embed([texts[i] for i in batch])))
+
+
+def synthetic_texts(count: int, seed: int = 0) -> list[str]:
+    """Icon-like search texts: 1-3 name words, a category and a few tags."""
+    rng = np.random.default_rng(seed)
+    names = ["arrow", "left", "right", "up", "down", "circle", "square", "user", "users", "file", "folder",
+             "chart", "bar", "line", "pie", "cloud", "download", "upload", "lock", "unlock", "mail", "send",
+             "home", "house", "settings", "gear", "search", "zoom", "plus", "minus", "check", "x", "star",
+             "heart", "bell", "calendar", "clock", "camera", "image", "video", "music", "phone", "map", "pin"]
+    categories = ["arrows", "ui", "files", "charts", "communication", "media", "navigation", "general"]
+    tags = ["direction", "pointer", "navigation", "person", "account", "profile", "document", "storage",
+            "love", "favorite", "time", "alert", "notification", "add", "remove", "done", "close", "edit"]
+    texts = []
+    for _ in range(count):
+        words = list(rng.choice(names, size=rng.integers(1, 4), replace=False))
+        words.append(str(rng.choice(categories)))
+        words.extend(rng.choice(tags, size=rng.integers(0, 4), replace=False))
+        texts.append(" ".join(dict.fromkeys(words)))
+    return texts
+
+
+def run_benchmark(count: int, dimensions: int):
+    texts = synthetic_texts(count)
+    unique = len(set(texts))
+
+    print("=" * 50)
+    print(f"Local embedder: {count} texts ({unique} distinct), {dimensions} dimensions")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    provider = LocalProvider.fit(texts, dimensions=dimensions)
+    fit_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectors = np.vstack([np.asarray(result.embeddings) for result in provider.embed_all(texts)])
+    embed_time = time.perf_counter() - start
+
+    # Sanity check: a text's nearest neighbour among the others should share words with it
+    sample = vectors[:200] @ vectors.T
+    sample[np.arange(len(sample)), np.arange(len(sample))] = -1
+    nearest = sample.argmax(axis=1)
+    shared = np.mean([bool(set(texts[i].split()) & set(texts[j].split())) for i, j in enumerate(nearest)])
+
+    print(f"  Fit:   {fit_time:.2f}s")
+    print(f"  Embed: {embed_time:.2f}s ({count / embed_time:.0f} texts/s)")
+    print(f"  Nearest neighbour shares a word: {shared:.0%}")
+    print(f"  Model: {provider.model}, {provider.components.nbytes / 2 ** 20:.0f} MiB projection")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the local embedder")
+    parser.add_argument("--benchmark", type=int, metavar="N", required=True, help="Synthetic texts to fit and embed")
+    parser.add_argument("--dims", type=int, default=256, help="Embedding dimensions (default: 256)")
+    args = parser.parse_args()
+
+    run_benchmark(args.benchmark, args.dims)
+
+
+if __name__ == "__main__":
+    main()
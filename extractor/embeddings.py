@@ -1,58 +1,92 @@
 #!/usr/bin/env python3
 """
-Generate embeddings for icons using AI Gateway.
+Generate embeddings for icons using AI Gateway, or fully offline with the local embedder.
 
 Usage:
     python embeddings.py                    # Generate embeddings for all icons
+    python embeddings.py --provider local --db icons.db  # Offline: TF-IDF + SVD fitted on the icon corpus
+    python embeddings.py --provider local --db icons.db --refit --dims 128 --reset  # Refit and re-embed everything
     python embeddings.py --source lucide    # Generate only for Lucide icons
-    python embeddings.py --batch-size 50    # Adjust batch size
+    python embeddings.py --restart          # Ignore the checkpoint of an interrupted run
+    python embeddings.py --concurrency 8    # Requests in flight
+    python embeddings.py --rpm 500 --tpm 200000  # Stay under account rate limits
+    python embeddings.py --no-cache         # Re-embed texts already in the local cache
+    python embeddings.py --no-index         # Skip exporting the IVF vector index
 """
 import os
 import sys
 import json
-import struct
+import time
 import argparse
 from pathlib import Path
+import numpy as np
 import libsql_experimental as libsql
 from dotenv import load_dotenv
-import urllib.request
-import urllib.error
+from embedding_client import RETRYABLE_STATUS, EmbeddingAPIError, EmbeddingClient
+from embedding_cache import DEFAULT_CACHE_PATH, EmbeddingCache
+from embedding_providers import DEFAULT_LOCAL_MODEL_PATH, EmbeddingProvider, LocalProvider, OpenAIProvider
+from native_vectors import column_dimensions
+from quantize import compact_blobs
+from vector_index import DEFAULT_INDEX_DIR, export_index
 
 
-class EmbeddingGenerator:
-    """Generate and store embeddings for icons."""
+SOURCES = ["lucide", "phosphor", "hugeicons", "heroicons", "tabler", "feather", "remix", "simple-icons", "iconoir"]
+PAGE_SIZE = 2048  # Icons per page (and per checkpoint)
+MAX_ATTEMPTS = 3  # Failed attempts before an icon is skipped
 
-    EMBEDDING_MODEL = "text-embedding-3-small"
-    EMBEDDING_DIMENSIONS = 1536  # OpenAI text-embedding-3-small dimensions
 
-    def __init__(self, turso_url: str, auth_token: str, api_key: str, gateway_url: str | None = None):
+class EmbeddingGenerator:
+    """
+    Generate and store embeddings for icons.
+
+    A run walks icons in primary-key order a page at a time and records
+    the last id of each finished page in embedding_jobs, so a killed run
+    resumes after it and every icon is read once per run. Icons whose
+    embedding fails are recorded in embedding_quarantine and skipped
+    once they have failed `max_attempts` times.
+    """
+
+    def __init__(
+        self,
+        turso_url: str,
+        auth_token: str,
+        provider: EmbeddingProvider | None = None,
+        cache_path: Path | None = DEFAULT_CACHE_PATH,
+    ):
         self.conn = libsql.connect(turso_url, auth_token=auth_token)
-        self.api_key = api_key
-        # Default to OpenAI endpoint if no gateway specified
-        self.gateway_url = gateway_url or "https://api.openai.com/v1"
-
-    def get_icons_without_embeddings(self, source_id: str | None = None, limit: int = 1000) -> list[dict]:
-        """Get icons that don't have embeddings yet."""
+        # Local (model, dimensions, text) -> embedding cache; None disables it
+        self.cache = EmbeddingCache(cache_path) if cache_path else None
+        self.provider = provider
+
+    def get_icons_without_embeddings(
+        self,
+        source_id: str | None = None,
+        after_id: str = "",
+        limit: int = PAGE_SIZE,
+        max_attempts: int = MAX_ATTEMPTS,
+    ) -> list[dict]:
+        """
+        Next page of icons without embeddings, in id order after `after_id`.
+
+        Seeks on the primary key (or icons_source_keyset_idx with a
+        source), so a page costs the rows it walks past, never a rescan
+        from the start. Skips icons quarantined `max_attempts` times.
+        """
+        query = """
+            SELECT icons.id, icons.name, icons.normalized_name, icons.category, icons.tags,
+                   quarantine.attempts
+            FROM icons
+            LEFT JOIN embedding_quarantine AS quarantine ON quarantine.icon_id = icons.id
+            WHERE icons.id > ? AND icons.embedding IS NULL
+              AND (quarantine.attempts IS NULL OR quarantine.attempts < ?)
+        """
+        params: list = [after_id, max_attempts]
         if source_id:
-            result = self.conn.execute(
-                """
-                SELECT id, name, normalized_name, category, tags
-                FROM icons 
-                WHERE embedding IS NULL AND source_id = ?
-                LIMIT ?
-                """,
-                (source_id, limit),
-            ).fetchall()
-        else:
-            result = self.conn.execute(
-                """
-                SELECT id, name, normalized_name, category, tags
-                FROM icons 
-                WHERE embedding IS NULL
-                LIMIT ?
-                """,
-                (limit,),
-            ).fetchall()
+            query += " AND icons.source_id = ?"
+            params.append(source_id)
+        query += " ORDER BY icons.id LIMIT ?"
+        params.append(limit)
+        result = self.conn.execute(query, tuple(params)).fetchall()
 
         return [
             {
@@ -61,10 +95,36 @@ class EmbeddingGenerator:
                 "normalized_name": row[2],
                 "category": row[3],
                 "tags": json.loads(row[4]) if row[4] else [],
+                "attempts": row[5],  # None unless quarantined
             }
             for row in result
         ]
 
+    def get_corpus_texts(self) -> list[str]:
+        """Search texts of every icon, for fitting the local embedder."""
+        rows = self.conn.execute("SELECT normalized_name, category, tags FROM icons").fetchall()
+        return [
+            self.build_search_text(
+                {"normalized_name": row[0], "category": row[1], "tags": json.loads(row[2]) if row[2] else []}
+            )
+            for row in rows
+        ]
+
+    def clear_embeddings(self, source_id: str | None = None) -> int:
+        """Drop stored embeddings so the next run re-embeds (e.g. after switching providers)."""
+        query = """
+            UPDATE icons
+            SET embedding = NULL, embedding_short = NULL, embedding_int8 = NULL, embedding_binary = NULL
+            WHERE embedding IS NOT NULL
+        """
+        params: tuple = ()
+        if source_id:
+            query += " AND source_id = ?"
+            params = (source_id,)
+        cleared = self.conn.execute(query, params).rowcount
+        self.conn.commit()
+        return cleared
+
     def build_search_text(self, icon: dict) -> str:
         """Build search text from icon metadata for embedding."""
         parts = []
@@ -85,81 +145,223 @@ class EmbeddingGenerator:
         unique_parts = list(dict.fromkeys(parts))  # Preserve order, remove dupes
         return " ".join(unique_parts)
 
-    def get_embeddings_batch(self, texts: list[str]) -> list[list[float]]:
-        """Get embeddings for a batch of texts from AI Gateway."""
-        url = f"{self.gateway_url}/embeddings"
-
-        payload = json.dumps({
-            "model": self.EMBEDDING_MODEL,
-            "input": texts,
-        }).encode("utf-8")
-
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}",
-        }
-
-        req = urllib.request.Request(url, data=payload, headers=headers, method="POST")
-
-        try:
-            with urllib.request.urlopen(req, timeout=60) as response:
-                result = json.loads(response.read().decode("utf-8"))
-                # Sort by index to ensure correct order
-                sorted_data = sorted(result["data"], key=lambda x: x["index"])
-                return [item["embedding"] for item in sorted_data]
-        except urllib.error.HTTPError as e:
-            error_body = e.read().decode("utf-8") if e.fp else "No error body"
-            raise RuntimeError(f"Embedding API error {e.code}: {error_body}")
-
-    def embedding_to_blob(self, embedding: list[float]) -> bytes:
-        """Convert embedding list to binary blob (F32 format for libSQL)."""
-        return struct.pack(f"{len(embedding)}f", *embedding)
+    def embedding_to_blob(self, embedding) -> bytes:
+        """Convert an embedding (list or array) to binary blob (F32 format for libSQL)."""
+        return np.asarray(embedding, dtype="<f4").tobytes()
 
     def update_icon_embedding(self, icon_id: str, search_text: str, embedding: list[float]):
         """Update icon with search text and embedding."""
-        embedding_blob = self.embedding_to_blob(embedding)
+        self.store_embeddings([(icon_id, search_text, self.embedding_to_blob(embedding))])
 
-        self.conn.execute(
+    def store_embeddings(self, rows: list[tuple[str, str, bytes]]):
+        """Write (icon_id, search_text, F32 blob) rows, with the compact encodings from quantize.py."""
+        compact = {blob: compact_blobs(blob) for _, _, blob in rows}
+        self.conn.executemany(
             """
-            UPDATE icons 
-            SET search_text = ?, embedding = ?
+            UPDATE icons
+            SET search_text = ?, embedding = ?, embedding_short = ?, embedding_int8 = ?, embedding_binary = ?
             WHERE id = ?
             """,
-            (search_text, embedding_blob, icon_id),
+            [(search_text, blob, *compact[blob], icon_id) for icon_id, search_text, blob in rows],
         )
 
-    def process_batch(self, icons: list[dict]) -> int:
-        """Process a batch of icons - generate and store embeddings."""
-        if not icons:
-            return 0
-
-        # Build search texts
-        search_texts = [self.build_search_text(icon) for icon in icons]
+    def job_key(self, source_id: str | None) -> str:
+        return f"{source_id or 'all'}:{self.provider.model}"
+
+    def load_checkpoint(self, job_key: str) -> str | None:
+        """Last icon id finished by an interrupted run of this job, if there is one."""
+        row = self.conn.execute(
+            "SELECT last_icon_id FROM embedding_jobs WHERE job_key = ? AND finished_at IS NULL",
+            (job_key,),
+        ).fetchone()
+        return row[0] if row else None
+
+    def save_checkpoint(self, job_key: str, last_icon_id: str, embedded: int, failed: int, started: bool = False):
+        """Record progress; `started` begins a new run (counters reset)."""
+        now = int(time.time())
+        if started:
+            self.conn.execute(
+                """
+                INSERT INTO embedding_jobs (job_key, last_icon_id, embedded, failed, started_at, updated_at, finished_at)
+                VALUES (?, ?, 0, 0, ?, ?, NULL)
+                ON CONFLICT(job_key) DO UPDATE SET
+                    last_icon_id = excluded.last_icon_id, embedded = 0, failed = 0,
+                    started_at = excluded.started_at, updated_at = excluded.updated_at, finished_at = NULL
+                """,
+                (job_key, last_icon_id, now, now),
+            )
+        else:
+            self.conn.execute(
+                """
+                UPDATE embedding_jobs
+                SET last_icon_id = ?, embedded = embedded + ?, failed = failed + ?, updated_at = ?
+                WHERE job_key = ?
+                """,
+                (last_icon_id, embedded, failed, now, job_key),
+            )
+        self.conn.commit()
 
-        # Get embeddings from API
-        embeddings = self.get_embeddings_batch(search_texts)
+    def finish_job(self, job_key: str):
+        now = int(time.time())
+        self.conn.execute(
+            "UPDATE embedding_jobs SET finished_at = ?, updated_at = ? WHERE job_key = ?", (now, now, job_key)
+        )
+        self.conn.commit()
 
-        # Store in database
-        for icon, search_text, embedding in zip(icons, search_texts, embeddings):
-            self.update_icon_embedding(icon["id"], search_text, embedding)
+    def quarantine(self, icon_ids: list[str], error: str):
+        """Record a failed attempt for each icon."""
+        now = int(time.time())
+        self.conn.executemany(
+            """
+            INSERT INTO embedding_quarantine (icon_id, model, error, attempts, first_failed_at, last_failed_at)
+            VALUES (?, ?, ?, 1, ?, ?)
+            ON CONFLICT(icon_id) DO UPDATE SET
+                model = excluded.model,
+                error = excluded.error,
+                attempts = embedding_quarantine.attempts + 1,
+                last_failed_at = excluded.last_failed_at
+            """,
+            [(icon_id, self.provider.model, error[:1000], now, now) for icon_id in icon_ids],
+        )
+        self.conn.commit()
 
+    def embed_texts(self, texts: list[str]) -> tuple[dict[str, bytes], dict[str, str]]:
+        """
+        Embed `texts`, returning ({text: F32 blob}, {text: error}).
+
+        A batch rejected outright (a 4xx other than rate limiting) is
+        retried one text at a time, so a single bad text only fails
+        itself. Transient failures fail the whole batch.
+        """
+        embedded: dict[str, bytes] = {}
+        errors: dict[str, str] = {}
+        for result in self.provider.embed_all(texts):
+            batch = [texts[index] for index in result.indices]
+            if not result.error:
+                embedded.update((text, self.embedding_to_blob(e)) for text, e in zip(batch, result.embeddings))
+                continue
+
+            status = result.error.status if isinstance(result.error, EmbeddingAPIError) else None
+            if len(batch) > 1 and status is not None and status not in RETRYABLE_STATUS:
+                rejected = 0
+                for text in batch:
+                    for single in self.provider.embed_all([text]):
+                        if single.error:
+                            errors[text] = str(single.error)
+                            rejected += 1
+                        else:
+                            embedded[text] = self.embedding_to_blob(single.embeddings[0])
+                print(f"  ✗ Batch of {len(batch)} texts rejected ({status}): "
+                      f"{rejected} failed on their own: {result.error}")
+            else:
+                print(f"  ✗ Batch of {len(batch)} texts failed: {result.error}")
+                errors.update((text, str(result.error)) for text in batch)
+        return embedded, errors
+
+    def embed_page(self, icons: list[dict], totals: dict) -> tuple[int, int]:
+        """
+        Embed and store one page of icons. Returns (embedded, failed) icon counts.
+
+        Identical search texts (outline/solid pairs and the like) are
+        embedded once, and texts already in the embedding cache are not
+        sent at all.
+        """
+        provider = self.provider
+        icons_by_text: dict[str, list[dict]] = {}
+        for icon in icons:
+            icons_by_text.setdefault(self.build_search_text(icon), []).append(icon)
+        unique_texts = list(icons_by_text)
+
+        cached = self.cache.get_many(provider.model, provider.dimensions, unique_texts) if self.cache else {}
+        missing = [text for text in unique_texts if text not in cached]
+        embedded, errors = self.embed_texts(missing) if missing else ({}, {})
+        if self.cache and embedded:
+            self.cache.put_many(provider.model, provider.dimensions, list(embedded.items()))
+
+        blobs = {**cached, **embedded}
+        self.store_embeddings([
+            (icon["id"], text, blob) for text, blob in blobs.items() for icon in icons_by_text[text]
+        ])
         self.conn.commit()
-        return len(icons)
 
-    def generate_all(self, source_id: str | None = None, batch_size: int = 100):
-        """Generate embeddings for all icons without them."""
-        total_processed = 0
+        # Icons that failed before and have now succeeded leave quarantine
+        recovered = [(icon["id"],) for text in blobs for icon in icons_by_text[text] if icon["attempts"] is not None]
+        if recovered:
+            self.conn.executemany("DELETE FROM embedding_quarantine WHERE icon_id = ?", recovered)
+            self.conn.commit()
+
+        for text, error in errors.items():
+            self.quarantine([icon["id"] for icon in icons_by_text[text]], error)
+
+        totals["duplicates"] += len(icons) - len(unique_texts)
+        totals["hits"] += len(cached)
+        totals["sent"] += len(missing)
+        totals["batches_avoided"] += len(provider.plan_batches([self.build_search_text(i) for i in icons])) - len(
+            provider.plan_batches(missing)
+        )
+        failed = sum(len(icons_by_text[text]) for text in errors)
+        return len(icons) - failed, failed
+
+    def generate_all(
+        self,
+        source_id: str | None = None,
+        restart: bool = False,
+        page_size: int = PAGE_SIZE,
+        max_attempts: int = MAX_ATTEMPTS,
+    ) -> tuple[int, int]:
+        """
+        Generate embeddings for all icons without them, resuming an interrupted run.
+
+        Pages are stored and checkpointed as they finish; a killed run
+        picks up after the last finished page (`restart` starts over).
+        Icons that fail are quarantined and the run moves on.
+
+        Returns (embedded, failed) icon counts for this invocation.
+        """
+        job_key = self.job_key(source_id)
+        after_id = None if restart else self.load_checkpoint(job_key)
+        if after_id is None:
+            after_id = ""
+            self.save_checkpoint(job_key, after_id, 0, 0, started=True)
+        else:
+            print(f"  Resuming after {after_id}")
 
+        totals = {"duplicates": 0, "hits": 0, "sent": 0, "batches_avoided": 0}
+        total_embedded = total_failed = 0
+        start = time.perf_counter()
+        print(f"  Embedding with {self.provider.describe()}")
         while True:
-            icons = self.get_icons_without_embeddings(source_id, limit=batch_size)
+            icons = self.get_icons_without_embeddings(source_id, after_id, page_size, max_attempts)
             if not icons:
                 break
-
-            processed = self.process_batch(icons)
-            total_processed += processed
-            print(f"  Processed {total_processed} icons...")
-
-        return total_processed
+            embedded, failed = self.embed_page(icons, totals)
+            after_id = icons[-1]["id"]
+            self.save_checkpoint(job_key, after_id, embedded, failed)
+            total_embedded += embedded
+            total_failed += failed
+            print(f"  Processed {total_embedded + total_failed} icons (through {after_id}), {total_failed} failed")
+
+        self.finish_job(job_key)
+
+        looked_up = totals["hits"] + totals["sent"]
+        if looked_up:
+            hit_rate = totals["hits"] / looked_up * 100
+            print(f"  {totals['duplicates']} duplicate search texts, cache: {totals['hits']} hits, "
+                  f"{totals['sent']} misses ({hit_rate:.1f}% hit rate)")
+            print(f"  API calls avoided: {totals['batches_avoided']} requests, "
+                  f"{total_embedded + total_failed - totals['sent']} texts")
+            print(f"  Finished in {time.perf_counter() - start:.1f}s")
+        summary = self.provider.summary()
+        if summary:
+            print(f"  {summary}")
+        return total_embedded, total_failed
+
+    def get_quarantine_stats(self, max_attempts: int = MAX_ATTEMPTS) -> tuple[int, int]:
+        """(quarantined icons, of which given up on after max_attempts)."""
+        row = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(attempts >= ?), 0) FROM embedding_quarantine", (max_attempts,)
+        ).fetchone()
+        return row[0], row[1]
 
     def get_embedding_stats(self) -> dict:
         """Get statistics on embedding coverage."""
@@ -184,39 +386,153 @@ def main():
     parser = argparse.ArgumentParser(description="Generate embeddings for icons")
     parser.add_argument(
         "--source",
-        choices=["lucide", "phosphor", "hugeicons"],
+        choices=SOURCES,
         help="Only process icons from this source",
     )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore the checkpoint of an interrupted run and start from the first icon",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=PAGE_SIZE,
+        help=f"Icons fetched, embedded and checkpointed per page (default: {PAGE_SIZE})",
+    )
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=MAX_ATTEMPTS,
+        help=f"Failed attempts before an icon is skipped until --retry-quarantined (default: {MAX_ATTEMPTS})",
+    )
+    parser.add_argument(
+        "--retry-quarantined",
+        action="store_true",
+        help="Give quarantined icons another try regardless of their attempt count",
+    )
+    parser.add_argument(
+        "--provider",
+        choices=["openai", "local"],
+        default="openai",
+        help="Embedding provider: OpenAI-compatible API, or the offline local embedder (default: openai)",
+    )
+    parser.add_argument(
+        "--local-model",
+        type=Path,
+        default=DEFAULT_LOCAL_MODEL_PATH,
+        help="Local embedder artifact; fitted on the icon corpus if missing (default: extractor/.cache/local-embedder.npz)",
+    )
+    parser.add_argument(
+        "--refit",
+        action="store_true",
+        help="Refit the local embedder on the current icon corpus",
+    )
+    parser.add_argument(
+        "--dims",
+        type=int,
+        default=256,
+        help="Local embedder dimensions when fitting (default: 256)",
+    )
+    parser.add_argument(
+        "--reset",
+        action="store_true",
+        help="Clear stored embeddings first (needed when switching providers or refitting)",
+    )
     parser.add_argument(
         "--batch-size",
         type=int,
-        default=100,
-        help="Number of icons to process per API call (default: 100)",
+        default=EmbeddingClient.MAX_BATCH_ITEMS,
+        help="Maximum icons per API call; batches are otherwise sized by --max-batch-tokens",
+    )
+    parser.add_argument(
+        "--max-batch-tokens",
+        type=int,
+        default=EmbeddingClient.DEFAULT_MAX_BATCH_TOKENS,
+        help=f"Estimated tokens per API call (default: {EmbeddingClient.DEFAULT_MAX_BATCH_TOKENS})",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=EmbeddingClient.DEFAULT_CONCURRENCY,
+        help=f"Requests in flight (default: {EmbeddingClient.DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--rpm",
+        type=float,
+        default=EmbeddingClient.DEFAULT_REQUESTS_PER_MINUTE,
+        help=f"Requests per minute limit (default: {EmbeddingClient.DEFAULT_REQUESTS_PER_MINUTE})",
+    )
+    parser.add_argument(
+        "--tpm",
+        type=float,
+        default=EmbeddingClient.DEFAULT_TOKENS_PER_MINUTE,
+        help=f"Tokens per minute limit (default: {EmbeddingClient.DEFAULT_TOKENS_PER_MINUTE})",
+    )
+    parser.add_argument(
+        "--cache",
+        type=Path,
+        default=DEFAULT_CACHE_PATH,
+        help="Embedding cache file (default: extractor/.cache/embeddings.sqlite)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Embed every text, ignoring and not filling the cache",
+    )
+    parser.add_argument(
+        "--index-dir",
+        type=Path,
+        default=DEFAULT_INDEX_DIR,
+        help="Where to export the IVF vector index (default: extractor/.cache/vector-index)",
+    )
+    parser.add_argument(
+        "--no-index",
+        action="store_true",
+        help="Don't export the vector index after embedding",
     )
     parser.add_argument(
         "--stats",
         action="store_true",
         help="Show embedding statistics and exit",
     )
+    parser.add_argument(
+        "--db",
+        type=Path,
+        help="Use a local database file instead of TURSO_DATABASE_URL (required with --provider local)",
+    )
     args = parser.parse_args()
 
     # Load environment variables
     load_dotenv(Path(__file__).parent.parent / ".env.local")
 
-    turso_url = os.environ.get("TURSO_DATABASE_URL")
-    auth_token = os.environ.get("TURSO_AUTH_TOKEN")
     api_key = os.environ.get("AI_GATEWAY_API_KEY")
     gateway_url = os.environ.get("AI_GATEWAY_URL")  # Optional
 
-    if not turso_url or not auth_token:
-        print("Error: TURSO_DATABASE_URL and TURSO_AUTH_TOKEN must be set")
+    # Local vectors live in a different space than the API's, which the web app
+    # embeds queries with, so they must never land in the shared database
+    if args.provider == "local" and not args.db and not args.stats:
+        print("Error: --provider local writes vectors the web app can't search; pass --db with a local database file")
         sys.exit(1)
 
-    if not api_key:
-        print("Error: AI_GATEWAY_API_KEY must be set")
+    if args.db:
+        if not args.db.exists():
+            print(f"Error: {args.db} not found")
+            sys.exit(1)
+        turso_url, auth_token = str(args.db), ""
+    else:
+        turso_url = os.environ.get("TURSO_DATABASE_URL")
+        auth_token = os.environ.get("TURSO_AUTH_TOKEN")
+
+        if not turso_url or not auth_token:
+            print("Error: TURSO_DATABASE_URL and TURSO_AUTH_TOKEN must be set (or pass --db)")
+            sys.exit(1)
+
+    if args.provider == "openai" and not api_key and not args.stats:
+        print("Error: AI_GATEWAY_API_KEY must be set (or use --provider local with --db)")
         sys.exit(1)
 
-    generator = EmbeddingGenerator(turso_url, auth_token, api_key, gateway_url)
+    generator = EmbeddingGenerator(turso_url, auth_token, cache_path=None if args.no_cache else args.cache)
 
     # Show stats
     if args.stats:
@@ -226,8 +542,42 @@ def main():
         for source, data in stats.items():
             pct = (data["with_embedding"] / data["total"] * 100) if data["total"] > 0 else 0
             print(f"  {source}: {data['with_embedding']}/{data['total']} ({pct:.1f}%)")
+        quarantined, given_up = generator.get_quarantine_stats(args.max_attempts)
+        if quarantined:
+            print(f"  Quarantined: {quarantined} icons ({given_up} at {args.max_attempts} attempts, skipped)")
         return
 
+    if args.provider == "local":
+        if args.refit or not args.local_model.exists():
+            texts = generator.get_corpus_texts()
+            start = time.perf_counter()
+            generator.provider = LocalProvider.fit(texts, dimensions=args.dims)
+            generator.provider.save(args.local_model)
+            print(f"✓ Fitted local embedder on {len(texts)} icons in {time.perf_counter() - start:.1f}s: {args.local_model}")
+        else:
+            generator.provider = LocalProvider.load(args.local_model)
+    else:
+        generator.provider = OpenAIProvider(
+            api_key,
+            gateway_url,
+            concurrency=args.concurrency,
+            requests_per_minute=args.rpm,
+            tokens_per_minute=args.tpm,
+            max_batch_tokens=args.max_batch_tokens,
+            max_batch_items=args.batch_size,
+        )
+
+    # A typed F32_BLOB(n) column (native_vectors.py) rejects vectors of any other size
+    column_dims = column_dimensions(generator.conn)
+    if column_dims and column_dims != generator.provider.dimensions:
+        print(f"Error: icons.embedding is F32_BLOB({column_dims}) but {generator.provider.model} "
+              f"produces {generator.provider.dimensions} dimensions")
+        print(f"  Run: python native_vectors.py --migrate --dims {generator.provider.dimensions}")
+        sys.exit(1)
+
+    if args.reset:
+        print(f"✓ Cleared {generator.clear_embeddings(args.source)} stored embeddings")
+
     # Generate embeddings
     print("\n" + "=" * 50)
     print("Generating embeddings...")
@@ -237,12 +587,26 @@ def main():
         print(f"Source: {args.source}")
     else:
         print("Source: all")
-    print(f"Batch size: {args.batch_size}")
+    print(f"Model: {generator.provider.describe()}")
+    if args.provider == "openai":
+        print(f"Batch budget: {args.max_batch_tokens} tokens, {args.batch_size} icons")
+        print(f"Limits: {args.rpm:g} requests/min, {args.tpm:g} tokens/min")
     print()
 
     try:
-        total = generator.generate_all(args.source, args.batch_size)
+        if args.retry_quarantined:
+            generator.conn.execute("UPDATE embedding_quarantine SET attempts = 0")
+            generator.conn.commit()
+        total, failed = generator.generate_all(
+            args.source,
+            restart=args.restart or args.reset,
+            page_size=args.page_size,
+            max_attempts=args.max_attempts,
+        )
         print(f"\n✓ Generated embeddings for {total} icons")
+        if failed:
+            print(f"✗ {failed} icons failed and were quarantined (embedding_quarantine); "
+                  f"they are retried on the next run until {args.max_attempts} attempts")
     except Exception as e:
         print(f"\n✗ Error: {e}")
         sys.exit(1)
@@ -254,6 +618,14 @@ def main():
         pct = (data["with_embedding"] / data["total"] * 100) if data["total"] > 0 else 0
         print(f"  {source}: {data['with_embedding']}/{data['total']} ({pct:.1f}%)")
 
+    if not args.no_index and any(data["with_embedding"] for data in stats.values()):
+        provider = generator.provider
+        manifest = export_index(generator.conn, args.index_dir, model=provider.model, model_dimensions=provider.dimensions)
+        print(f"\n✓ Exported vector index: {manifest['count']} vectors, {manifest['nlist']} lists -> {args.index_dir}")
+
+    if failed:
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     main()
@@ -25,6 +25,9 @@ class ExtractedIcon:
 class BaseExtractor(ABC):
     """Base class for icon extractors."""
 
+    # Name words mapped to related terms, e.g. {"house": ["home"]}
+    SYNONYMS: dict[str, list[str]] = {}
+
     def __init__(self, source_path: Path):
         self.source_path = source_path
 
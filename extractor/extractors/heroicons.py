@@ -6,6 +6,14 @@ from .base import BaseExtractor, ExtractedIcon
 class HeroiconsExtractor(BaseExtractor):
     """Extract icons from @heroicons/react package."""
 
+    # Name words and the extra tags they imply (also used by name_lookup.py)
+    SYNONYMS = {
+        "magnifying-glass": ["search", "find", "lookup"],
+        "envelope": ["mail", "email", "message"],
+        "bars": ["menu", "hamburger"],
+        "hand-thumb": ["like", "thumbs"],
+    }
+
     def __init__(self, node_modules: Path):
         # Heroicons has 24x24/outline and 24x24/solid subdirectories
         self.base_dir = node_modules / "heroicons" / "24" / "outline"
@@ -107,15 +115,7 @@ class HeroiconsExtractor(BaseExtractor):
         words = name.split("-")
         tags = list(words)
 
-        # Add common synonyms
-        synonyms = {
-            "magnifying-glass": ["search", "find", "lookup"],
-            "envelope": ["mail", "email", "message"],
-            "bars": ["menu", "hamburger"],
-            "hand-thumb": ["like", "thumbs"],
-        }
-
-        for key, syns in synonyms.items():
+        for key, syns in self.SYNONYMS.items():
             if key in name:
                 tags.extend(syns)
 
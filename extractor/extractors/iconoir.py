@@ -6,6 +6,22 @@ from .base import BaseExtractor, ExtractedIcon
 class IconoirExtractor(BaseExtractor):
     """Extract icons from iconoir package."""
 
+    # Name words and the extra tags they imply (also used by name_lookup.py)
+    SYNONYMS = {
+        "arrow": ["direction", "pointer", "navigation"],
+        "home": ["house", "main", "start"],
+        "search": ["find", "magnify", "lookup"],
+        "user": ["person", "account", "profile"],
+        "settings": ["config", "preferences", "options", "gear"],
+        "mail": ["email", "envelope", "message"],
+        "heart": ["love", "favorite", "like"],
+        "star": ["favorite", "rating", "bookmark"],
+        "check": ["done", "complete", "success", "tick"],
+        "cancel": ["close", "remove", "delete", "x"],
+        "plus": ["add", "new", "create"],
+        "minus": ["remove", "subtract", "less"],
+    }
+
     def __init__(self, node_modules: Path):
         # Iconoir has icons/regular and icons/solid subdirectories
         self.icons_dir = node_modules / "iconoir" / "icons"
@@ -110,24 +126,8 @@ class IconoirExtractor(BaseExtractor):
         words = name.split("-")
         tags = list(words)
 
-        # Add common synonyms
-        synonyms = {
-            "arrow": ["direction", "pointer", "navigation"],
-            "home": ["house", "main", "start"],
-            "search": ["find", "magnify", "lookup"],
-            "user": ["person", "account", "profile"],
-            "settings": ["config", "preferences", "options", "gear"],
-            "mail": ["email", "envelope", "message"],
-            "heart": ["love", "favorite", "like"],
-            "star": ["favorite", "rating", "bookmark"],
-            "check": ["done", "complete", "success", "tick"],
-            "cancel": ["close", "remove", "delete", "x"],
-            "plus": ["add", "new", "create"],
-            "minus": ["remove", "subtract", "less"],
-        }
-
         for word in words:
-            if word in synonyms:
-                tags.extend(synonyms[word])
+            if word in self.SYNONYMS:
+                tags.extend(self.SYNONYMS[word])
 
         return list(set(tags))
@@ -6,6 +6,22 @@ from .base import BaseExtractor, ExtractedIcon
 class LucideExtractor(BaseExtractor):
     """Extract icons from lucide-static package."""
 
+    # Name words and the extra tags they imply (also used by name_lookup.py)
+    SYNONYMS = {
+        "arrow": ["direction", "pointer", "navigation"],
+        "home": ["house", "main", "start"],
+        "search": ["find", "magnify", "lookup"],
+        "user": ["person", "account", "profile"],
+        "settings": ["config", "preferences", "options", "gear"],
+        "mail": ["email", "envelope", "message"],
+        "heart": ["love", "favorite", "like"],
+        "star": ["favorite", "rating", "bookmark"],
+        "check": ["done", "complete", "success", "tick"],
+        "x": ["close", "remove", "delete", "cancel"],
+        "plus": ["add", "new", "create"],
+        "minus": ["remove", "subtract", "less"],
+    }
+
     def __init__(self, node_modules: Path):
         self.icons_dir = node_modules / "lucide-static" / "icons"
         self.package_json = node_modules / "lucide-static" / "package.json"
@@ -97,24 +113,8 @@ class LucideExtractor(BaseExtractor):
         words = name.split("-")
         tags = list(words)
 
-        # Add common synonyms
-        synonyms = {
-            "arrow": ["direction", "pointer", "navigation"],
-            "home": ["house", "main", "start"],
-            "search": ["find", "magnify", "lookup"],
-            "user": ["person", "account", "profile"],
-            "settings": ["config", "preferences", "options", "gear"],
-            "mail": ["email", "envelope", "message"],
-            "heart": ["love", "favorite", "like"],
-            "star": ["favorite", "rating", "bookmark"],
-            "check": ["done", "complete", "success", "tick"],
-            "x": ["close", "remove", "delete", "cancel"],
-            "plus": ["add", "new", "create"],
-            "minus": ["remove", "subtract", "less"],
-        }
-
         for word in words:
-            if word in synonyms:
-                tags.extend(synonyms[word])
+            if word in self.SYNONYMS:
+                tags.extend(self.SYNONYMS[word])
 
         return list(set(tags))  # Remove duplicates
@@ -10,6 +10,22 @@ class PhosphorExtractor(BaseExtractor):
     WEIGHTS = ["regular", "bold", "fill", "duotone", "light", "thin"]
     PRIMARY_WEIGHT = "regular"  # Base icon weight
 
+    # Name words and the extra tags they imply (also used by name_lookup.py)
+    SYNONYMS = {
+        "arrow": ["direction", "pointer", "navigation"],
+        "house": ["home", "main", "start"],
+        "magnifying-glass": ["search", "find", "lookup"],
+        "user": ["person", "account", "profile"],
+        "gear": ["settings", "config", "preferences", "options"],
+        "envelope": ["mail", "email", "message"],
+        "heart": ["love", "favorite", "like"],
+        "star": ["favorite", "rating", "bookmark"],
+        "check": ["done", "complete", "success", "tick"],
+        "x": ["close", "remove", "delete", "cancel"],
+        "plus": ["add", "new", "create"],
+        "minus": ["remove", "subtract", "less"],
+    }
+
     def __init__(self, node_modules: Path):
         self.core_dir = node_modules / "@phosphor-icons" / "core" / "assets"
         self.package_json = node_modules / "@phosphor-icons" / "core" / "package.json"
@@ -139,23 +155,8 @@ class PhosphorExtractor(BaseExtractor):
         words = name.split("-")
         tags = list(words)
 
-        synonyms = {
-            "arrow": ["direction", "pointer", "navigation"],
-            "house": ["home", "main", "start"],
-            "magnifying-glass": ["search", "find", "lookup"],
-            "user": ["person", "account", "profile"],
-            "gear": ["settings", "config", "preferences", "options"],
-            "envelope": ["mail", "email", "message"],
-            "heart": ["love", "favorite", "like"],
-            "star": ["favorite", "rating", "bookmark"],
-            "check": ["done", "complete", "success", "tick"],
-            "x": ["close", "remove", "delete", "cancel"],
-            "plus": ["add", "new", "create"],
-            "minus": ["remove", "subtract", "less"],
-        }
-
         for word in words:
-            if word in synonyms:
-                tags.extend(synonyms[word])
+            if word in self.SYNONYMS:
+                tags.extend(self.SYNONYMS[word])
 
         return list(set(tags))
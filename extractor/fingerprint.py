@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Geometric fingerprints for visual near-duplicate detection.
+
+Each icon's outlines are sampled (via geometry.SegmentTable), fitted into
+a unit square by their bounding box and rasterized into a length-weighted
+density grid. The grid is the shape descriptor: it ignores position and
+scale (so library padding and viewBox size don't matter) but not
+rotation, so arrow-up and arrow-down stay apart. A 64-bit perceptual
+hash is taken from the grid's low-frequency DCT coefficients, and a
+multi-index over 16-bit hash chunks answers Hamming-radius queries
+without comparing every pair.
+
+Usage:
+    python fingerprint.py --backfill               # Hash icons missing a fingerprint
+    python fingerprint.py --backfill --all         # Rehash every icon
+    python fingerprint.py --duplicates             # Near-duplicate report per library
+    python fingerprint.py --duplicates --source tabler --radius 2 --output dupes.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from collections import defaultdict
+from itertools import combinations
+from pathlib import Path
+import numpy as np
+from geometry import SegmentTable
+
+
+GRID = 32  # Descriptor resolution
+HASH_SIZE = 8  # Low-frequency DCT block; HASH_SIZE**2 = 64 bits
+OUTLINE_SAMPLES = 17  # Points per segment
+CHUNK_BITS = 16  # Multi-index chunk width
+DEFAULT_RADIUS = 6  # Hamming distance treated as a near duplicate
+BATCH_SIZE = 4096
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount(values: np.ndarray) -> np.ndarray:
+    """Set bits per uint64."""
+    values = np.ascontiguousarray(values, dtype=np.uint64)
+    return _POPCOUNT[values.view(np.uint8)].reshape(-1, 8).sum(axis=1, dtype=np.int64)
+
+
+def hamming(a: int, b: int) -> int:
+    """Hamming distance between two 64-bit hashes."""
+    return (a ^ b).bit_count()
+
+
+def hash_to_hex(value: int) -> str:
+    return f"{value:016x}"
+
+
+def hex_to_hash(value: str) -> int:
+    return int(value, 16)
+
+
+def dct_matrix(n: int) -> np.ndarray:
+    """Orthonormal DCT-II basis (rows are frequencies)."""
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    basis = np.cos(np.pi * (2 * x + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    basis[0] /= np.sqrt(2)
+    return basis
+
+
+_DCT = dct_matrix(GRID)
+
+
+def outline_descriptors(path_data: list[list[dict]]) -> np.ndarray:
+    """
+    Rasterize a batch of icons into (n, GRID, GRID) density descriptors.
+
+    Every segment is sampled at OUTLINE_SAMPLES points, each weighted by
+    the segment's length so long strokes count more than short ones. The
+    outlines are centered and scaled by the longer side of their bounding
+    box. Grids are blurred and L2-normalized; icons without
+    drawable geometry get an all-zero grid.
+    """
+    n = len(path_data)
+    table = SegmentTable()
+    for owner, elements in enumerate(path_data):
+        for element in elements or []:
+            table.add_element(owner, element.get("tag", ""), element.get("attrs", {}))
+
+    grids = np.zeros((n, GRID, GRID), dtype=np.float64)
+    owners, points = table.sample(OUTLINE_SAMPLES, dense_lines=True)
+    if not len(owners):
+        return grids
+
+    # Each segment is OUTLINE_SAMPLES consecutive points; weight them by its length
+    segments = points.reshape(-1, OUTLINE_SAMPLES, 2)
+    lengths = np.linalg.norm(np.diff(segments, axis=1), axis=2).sum(axis=1)
+    weights = np.repeat(lengths / OUTLINE_SAMPLES, OUTLINE_SAMPLES)
+
+    order = np.argsort(owners, kind="stable")
+    owners, points, weights = owners[order], points[order], weights[order]
+    present, starts = np.unique(owners, return_index=True)
+    lo = np.full((n, 2), np.nan)
+    hi = np.full((n, 2), np.nan)
+    lo[present] = np.minimum.reduceat(points, starts, axis=0)
+    hi[present] = np.maximum.reduceat(points, starts, axis=0)
+
+    size = (hi - lo).max(axis=1)
+    size = np.where(np.isnan(size) | (size <= 0), 1.0, size)
+    center = (lo + hi) / 2
+    unit = (points - center[owners]) / size[owners, None] + 0.5  # Longer side spans [0, 1]
+
+    cells = np.clip((unit * GRID).astype(np.int64), 0, GRID - 1)
+    flat = owners * GRID * GRID + cells[:, 1] * GRID + cells[:, 0]
+    grids = np.bincount(flat, weights=weights, minlength=n * GRID * GRID).reshape(n, GRID, GRID)
+
+    # Two 3x3 box blurs (roughly Gaussian) so outlines a cell or two apart still overlap
+    for _ in range(2):
+        padded = np.pad(grids, ((0, 0), (1, 1), (1, 1)))
+        grids = sum(padded[:, dy:dy + GRID, dx:dx + GRID] for dy in range(3) for dx in range(3))
+
+    norms = np.linalg.norm(grids.reshape(n, -1), axis=1)
+    grids /= np.where(norms == 0, 1.0, norms)[:, None, None]
+    return grids
+
+
+def perceptual_hashes(descriptors: np.ndarray) -> list[int | None]:
+    """
+    64-bit perceptual hash per descriptor grid.
+
+    Bits mark whether each low-frequency DCT coefficient lies above the
+    block's median (pHash). Empty descriptors hash to None.
+    """
+    low = _DCT[:HASH_SIZE]
+    coefficients = low @ descriptors @ low.T
+    coefficients = coefficients.reshape(len(descriptors), -1)
+    bits = coefficients > np.median(coefficients, axis=1, keepdims=True)
+    weights = np.uint64(1) << np.arange(HASH_SIZE * HASH_SIZE, dtype=np.uint64)[::-1]
+    values = (bits.astype(np.uint64) * weights).sum(axis=1, dtype=np.uint64)
+
+    empty = ~descriptors.reshape(len(descriptors), -1).any(axis=1)
+    return [None if blank else int(value) for value, blank in zip(values.tolist(), empty.tolist())]
+
+
+def compute_fingerprints(path_data: list[list[dict]], batch_size: int = BATCH_SIZE) -> list[str | None]:
+    """Hex perceptual hashes for a batch of icons, processed in memory-bounded chunks."""
+    hashes = []
+    for i in range(0, len(path_data), batch_size):
+        for value in perceptual_hashes(outline_descriptors(path_data[i:i + batch_size])):
+            hashes.append(None if value is None else hash_to_hex(value))
+    return hashes
+
+
+class HammingIndex:
+    """
+    Multi-index hashing over 64-bit hashes.
+
+    Hashes are split into 64 / CHUNK_BITS chunks with one exact-match table
+    per chunk. By pigeonhole, two hashes within radius r agree to within
+    r // chunks bits on at least one chunk, so a query only probes chunk
+    values that close to its own and verifies the survivors with popcount.
+    """
+
+    def __init__(self, hashes: list[int]):
+        self.hashes = np.array(hashes, dtype=np.uint64)
+        self.chunks = 64 // CHUNK_BITS
+        self.mask = (1 << CHUNK_BITS) - 1
+        self.tables: list[dict[int, list[int]]] = [defaultdict(list) for _ in range(self.chunks)]
+        for position, value in enumerate(hashes):
+            for chunk in range(self.chunks):
+                self.tables[chunk][(value >> (chunk * CHUNK_BITS)) & self.mask].append(position)
+
+    def _probes(self, value: int, flips: int) -> list[int]:
+        """Chunk values within `flips` bits of value."""
+        probes = [value]
+        for count in range(1, flips + 1):
+            for bits in combinations(range(CHUNK_BITS), count):
+                flipped = value
+                for bit in bits:
+                    flipped ^= 1 << bit
+                probes.append(flipped)
+        return probes
+
+    def query(self, value: int, radius: int = DEFAULT_RADIUS) -> list[tuple[int, int]]:
+        """Positions within `radius` of a hash, as (position, distance) sorted by distance."""
+        flips = radius // self.chunks
+        candidates = set()
+        for chunk in range(self.chunks):
+            table = self.tables[chunk]
+            for probe in self._probes((value >> (chunk * CHUNK_BITS)) & self.mask, flips):
+                candidates.update(table.get(probe, ()))
+        if not candidates:
+            return []
+
+        positions = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        distances = popcount(self.hashes[positions] ^ np.uint64(value))
+        keep = distances <= radius
+        matches = sorted(zip(distances[keep].tolist(), positions[keep].tolist()))
+        return [(position, distance) for distance, position in matches]
+
+    def pairs(self, radius: int = DEFAULT_RADIUS) -> list[tuple[int, int, int]]:
+        """All pairs (i, j, distance) with i < j within `radius`."""
+        found = []
+        for i, value in enumerate(self.hashes.tolist()):
+            for j, distance in self.query(value, radius):
+                if j > i:
+                    found.append((i, j, distance))
+        return found
+
+
+def duplicate_groups(ids: list[str], hashes: list[int], radius: int = DEFAULT_RADIUS) -> list[dict]:
+    """Group icons whose hashes are within `radius`, linking transitively."""
+    index = HammingIndex(hashes)
+    parent = list(range(len(ids)))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    closest: dict[int, int] = {}
+    for i, j, distance in index.pairs(radius):
+        parent[find(i)] = find(j)
+        closest[i] = min(distance, closest.get(i, 64))
+        closest[j] = min(distance, closest.get(j, 64))
+
+    groups: dict[int, list[int]] = defaultdict(list)
+    for member in closest:
+        groups[find(member)].append(member)
+
+    return sorted(
+        (
+            {
+                "icons": sorted(ids[m] for m in members),
+                "maxDistance": max(closest[m] for m in members),
+            }
+            for members in groups.values()
+        ),
+        key=lambda group: (-len(group["icons"]), group["icons"]),
+    )
+
+
+def backfill_fingerprints(conn, source_id: str | None = None, recompute: bool = False,
+                          batch_size: int = 5000) -> int:
+    """Compute and store geometry hashes for icons already in the database."""
+    conditions = []
+    params: list = []
+    if source_id:
+        conditions.append("source_id = ?")
+        params.append(source_id)
+    if not recompute:
+        conditions.append("geometry_hash IS NULL")
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    rows = conn.execute(f"SELECT id, path_data FROM icons {where}", tuple(params)).fetchall()
+    if not rows:
+        return 0
+
+    start = time.perf_counter()
+    hashes = compute_fingerprints([json.loads(row[1]) if row[1] else [] for row in rows])
+    print(f"  Fingerprinted {len(rows)} icons in {time.perf_counter() - start:.2f}s")
+
+    for i in range(0, len(rows), batch_size):
+        conn.executemany(
+            "UPDATE icons SET geometry_hash = ? WHERE id = ?",
+            [(value, row[0]) for row, value in zip(rows[i:i + batch_size], hashes[i:i + batch_size])],
+        )
+        conn.commit()
+        print(f"  Progress: {min(i + batch_size, len(rows))}/{len(rows)}")
+
+    return len(rows)
+
+
+def duplicate_report(conn, source_id: str | None = None, radius: int = DEFAULT_RADIUS) -> dict[str, list[dict]]:
+    """Near-duplicate groups per library, from stored geometry hashes."""
+    params = (source_id,) if source_id else ()
+    rows = conn.execute(
+        f"""
+        SELECT source_id, id, geometry_hash FROM icons
+        WHERE geometry_hash IS NOT NULL {"AND source_id = ?" if source_id else ""}
+        ORDER BY source_id, id
+        """,
+        params,
+    ).fetchall()
+
+    by_source: dict[str, list[tuple[str, int]]] = defaultdict(list)
+    for row in rows:
+        by_source[row[0]].append((row[1], hex_to_hash(row[2])))
+
+    report = {}
+    for source, entries in by_source.items():
+        start = time.perf_counter()
+        groups = duplicate_groups([e[0] for e in entries], [e[1] for e in entries], radius)
+        report[source] = groups
+        duplicates = sum(len(g["icons"]) for g in groups)
+        print(f"  {source}: {len(groups)} groups, {duplicates}/{len(entries)} icons "
+              f"({time.perf_counter() - start:.2f}s)")
+    return report
+
+
+def main():
+    import libsql_experimental as libsql
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Geometric fingerprints and near-duplicate reports")
+    parser.add_argument(
+        "--backfill",
+        action="store_true",
+        help="Compute geometry hashes for icons already in the database",
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Recompute even for icons that already have a hash",
+    )
+    parser.add_argument(
+        "--duplicates",
+        action="store_true",
+        help="Report groups of near-identical icons within each library",
+    )
+    parser.add_argument(
+        "--radius",
+        type=int,
+        default=DEFAULT_RADIUS,
+        help=f"Max Hamming distance between near duplicates (default: {DEFAULT_RADIUS})",
+    )
+    parser.add_argument("--output", type=Path, help="Write the duplicate report as JSON")
+    parser.add_argument("--source", help="Only process icons from this source")
+    args = parser.parse_args()
+
+    if not args.backfill and not args.duplicates:
+        parser.print_help()
+        return
+
+    load_dotenv(Path(__file__).parent.parent / ".env.local")
+
+    turso_url = os.environ.get("TURSO_DATABASE_URL")
+    auth_token = os.environ.get("TURSO_AUTH_TOKEN")
+
+    if not turso_url or not auth_token:
+        print("Error: TURSO_DATABASE_URL and TURSO_AUTH_TOKEN must be set")
+        sys.exit(1)
+
+    conn = libsql.connect(turso_url, auth_token=auth_token)
+
+    if args.backfill:
+        total = backfill_fingerprints(conn, args.source, recompute=args.all)
+        print(f"\n✓ Stored geometry hashes for {total} icons")
+
+    if args.duplicates:
+        print("\nNear-duplicate icons:")
+        print("=" * 50)
+        report = duplicate_report(conn, args.source, args.radius)
+        if args.output:
+            args.output.write_text(json.dumps(report, indent=2))
+            print(f"\n✓ Wrote duplicate report to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
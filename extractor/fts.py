@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Maintain and measure the icons_fts full-text index.
+
+IconRegistry creates icons_fts (an FTS5 external-content table over
+icons) on first connect and keeps it in sync with triggers. This script
+rebuilds or optimizes it, checks it against the icons table, and
+compares query latency with the search route's LIKE fallback.
+
+Benchmarks over the network mostly measure round trips; --db runs them
+against a local copy of the database instead.
+
+Usage:
+    python fts.py --rebuild                 # Re-read every icon into the index
+    python fts.py --optimize                # Merge index segments
+    python fts.py --check                   # Integrity check against icons
+    python fts.py --query "shopping cart"
+    python fts.py --benchmark --db ./local.db --queries 1000
+"""
+import os
+import sys
+import time
+import argparse
+from pathlib import Path
+from bm25_index import like_search, load_icons, percentile_ms, sample_queries
+from registry import FTS_TABLE, IconRegistry
+
+
+def run_benchmark(registry: IconRegistry, query_count: int, k: int):
+    """Time FTS5 MATCH and LIKE on the same sampled queries."""
+    queries = sample_queries(load_icons(registry.conn), query_count)
+    fts_times, like_times = [], []
+    fts_found = like_found = 0
+    for query in queries:
+        start = time.perf_counter()
+        fts_found += bool(registry.search_fts(query, limit=k))
+        fts_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        like_found += bool(like_search(registry.conn, query, k))
+        like_times.append(time.perf_counter() - start)
+
+    print("\n" + "=" * 50)
+    print(f"{FTS_TABLE} vs LIKE: {len(queries)} queries, k={k}")
+    print("=" * 50)
+    print(f"  {'':<6} {'p50 ms':>8} {'p95 ms':>8} {'answered':>9}")
+    for label, times, found in (("fts5", fts_times, fts_found), ("LIKE", like_times, like_found)):
+        print(f"  {label:<6} {percentile_ms(times, 50):>8.2f} {percentile_ms(times, 95):>8.2f} "
+              f"{found / max(1, len(queries)):>9.1%}")
+
+
+def main():
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Maintain and benchmark the icons_fts full-text index")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the index from the icons table")
+    parser.add_argument("--optimize", action="store_true", help="Merge index segments")
+    parser.add_argument("--check", action="store_true", help="Check the index against the icons table")
+    parser.add_argument("--query", help="Search the index")
+    parser.add_argument("--benchmark", action="store_true", help="Compare query latency with LIKE")
+    parser.add_argument("--queries", type=int, default=1000, help="Queries for --benchmark (default: 1000)")
+    parser.add_argument("--k", type=int, default=10, help="Results per query (default: 10)")
+    parser.add_argument("--db", type=Path, help="Use a local database file instead of TURSO_DATABASE_URL")
+    args = parser.parse_args()
+
+    if not (args.rebuild or args.optimize or args.check or args.query or args.benchmark):
+        parser.error("nothing to do: pass --rebuild, --optimize, --check, --query and/or --benchmark")
+
+    if args.db:
+        if not args.db.exists():
+            print(f"Error: {args.db} not found")
+            sys.exit(1)
+        turso_url, auth_token = str(args.db), ""
+    else:
+        load_dotenv(Path(__file__).parent.parent / ".env.local")
+
+        turso_url = os.environ.get("TURSO_DATABASE_URL")
+        auth_token = os.environ.get("TURSO_AUTH_TOKEN")
+
+        if not turso_url or not auth_token:
+            print("Error: TURSO_DATABASE_URL and TURSO_AUTH_TOKEN must be set (or pass --db)")
+            sys.exit(1)
+
+    registry = IconRegistry(turso_url, auth_token)
+
+    if args.rebuild:
+        start = time.perf_counter()
+        registry.rebuild_fts()
+        print(f"✓ Rebuilt {FTS_TABLE} in {time.perf_counter() - start:.2f}s")
+
+    if args.optimize:
+        start = time.perf_counter()
+        registry.optimize_fts()
+        print(f"✓ Optimized {FTS_TABLE} in {time.perf_counter() - start:.2f}s")
+
+    if args.check:
+        if not registry.check_fts():
+            print(f"✗ {FTS_TABLE} is out of sync with icons (run with --rebuild)")
+            sys.exit(1)
+        print(f"✓ {FTS_TABLE} matches the icons table")
+
+    if args.query:
+        for icon_id, score in registry.search_fts(args.query, limit=args.k):
+            print(f"  {-score:7.3f}  {icon_id}")
+
+    if args.benchmark:
+        run_benchmark(registry, args.queries, args.k)
+
+
+if __name__ == "__main__":
+    main()
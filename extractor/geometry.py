@@ -0,0 +1,800 @@
+#!/usr/bin/env python3
+"""
+SVG geometry analysis: path-data tokenizing, per-icon metrics and
+viewBox normalization.
+
+Paths and basic shapes are converted into absolute line, cubic and arc
+segments, then sampled in one vectorized pass over the whole batch, so
+metrics for the full corpus take seconds rather than minutes.
+
+Normalization rewrites every icon's coordinates and stroke widths onto a
+24x24 grid (e.g. Phosphor's 0 0 256 256), so mixed-library bundles can be
+served without rescaling at request time.
+
+Usage:
+    python geometry.py --backfill                 # Compute metrics for icons missing them
+    python geometry.py --backfill --all           # Recompute metrics for every icon
+    python geometry.py --backfill --source lucide
+    python geometry.py --normalize                # Normalize icons/variants missing it
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+from dataclasses import dataclass, asdict
+from pathlib import Path
+import numpy as np
+
+
+# Number of arguments taken by each path command
+PATH_ARG_COUNTS = {"m": 2, "l": 2, "h": 1, "v": 1, "c": 6, "s": 4, "q": 4, "t": 2, "a": 7, "z": 0}
+
+# Relative render cost of each primitive, used for the complexity score
+COMPLEXITY_WEIGHTS = {"line": 1.0, "curve": 3.0, "arc": 4.0, "element": 2.0}
+
+# Points sampled along each curve/arc when computing outlines
+CURVE_SAMPLES = 9
+
+# Normalized geometry: every icon mapped onto a 24x24 grid
+NORMALIZED_GRID = 24.0
+NORMALIZED_VIEW_BOX = "0 0 24 24"
+NORMALIZED_DECIMALS = 2
+
+# Attributes rewritten when normalizing geometry
+X_ATTRS = {"x", "x1", "x2", "cx", "fx"}
+Y_ATTRS = {"y", "y1", "y2", "cy", "fy"}
+LENGTH_ATTRS = {"r", "rx", "ry", "width", "height", "stroke-width", "stroke-dashoffset"}
+GRADIENT_TAGS = {"linearGradient", "radialGradient"}
+
+_PATH_TOKEN_RE = re.compile(r"[MmLlHhVvCcSsQqTtAaZz]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_NUMBER_RE = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+_TRANSFORM_RE = re.compile(r"(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)")
+_STYLE_LENGTH_RE = re.compile(r"((?:^|;)\s*stroke-width\s*:\s*)([^;]+)")
+_TAG_RE = re.compile(r"<(/?)([\w:-]+)((?:\s+[\w:-]+\s*=\s*(?:\"[^\"]*\"|'[^']*'))*)\s*(/?)>")
+_ATTR_RE = re.compile(r"([\w:-]+)\s*=\s*([\"'])(.*?)\2", re.S)
+
+
+@dataclass
+class IconMetrics:
+    """Geometry metrics stored per icon."""
+    bbox_min_x: float | None
+    bbox_min_y: float | None
+    bbox_max_x: float | None
+    bbox_max_y: float | None
+    node_count: int
+    segment_count: int
+    element_count: int
+    byte_size: int
+    complexity: float
+    geometry_hash: str | None = None  # Perceptual outline hash (see fingerprint.py)
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def tokenize_path(d: str) -> list[tuple[str, np.ndarray]]:
+    """Tokenize SVG path data into (command, args) pairs.
+
+    `args` has one row per repetition of the command, e.g. "L1 2 3 4" gives
+    ("L", [[1, 2], [3, 4]]). Arc flags may be packed without separators
+    ("a2 2 0 011 1"), so they are split off digit by digit.
+    """
+    commands: list[tuple[str, np.ndarray]] = []
+    command = None
+    args: list[float] = []
+
+    def flush():
+        if command is None:
+            return
+        count = PATH_ARG_COUNTS[command.lower()]
+        if count == 0:
+            commands.append((command, np.empty((0, 0))))
+            return
+        usable = len(args) - len(args) % count
+        if usable:
+            commands.append((command, np.array(args[:usable], dtype=np.float64).reshape(-1, count)))
+
+    for token in _PATH_TOKEN_RE.findall(d or ""):
+        if token.isalpha():
+            flush()
+            command = token
+            args = []
+            continue
+        if command is None:
+            continue
+        if command in "Aa":
+            # Arc flags are single 0/1 digits at argument positions 3 and 4
+            while token and len(args) % 7 in (3, 4) and token[0] in "01":
+                args.append(float(token[0]))
+                token = token[1:]
+            if not token:
+                continue
+        args.append(float(token))
+
+    flush()
+    return commands
+
+
+def parse_number(value, default: float = 0.0) -> float:
+    """Parse a numeric attribute value such as '12', '1.5px' or '.5'."""
+    if value is None:
+        return default
+    match = _NUMBER_RE.match(str(value).strip())
+    return float(match.group()) if match else default
+
+
+def parse_points(value: str | None) -> np.ndarray:
+    """Parse a polyline/polygon `points` attribute into an (n, 2) array."""
+    numbers = [float(n) for n in _NUMBER_RE.findall(value or "")]
+    usable = len(numbers) - len(numbers) % 2
+    return np.array(numbers[:usable], dtype=np.float64).reshape(-1, 2)
+
+
+class SegmentTable:
+    """Absolute line, cubic and arc segments for a batch of icons.
+
+    Each segment records the index of the icon it belongs to so that
+    sampling can run over the whole batch at once.
+    """
+
+    def __init__(self):
+        self.lines: list[tuple] = []  # (owner, x0, y0, x1, y1)
+        self.cubics: list[tuple] = []  # (owner, x0, y0, c1x, c1y, c2x, c2y, x1, y1)
+        self.arcs: list[tuple] = []  # (owner, x0, y0, rx, ry, phi, large_arc, sweep, x1, y1)
+
+    def add_path(self, owner: int, d: str) -> int:
+        """Add the segments of a path's `d` attribute. Returns its node count."""
+        cx = cy = 0.0  # Current point
+        sx = sy = 0.0  # Subpath start
+        cubic_ctrl = None  # Last cubic control point, for S reflection
+        quad_ctrl = None  # Last quadratic control point, for T reflection
+        nodes = 0
+
+        for command, rows in tokenize_path(d):
+            kind = command.lower()
+            relative = command.islower()
+
+            if kind == "z":
+                if (cx, cy) != (sx, sy):
+                    self.lines.append((owner, cx, cy, sx, sy))
+                cx, cy = sx, sy
+                cubic_ctrl = quad_ctrl = None
+                continue
+
+            for row in rows.tolist():
+                ox, oy = (cx, cy) if relative else (0.0, 0.0)
+
+                if kind == "m":
+                    cx, cy = ox + row[0], oy + row[1]
+                    sx, sy = cx, cy
+                    nodes += 1
+                    kind = "l"  # Further coordinate pairs are implicit lineto
+                    cubic_ctrl = quad_ctrl = None
+                    continue
+
+                if kind in "lhv":
+                    if kind == "l":
+                        nx, ny = ox + row[0], oy + row[1]
+                    elif kind == "h":
+                        nx, ny = ox + row[0], cy
+                    else:
+                        nx, ny = cx, oy + row[0]
+                    self.lines.append((owner, cx, cy, nx, ny))
+                    cubic_ctrl = quad_ctrl = None
+                    nodes += 1
+                elif kind in "cs":
+                    if kind == "c":
+                        c1x, c1y = ox + row[0], oy + row[1]
+                        rest = row[2:]
+                        nodes += 3
+                    else:
+                        c1x, c1y = (2 * cx - cubic_ctrl[0], 2 * cy - cubic_ctrl[1]) if cubic_ctrl else (cx, cy)
+                        rest = row
+                        nodes += 2
+                    c2x, c2y = ox + rest[0], oy + rest[1]
+                    nx, ny = ox + rest[2], oy + rest[3]
+                    self.cubics.append((owner, cx, cy, c1x, c1y, c2x, c2y, nx, ny))
+                    cubic_ctrl, quad_ctrl = (c2x, c2y), None
+                elif kind in "qt":
+                    if kind == "q":
+                        qx, qy = ox + row[0], oy + row[1]
+                        nx, ny = ox + row[2], oy + row[3]
+                        nodes += 2
+                    else:
+                        qx, qy = (2 * cx - quad_ctrl[0], 2 * cy - quad_ctrl[1]) if quad_ctrl else (cx, cy)
+                        nx, ny = ox + row[0], oy + row[1]
+                        nodes += 1
+                    # Elevate the quadratic to an equivalent cubic
+                    self.cubics.append((
+                        owner, cx, cy,
+                        cx + 2 / 3 * (qx - cx), cy + 2 / 3 * (qy - cy),
+                        nx + 2 / 3 * (qx - nx), ny + 2 / 3 * (qy - ny),
+                        nx, ny,
+                    ))
+                    cubic_ctrl, quad_ctrl = None, (qx, qy)
+                else:  # Arc
+                    nx, ny = ox + row[5], oy + row[6]
+                    self.arcs.append((owner, cx, cy, row[0], row[1], row[2], row[3], row[4], nx, ny))
+                    cubic_ctrl = quad_ctrl = None
+                    nodes += 1
+
+                cx, cy = nx, ny
+
+        return nodes
+
+    def add_element(self, owner: int, tag: str, attrs: dict) -> int:
+        """Add the segments of a path/shape element. Returns its node count."""
+        if tag == "path":
+            return self.add_path(owner, attrs.get("d", ""))
+
+        if tag in ("circle", "ellipse"):
+            cx, cy = parse_number(attrs.get("cx")), parse_number(attrs.get("cy"))
+            if tag == "circle":
+                rx = ry = parse_number(attrs.get("r"))
+            else:
+                rx, ry = parse_number(attrs.get("rx")), parse_number(attrs.get("ry"))
+            if rx <= 0 or ry <= 0:
+                return 0
+            # Two half-ellipse arcs
+            self.arcs.append((owner, cx - rx, cy, rx, ry, 0.0, 0.0, 1.0, cx + rx, cy))
+            self.arcs.append((owner, cx + rx, cy, rx, ry, 0.0, 0.0, 1.0, cx - rx, cy))
+            return 2
+
+        if tag == "rect":
+            x, y = parse_number(attrs.get("x")), parse_number(attrs.get("y"))
+            w, h = parse_number(attrs.get("width")), parse_number(attrs.get("height"))
+            if w <= 0 or h <= 0:
+                return 0
+            corners = [(x, y), (x + w, y), (x + w, y + h), (x, y + h), (x, y)]
+            for (x0, y0), (x1, y1) in zip(corners, corners[1:]):
+                self.lines.append((owner, x0, y0, x1, y1))
+            return 4
+
+        if tag == "line":
+            self.lines.append((
+                owner,
+                parse_number(attrs.get("x1")), parse_number(attrs.get("y1")),
+                parse_number(attrs.get("x2")), parse_number(attrs.get("y2")),
+            ))
+            return 2
+
+        if tag in ("polyline", "polygon"):
+            points = parse_points(attrs.get("points"))
+            if tag == "polygon" and len(points) > 2:
+                points = np.vstack([points, points[:1]])
+            for (x0, y0), (x1, y1) in zip(points.tolist(), points[1:].tolist()):
+                self.lines.append((owner, x0, y0, x1, y1))
+            return len(points) - (1 if tag == "polygon" and len(points) > 2 else 0)
+
+        return 0
+
+    def counts(self, n_owners: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Per-owner counts of line, curve and arc segments."""
+        return tuple(
+            np.bincount(np.array([s[0] for s in table], dtype=np.int64), minlength=n_owners)
+            if table else np.zeros(n_owners, dtype=np.int64)
+            for table in (self.lines, self.cubics, self.arcs)
+        )
+
+    def sample(self, samples: int = CURVE_SAMPLES, dense_lines: bool = False) -> tuple[np.ndarray, np.ndarray]:
+        """Sample every segment into points. Returns (owners, points[n, 2]).
+
+        Lines contribute their two endpoints, or `samples` evenly spaced
+        points with `dense_lines` (every segment then yields exactly
+        `samples` consecutive points).
+        """
+        owners = []
+        points = []
+        t = np.linspace(0.0, 1.0, samples)
+
+        if self.lines:
+            lines = np.array(self.lines, dtype=np.float64)
+            if dense_lines:
+                p0, p1 = lines[:, None, 1:3], lines[:, None, 3:5]
+                owners.append(np.repeat(lines[:, 0], samples))
+                points.append((p0 + (p1 - p0) * t[None, :, None]).reshape(-1, 2))
+            else:
+                owners.append(np.repeat(lines[:, 0], 2))
+                points.append(lines[:, 1:5].reshape(-1, 2))
+
+        if self.cubics:
+            cubics = np.array(self.cubics, dtype=np.float64)
+            p0, p1, p2, p3 = (cubics[:, None, i:i + 2] for i in (1, 3, 5, 7))
+            mt = 1.0 - t[None, :, None]
+            tt = t[None, :, None]
+            curve = mt ** 3 * p0 + 3 * mt ** 2 * tt * p1 + 3 * mt * tt ** 2 * p2 + tt ** 3 * p3
+            owners.append(np.repeat(cubics[:, 0], samples))
+            points.append(curve.reshape(-1, 2))
+
+        if self.arcs:
+            arc_owners, arc_points = sample_arcs(np.array(self.arcs, dtype=np.float64), t)
+            owners.append(arc_owners)
+            points.append(arc_points)
+
+        if not points:
+            return np.empty(0, dtype=np.int64), np.empty((0, 2))
+        return np.concatenate(owners).astype(np.int64), np.concatenate(points)
+
+
+def sample_arcs(arcs: np.ndarray, t: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Sample elliptical arcs (SVG endpoint parameterization) at parameters t.
+
+    Implements the endpoint-to-center conversion from the SVG spec
+    (appendix F.6.5) for all arcs at once. Degenerate arcs (zero radius)
+    fall back to straight lines, as in SVG rendering.
+    """
+    owner = arcs[:, 0]
+    x0, y0, rx, ry, phi_deg, large_arc, sweep, x1, y1 = (arcs[:, i] for i in range(1, 10))
+    rx = np.abs(rx)
+    ry = np.abs(ry)
+    phi = np.radians(phi_deg)
+    cos_phi, sin_phi = np.cos(phi), np.sin(phi)
+
+    dx2 = (x0 - x1) / 2
+    dy2 = (y0 - y1) / 2
+    x1p = cos_phi * dx2 + sin_phi * dy2
+    y1p = -sin_phi * dx2 + cos_phi * dy2
+
+    degenerate = (rx == 0) | (ry == 0) | ((dx2 == 0) & (dy2 == 0))
+    rx = np.where(degenerate, 1.0, rx)
+    ry = np.where(degenerate, 1.0, ry)
+
+    # Scale radii up when they are too small to span the endpoints
+    lam = (x1p / rx) ** 2 + (y1p / ry) ** 2
+    scale = np.sqrt(np.maximum(lam, 1.0))
+    rx = rx * scale
+    ry = ry * scale
+
+    num = rx ** 2 * ry ** 2 - rx ** 2 * y1p ** 2 - ry ** 2 * x1p ** 2
+    den = rx ** 2 * y1p ** 2 + ry ** 2 * x1p ** 2
+    coef = np.sqrt(np.maximum(num, 0.0) / np.where(den == 0, 1.0, den))
+    coef = np.where(large_arc == sweep, -coef, coef)
+    cxp = coef * rx * y1p / ry
+    cyp = -coef * ry * x1p / rx
+
+    cx = cos_phi * cxp - sin_phi * cyp + (x0 + x1) / 2
+    cy = sin_phi * cxp + cos_phi * cyp + (y0 + y1) / 2
+
+    ux, uy = (x1p - cxp) / rx, (y1p - cyp) / ry
+    vx, vy = (-x1p - cxp) / rx, (-y1p - cyp) / ry
+    theta1 = np.arctan2(uy, ux)
+    dtheta = np.arctan2(ux * vy - uy * vx, ux * vx + uy * vy)
+    dtheta = np.where((sweep == 0) & (dtheta > 0), dtheta - 2 * np.pi, dtheta)
+    dtheta = np.where((sweep != 0) & (dtheta < 0), dtheta + 2 * np.pi, dtheta)
+
+    theta = theta1[:, None] + dtheta[:, None] * t[None, :]
+    ex = rx[:, None] * np.cos(theta)
+    ey = ry[:, None] * np.sin(theta)
+    px = cos_phi[:, None] * ex - sin_phi[:, None] * ey + cx[:, None]
+    py = sin_phi[:, None] * ex + cos_phi[:, None] * ey + cy[:, None]
+
+    # Straight line for degenerate arcs
+    line_x = x0[:, None] + (x1 - x0)[:, None] * t[None, :]
+    line_y = y0[:, None] + (y1 - y0)[:, None] * t[None, :]
+    px = np.where(degenerate[:, None], line_x, px)
+    py = np.where(degenerate[:, None], line_y, py)
+
+    points = np.stack([px, py], axis=-1).reshape(-1, 2)
+    return np.repeat(owner, len(t)), points
+
+
+def compute_metrics(path_data: list[list[dict]], contents: list[str]) -> list[IconMetrics]:
+    """Compute geometry metrics for a batch of icons.
+
+    `path_data` holds each icon's extracted elements ({"tag", "attrs"}) and
+    `contents` its inner SVG markup. The bounding box covers the sampled
+    outlines (stroke width and transforms are not applied).
+    """
+    n = len(path_data)
+    table = SegmentTable()
+    nodes = np.zeros(n, dtype=np.int64)
+    elements = np.zeros(n, dtype=np.int64)
+
+    for owner, icon_elements in enumerate(path_data):
+        elements[owner] = len(icon_elements or [])
+        for element in icon_elements or []:
+            nodes[owner] += table.add_element(owner, element.get("tag", ""), element.get("attrs", {}))
+
+    line_counts, curve_counts, arc_counts = table.counts(n)
+    owners, points = table.sample()
+
+    bbox = np.full((n, 4), np.nan)
+    if len(owners):
+        order = np.argsort(owners, kind="stable")
+        owners, points = owners[order], points[order]
+        present, starts = np.unique(owners, return_index=True)
+        bbox[present, 0:2] = np.minimum.reduceat(points, starts, axis=0)
+        bbox[present, 2:4] = np.maximum.reduceat(points, starts, axis=0)
+
+    complexity = (
+        line_counts * COMPLEXITY_WEIGHTS["line"]
+        + curve_counts * COMPLEXITY_WEIGHTS["curve"]
+        + arc_counts * COMPLEXITY_WEIGHTS["arc"]
+        + elements * COMPLEXITY_WEIGHTS["element"]
+    )
+    segments = line_counts + curve_counts + arc_counts
+
+    results = []
+    for i in range(n):
+        box = [None if np.isnan(v) else round(float(v), 3) for v in bbox[i]]
+        results.append(IconMetrics(
+            bbox_min_x=box[0],
+            bbox_min_y=box[1],
+            bbox_max_x=box[2],
+            bbox_max_y=box[3],
+            node_count=int(nodes[i]),
+            segment_count=int(segments[i]),
+            element_count=int(elements[i]),
+            byte_size=len((contents[i] or "").encode("utf-8")),
+            complexity=float(complexity[i]),
+        ))
+    return results
+
+
+def parse_view_box(view_box: str | None) -> tuple[float, float, float, float]:
+    """Parse a viewBox into (min_x, min_y, width, height), defaulting to 24x24."""
+    numbers = [float(n) for n in _NUMBER_RE.findall(view_box or "")]
+    if len(numbers) != 4 or numbers[2] <= 0 or numbers[3] <= 0:
+        return 0.0, 0.0, NORMALIZED_GRID, NORMALIZED_GRID
+    return numbers[0], numbers[1], numbers[2], numbers[3]
+
+
+def format_number(value: float, decimals: int = NORMALIZED_DECIMALS) -> str:
+    """Format a coordinate compactly: fixed precision, no trailing zeros."""
+    text = f"{value:.{decimals}f}".rstrip("0").rstrip(".")
+    return "0" if text in ("-0", "") else text
+
+
+@dataclass
+class GridTransform:
+    """Uniform scale + offset mapping a viewBox onto the normalized grid.
+
+    Non-square viewBoxes are scaled by their longer side and centered.
+    """
+    scale: float
+    offset_x: float
+    offset_y: float
+
+    @classmethod
+    def for_view_box(cls, view_box: str | None, grid: float = None) -> "GridTransform":
+        grid = grid or NORMALIZED_GRID
+        min_x, min_y, width, height = parse_view_box(view_box)
+        scale = grid / max(width, height)
+        return cls(
+            scale=scale,
+            offset_x=(grid - width * scale) / 2 - min_x * scale,
+            offset_y=(grid - height * scale) / 2 - min_y * scale,
+        )
+
+    @property
+    def has_offset(self) -> bool:
+        return self.offset_x != 0 or self.offset_y != 0
+
+    def length(self, value: str) -> str:
+        """Scale a length attribute, leaving percentages and non-numbers alone."""
+        value = value.strip()
+        match = _NUMBER_RE.match(value)
+        if not match or value.endswith("%"):
+            return value
+        return format_number(float(match.group()) * self.scale) + value[match.end():]
+
+    def coordinate(self, value: str, axis: int, offset: bool) -> str:
+        """Map an x (axis 0) or y (axis 1) coordinate attribute."""
+        value = value.strip()
+        match = _NUMBER_RE.match(value)
+        if not match or value.endswith("%"):
+            return value
+        shift = (self.offset_x, self.offset_y)[axis] if offset else 0.0
+        return format_number(float(match.group()) * self.scale + shift) + value[match.end():]
+
+    def points(self, value: str, offset: bool) -> str:
+        """Map a polyline/polygon `points` list."""
+        points = parse_points(value) * self.scale
+        if offset:
+            points += (self.offset_x, self.offset_y)
+        return " ".join(f"{format_number(x)},{format_number(y)}" for x, y in points.tolist())
+
+    def path(self, d: str, offset: bool) -> str:
+        """Rescale path data command by command.
+
+        Absolute coordinates are scaled and offset, relative ones only
+        scaled. Arc radii scale; rotation and flags are kept.
+        """
+        shift = np.array([self.offset_x, self.offset_y]) if offset else np.zeros(2)
+        parts = []
+
+        for command, rows in tokenize_path(d):
+            kind = command.lower()
+            if kind == "z":
+                parts.append(command)
+                continue
+
+            rows = rows.copy()
+            absolute = command.isupper()
+            # A leading relative moveto's first pair is absolute (SVG 1.1, 8.3.3)
+            leading_move = kind == "m" and not parts and not absolute
+            if kind == "a":
+                rows[:, 0:2] *= self.scale
+                rows[:, 5:7] *= self.scale
+                if absolute:
+                    rows[:, 5:7] += shift
+            elif kind in ("h", "v"):
+                rows *= self.scale
+                if absolute:
+                    rows += shift[0 if kind == "h" else 1]
+            else:
+                rows *= self.scale
+                if absolute:
+                    rows += np.tile(shift, rows.shape[1] // 2)
+                elif leading_move:
+                    rows[0] += shift
+
+            if kind == "a":
+                values = [
+                    " ".join([format_number(r[0]), format_number(r[1]), format_number(r[2], 3),
+                              str(int(r[3])), str(int(r[4])), format_number(r[5]), format_number(r[6])])
+                    for r in rows.tolist()
+                ]
+            else:
+                values = [" ".join(format_number(v) for v in r) for r in rows.tolist()]
+            parts.append(command + " ".join(values))
+
+        return "".join(parts).replace(" -", "-")
+
+    def transform_list(self, value: str, offset: bool) -> str:
+        """Conjugate a transform attribute with the grid scale.
+
+        Translations (and rotation centers) scale with the grid, linear
+        parts stay. With `offset`, the grid offset is prepended so the
+        element's own coordinates only need scaling.
+        """
+        def rewrite(match: re.Match) -> str:
+            name = match.group(1)
+            args = [float(n) for n in _NUMBER_RE.findall(match.group(2))]
+            if name == "translate":
+                args = [a * self.scale for a in args]
+            elif name == "rotate" and len(args) == 3:
+                args = [args[0], args[1] * self.scale, args[2] * self.scale]
+            elif name == "matrix" and len(args) == 6:
+                args = args[:4] + [args[4] * self.scale, args[5] * self.scale]
+            return f"{name}({' '.join(format_number(a, 4) for a in args)})"
+
+        rewritten = _TRANSFORM_RE.sub(rewrite, value)
+        if offset and self.has_offset:
+            rewritten = f"translate({format_number(self.offset_x)} {format_number(self.offset_y)}) {rewritten}"
+        return rewritten
+
+    def attrs(self, tag: str, attrs: dict, offset: bool) -> tuple[dict, bool]:
+        """Map one element's attributes onto the grid.
+
+        Returns the new attributes and whether descendants still need the
+        grid offset applied (false once a transform has absorbed it).
+        """
+        result = dict(attrs)
+        own_offset = offset
+        if "transform" in attrs:
+            result["transform"] = self.transform_list(attrs["transform"], offset)
+            own_offset = False
+
+        user_space = tag not in GRADIENT_TAGS or attrs.get("gradientUnits") == "userSpaceOnUse"
+        for name, value in attrs.items():
+            if name == "d" and tag == "path":
+                result[name] = self.path(value, own_offset)
+            elif name == "points" and tag in ("polyline", "polygon"):
+                result[name] = self.points(value, own_offset)
+            elif name in LENGTH_ATTRS and user_space:
+                result[name] = self.length(value)
+            elif name in X_ATTRS and user_space:
+                result[name] = self.coordinate(value, 0, own_offset)
+            elif name in Y_ATTRS and user_space:
+                result[name] = self.coordinate(value, 1, own_offset)
+            elif name == "stroke-dasharray":
+                result[name] = " ".join(self.length(v) for v in re.split(r"[\s,]+", value.strip()) if v)
+            elif name == "style":
+                result[name] = _STYLE_LENGTH_RE.sub(
+                    lambda m: m.group(1) + self.length(m.group(2)), value
+                )
+        return result, own_offset
+
+    def content(self, content: str) -> str:
+        """Map inner SVG markup onto the grid, rewriting attributes in place."""
+        offset_stack = [True]
+        out = []
+        position = 0
+
+        for match in _TAG_RE.finditer(content):
+            out.append(content[position:match.start()])
+            position = match.end()
+            closing, tag, raw_attrs, self_closing = match.groups()
+
+            if closing:
+                if len(offset_stack) > 1:
+                    offset_stack.pop()
+                out.append(match.group(0))
+                continue
+
+            attr_list = _ATTR_RE.findall(raw_attrs)
+            attrs, child_offset = self.attrs(tag, {name: value for name, _, value in attr_list}, offset_stack[-1])
+            rendered = "".join(f' {name}={quote}{attrs[name]}{quote}' for name, quote, _ in attr_list)
+            out.append(f"<{tag}{rendered}{'/' if self_closing else ''}>")
+            if not self_closing:
+                offset_stack.append(child_offset)
+
+        out.append(content[position:])
+        return "".join(out)
+
+
+@dataclass
+class NormalizedGeometry:
+    """An icon's geometry mapped onto the normalized grid."""
+    content: str
+    path_data: list[dict]
+    stroke_width: str | None
+
+
+def normalize_geometry(view_box: str | None, content: str, path_data: list[dict] | None,
+                       stroke_width: str | None = None) -> NormalizedGeometry:
+    """Rescale an icon's geometry from its viewBox onto NORMALIZED_VIEW_BOX.
+
+    Coordinates and stroke widths are rewritten directly rather than
+    wrapping the content in a scaling transform.
+    """
+    grid = GridTransform.for_view_box(view_box)
+    return NormalizedGeometry(
+        content=grid.content(content or ""),
+        path_data=[
+            {"tag": el.get("tag", ""), "attrs": grid.attrs(el.get("tag", ""), el.get("attrs", {}), True)[0]}
+            for el in path_data or []
+        ],
+        stroke_width=grid.length(stroke_width) if stroke_width else stroke_width,
+    )
+
+
+def backfill_metrics(conn, source_id: str | None = None, recompute: bool = False, batch_size: int = 5000) -> int:
+    """Compute and store metrics for icons already in the database."""
+    conditions = []
+    params: list = []
+    if source_id:
+        conditions.append("source_id = ?")
+        params.append(source_id)
+    if not recompute:
+        conditions.append("complexity IS NULL")
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    rows = conn.execute(f"SELECT id, path_data, content FROM icons {where}", tuple(params)).fetchall()
+    if not rows:
+        return 0
+
+    start = time.perf_counter()
+    metrics = compute_metrics(
+        [json.loads(row[1]) if row[1] else [] for row in rows],
+        [row[2] for row in rows],
+    )
+    elapsed = time.perf_counter() - start
+    print(f"  Analyzed {len(rows)} icons in {elapsed:.2f}s")
+
+    for i in range(0, len(rows), batch_size):
+        for row, m in zip(rows[i:i + batch_size], metrics[i:i + batch_size]):
+            conn.execute(
+                """
+                UPDATE icons
+                SET bbox_min_x = ?, bbox_min_y = ?, bbox_max_x = ?, bbox_max_y = ?,
+                    node_count = ?, segment_count = ?, element_count = ?, byte_size = ?, complexity = ?
+                WHERE id = ?
+                """,
+                (
+                    m.bbox_min_x, m.bbox_min_y, m.bbox_max_x, m.bbox_max_y,
+                    m.node_count, m.segment_count, m.element_count, m.byte_size, m.complexity,
+                    row[0],
+                ),
+            )
+        conn.commit()
+        print(f"  Progress: {min(i + batch_size, len(rows))}/{len(rows)}")
+
+    return len(rows)
+
+
+def backfill_normalized(conn, source_id: str | None = None, recompute: bool = False,
+                        batch_size: int = 1000) -> int:
+    """Compute and store normalized geometry for icons and variants already in the database."""
+    source_filter = "AND i.source_id = ?" if source_id else ""
+    missing_icon = "" if recompute else "AND i.normalized_content IS NULL"
+    missing_variant = "" if recompute else "AND v.normalized_content IS NULL"
+    params = (source_id,) if source_id else ()
+
+    icons = conn.execute(
+        f"""
+        SELECT i.id, i.view_box, i.content, i.path_data, i.stroke_width
+        FROM icons i
+        WHERE 1 = 1 {source_filter} {missing_icon}
+        """,
+        params,
+    ).fetchall()
+    variants = conn.execute(
+        f"""
+        SELECT v.id, i.view_box, v.content, v.path_data
+        FROM variants v JOIN icons i ON i.id = v.icon_id
+        WHERE 1 = 1 {source_filter} {missing_variant}
+        """,
+        params,
+    ).fetchall()
+
+    for i, row in enumerate(icons, 1):
+        geometry = normalize_geometry(row[1], row[2], json.loads(row[3]) if row[3] else [], row[4])
+        conn.execute(
+            """
+            UPDATE icons
+            SET normalized_content = ?, normalized_path_data = ?, normalized_stroke_width = ?
+            WHERE id = ?
+            """,
+            (geometry.content, json.dumps(geometry.path_data), geometry.stroke_width, row[0]),
+        )
+        if i % batch_size == 0:
+            conn.commit()
+            print(f"  Icons: {i}/{len(icons)}")
+
+    for i, row in enumerate(variants, 1):
+        geometry = normalize_geometry(row[1], row[2], json.loads(row[3]) if row[3] else [])
+        conn.execute(
+            "UPDATE variants SET normalized_content = ?, normalized_path_data = ? WHERE id = ?",
+            (geometry.content, json.dumps(geometry.path_data), row[0]),
+        )
+        if i % batch_size == 0:
+            conn.commit()
+            print(f"  Variants: {i}/{len(variants)}")
+
+    conn.commit()
+    return len(icons) + len(variants)
+
+
+def main():
+    import libsql_experimental as libsql
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Compute per-icon geometry metrics")
+    parser.add_argument(
+        "--backfill",
+        action="store_true",
+        help="Compute metrics for icons already in the database",
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Recompute even for rows that already have values",
+    )
+    parser.add_argument(
+        "--normalize",
+        action="store_true",
+        help="Compute 24x24 normalized geometry for icons and variants in the database",
+    )
+    parser.add_argument("--source", help="Only process icons from this source")
+    args = parser.parse_args()
+
+    if not args.backfill and not args.normalize:
+        parser.print_help()
+        return
+
+    load_dotenv(Path(__file__).parent.parent / ".env.local")
+
+    turso_url = os.environ.get("TURSO_DATABASE_URL")
+    auth_token = os.environ.get("TURSO_AUTH_TOKEN")
+
+    if not turso_url or not auth_token:
+        print("Error: TURSO_DATABASE_URL and TURSO_AUTH_TOKEN must be set")
+        sys.exit(1)
+
+    conn = libsql.connect(turso_url, auth_token=auth_token)
+
+    if args.backfill:
+        total = backfill_metrics(conn, args.source, recompute=args.all)
+        print(f"\n✓ Stored geometry metrics for {total} icons")
+
+    if args.normalize:
+        total = backfill_normalized(conn, args.source, recompute=args.all)
+        print(f"\n✓ Stored normalized geometry for {total} icons and variants")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,8 +8,15 @@ and stores them in the Turso database.
 Usage:
     python main.py                    # Extract all libraries
     python main.py --source lucide    # Extract only Lucide
-    python main.py --map              # Run cross-library mapping
+    python main.py --map              # Run cross-library mapping (incremental)
+    python main.py --map-only --full-map  # Recompute all mappings
+    python main.py --review-queue     # List mappings that need review
+    python main.py --review lucide:sun-dim lucide:cog  # Confirm mappings; later runs keep them
     python main.py --clear lucide     # Clear and re-extract Lucide
+    python main.py --export-only --export-shards ./static/shards  # Re-export shards only
+    python main.py --export-only --export-sprites ./static/sprites  # Rebuild sprite sheets only
+    python main.py --export-only --export-search-index ./static/bm25  # Rebuild the keyword index only
+    python main.py --export-only --export-catalog ./static/catalog.unicat  # Offline catalog for the CLI
 """
 import os
 import sys
@@ -19,6 +26,7 @@ from pathlib import Path
 from dotenv import load_dotenv
 
 from extractors import (
+    ExtractedIcon,
     LucideExtractor,
     PhosphorExtractor,
     HugeIconsExtractor,
@@ -31,6 +39,12 @@ from extractors import (
 )
 from registry import IconRegistry
 from mapper import IconMapper
+from shards import ShardExporter
+from sprites import SpriteBuilder
+from name_lookup import sync_name_lookup
+from autocomplete import sync_autocomplete
+from bm25_index import export_index as export_search_index
+from offline_catalog import DEFAULT_MAX_BYTES as DEFAULT_MAX_CATALOG_BYTES, CatalogBudgetError, export_catalog
 
 
 # Icon package versions (update as needed)
@@ -114,7 +128,7 @@ def setup_npm_packages(tmp_dir: Path, sources: list[str]) -> Path:
     return tmp_dir / "node_modules"
 
 
-def extract_lucide(registry: IconRegistry, node_modules: Path) -> int:
+def extract_lucide(registry: IconRegistry, node_modules: Path) -> tuple[int, list[ExtractedIcon]]:
     """Extract Lucide icons."""
     print("\n" + "=" * 50)
     print("Extracting Lucide icons...")
@@ -135,10 +149,10 @@ def extract_lucide(registry: IconRegistry, node_modules: Path) -> int:
         len(base_icons),
     )
     inserted, _ = registry.batch_insert(icons)
-    return inserted
+    return inserted, icons
 
 
-def extract_phosphor(registry: IconRegistry, node_modules: Path) -> int:
+def extract_phosphor(registry: IconRegistry, node_modules: Path) -> tuple[int, list[ExtractedIcon]]:
     """Extract Phosphor icons."""
     print("\n" + "=" * 50)
     print("Extracting Phosphor icons...")
@@ -167,10 +181,10 @@ def extract_phosphor(registry: IconRegistry, node_modules: Path) -> int:
     inserted_base, _ = registry.batch_insert(base_icons)
     inserted_variants, _ = registry.batch_insert(variant_icons)
 
-    return inserted_base + inserted_variants
+    return inserted_base + inserted_variants, icons
 
 
-def extract_hugeicons(registry: IconRegistry, node_modules: Path) -> int:
+def extract_hugeicons(registry: IconRegistry, node_modules: Path) -> tuple[int, list[ExtractedIcon]]:
     """Extract HugeIcons icons."""
     print("\n" + "=" * 50)
     print("Extracting HugeIcons icons...")
@@ -182,7 +196,7 @@ def extract_hugeicons(registry: IconRegistry, node_modules: Path) -> int:
 
     if not icons:
         print("⚠ No HugeIcons extracted (package structure may differ)")
-        return 0
+        return 0, []
 
     registry.insert_source(
         "hugeicons",
@@ -192,10 +206,10 @@ def extract_hugeicons(registry: IconRegistry, node_modules: Path) -> int:
         len(icons),
     )
     inserted, _ = registry.batch_insert(icons)
-    return inserted
+    return inserted, icons
 
 
-def extract_heroicons(registry: IconRegistry, node_modules: Path) -> int:
+def extract_heroicons(registry: IconRegistry, node_modules: Path) -> tuple[int, list[ExtractedIcon]]:
     """Extract Heroicons icons."""
     print("\n" + "=" * 50)
     print("Extracting Heroicons icons...")
@@ -215,10 +229,10 @@ def extract_heroicons(registry: IconRegistry, node_modules: Path) -> int:
         len(base_icons),
     )
     inserted, _ = registry.batch_insert(icons)
-    return inserted
+    return inserted, icons
 
 
-def extract_tabler(registry: IconRegistry, node_modules: Path) -> int:
+def extract_tabler(registry: IconRegistry, node_modules: Path) -> tuple[int, list[ExtractedIcon]]:
     """Extract Tabler Icons icons."""
     print("\n" + "=" * 50)
     print("Extracting Tabler Icons icons...")
@@ -236,10 +250,10 @@ def extract_tabler(registry: IconRegistry, node_modules: Path) -> int:
         len(icons),
     )
     inserted, _ = registry.batch_insert(icons)
-    return inserted
+    return inserted, icons
 
 
-def extract_feather(registry: IconRegistry, node_modules: Path) -> int:
+def extract_feather(registry: IconRegistry, node_modules: Path) -> tuple[int, list[ExtractedIcon]]:
     """Extract Feather Icons icons."""
     print("\n" + "=" * 50)
     print("Extracting Feather Icons icons...")
@@ -257,10 +271,10 @@ def extract_feather(registry: IconRegistry, node_modules: Path) -> int:
         len(icons),
     )
     inserted, _ = registry.batch_insert(icons)
-    return inserted
+    return inserted, icons
 
 
-def extract_remix(registry: IconRegistry, node_modules: Path) -> int:
+def extract_remix(registry: IconRegistry, node_modules: Path) -> tuple[int, list[ExtractedIcon]]:
     """Extract Remix Icon icons."""
     print("\n" + "=" * 50)
     print("Extracting Remix Icon icons...")
@@ -278,10 +292,10 @@ def extract_remix(registry: IconRegistry, node_modules: Path) -> int:
         len(icons),
     )
     inserted, _ = registry.batch_insert(icons)
-    return inserted
+    return inserted, icons
 
 
-def extract_simple_icons(registry: IconRegistry, node_modules: Path) -> int:
+def extract_simple_icons(registry: IconRegistry, node_modules: Path) -> tuple[int, list[ExtractedIcon]]:
     """Extract Simple Icons brand logos."""
     print("\n" + "=" * 50)
     print("Extracting Simple Icons (brand logos)...")
@@ -293,7 +307,7 @@ def extract_simple_icons(registry: IconRegistry, node_modules: Path) -> int:
 
     if not icons:
         print("⚠ No Simple Icons extracted")
-        return 0
+        return 0, []
 
     registry.insert_source(
         "simple-icons",
@@ -303,10 +317,10 @@ def extract_simple_icons(registry: IconRegistry, node_modules: Path) -> int:
         len(icons),
     )
     inserted, _ = registry.batch_insert(icons)
-    return inserted
+    return inserted, icons
 
 
-def extract_iconoir(registry: IconRegistry, node_modules: Path) -> int:
+def extract_iconoir(registry: IconRegistry, node_modules: Path) -> tuple[int, list[ExtractedIcon]]:
     """Extract Iconoir icons."""
     print("\n" + "=" * 50)
     print("Extracting Iconoir icons...")
@@ -318,7 +332,7 @@ def extract_iconoir(registry: IconRegistry, node_modules: Path) -> int:
 
     if not icons:
         print("⚠ No Iconoir icons extracted")
-        return 0
+        return 0, []
 
     registry.insert_source(
         "iconoir",
@@ -328,22 +342,91 @@ def extract_iconoir(registry: IconRegistry, node_modules: Path) -> int:
         len(icons),
     )
     inserted, _ = registry.batch_insert(icons)
-    return inserted
-
-
-def run_mapping(turso_url: str, auth_token: str):
-    """Run cross-library mapping."""
+    return inserted, icons
+
+
+def run_mapping(
+    turso_url: str,
+    auth_token: str,
+    extracted: dict[str, list[ExtractedIcon]] | None = None,
+    full: bool = False,
+    use_geometry: bool = False,
+):
+    """Run cross-library mapping and concept clustering.
+
+    Mappings are updated incrementally unless `full` is set, and
+    cross-checked with geometry fingerprints with `use_geometry`. Sources in
+    `extracted` are clustered from the in-memory extraction results; the
+    rest are read from the database.
+    """
     print("\n" + "=" * 50)
     print("Running cross-library mapping...")
     print("=" * 50)
 
     mapper = IconMapper(turso_url, auth_token)
-    mappings = mapper.auto_map(confidence_threshold=80)
-    mapper.save_mappings(mappings)
+    if full:
+        mappings = mapper.auto_map(confidence_threshold=80, use_geometry=use_geometry)
+        mapper.save_mappings(mappings)
+    else:
+        mapper.incremental_map(confidence_threshold=80, use_geometry=use_geometry)
 
     # Export for review
     mapper.export_mappings_json("./mappings.json")
 
+    clusters = mapper.build_clusters(extracted, threshold=80)
+    mapper.save_clusters(clusters)
+
+
+def run_exports(registry: IconRegistry, args: argparse.Namespace, sources: list[str] | None = None):
+    """Write static artifacts requested on the command line."""
+    if args.export_shards:
+        print("\n" + "=" * 50)
+        print("Exporting static JSON shards...")
+        print("=" * 50)
+
+        exporter = ShardExporter(
+            registry,
+            args.export_shards,
+            max_shard_bytes=args.max_shard_bytes,
+            use_brotli=not args.no_brotli,
+        )
+        exporter.export(sources)
+
+    if args.export_sprites:
+        print("\n" + "=" * 50)
+        print("Building SVG sprite sheets...")
+        print("=" * 50)
+
+        builder = SpriteBuilder(
+            registry,
+            args.export_sprites,
+            max_sprite_bytes=args.max_sprite_bytes,
+        )
+        builder.build(sources)
+
+    if args.export_search_index:
+        print("\n" + "=" * 50)
+        print("Building BM25 keyword index...")
+        print("=" * 50)
+
+        # Always the whole catalog: scores depend on corpus-wide statistics
+        manifest = export_search_index(registry.conn, args.export_search_index)
+        print(f"✓ {manifest['count']} icons, {manifest['terms']} terms, "
+              f"{manifest['postings_bytes'] / 1024:.0f} KiB postings in {manifest['build_seconds']:.2f}s")
+
+    if args.export_catalog:
+        print("\n" + "=" * 50)
+        print("Building offline catalog...")
+        print("=" * 50)
+
+        try:
+            header = export_catalog(registry.conn, args.export_catalog, args.max_catalog_bytes)
+        except CatalogBudgetError as e:
+            print(f"✗ {e}")
+            sys.exit(1)
+        print(f"✓ {header['icons']} icons, {header['names']} names, {header['terms']} terms: "
+              f"{header['bytes'] / 1024:.0f} KiB -> {args.export_catalog}")
+
 
 def main():
     parser = argparse.ArgumentParser(description="Extract icons from icon libraries")
@@ -374,11 +457,84 @@ def main():
         action="store_true",
         help="Only run mapping (skip extraction)",
     )
+    parser.add_argument(
+        "--full-map",
+        action="store_true",
+        help="Recompute every mapping instead of only new and changed icons",
+    )
+    parser.add_argument(
+        "--review-queue",
+        action="store_true",
+        help="List mappings that need manual review and exit",
+    )
+    parser.add_argument(
+        "--review",
+        nargs="+",
+        metavar="LUCIDE_ID",
+        help="Mark the mappings of these Lucide icons as human-reviewed and exit; mapping runs keep them as they are",
+    )
+    parser.add_argument(
+        "--geometry",
+        action="store_true",
+        help="Use geometry fingerprints as an extra mapping signal",
+    )
     parser.add_argument(
         "--clear",
         metavar="SOURCE",
         help="Clear existing icons for a source before extracting",
     )
+    parser.add_argument(
+        "--export-shards",
+        metavar="DIR",
+        type=Path,
+        help="Write static JSON shards (per source and category) to DIR",
+    )
+    parser.add_argument(
+        "--max-shard-bytes",
+        type=int,
+        default=ShardExporter.DEFAULT_MAX_SHARD_BYTES,
+        help="Uncompressed size budget per shard (default: 512 KiB)",
+    )
+    parser.add_argument(
+        "--no-brotli",
+        action="store_true",
+        help="Skip .br shard siblings even if brotli is installed",
+    )
+    parser.add_argument(
+        "--export-sprites",
+        metavar="DIR",
+        type=Path,
+        help="Write <symbol> sprite sheets (per source and category) to DIR",
+    )
+    parser.add_argument(
+        "--max-sprite-bytes",
+        type=int,
+        default=SpriteBuilder.DEFAULT_MAX_SPRITE_BYTES,
+        help="Size budget per sprite sheet before it is split (default: 256 KiB)",
+    )
+    parser.add_argument(
+        "--export-search-index",
+        metavar="DIR",
+        type=Path,
+        help="Write the BM25 keyword index (see bm25_index.py) to DIR",
+    )
+    parser.add_argument(
+        "--export-catalog",
+        metavar="FILE",
+        type=Path,
+        help="Write the CLI's offline catalog (see offline_catalog.py) to FILE",
+    )
+    parser.add_argument(
+        "--max-catalog-bytes",
+        type=int,
+        default=DEFAULT_MAX_CATALOG_BYTES,
+        help="Size budget for --export-catalog; exceeding it fails the export (default: 12 MiB)",
+    )
+    parser.add_argument(
+        "--export-only",
+        action="store_true",
+        help="Only write static exports (skip extraction)",
+    )
     parser.add_argument(
         "--tmp-dir",
         type=Path,
@@ -398,14 +554,32 @@ def main():
         print("Make sure .env.local exists in the project root")
         sys.exit(1)
 
+    if args.review_queue:
+        queue = IconMapper(turso_url, auth_token).get_review_queue()
+        for row in queue:
+            print(f"  {row['confidence']:>3.0f}  {row['lucide_id'] or '-':<32} "
+                  f"{row['phosphor_id'] or '-':<32} {row['hugeicons_id'] or '-'}")
+        print(f"✓ {len(queue)} mappings need review (confirm with --review LUCIDE_ID ...)")
+        return
+
+    if args.review:
+        updated = IconMapper(turso_url, auth_token).mark_reviewed(args.review)
+        print(f"✓ Marked {updated} of {len(args.review)} mappings as reviewed")
+        return
+
     # Handle mapping-only mode
     if args.map_only:
-        run_mapping(turso_url, auth_token)
+        run_mapping(turso_url, auth_token, full=args.full_map, use_geometry=args.geometry)
         return
 
     # Connect to database
     registry = IconRegistry(turso_url, auth_token)
 
+    # Handle export-only mode
+    if args.export_only:
+        run_exports(registry, args)
+        return
+
     # Clear source if requested
     if args.clear:
         registry.clear_source(args.clear)
@@ -430,42 +604,45 @@ def main():
     node_modules = setup_npm_packages(args.tmp_dir, sources)
 
     # Extract each source
+    extractors = {
+        "lucide": extract_lucide,
+        "phosphor": extract_phosphor,
+        "hugeicons": extract_hugeicons,
+        "heroicons": extract_heroicons,
+        "tabler": extract_tabler,
+        "feather": extract_feather,
+        "remix": extract_remix,
+        "simple-icons": extract_simple_icons,
+        "iconoir": extract_iconoir,
+    }
     total_extracted = 0
+    extracted: dict[str, list[ExtractedIcon]] = {}
 
-    if "lucide" in sources:
-        total_extracted += extract_lucide(registry, node_modules)
-
-    if "phosphor" in sources:
-        total_extracted += extract_phosphor(registry, node_modules)
-
-    if "hugeicons" in sources:
-        total_extracted += extract_hugeicons(registry, node_modules)
-
-    if "heroicons" in sources:
-        total_extracted += extract_heroicons(registry, node_modules)
-
-    if "tabler" in sources:
-        total_extracted += extract_tabler(registry, node_modules)
-
-    if "feather" in sources:
-        total_extracted += extract_feather(registry, node_modules)
-
-    if "remix" in sources:
-        total_extracted += extract_remix(registry, node_modules)
-
-    if "simple-icons" in sources:
-        total_extracted += extract_simple_icons(registry, node_modules)
-
-    if "iconoir" in sources:
-        total_extracted += extract_iconoir(registry, node_modules)
+    for source, extract in extractors.items():
+        if source in sources:
+            inserted, icons = extract(registry, node_modules)
+            total_extracted += inserted
+            if icons:
+                extracted[source] = icons
 
     print("\n" + "=" * 50)
     print(f"EXTRACTION COMPLETE: {total_extracted} total icons")
     print("=" * 50)
 
+    # Names, aliases and synonyms -> icon ids, for single-query name resolution
+    sync_name_lookup(registry.conn)
+
+    # Prefix and trigram tables for type-ahead, rescored with recent searches
+    sync_autocomplete(registry.conn)
+
+    # Triggers kept icons_fts in sync row by row; merge the segments that left behind
+    registry.optimize_fts()
+
     # Run mapping if requested
     if args.map:
-        run_mapping(turso_url, auth_token)
+        run_mapping(turso_url, auth_token, extracted, full=args.full_map, use_geometry=args.geometry)
+
+    run_exports(registry, args, sources)
 
     # Print summary
     print("\nDatabase summary:")
@@ -1,7 +1,70 @@
 """Cross-library icon mapping using fuzzy matching."""
 import json
+import numpy as np
 from rapidfuzz import fuzz, process
 import libsql_experimental as libsql
+from clusters import SOURCE_PRIORITY, ClusterBuilder, ConceptCluster
+from fingerprint import HammingIndex, hamming, hex_to_hash
+from extractors import ExtractedIcon
+
+
+# Geometry signal: Hamming distances between 64-bit outline hashes
+GEOMETRY_MATCH_DISTANCE = 10  # Close enough to propose a match on shape alone
+GEOMETRY_MISMATCH_DISTANCE = 20  # Far enough to doubt a name-based match
+
+
+def top_matches(
+    queries: list[str],
+    choices: list[str],
+    score_cutoff: float = 0,
+    top_k: int = 1,
+    chunk_size: int = 1024,
+    scorer=fuzz.ratio,
+) -> list[list[tuple[int, float]]]:
+    """
+    Score every query against every choice with `scorer` (fuzz.ratio by
+    default) and keep the best `top_k` choices per query.
+
+    Returns, per query, a list of (choice_index, score) sorted by score
+    descending; ties go to the earlier choice, like process.extractOne.
+    Scores below `score_cutoff` are dropped. The score matrix is computed
+    by process.cdist on all cores, `chunk_size` query rows at a time so
+    memory stays bounded for large libraries.
+    """
+    if not queries:
+        return []
+    if not choices:
+        return [[] for _ in queries]
+
+    top_k = min(top_k, len(choices))
+    results = []
+    for start in range(0, len(queries), chunk_size):
+        scores = process.cdist(
+            queries[start : start + chunk_size],
+            choices,
+            scorer=scorer,
+            score_cutoff=score_cutoff,
+            dtype=np.float64,
+            workers=-1,
+        )
+
+        if top_k == 1:
+            # argmax returns the first maximum, matching extractOne's tie-break
+            best = scores.argmax(axis=1)[:, None]
+        else:
+            candidates = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+            order = np.lexsort((candidates, -np.take_along_axis(scores, candidates, axis=1)), axis=1)
+            best = np.take_along_axis(candidates, order, axis=1)
+        best_scores = np.take_along_axis(scores, best, axis=1)
+
+        for row_indices, row_scores in zip(best.tolist(), best_scores.tolist()):
+            # cdist zeroes scores under the cutoff; a zero only counts with no cutoff
+            results.append([
+                (index, score)
+                for index, score in zip(row_indices, row_scores)
+                if score >= score_cutoff and (score > 0 or score_cutoff <= 0)
+            ])
+    return results
 
 
 class IconMapper:
@@ -18,10 +81,19 @@ class IconMapper:
         ).fetchall()
         return {row[1]: row[0] for row in result}
 
-    def auto_map(self, confidence_threshold: int = 80):
+    def get_geometry_hashes(self, source_id: str) -> dict[str, int]:
+        """Get stored geometry hashes for a source. Returns {icon_id: hash}."""
+        result = self.conn.execute(
+            "SELECT id, geometry_hash FROM icons WHERE source_id = ? AND geometry_hash IS NOT NULL",
+            (source_id,),
+        ).fetchall()
+        return {row[0]: hex_to_hash(row[1]) for row in result}
+
+    def auto_map(self, confidence_threshold: int = 80, use_geometry: bool = False):
         """
         Automatically map icons across libraries using fuzzy matching.
-        Uses Lucide as the canonical reference.
+        Uses Lucide as the canonical reference, optionally cross-checked
+        with geometry fingerprints.
         """
         print("Starting auto-mapping...")
 
@@ -34,11 +106,79 @@ class IconMapper:
         print(f"  Phosphor: {len(phosphor_icons)} icons")
         print(f"  HugeIcons: {len(hugeicons_icons)} icons")
 
+        mappings = self.map_names(lucide_icons, phosphor_icons, hugeicons_icons, confidence_threshold)
+        if use_geometry:
+            self.apply_geometry_signal(mappings)
+        return mappings
+
+    def apply_geometry_signal(
+        self,
+        mappings: list[dict],
+        max_distance: int = GEOMETRY_MATCH_DISTANCE,
+        mismatch_distance: int = GEOMETRY_MISMATCH_DISTANCE,
+    ) -> dict:
+        """
+        Cross-check name-based mappings against geometry fingerprints, in place.
+
+        - Name matches whose outlines are far apart (e.g. a-arrow-down vs
+          arrow-down) are flagged for review.
+        - Lucide icons without a name match in a library take the closest
+          outline within `max_distance`, flagged for review.
+
+        Icons without a stored geometry hash are left as they are.
+        """
+        lucide_hashes = self.get_geometry_hashes("lucide")
+        flagged = 0
+        added = 0
+
+        for column, source_id in (("phosphor_id", "phosphor"), ("hugeicons_id", "hugeicons")):
+            target_hashes = self.get_geometry_hashes(source_id)
+            target_ids = list(target_hashes)
+            index = HammingIndex([target_hashes[i] for i in target_ids])
+
+            for mapping in mappings:
+                lucide_hash = lucide_hashes.get(mapping["lucide_id"])
+                if lucide_hash is None:
+                    continue
+
+                target_id = mapping[column]
+                if target_id:
+                    target_hash = target_hashes.get(target_id)
+                    if target_hash is not None and hamming(lucide_hash, target_hash) > mismatch_distance:
+                        mapping["needs_review"] = True
+                        flagged += 1
+                    continue
+
+                matches = index.query(lucide_hash, max_distance)
+                if matches:
+                    position, distance = matches[0]
+                    mapping[column] = target_ids[position]
+                    # mappings.confidence is an integer 0-100
+                    mapping["confidence"] = min(mapping["confidence"], round(100 * (1 - distance / 64)))
+                    mapping["needs_review"] = True
+                    added += 1
+
+        print(f"  Geometry signal: {flagged} name matches flagged, {added} shape-only matches added")
+        return {"flagged": flagged, "added": added}
+
+    @staticmethod
+    def map_names(
+        lucide_icons: dict[str, str],
+        phosphor_icons: dict[str, str],
+        hugeicons_icons: dict[str, str],
+        confidence_threshold: int = 80,
+    ) -> list[dict]:
+        """Map each Lucide name to its best Phosphor and HugeIcons match."""
+        lucide_names = list(lucide_icons.keys())
         phosphor_names = list(phosphor_icons.keys())
         hugeicons_names = list(hugeicons_icons.keys())
 
+        # Best match per Lucide name, scored as one matrix per library
+        phosphor_matches = top_matches(lucide_names, phosphor_names, score_cutoff=confidence_threshold)
+        huge_matches = top_matches(lucide_names, hugeicons_names, score_cutoff=confidence_threshold)
+
         mappings = []
-        for lucide_name, lucide_id in lucide_icons.items():
+        for row, (lucide_name, lucide_id) in enumerate(lucide_icons.items()):
             mapping = {
                 "canonical_name": lucide_name,
                 "lucide_id": lucide_id,
@@ -48,43 +188,161 @@ class IconMapper:
                 "needs_review": False,
             }
 
-            # Find best Phosphor match
-            if phosphor_names:
-                phosphor_match = process.extractOne(
-                    lucide_name, phosphor_names, scorer=fuzz.ratio
-                )
-                if phosphor_match and phosphor_match[1] >= confidence_threshold:
-                    mapping["phosphor_id"] = phosphor_icons[phosphor_match[0]]
-                    mapping["confidence"] = min(mapping["confidence"], phosphor_match[1])
-                    if phosphor_match[1] < 90:
-                        mapping["needs_review"] = True
+            # Best Phosphor match
+            if phosphor_matches[row]:
+                index, score = phosphor_matches[row][0]
+                mapping["phosphor_id"] = phosphor_icons[phosphor_names[index]]
+                mapping["confidence"] = min(mapping["confidence"], score)
+                if score < 90:
+                    mapping["needs_review"] = True
 
-            # Find best HugeIcons match
-            if hugeicons_names:
-                huge_match = process.extractOne(
-                    lucide_name, hugeicons_names, scorer=fuzz.ratio
-                )
-                if huge_match and huge_match[1] >= confidence_threshold:
-                    mapping["hugeicons_id"] = hugeicons_icons[huge_match[0]]
-                    mapping["confidence"] = min(mapping["confidence"], huge_match[1])
-                    if huge_match[1] < 90:
-                        mapping["needs_review"] = True
+            # Best HugeIcons match
+            if huge_matches[row]:
+                index, score = huge_matches[row][0]
+                mapping["hugeicons_id"] = hugeicons_icons[hugeicons_names[index]]
+                mapping["confidence"] = min(mapping["confidence"], score)
+                if score < 90:
+                    mapping["needs_review"] = True
 
             mappings.append(mapping)
 
         return mappings
 
-    def save_mappings(self, mappings: list[dict]):
-        """Save mappings to database."""
-        # Clear existing mappings
-        self.conn.execute("DELETE FROM mappings")
+    def incremental_map(self, confidence_threshold: int = 80, use_geometry: bool = False) -> dict:
+        """
+        Update mappings for icons added or removed since the last mapping run.
+
+        Icons the mapper has seen carry the generation that first saw them
+        (icons.mapped_generation). Only these Lucide rows are recomputed:
+        - new Lucide icons
+        - rows that point at a removed Phosphor/HugeIcons icon
+        - rows with a new Phosphor/HugeIcons candidate at or above the threshold
+        - with `use_geometry`, rows whose outline is close to a new icon's
+
+        Candidates are still scored against the full target libraries, so
+        a recomputed row matches what a full auto_map would produce. Rows
+        marked as reviewed are never overwritten or deleted; when one of
+        their icons is removed, that id is cleared and the row flagged for
+        review.
+        """
+        print("Starting incremental mapping...")
 
-        for m in mappings:
-            self.conn.execute(
+        generation = (self.conn.execute("SELECT MAX(generation) FROM mappings").fetchone()[0] or 0) + 1
+        lucide_icons = self.get_icons_by_source("lucide")
+        phosphor_icons = self.get_icons_by_source("phosphor")
+        hugeicons_icons = self.get_icons_by_source("hugeicons")
+        new_ids = {
+            row[0]
+            for row in self.conn.execute(
                 """
-                INSERT INTO mappings (canonical_name, lucide_id, phosphor_id, hugeicons_id, confidence, needs_review)
-                VALUES (?, ?, ?, ?, ?, ?)
-                """,
+                SELECT id FROM icons
+                WHERE source_id IN ('lucide', 'phosphor', 'hugeicons') AND mapped_generation IS NULL
+                """
+            ).fetchall()
+        }
+
+        existing = {
+            row[0]: {"phosphor_id": row[1], "hugeicons_id": row[2], "reviewed": bool(row[3])}
+            for row in self.conn.execute(
+                "SELECT lucide_id, phosphor_id, hugeicons_id, reviewed FROM mappings WHERE lucide_id IS NOT NULL"
+            ).fetchall()
+        }
+
+        current_ids = set(lucide_icons.values()) | set(phosphor_icons.values()) | set(hugeicons_icons.values())
+        affected = {
+            lucide_id
+            for lucide_id, row in existing.items()
+            if (row["phosphor_id"] and row["phosphor_id"] not in current_ids)
+            or (row["hugeicons_id"] and row["hugeicons_id"] not in current_ids)
+        }
+        affected.update(lucide_id for lucide_id in lucide_icons.values() if lucide_id not in existing)
+
+        # Rows a new target icon could take over: any score at or above the threshold
+        lucide_names = list(lucide_icons.keys())
+        for target_icons in (phosphor_icons, hugeicons_icons):
+            new_names = [name for name, icon_id in target_icons.items() if icon_id in new_ids]
+            for name, matches in zip(lucide_names, top_matches(lucide_names, new_names, confidence_threshold)):
+                if matches:
+                    affected.add(lucide_icons[name])
+
+        if use_geometry:
+            lucide_hashes = self.get_geometry_hashes("lucide")
+            for source_id in ("phosphor", "hugeicons"):
+                new_hashes = [h for icon_id, h in self.get_geometry_hashes(source_id).items() if icon_id in new_ids]
+                index = HammingIndex(new_hashes)
+                affected.update(
+                    lucide_id
+                    for lucide_id, lucide_hash in lucide_hashes.items()
+                    if index.query(lucide_hash, GEOMETRY_MATCH_DISTANCE)
+                )
+
+        removed = [lucide_id for lucide_id in existing if lucide_id not in current_ids]
+        reviewed = {lucide_id for lucide_id, row in existing.items() if row["reviewed"]}
+        recompute = {name: icon_id for name, icon_id in lucide_icons.items() if icon_id in affected - reviewed}
+
+        print(f"  Lucide: {len(lucide_icons)} icons ({len(recompute)} to remap)")
+        print(f"  New icons since last run: {len(new_ids)}")
+
+        mappings = self.map_names(recompute, phosphor_icons, hugeicons_icons, confidence_threshold)
+        if use_geometry:
+            self.apply_geometry_signal(mappings)
+        self.upsert_mappings(mappings, generation)
+
+        # Reviewed rows stay, but can't keep pointing at icons that no longer exist
+        for column in ("phosphor_id", "hugeicons_id"):
+            stale = [
+                (lucide_id,)
+                for lucide_id in reviewed
+                if existing[lucide_id][column] and existing[lucide_id][column] not in current_ids
+            ]
+            if stale:
+                self.conn.executemany(
+                    f"UPDATE mappings SET {column} = NULL, needs_review = 1 WHERE lucide_id = ?", stale
+                )
+        deleted = [(lucide_id,) for lucide_id in removed if lucide_id not in reviewed]
+        orphaned = [(lucide_id,) for lucide_id in removed if lucide_id in reviewed]
+        if deleted:
+            self.conn.executemany("DELETE FROM mappings WHERE lucide_id = ?", deleted)
+        if orphaned:
+            self.conn.executemany(
+                "UPDATE mappings SET lucide_id = NULL, needs_review = 1 WHERE lucide_id = ?", orphaned
+            )
+
+        self.conn.execute(
+            """
+            UPDATE icons SET mapped_generation = ?
+            WHERE source_id IN ('lucide', 'phosphor', 'hugeicons') AND mapped_generation IS NULL
+            """,
+            (generation,),
+        )
+        self.conn.commit()
+
+        stats = {
+            "generation": generation,
+            "remapped": len(mappings),
+            "removed": len(deleted),
+            "reviewed_kept": len(reviewed & (affected | set(removed))),
+        }
+        print(f"✓ Mapping generation {generation}: {stats['remapped']} remapped, "
+              f"{stats['removed']} removed, {stats['reviewed_kept']} reviewed rows kept")
+        return stats
+
+    def upsert_mappings(self, mappings: list[dict], generation: int):
+        """Insert or update mapping rows in bulk, leaving reviewed rows alone."""
+        self.conn.executemany(
+            """
+            INSERT INTO mappings (canonical_name, lucide_id, phosphor_id, hugeicons_id, confidence, needs_review, generation)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(lucide_id) DO UPDATE SET
+                canonical_name = excluded.canonical_name,
+                phosphor_id = excluded.phosphor_id,
+                hugeicons_id = excluded.hugeicons_id,
+                confidence = excluded.confidence,
+                needs_review = excluded.needs_review,
+                generation = excluded.generation
+            WHERE mappings.reviewed = 0
+            """,
+            [
                 (
                     m["canonical_name"],
                     m["lucide_id"],
@@ -92,9 +350,32 @@ class IconMapper:
                     m["hugeicons_id"],
                     m["confidence"],
                     1 if m["needs_review"] else 0,
-                ),
-            )
+                    generation,
+                )
+                for m in mappings
+            ],
+        )
+
+    def save_mappings(self, mappings: list[dict]):
+        """Save a full set of mappings, keeping rows marked as reviewed."""
+        generation = (self.conn.execute("SELECT MAX(generation) FROM mappings").fetchone()[0] or 0) + 1
+        lucide_ids = {m["lucide_id"] for m in mappings}
 
+        # Drop rows for icons that are gone, but never human-reviewed rows
+        stale = [
+            (row[0],)
+            for row in self.conn.execute("SELECT id, lucide_id FROM mappings WHERE reviewed = 0").fetchall()
+            if row[1] not in lucide_ids
+        ]
+        self.conn.executemany("DELETE FROM mappings WHERE id = ?", stale)
+        self.upsert_mappings(mappings, generation)
+        self.conn.execute(
+            """
+            UPDATE icons SET mapped_generation = ?
+            WHERE source_id IN ('lucide', 'phosphor', 'hugeicons') AND mapped_generation IS NULL
+            """,
+            (generation,),
+        )
         self.conn.commit()
         print(f"✓ Saved {len(mappings)} mappings")
 
@@ -107,6 +388,67 @@ class IconMapper:
         print(f"  HugeIcons matches: {with_hugeicons}")
         print(f"  Needs review: {needs_review}")
 
+    def build_clusters(
+        self,
+        extracted: dict[str, list[ExtractedIcon]] | None = None,
+        threshold: int = 80,
+    ) -> list[ConceptCluster]:
+        """
+        Cluster equivalent icons across every library.
+
+        Freshly extracted icons are used as-is; libraries that weren't part
+        of this run are read from the database.
+        """
+        print("Building concept clusters...")
+
+        icons_by_source = {
+            source_id: ClusterBuilder.names_from_extracted(icons)
+            for source_id, icons in (extracted or {}).items()
+        }
+        stored_sources = [row[0] for row in self.conn.execute("SELECT id FROM sources").fetchall()]
+        for source_id in SOURCE_PRIORITY + sorted(stored_sources):
+            if source_id not in icons_by_source:
+                icons_by_source[source_id] = self.get_icons_by_source(source_id)
+
+        for source_id, names in icons_by_source.items():
+            if names:
+                print(f"  {source_id}: {len(names)} icons")
+
+        return ClusterBuilder(threshold).build({k: v for k, v in icons_by_source.items() if v})
+
+    def save_clusters(self, clusters: list[ConceptCluster]):
+        """Replace the concept cluster tables with freshly built clusters."""
+        self.conn.execute("DELETE FROM concept_cluster_members")
+        self.conn.execute("DELETE FROM concept_clusters")
+
+        self.conn.executemany(
+            """
+            INSERT INTO concept_clusters (id, canonical_name, canonical_icon_id, size, source_count, confidence)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (cluster_id, c.canonical_name, c.canonical_icon_id, len(c.members), c.source_count, c.confidence)
+                for cluster_id, c in enumerate(clusters, start=1)
+            ],
+        )
+        self.conn.executemany(
+            """
+            INSERT INTO concept_cluster_members (cluster_id, icon_id, source_id, score)
+            VALUES (?, ?, ?, ?)
+            """,
+            [
+                (cluster_id, icon_id, source_id, score)
+                for cluster_id, c in enumerate(clusters, start=1)
+                for icon_id, source_id, score in c.members
+            ],
+        )
+        self.conn.commit()
+
+        members = sum(len(c.members) for c in clusters)
+        full = sum(1 for c in clusters if c.source_count == len(SOURCE_PRIORITY))
+        print(f"✓ Saved {len(clusters)} concept clusters ({members} icons)")
+        print(f"  In all {len(SOURCE_PRIORITY)} libraries: {full}")
+
     def get_review_queue(self) -> list[dict]:
         """Get mappings that need manual review."""
         result = self.conn.execute(
@@ -129,6 +471,20 @@ class IconMapper:
             for row in result
         ]
 
+    def mark_reviewed(self, lucide_ids: list[str]) -> int:
+        """
+        Confirm mappings as a human: mark them reviewed, clearing needs_review.
+        Mapping runs never overwrite or delete reviewed rows. Returns the rows updated.
+        """
+        updated = 0
+        for lucide_id in lucide_ids:
+            cursor = self.conn.execute(
+                "UPDATE mappings SET reviewed = 1, needs_review = 0 WHERE lucide_id = ?", (lucide_id,)
+            )
+            updated += cursor.rowcount
+        self.conn.commit()
+        return updated
+
     def export_mappings_json(self, filepath: str):
         """Export mappings to JSON for inspection."""
         result = self.conn.execute(
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Materialize the name_lookup table.
+
+Every name a client may ask for (normalized name, PascalCase name, name
+without a style suffix, alias from src/lib/icon-aliases.ts and extractor
+synonym) is mapped to icon ids per source with a priority rank, so
+resolving a batch of names is one indexed query instead of per-name
+fallbacks.
+
+Lower ranks win within a source:
+    0       normalized name ('arrow-right')
+    1       PascalCase name ('arrowright' for 'ArrowRight')
+    2-3     name without style suffix ('home' for heroicons 'home-outline')
+    100+    alias target, in alias list order
+    1000+   synonym target, in synonym list order
+
+Usage:
+    python name_lookup.py                         # Sync the table with the icons table
+    python name_lookup.py --resolve cog tick      # Show how names resolve
+    python name_lookup.py --resolve cog --prefer phosphor
+"""
+import os
+import re
+import sys
+import argparse
+from collections import defaultdict
+from pathlib import Path
+from clusters import STYLE_SUFFIXES, match_name
+from extractors import (
+    LucideExtractor,
+    PhosphorExtractor,
+    HugeIconsExtractor,
+    HeroiconsExtractor,
+    TablerExtractor,
+    FeatherExtractor,
+    RemixExtractor,
+    SimpleIconsExtractor,
+    IconoirExtractor,
+)
+
+
+ALIASES_PATH = Path(__file__).parent.parent / "src" / "lib" / "icon-aliases.ts"
+
+RANK_NAME = 0
+RANK_PASCAL = 1
+RANK_STYLE = 2
+RANK_ALIAS = 100
+RANK_SYNONYM = 1000
+
+EXTRACTORS = [
+    LucideExtractor,
+    PhosphorExtractor,
+    HugeIconsExtractor,
+    HeroiconsExtractor,
+    TablerExtractor,
+    FeatherExtractor,
+    RemixExtractor,
+    SimpleIconsExtractor,
+    IconoirExtractor,
+]
+
+ALIAS_ENTRY = re.compile(r"""^\s*["']?([\w-]+)["']?\s*:\s*\[([^\]]*)\]""", re.M)
+QUOTED = re.compile(r"""["']([^"']+)["']""")
+
+
+def lookup_key(name: str) -> str:
+    """Key names are stored and queried under (lowercase, trimmed)."""
+    return name.strip().lower()
+
+
+def load_aliases(path: Path = ALIASES_PATH) -> dict[str, list[str]]:
+    """Parse ICON_ALIASES ({alias: [icon names]}) out of icon-aliases.ts."""
+    if not path.exists():
+        print(f"Warning: {path} not found, skipping aliases")
+        return {}
+
+    source = path.read_text()
+    start = source.find("ICON_ALIASES")
+    end = source.find("\n};", start)
+    if start == -1 or end == -1:
+        print(f"Warning: ICON_ALIASES not found in {path}, skipping aliases")
+        return {}
+
+    aliases = {}
+    for match in ALIAS_ENTRY.finditer(source[start:end]):
+        aliases[lookup_key(match.group(1))] = [lookup_key(name) for name in QUOTED.findall(match.group(2))]
+    return aliases
+
+
+def load_synonyms() -> dict[str, list[str]]:
+    """Invert the extractors' SYNONYMS into {term: [icon names]}, first seen first."""
+    synonyms: dict[str, list[str]] = defaultdict(list)
+    for extractor in EXTRACTORS:
+        for name, terms in extractor.SYNONYMS.items():
+            for term in terms:
+                if name not in synonyms[term]:
+                    synonyms[term].append(name)
+    return dict(synonyms)
+
+
+def build_name_lookup(
+    icons: list[tuple[str, str, str, str]],
+    aliases: dict[str, list[str]],
+    synonyms: dict[str, list[str]],
+) -> dict[tuple[str, str, str], tuple[int, str]]:
+    """
+    Build {(name, source_id, icon_id): (rank, kind)} from (icon_id, source_id, name, normalized_name) rows.
+
+    Only the best rank is kept when one icon is reachable several ways.
+    Alias and synonym targets resolve against normalized names and
+    style-stripped names, so 'checkmark' reaches heroicons 'check-outline'.
+    """
+    rows: dict[tuple[str, str, str], tuple[int, str]] = {}
+
+    def add(name: str, source_id: str, icon_id: str, rank: int, kind: str):
+        key = (name, source_id, icon_id)
+        if key not in rows or rank < rows[key][0]:
+            rows[key] = (rank, kind)
+
+    # Direct names, also the targets aliases and synonyms resolve against
+    targets: dict[str, list[tuple[int, str, str]]] = defaultdict(list)
+    for icon_id, source_id, name, normalized_name in icons:
+        normalized = lookup_key(normalized_name)
+        add(normalized, source_id, icon_id, RANK_NAME, "name")
+        add(lookup_key(name), source_id, icon_id, RANK_PASCAL, "pascal")
+        targets[normalized].append((RANK_NAME, source_id, icon_id))
+
+        stripped = match_name(source_id, normalized)
+        if stripped != normalized:
+            style = next(
+                rank for rank, suffix in enumerate(STYLE_SUFFIXES[source_id]) if normalized == stripped + suffix
+            )
+            add(stripped, source_id, icon_id, RANK_STYLE + style, "style")
+            targets[stripped].append((RANK_STYLE + style, source_id, icon_id))
+
+    for base_rank, kind, expansions in ((RANK_ALIAS, "alias", aliases), (RANK_SYNONYM, "synonym", synonyms)):
+        for name, target_names in expansions.items():
+            for position, target in enumerate(target_names):
+                for target_rank, source_id, icon_id in targets.get(target, ()):
+                    add(name, source_id, icon_id, base_rank + position * 10 + target_rank, kind)
+
+    return rows
+
+
+def sync_name_lookup(conn, aliases_path: Path = ALIASES_PATH) -> int:
+    """
+    Bring name_lookup in line with the icons table.
+
+    Only rows that were added, removed or re-ranked are written, so
+    re-running after an unchanged extraction is a read-only diff.
+    Returns the number of rows in the table.
+    """
+    icons = conn.execute("SELECT id, source_id, name, normalized_name FROM icons").fetchall()
+    wanted = build_name_lookup(icons, load_aliases(aliases_path), load_synonyms())
+
+    stored = {
+        (name, source_id, icon_id): (rank, kind)
+        for name, source_id, icon_id, rank, kind in conn.execute(
+            "SELECT name, source_id, icon_id, rank, kind FROM name_lookup"
+        ).fetchall()
+    }
+
+    removed = [key for key in stored if key not in wanted]
+    changed = [key + value for key, value in wanted.items() if stored.get(key) != value]
+
+    if removed:
+        conn.executemany(
+            "DELETE FROM name_lookup WHERE name = ? AND source_id = ? AND icon_id = ?",
+            removed,
+        )
+    if changed:
+        conn.executemany(
+            """
+            INSERT INTO name_lookup (name, source_id, icon_id, rank, kind)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(name, source_id, icon_id) DO UPDATE SET
+                rank = excluded.rank,
+                kind = excluded.kind
+            """,
+            changed,
+        )
+    conn.commit()
+
+    names = len({name for name, _, _ in wanted})
+    print(f"✓ Name lookup: {len(wanted)} rows for {names} names "
+          f"({len(changed)} written, {len(removed)} removed)")
+    return len(wanted)
+
+
+def resolve_names(conn, names: list[str], preferred_source: str = "lucide") -> dict[str, list[tuple[str, int]]]:
+    """
+    Resolve names the way getIconsByNames does: the best-ranked icon per
+    source, preferred source first. Returns {name: [(icon_id, rank)]}.
+    """
+    keys = [lookup_key(name) for name in names]
+    if not keys:
+        return {}
+
+    placeholders = ", ".join("?" for _ in keys)
+    rows = conn.execute(
+        f"""
+        SELECT l.name, l.icon_id, l.rank
+        FROM name_lookup l
+        WHERE l.name IN ({placeholders})
+          AND l.rank = (
+            SELECT MIN(best.rank) FROM name_lookup best
+            WHERE best.name = l.name AND best.source_id = l.source_id
+          )
+        ORDER BY l.name, CASE WHEN l.source_id = ? THEN 0 ELSE 1 END, l.rank, l.source_id
+        """,
+        (*keys, preferred_source),
+    ).fetchall()
+
+    resolved: dict[str, list[tuple[str, int]]] = {key: [] for key in keys}
+    for name, icon_id, rank in rows:
+        resolved[name].append((icon_id, rank))
+    return resolved
+
+
+def main():
+    import libsql_experimental as libsql
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Materialize the name -> icon lookup table")
+    parser.add_argument("--resolve", nargs="+", metavar="NAME", help="Show how names resolve instead of syncing")
+    parser.add_argument("--prefer", default="lucide", help="Preferred source for --resolve (default: lucide)")
+    parser.add_argument("--aliases", type=Path, default=ALIASES_PATH, help="Path to icon-aliases.ts")
+    args = parser.parse_args()
+
+    load_dotenv(Path(__file__).parent.parent / ".env.local")
+
+    turso_url = os.environ.get("TURSO_DATABASE_URL")
+    auth_token = os.environ.get("TURSO_AUTH_TOKEN")
+
+    if not turso_url or not auth_token:
+        print("Error: TURSO_DATABASE_URL and TURSO_AUTH_TOKEN must be set")
+        sys.exit(1)
+
+    conn = libsql.connect(turso_url, auth_token=auth_token)
+
+    if args.resolve:
+        for name, matches in resolve_names(conn, args.resolve, args.prefer).items():
+            found = ", ".join(f"{icon_id} ({rank})" for icon_id, rank in matches) or "no match"
+            print(f"  {name}: {found}")
+        return
+
+    print("\n" + "=" * 50)
+    print("Syncing name lookup...")
+    print("=" * 50)
+
+    sync_name_lookup(conn, args.aliases)
+
+
+if __name__ == "__main__":
+    main()
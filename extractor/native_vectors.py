@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Manage the typed embedding column and libSQL's native (DiskANN) vector index.
+
+`icons.embedding` starts life as an untyped blob, which libSQL cannot
+index. --migrate retypes it to F32_BLOB(n) in place (new column, copy,
+drop, rename; blobs of another length are cleared so they get
+re-embedded) and builds a libsql_vector_idx index on it, so searches
+can use vector_top_k() instead of scanning every row.
+
+The column stays F32 because related.py, quantize.py and the web app
+read raw F32 blobs; storage is saved in the index instead, through
+compress_neighbors (float8 by default).
+
+Usage:
+    python native_vectors.py --status
+    python native_vectors.py --migrate                 # Dimensions taken from stored embeddings
+    python native_vectors.py --migrate --dims 1536 --metric cosine --compress float8
+    python native_vectors.py --rebuild --compress float1bit --max-neighbors 64
+    python native_vectors.py --verify --queries 200 --k 10
+    python native_vectors.py --migrate --verify --db ../icons.db  # Local libSQL file
+"""
+import os
+import re
+import sys
+import time
+import argparse
+from pathlib import Path
+
+
+INDEX_NAME = "icons_embedding_idx"
+METRICS = ("cosine", "l2")
+COMPRESSIONS = ("float32", "float16", "floatb16", "float8", "float1bit")
+DEFAULT_METRIC = "cosine"
+DEFAULT_COMPRESSION = "float8"
+COPY_BATCH_ROWS = 1000
+DISTANCE_FUNCTIONS = {"cosine": "vector_distance_cos", "l2": "vector_distance_l2"}
+
+
+def column_type(conn, column: str = "embedding") -> str | None:
+    """Declared type of an icons column ('' for untyped, None if absent)."""
+    for row in conn.execute("PRAGMA table_info(icons)").fetchall():
+        if row[1] == column:
+            return row[2]
+    return None
+
+
+def column_dimensions(conn) -> int | None:
+    """n for an F32_BLOB(n) embedding column, None while it is untyped."""
+    match = re.fullmatch(r"F32_BLOB\((\d+)\)", column_type(conn) or "", re.IGNORECASE)
+    return int(match.group(1)) if match else None
+
+
+def index_sql(conn) -> str | None:
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'index' AND name = ?", (INDEX_NAME,)).fetchone()
+    return row[0] if row else None
+
+
+def index_metric(conn) -> str:
+    match = re.search(r"metric=(\w+)", index_sql(conn) or "")
+    return match.group(1) if match else DEFAULT_METRIC
+
+
+def stored_dimensions(conn) -> int | None:
+    """Most common embedding length, in floats."""
+    row = conn.execute(
+        """
+        SELECT length(embedding) / 4 AS dims FROM icons
+        WHERE embedding IS NOT NULL
+        GROUP BY dims ORDER BY COUNT(*) DESC LIMIT 1
+        """
+    ).fetchone()
+    return row[0] if row else None
+
+
+def migrate_column(conn, dimensions: int) -> tuple[int, int]:
+    """
+    Retype icons.embedding to F32_BLOB(dimensions), keeping matching blobs.
+
+    Returns (copied, cleared): embeddings carried over, and embeddings of
+    another length that were dropped (with their compact encodings).
+    """
+    if column_dimensions(conn) == dimensions:
+        return 0, 0
+
+    conn.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
+    if column_type(conn, "embedding_typed") is not None:  # Left over from an interrupted run
+        conn.execute("ALTER TABLE icons DROP COLUMN embedding_typed")
+    conn.execute(f"ALTER TABLE icons ADD COLUMN embedding_typed F32_BLOB({dimensions})")
+    conn.commit()
+
+    blob_bytes = dimensions * 4
+    cleared = conn.execute(
+        """
+        UPDATE icons
+        SET embedding_short = NULL, embedding_int8 = NULL, embedding_binary = NULL
+        WHERE embedding IS NOT NULL AND length(embedding) != ?
+        """,
+        (blob_bytes,),
+    ).rowcount
+
+    max_rowid = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM icons").fetchone()[0]
+    copied = 0
+    for start in range(0, max_rowid + 1, COPY_BATCH_ROWS):
+        copied += conn.execute(
+            """
+            UPDATE icons SET embedding_typed = embedding
+            WHERE rowid >= ? AND rowid < ? AND length(embedding) = ?
+            """,
+            (start, start + COPY_BATCH_ROWS, blob_bytes),
+        ).rowcount
+        conn.commit()
+
+    conn.execute("ALTER TABLE icons DROP COLUMN embedding")
+    conn.execute("ALTER TABLE icons RENAME COLUMN embedding_typed TO embedding")
+    conn.commit()
+    return copied, cleared
+
+
+def create_index(conn, metric: str = DEFAULT_METRIC, compression: str = DEFAULT_COMPRESSION,
+                 max_neighbors: int | None = None) -> float:
+    """(Re)build the DiskANN index over icons.embedding. Returns seconds taken."""
+    if metric not in METRICS:
+        raise ValueError(f"unknown metric {metric!r} (expected one of {', '.join(METRICS)})")
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"unknown compression {compression!r} (expected one of {', '.join(COMPRESSIONS)})")
+    if compression == "float1bit" and metric != "cosine":
+        raise ValueError("float1bit compression requires the cosine metric")
+    if column_dimensions(conn) is None:
+        raise ValueError("icons.embedding is not an F32_BLOB(n) column yet (run with --migrate)")
+
+    options = [f"'metric={metric}'", f"'compress_neighbors={compression}'"]
+    if max_neighbors:
+        options.append(f"'max_neighbors={max_neighbors}'")
+
+    start = time.perf_counter()
+    conn.execute(f"DROP INDEX IF EXISTS {INDEX_NAME}")
+    conn.execute(f"CREATE INDEX {INDEX_NAME} ON icons (libsql_vector_idx(embedding, {', '.join(options)}))")
+    conn.commit()
+    return time.perf_counter() - start
+
+
+def verify(conn, query_count: int = 100, k: int = 10, seed: int = 0) -> dict:
+    """
+    Compare vector_top_k() results with an exact ORDER BY distance scan.
+
+    Queries are embeddings of randomly chosen icons. A result counts as a
+    hit when its exact distance is within the exact k-th best, so ties
+    between identical vectors are not misses.
+    """
+    if index_sql(conn) is None:
+        raise ValueError(f"index {INDEX_NAME} does not exist (run with --migrate or --rebuild)")
+    distance = DISTANCE_FUNCTIONS[index_metric(conn)]
+
+    queries = conn.execute(
+        """
+        SELECT embedding FROM icons
+        WHERE embedding IS NOT NULL
+        ORDER BY (rowid * 2654435761 + ?) % 4294967296
+        LIMIT ?
+        """,
+        (seed, query_count),
+    ).fetchall()
+
+    hits = total = 0
+    index_seconds = exact_seconds = 0.0
+    for (query,) in queries:
+        start = time.perf_counter()
+        exact = conn.execute(
+            f"SELECT {distance}(embedding, ?) AS d FROM icons WHERE embedding IS NOT NULL ORDER BY d LIMIT ?",
+            (query, k),
+        ).fetchall()
+        exact_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = conn.execute(
+            f"""
+            SELECT {distance}(icons.embedding, ?) FROM vector_top_k('{INDEX_NAME}', ?, ?) AS top
+            JOIN icons ON icons.rowid = top.id
+            """,
+            (query, query, k),
+        ).fetchall()
+        index_seconds += time.perf_counter() - start
+
+        kth_best = exact[-1][0] + 1e-6
+        hits += sum(1 for (d,) in found if d <= kth_best)
+        total += len(exact)
+
+    return {
+        "queries": len(queries),
+        "recall": hits / total if total else 0.0,
+        "index_ms": index_seconds * 1000 / max(1, len(queries)),
+        "exact_ms": exact_seconds * 1000 / max(1, len(queries)),
+    }
+
+
+def print_status(conn):
+    embedded = conn.execute("SELECT COUNT(*) FROM icons WHERE embedding IS NOT NULL").fetchone()[0]
+    print(f"  Column:     icons.embedding {column_type(conn) or 'BLOB (untyped)'}")
+    print(f"  Embeddings: {embedded} ({stored_dimensions(conn) or '-'} dimensions)")
+    print(f"  Index:      {index_sql(conn) or 'none'}")
+
+
+def main():
+    import libsql_experimental as libsql
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Manage the native libSQL vector index on icons.embedding")
+    parser.add_argument("--status", action="store_true", help="Show column type and index definition")
+    parser.add_argument("--migrate", action="store_true", help="Retype the column to F32_BLOB(n) and build the index")
+    parser.add_argument("--rebuild", action="store_true", help="Drop and rebuild the index")
+    parser.add_argument("--verify", action="store_true", help="Compare index results with exact search")
+    parser.add_argument("--dims", type=int, help="Column dimensions for --migrate (default: from stored embeddings)")
+    parser.add_argument("--metric", choices=METRICS, default=DEFAULT_METRIC,
+                        help=f"Index distance metric (default: {DEFAULT_METRIC})")
+    parser.add_argument("--compress", choices=COMPRESSIONS, default=DEFAULT_COMPRESSION,
+                        help=f"Neighbour vector compression in the index (default: {DEFAULT_COMPRESSION})")
+    parser.add_argument("--max-neighbors", type=int, help="DiskANN graph degree (default: libSQL's)")
+    parser.add_argument("--queries", type=int, default=100, help="Queries for --verify (default: 100)")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query for --verify (default: 10)")
+    parser.add_argument("--db", type=Path, help="Use a local database file instead of TURSO_DATABASE_URL")
+    args = parser.parse_args()
+
+    if not (args.status or args.migrate or args.rebuild or args.verify):
+        parser.error("nothing to do: pass --status, --migrate, --rebuild and/or --verify")
+
+    if args.db:
+        if not args.db.exists():
+            print(f"Error: {args.db} not found")
+            sys.exit(1)
+        turso_url, auth_token = str(args.db), ""
+    else:
+        load_dotenv(Path(__file__).parent.parent / ".env.local")
+
+        turso_url = os.environ.get("TURSO_DATABASE_URL")
+        auth_token = os.environ.get("TURSO_AUTH_TOKEN")
+
+        if not turso_url or not auth_token:
+            print("Error: TURSO_DATABASE_URL and TURSO_AUTH_TOKEN must be set (or pass --db)")
+            sys.exit(1)
+
+    conn = libsql.connect(turso_url, auth_token=auth_token)
+
+    try:
+        if args.migrate:
+            dimensions = args.dims or stored_dimensions(conn)
+            if not dimensions:
+                print("Error: no stored embeddings to infer dimensions from (pass --dims)")
+                sys.exit(1)
+            copied, cleared = migrate_column(conn, dimensions)
+            print(f"✓ icons.embedding is F32_BLOB({dimensions}): {copied} embeddings copied, {cleared} cleared")
+            if cleared:
+                print(f"  {cleared} embeddings had other dimensions; run embeddings.py to regenerate them")
+
+        if args.migrate or args.rebuild:
+            seconds = create_index(conn, args.metric, args.compress, args.max_neighbors)
+            print(f"✓ Built {INDEX_NAME} ({args.metric}, {args.compress}) in {seconds:.1f}s")
+
+        if args.status:
+            print("\n" + "=" * 50)
+            print("Vector storage")
+            print("=" * 50)
+            print_status(conn)
+
+        if args.verify:
+            result = verify(conn, args.queries, args.k)
+            print("\n" + "=" * 50)
+            print(f"Index vs exact search ({result['queries']} queries, k={args.k})")
+            print("=" * 50)
+            print(f"  Recall@{args.k}: {result['recall']:.3f}")
+            print(f"  Index:  {result['index_ms']:.2f} ms/query")
+            print(f"  Exact:  {result['exact_ms']:.2f} ms/query")
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,575 @@
+#!/usr/bin/env python3
+"""
+Compact offline catalog for the CLI (packages/cli).
+
+One versioned file holding everything the CLI needs to search and fetch
+icons without the hosted API:
+
+    magic "UNICAT\\0\\0", u32 version, u32 header length, header JSON,
+    then the sections the header lists as [offset, length] from the
+    end of the header:
+
+    names.keys      sorted names and aliases (name_lookup keys),
+                    front-coded in blocks of BLOCK_SIZE keys
+    names.blocks    u32 offset of each block in names.keys
+    names.offsets   u32 offset of each name's list in names.lists (+ end)
+    names.lists     per name: varint icon count, then (icon, rank) varints,
+                    best rank first
+    terms.keys      sorted words of names, tags and categories (front-coded)
+    terms.blocks    u32 block offsets
+    terms.offsets   u32 offset of each term's posting in terms.postings (+ end)
+    terms.postings  per term: kind byte, then a bitset over icons (kind 1)
+                    or delta varints of icon indexes (kind 0), whichever
+                    is smaller
+    icons           RECORD_DTYPE records, one per icon in id order
+    strings         "normalized_name\\tname" of each icon (UTF-8)
+    content.dict    preset deflate dictionary (a sample of icon payloads)
+    content         per icon, "tags\\x1econtent" (tags joined by \\x1f) as
+                    a raw deflate stream primed with content.dict
+
+Front coding stores each key as (shared prefix length, suffix) varints
+against the previous key; the first key of a block is stored whole so
+lookups binary-search block heads and scan at most one block.
+
+Compressing each icon separately against a shared dictionary keeps
+fetches to one small inflate (microseconds) at a modest size cost over
+compressing the whole blob at once.
+
+Header JSON carries counts, sources, categories, viewBoxes and stroke
+widths (records index into these), build time and the section table.
+
+Usage:
+    python offline_catalog.py --build                      # Write the catalog
+    python offline_catalog.py --build --max-bytes 8000000  # Size budget
+    python offline_catalog.py --verify                     # Check the file against the database
+    python offline_catalog.py --search "arrow ri" --k 5    # Query the file only
+"""
+import os
+import sys
+import json
+import time
+import zlib
+import struct
+import argparse
+from bisect import bisect_right
+from pathlib import Path
+import numpy as np
+from bm25_index import decode_varints, encode_varints, tokenize
+from name_lookup import build_name_lookup, load_aliases, load_synonyms
+
+
+FORMAT_VERSION = 1
+MAGIC = b"UNICAT\0\0"
+PREAMBLE = struct.Struct("<8sII")
+DEFAULT_CATALOG_PATH = Path(__file__).parent / ".cache" / "catalog.unicat"
+DEFAULT_MAX_BYTES = 12 * 1024 * 1024
+BLOCK_SIZE = 16
+DICTIONARY_BYTES = 16 * 1024
+DICTIONARY_SAMPLES = 400
+NO_CATEGORY = 0xFFFF
+POSTING_LIST, POSTING_BITSET = 0, 1
+FLAG_STROKE, FLAG_FILL = 1, 2
+TAG_SEPARATOR, CONTENT_SEPARATOR = "\x1f", "\x1e"
+
+RECORD_DTYPE = np.dtype([
+    ("string_offset", "<u4"),
+    ("string_length", "<u2"),
+    ("source", "u1"),
+    ("flags", "u1"),
+    ("category", "<u2"),
+    ("view_box", "<u2"),
+    ("stroke_width", "<u2"),
+    ("content_offset", "<u4"),
+    ("content_length", "<u4"),
+])
+
+
+class CatalogBudgetError(ValueError):
+    """The catalog came out larger than its size budget."""
+
+
+def front_code(keys: list[str]) -> tuple[bytes, np.ndarray]:
+    """(front-coded keys, u32 block offsets) for sorted keys."""
+    out = bytearray()
+    blocks = []
+    previous = b""
+    for position, key in enumerate(keys):
+        encoded = key.encode("utf-8")
+        if position % BLOCK_SIZE == 0:
+            blocks.append(len(out))
+            shared = 0
+        else:
+            shared = 0
+            limit = min(len(previous), len(encoded))
+            while shared < limit and previous[shared] == encoded[shared]:
+                shared += 1
+        out += encode_varints([shared, len(encoded) - shared]) + encoded[shared:]
+        previous = encoded
+    return bytes(out), np.array(blocks, dtype="<u4")
+
+
+def read_varint(data: bytes, offset: int) -> tuple[int, int]:
+    """One varint at data[offset]. Returns (value, offset after it)."""
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def build_dictionary(payloads: list[bytes], size: int = DICTIONARY_BYTES) -> bytes:
+    """Evenly spaced payloads (across sources, rows are in id order) up to `size` bytes."""
+    step = max(1, len(payloads) // DICTIONARY_SAMPLES)
+    parts, total = [], 0
+    for payload in payloads[::step]:
+        if total + len(payload) > size:
+            continue
+        parts.append(payload)
+        total += len(payload)
+    return b"".join(parts)
+
+
+def deflate(payload: bytes, dictionary: bytes) -> bytes:
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -15, 9, zlib.Z_DEFAULT_STRATEGY, dictionary)
+    return compressor.compress(payload) + compressor.flush()
+
+
+def inflate(data: bytes, dictionary: bytes) -> bytes:
+    return zlib.decompressobj(-15, dictionary).decompress(data)
+
+
+def encode_posting(icons: np.ndarray, n_icons: int) -> bytes:
+    """Kind byte + bitset or delta varints, whichever is smaller."""
+    deltas = encode_varints(np.diff(icons, prepend=0))
+    bitset_bytes = (n_icons + 7) // 8
+    if bitset_bytes < len(deltas):
+        bits = np.zeros(bitset_bytes * 8, dtype=bool)
+        bits[icons] = True
+        return bytes([POSTING_BITSET]) + np.packbits(bits, bitorder="little").tobytes()
+    return bytes([POSTING_LIST]) + deltas
+
+
+def build_catalog(rows: list[tuple], aliases: dict[str, list[str]], synonyms: dict[str, list[str]]) -> bytes:
+    """
+    Catalog bytes for (id, source_id, name, normalized_name, category, tags,
+    view_box, content, default_stroke, default_fill, stroke_width) rows.
+    """
+    rows = sorted(rows, key=lambda row: row[0])
+    n = len(rows)
+    index_of = {row[0]: position for position, row in enumerate(rows)}
+
+    sources = sorted({row[1] for row in rows})
+    categories = sorted({row[4] for row in rows if row[4]})
+    view_boxes = sorted({row[6] for row in rows})
+    stroke_widths = sorted({row[10] or "" for row in rows})
+    source_index = {value: i for i, value in enumerate(sources)}
+    category_index = {value: i for i, value in enumerate(categories)}
+    view_box_index = {value: i for i, value in enumerate(view_boxes)}
+    stroke_width_index = {value: i for i, value in enumerate(stroke_widths)}
+
+    # Names and aliases -> icons, best rank first
+    lookup = build_name_lookup([(row[0], row[1], row[2], row[3]) for row in rows], aliases, synonyms)
+    by_name: dict[str, list[tuple[int, int]]] = {}
+    for (name, _, icon_id), (rank, _) in lookup.items():
+        by_name.setdefault(name, []).append((rank, index_of[icon_id]))
+    names = sorted(by_name)
+    name_lists = bytearray()
+    name_offsets = []
+    for name in names:
+        name_offsets.append(len(name_lists))
+        entries = sorted(by_name[name])
+        name_lists += encode_varints([len(entries)] + [value for rank, icon in entries for value in (icon, rank)])
+    name_offsets.append(len(name_lists))
+
+    # Words -> icon postings
+    term_icons: dict[str, list[int]] = {}
+    records = np.zeros(n, dtype=RECORD_DTYPE)
+    strings = bytearray()
+    payloads = []
+    for position, row in enumerate(rows):
+        icon_id, source_id, name, normalized_name, category, tags, view_box, content, stroke, fill, stroke_width = row
+        tag_list = json.loads(tags) if tags else []
+        words = set(tokenize(normalized_name) + tokenize(name) + tokenize(category or ""))
+        words.update(token for tag in tag_list for token in tokenize(tag))
+        for word in words:
+            term_icons.setdefault(word, []).append(position)
+
+        label = f"{normalized_name}\t{name}".encode("utf-8")
+        payloads.append((TAG_SEPARATOR.join(tag_list) + CONTENT_SEPARATOR + content).encode("utf-8"))
+        records[position] = (
+            len(strings), len(label), source_index[source_id],
+            (FLAG_STROKE if stroke else 0) | (FLAG_FILL if fill else 0),
+            category_index.get(category, NO_CATEGORY), view_box_index[view_box],
+            stroke_width_index[stroke_width or ""], 0, 0,
+        )
+        strings += label
+
+    dictionary = build_dictionary(payloads)
+    content = bytearray()
+    for position, payload in enumerate(payloads):
+        compressed = deflate(payload, dictionary)
+        records[position]["content_offset"] = len(content)
+        records[position]["content_length"] = len(compressed)
+        content += compressed
+
+    terms = sorted(term_icons)
+    postings = bytearray()
+    term_offsets = []
+    for term in terms:
+        term_offsets.append(len(postings))
+        postings += encode_posting(np.array(term_icons[term], dtype=np.int64), n)
+    term_offsets.append(len(postings))
+
+    name_keys, name_blocks = front_code(names)
+    term_keys, term_blocks = front_code(terms)
+    sections = {
+        "names.keys": name_keys,
+        "names.blocks": name_blocks.tobytes(),
+        "names.offsets": np.array(name_offsets, dtype="<u4").tobytes(),
+        "names.lists": bytes(name_lists),
+        "terms.keys": term_keys,
+        "terms.blocks": term_blocks.tobytes(),
+        "terms.offsets": np.array(term_offsets, dtype="<u4").tobytes(),
+        "terms.postings": bytes(postings),
+        "icons": records.tobytes(),
+        "strings": bytes(strings),
+        "content.dict": dictionary,
+        "content": bytes(content),
+    }
+
+    table = {}
+    offset = 0
+    for section, data in sections.items():
+        table[section] = [offset, len(data)]
+        offset += len(data)
+    header = json.dumps({
+        "version": FORMAT_VERSION,
+        "built_at": int(time.time()),
+        "icons": n,
+        "names": len(names),
+        "terms": len(terms),
+        "block_size": BLOCK_SIZE,
+        "sources": sources,
+        "categories": categories,
+        "view_boxes": view_boxes,
+        "stroke_widths": stroke_widths,
+        "content_bytes": sum(len(payload) for payload in payloads),
+        "sections": table,
+    }, separators=(",", ":")).encode("utf-8")
+    return PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)) + header + b"".join(sections.values())
+
+
+def load_rows(conn) -> list[tuple]:
+    return conn.execute(
+        """
+        SELECT id, source_id, name, normalized_name, category, tags, view_box, content,
+               default_stroke, default_fill, stroke_width
+        FROM icons ORDER BY id
+        """
+    ).fetchall()
+
+
+def export_catalog(conn, path: Path = DEFAULT_CATALOG_PATH, max_bytes: int | None = DEFAULT_MAX_BYTES) -> dict:
+    """
+    Write the catalog for the icons table. Returns the header plus total size.
+
+    Raises CatalogBudgetError (leaving any previous file in place) when the
+    catalog exceeds max_bytes.
+    """
+    data = build_catalog(load_rows(conn), load_aliases(), load_synonyms())
+    header = CatalogReader(data).header
+    if max_bytes and len(data) > max_bytes:
+        breakdown = ", ".join(f"{name} {length / 1024:.0f} KiB" for name, (_, length) in header["sections"].items())
+        raise CatalogBudgetError(f"catalog is {len(data)} bytes, over the {max_bytes} byte budget ({breakdown})")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging = path.with_name(path.name + ".tmp")
+    staging.write_bytes(data)
+    staging.replace(path)
+    return {**header, "bytes": len(data)}
+
+
+class CatalogReader:
+    """Reads a catalog from bytes; the reference for the format."""
+
+    def __init__(self, data: bytes):
+        magic, version, header_length = PREAMBLE.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a Unicon catalog")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"unsupported catalog version {version} (expected {FORMAT_VERSION})")
+        self.header = json.loads(data[PREAMBLE.size : PREAMBLE.size + header_length])
+        base = PREAMBLE.size + header_length
+        view = memoryview(data)
+        self.sections = {
+            name: view[base + offset : base + offset + length]
+            for name, (offset, length) in self.header["sections"].items()
+        }
+        self.n_icons = self.header["icons"]
+        self.records = np.frombuffer(self.sections["icons"], dtype=RECORD_DTYPE)
+        self.dictionary = bytes(self.sections["content.dict"])
+        self.names = self._dictionary("names")
+        self.name_lists = bytes(self.sections["names.lists"])
+        self.terms = self._dictionary("terms")
+
+    @classmethod
+    def open(cls, path: Path) -> "CatalogReader":
+        return cls(path.read_bytes())
+
+    def _dictionary(self, prefix: str) -> dict:
+        keys = bytes(self.sections[f"{prefix}.keys"])
+        blocks = np.frombuffer(self.sections[f"{prefix}.blocks"], dtype="<u4")
+        heads = [self._read_key(keys, int(offset), b"")[0] for offset in blocks]
+        return {
+            "keys": keys,
+            "blocks": blocks,
+            "heads": heads,
+            "offsets": np.frombuffer(self.sections[f"{prefix}.offsets"], dtype="<u4"),
+            "count": len(self.sections[f"{prefix}.offsets"]) // 4 - 1,
+        }
+
+    @staticmethod
+    def _read_key(keys: bytes, offset: int, previous: bytes) -> tuple[bytes, int]:
+        shared, offset = read_varint(keys, offset)
+        length, offset = read_varint(keys, offset)
+        return previous[:shared] + keys[offset : offset + length], offset + length
+
+    def _scan(self, dictionary: dict, prefix: bytes):
+        """Yield (position, key) for keys >= prefix in order, starting at prefix's block."""
+        block = max(0, bisect_right(dictionary["heads"], prefix) - 1)
+        offset = int(dictionary["blocks"][block]) if len(dictionary["blocks"]) else 0
+        key = b""
+        for position in range(block * BLOCK_SIZE, dictionary["count"]):
+            key, offset = self._read_key(dictionary["keys"], offset, key)
+            if key >= prefix:
+                yield position, key
+
+    def find(self, dictionary: dict, key: str) -> int | None:
+        encoded = key.encode("utf-8")
+        for position, found in self._scan(dictionary, encoded):
+            return position if found == encoded else None
+        return None
+
+    def keys_with_prefix(self, dictionary: dict, prefix: str, limit: int = 64) -> list[tuple[int, str]]:
+        encoded = prefix.encode("utf-8")
+        matches = []
+        for position, key in self._scan(dictionary, encoded):
+            if not key.startswith(encoded) or len(matches) == limit:
+                break
+            matches.append((position, key.decode("utf-8")))
+        return matches
+
+    def all_keys(self, dictionary: dict) -> list[str]:
+        keys, offset, key = [], 0, b""
+        for _ in range(dictionary["count"]):
+            key, offset = self._read_key(dictionary["keys"], offset, key)
+            keys.append(key.decode("utf-8"))
+        return keys
+
+    def resolve(self, name: str) -> list[tuple[int, int]]:
+        """(icon index, rank) for a name or alias, best rank first."""
+        position = self.find(self.names, name.strip().lower())
+        if position is None:
+            return []
+        data = self.name_lists
+        count, offset = read_varint(data, int(self.names["offsets"][position]))
+        entries = []
+        for _ in range(count):
+            icon, offset = read_varint(data, offset)
+            rank, offset = read_varint(data, offset)
+            entries.append((icon, rank))
+        return entries
+
+    def posting(self, position: int) -> np.ndarray:
+        """Icon indexes of a term, ascending."""
+        offsets = self.terms["offsets"]
+        data = np.frombuffer(self.sections["terms.postings"], dtype=np.uint8)
+        data = data[int(offsets[position]) : int(offsets[position + 1])]
+        if data[0] == POSTING_BITSET:
+            return np.flatnonzero(np.unpackbits(data[1:], bitorder="little")[: self.n_icons])
+        body = data[1:]
+        count = int((body < 0x80).sum())
+        return np.cumsum(decode_varints(body, count)[0])
+
+    def search(self, query: str, k: int = 20) -> list[int]:
+        """
+        Icons matching every word of the query, the last word as a prefix.
+        Exact name/alias matches come first, then shorter names.
+        """
+        words = tokenize(query)
+        if not words:
+            return []
+        matched: np.ndarray | None = None
+        for i, word in enumerate(words):
+            if i == len(words) - 1:
+                positions = [position for position, _ in self.keys_with_prefix(self.terms, word)]
+            else:
+                position = self.find(self.terms, word)
+                positions = [] if position is None else [position]
+            if not positions:
+                return []
+            icons = np.unique(np.concatenate([self.posting(position) for position in positions]))
+            matched = icons if matched is None else np.intersect1d(matched, icons, assume_unique=True)
+
+        exact = [icon for icon, _ in self.resolve("-".join(words))]
+        rest = np.setdiff1d(matched, exact, assume_unique=True)
+        lengths = self.records["string_length"][rest]
+        if len(rest) > k:
+            rest = rest[np.argpartition(lengths, k)[:k]]
+            lengths = self.records["string_length"][rest]
+        rest = rest[np.lexsort((rest, lengths))]
+        return (exact + rest.tolist())[:k]
+
+    def icon(self, index: int) -> dict:
+        """The CLI's Icon shape for an icon index."""
+        record = self.records[index]
+        start = int(record["string_offset"])
+        normalized_name, name = bytes(self.sections["strings"][start : start + int(record["string_length"])]) \
+            .decode("utf-8").split("\t")
+        tags, content = self._payload(int(record["content_offset"]), int(record["content_length"]))
+        category = int(record["category"])
+        source = self.header["sources"][int(record["source"])]
+        return {
+            "id": f"{source}:{normalized_name}",
+            "name": name,
+            "normalizedName": normalized_name,
+            "sourceId": source,
+            "viewBox": self.header["view_boxes"][int(record["view_box"])],
+            "content": content,
+            "category": None if category == NO_CATEGORY else self.header["categories"][category],
+            "tags": tags.split(TAG_SEPARATOR) if tags else [],
+            "strokeWidth": self.header["stroke_widths"][int(record["stroke_width"])] or None,
+            "defaultStroke": bool(record["flags"] & FLAG_STROKE),
+            "defaultFill": bool(record["flags"] & FLAG_FILL),
+        }
+
+    def _payload(self, offset: int, length: int) -> tuple[str, str]:
+        data = inflate(self.sections["content"][offset : offset + length], self.dictionary)
+        tags, content = data.decode("utf-8").split(CONTENT_SEPARATOR, 1)
+        return tags, content
+
+
+def verify_catalog(reader: CatalogReader, conn) -> list[str]:
+    """Compare every icon, name and term in the catalog with the database. Returns problems found."""
+    problems = []
+    rows = load_rows(conn)
+    if reader.n_icons != len(rows):
+        return [f"catalog has {reader.n_icons} icons, database has {len(rows)}"]
+
+    term_icons: dict[str, set[int]] = {}
+    for index, row in enumerate(rows):
+        icon = reader.icon(index)
+        expected = {
+            "id": row[0], "sourceId": row[1], "name": row[2], "normalizedName": row[3], "category": row[4],
+            "tags": json.loads(row[5]) if row[5] else [], "viewBox": row[6], "content": row[7],
+            "defaultStroke": bool(row[8]), "defaultFill": bool(row[9]), "strokeWidth": row[10] or None,
+        }
+        for field, value in expected.items():
+            if icon[field] != value:
+                problems.append(f"{row[0]}: {field} differs")
+        words = set(tokenize(row[3]) + tokenize(row[2]) + tokenize(row[4] or ""))
+        words.update(token for tag in expected["tags"] for token in tokenize(tag))
+        for word in words:
+            term_icons.setdefault(word, set()).add(index)
+
+    terms = reader.all_keys(reader.terms)
+    if terms != sorted(term_icons):
+        problems.append("term dictionary differs")
+    for position, term in enumerate(terms):
+        if set(reader.posting(position).tolist()) != term_icons.get(term, set()):
+            problems.append(f"posting for {term!r} differs")
+
+    index_of = {row[0]: index for index, row in enumerate(rows)}
+    lookup = build_name_lookup([(row[0], row[1], row[2], row[3]) for row in rows], load_aliases(), load_synonyms())
+    expected_names: dict[str, set[tuple[int, int]]] = {}
+    for (name, _, icon_id), (rank, _) in lookup.items():
+        expected_names.setdefault(name, set()).add((index_of[icon_id], rank))
+    names = reader.all_keys(reader.names)
+    if names != sorted(expected_names):
+        problems.append("name dictionary differs")
+    for name in names:
+        if set(reader.resolve(name)) != expected_names.get(name, set()):
+            problems.append(f"name {name!r} resolves differently")
+    return problems
+
+
+def print_sizes(header: dict, total: int):
+    print(f"  {header['icons']} icons, {header['names']} names, {header['terms']} terms: {total / 1024:.0f} KiB "
+          f"({header['content_bytes'] / 1024:.0f} KiB content before compression)")
+    for name, (_, length) in header["sections"].items():
+        print(f"    {name:<16} {length / 1024:>8.1f} KiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and check the CLI's offline icon catalog")
+    parser.add_argument("--build", action="store_true", help="Write the catalog from the database")
+    parser.add_argument("--verify", action="store_true", help="Check the catalog against the database")
+    parser.add_argument("--search", help="Search the catalog file (no database needed)")
+    parser.add_argument("--k", type=int, default=10, help="Results for --search (default: 10)")
+    parser.add_argument("--output", type=Path, default=DEFAULT_CATALOG_PATH,
+                        help="Catalog file (default: extractor/.cache/catalog.unicat)")
+    parser.add_argument("--max-bytes", type=int, default=DEFAULT_MAX_BYTES,
+                        help=f"Size budget; the build fails above it (default: {DEFAULT_MAX_BYTES}, 0 = none)")
+    args = parser.parse_args()
+
+    if not (args.build or args.verify or args.search):
+        parser.error("nothing to do: pass --build, --verify and/or --search")
+
+    conn = None
+    if args.build or args.verify:
+        import libsql_experimental as libsql
+        from dotenv import load_dotenv
+
+        load_dotenv(Path(__file__).parent.parent / ".env.local")
+
+        turso_url = os.environ.get("TURSO_DATABASE_URL")
+        auth_token = os.environ.get("TURSO_AUTH_TOKEN")
+
+        if not turso_url or not auth_token:
+            print("Error: TURSO_DATABASE_URL and TURSO_AUTH_TOKEN must be set")
+            sys.exit(1)
+
+        conn = libsql.connect(turso_url, auth_token=auth_token)
+
+    if args.build:
+        start = time.perf_counter()
+        try:
+            header = export_catalog(conn, args.output, args.max_bytes)
+        except CatalogBudgetError as e:
+            print(f"✗ {e}")
+            sys.exit(1)
+        print(f"✓ Wrote {args.output} (format v{FORMAT_VERSION}) in {time.perf_counter() - start:.2f}s")
+        print_sizes(header, header["bytes"])
+
+    if not args.output.exists():
+        print(f"Error: {args.output} not found (run with --build)")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    reader = CatalogReader.open(args.output)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    if args.verify:
+        problems = verify_catalog(reader, conn)
+        for problem in problems[:20]:
+            print(f"  ✗ {problem}")
+        if problems:
+            print(f"✗ {len(problems)} problems in {args.output}")
+            sys.exit(1)
+        print(f"✓ {args.output} matches the database ({reader.n_icons} icons)")
+
+    if args.search:
+        start = time.perf_counter()
+        found = reader.search(args.search, args.k)
+        icons = [reader.icon(index) for index in found]
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        for icon in icons:
+            print(f"  {icon['id']}")
+        print(f"  ({len(icons)} results in {elapsed_us:.0f} µs, catalog loaded in {load_ms:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+Materialize search results for the hottest queries from search_analytics.
+
+For every source filter seen in the window (all sources is ''), the job
+picks the highest-volume queries and the slowest cache-missing ones
+(from the analytics_rollup.py summaries), runs each offline the way
+GET /api/icons does and stores the ranked icon ids in
+precomputed_results, keyed by (normalized query, filter). The route
+serves those queries from one primary-key read.
+
+    3+ characters   nearest icons to the query embedding (DiskANN index
+                    when present, exact scan otherwise), no AI expansion;
+                    the route skips these rows while ANTHROPIC_API_KEY is
+                    set, since the live search then embeds the expansion
+    shorter         LIKE over names and tags with alias expansion,
+                    ordered by name, as searchIcons does
+
+Refreshes are incremental: a row is re-executed only when it is new or
+the corpus behind its filter changed (embedding model, source manifest
+hashes, embedded icon counts). Queries that drop out of the list are
+removed. The warm list (src/lib/warm-queries.json), read by
+scripts/warm-cache.ts and /api/admin/warm-cache, is regenerated from the
+same selection, hottest first. Until the job first finds enough
+searches, that file holds the former hard-coded list (reason 'seed').
+
+Queries must be embedded with the model that produced icons.embedding,
+so pass the same --provider as embeddings.py.
+
+Usage:
+    python precompute_results.py                       # Incremental refresh
+    python precompute_results.py --provider local --local-model ./model.npz --db icons.db
+    python precompute_results.py --full --days 14 --top 200
+    python precompute_results.py --show                # Print the current selection
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+from analytics_rollup import query_stats
+from embedding_providers import DEFAULT_LOCAL_MODEL_PATH, EmbeddingProvider, LocalProvider, OpenAIProvider
+from name_lookup import load_aliases
+from native_vectors import DISTANCE_FUNCTIONS, INDEX_NAME, index_metric, index_sql
+
+
+WARM_LIST_PATH = Path(__file__).parent.parent / "src" / "lib" / "warm-queries.json"
+
+WINDOW_DAYS = 30
+TOP_QUERIES = 100  # Highest-volume queries per source filter
+SLOWEST_QUERIES = 25  # Slowest cache-missing queries per source filter
+MIN_SEARCHES = 3  # Fewer searches than this are too rare to precompute
+RESULT_DEPTH = 100  # Ranked ids stored per query; the minimum (PRECOMPUTED_RESULT_DEPTH in src/lib/queries.ts)
+SEMANTIC_MIN_LENGTH = 3  # Shorter queries take the route's text search
+MAX_INDEX_CANDIDATES = 2000  # Must match vector-search.ts
+
+
+@dataclass
+class HotQuery:
+    query: str  # analytics_rollup.query_key
+    source_filter: str  # '' for all sources
+    searches: int
+    avg_miss_ms: float | None  # Mean response time of cache misses
+    reason: str  # 'volume' | 'slow' | 'volume+slow'
+
+
+def mine_queries(conn, days: int = WINDOW_DAYS, top: int = TOP_QUERIES, slowest: int = SLOWEST_QUERIES,
+                 min_searches: int = MIN_SEARCHES) -> list[HotQuery]:
+    """Highest-volume and slowest queries per source filter, hottest first."""
+    since = int((time.time() - days * 86400) * 1000)  # search_analytics.timestamp is in ms
+    stats = query_stats(conn, since)
+
+    by_filter: dict[str, list[tuple[str, int, float | None]]] = {}
+    for (query, source_filter), (_, searches, _, misses, miss_ms) in stats.items():
+        if searches >= min_searches:
+            by_filter.setdefault(source_filter, []).append((query, searches, miss_ms / misses if misses else None))
+
+    hot = []
+    for source_filter, candidates in by_filter.items():
+        by_volume = sorted(candidates, key=lambda c: (-c[1], c[0]))[:top]
+        by_latency = sorted((c for c in candidates if c[2] is not None), key=lambda c: (-c[2], c[0]))[:slowest]
+        reasons: dict[str, list[str]] = {}
+        for label, picked in (("volume", by_volume), ("slow", by_latency)):
+            for query, _, _ in picked:
+                reasons.setdefault(query, []).append(label)
+        for query, searches, avg_miss_ms in candidates:
+            if query in reasons:
+                hot.append(HotQuery(query, source_filter, searches, avg_miss_ms, "+".join(reasons[query])))
+
+    hot.sort(key=lambda h: (-h.searches, h.source_filter, h.query))
+    return hot
+
+
+def corpus_versions(conn, model: str) -> dict[str, str]:
+    """
+    {source filter: version} over what a query's results depend on: the
+    embedding model, each source's manifest hash and embedded icon count.
+    '' (all sources) covers every source.
+    """
+    parts = {
+        source_id: f"{source_id}:{manifest_hash or ''}:{embedded}:{total}"
+        for source_id, manifest_hash, embedded, total in conn.execute(
+            """
+            SELECT s.id, s.manifest_hash, COUNT(i.embedding), COUNT(i.id)
+            FROM sources s LEFT JOIN icons i ON i.source_id = s.id
+            GROUP BY s.id
+            ORDER BY s.id
+            """
+        ).fetchall()
+    }
+
+    def version(*keys: str) -> str:
+        payload = "\n".join([model, *(parts[key] for key in keys)])
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+    versions = {source_id: version(source_id) for source_id in parts}
+    versions[""] = version(*parts)
+    return versions
+
+
+def semantic_ids(conn, vector: list[float], source_filter: str, depth: int, index_distance: str | None) -> list[str]:
+    """Nearest icon ids, as nearestIcons in src/lib/vector-search.ts computes them.
+
+    `index_distance` is the distance function matching the vector index's
+    metric, or None without an index. Source-filtered queries always scan,
+    since the index's global top k can hold too few icons from a small library.
+    """
+    vector_string = json.dumps([float(value) for value in vector])
+    if index_distance and not source_filter:
+        rows = conn.execute(
+            f"""
+            SELECT i.id FROM vector_top_k('{INDEX_NAME}', vector32(?), ?) AS top
+            JOIN icons i ON i.rowid = top.id
+            ORDER BY {index_distance}(i.embedding, vector32(?)) ASC
+            LIMIT ?
+            """,
+            (vector_string, min(depth, MAX_INDEX_CANDIDATES), vector_string, depth),
+        ).fetchall()
+    else:
+        rows = conn.execute(
+            """
+            SELECT id FROM icons
+            WHERE embedding IS NOT NULL AND (? = '' OR source_id = ?)
+            ORDER BY vector_distance_cos(embedding, vector32(?)) ASC
+            LIMIT ?
+            """,
+            (source_filter, source_filter, vector_string, depth),
+        ).fetchall()
+    return [row[0] for row in rows]
+
+
+def expand_query(query: str, aliases: dict[str, list[str]]) -> list[str]:
+    """expandSearchQuery in src/lib/icon-aliases.ts."""
+    terms = [query]
+    for term in aliases.get(query, []):
+        if term not in terms:
+            terms.append(term)
+    for key, values in aliases.items():
+        if query in values:
+            for term in [key, *values]:
+                if term not in terms:
+                    terms.append(term)
+    return terms
+
+
+def text_ids(conn, query: str, source_filter: str, depth: int, aliases: dict[str, list[str]]) -> list[str]:
+    """Ids searchIcons in src/lib/queries.ts returns: LIKE on names and tags, ordered by name."""
+    terms = expand_query(query, aliases)
+    matches = " OR ".join(
+        "lower(normalized_name) LIKE ? OR lower(name) LIKE ? OR lower(tags) LIKE ?" for _ in terms
+    )
+    patterns = [f"%{term}%" for term in terms for _ in range(3)]
+    rows = conn.execute(
+        f"""
+        SELECT id FROM icons
+        WHERE (? = '' OR source_id = ?) AND ({matches})
+        ORDER BY normalized_name ASC
+        LIMIT ?
+        """,
+        (source_filter, source_filter, *patterns, depth),
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+def embed_queries(provider: EmbeddingProvider, queries: list[str]) -> dict[str, list[float]]:
+    """Query embeddings; queries whose batch failed are left out (they fall back to text search)."""
+    vectors = {}
+    for result in provider.embed_all(queries):
+        if result.error is not None:
+            print(f"  Warning: embedding {len(result.indices)} queries failed: {result.error}")
+            continue
+        for index, vector in zip(result.indices, result.embeddings):
+            vectors[queries[index]] = vector
+    return vectors
+
+
+def refresh(conn, provider: EmbeddingProvider | None, hot: list[HotQuery], full: bool = False,
+            depth: int = RESULT_DEPTH) -> dict[str, int]:
+    """
+    Bring precomputed_results in line with `hot`. Only new rows and rows
+    whose corpus version changed are executed; the rest only get their
+    volume and latency figures updated. Without a provider every query
+    takes the text search.
+    """
+    model = provider.model if provider else "text"
+    versions = corpus_versions(conn, model)
+    stored = {
+        (query, source_filter): version
+        for query, source_filter, version in conn.execute(
+            "SELECT query_key, source_filter, corpus_version FROM precomputed_results"
+        ).fetchall()
+    }
+    wanted = {(h.query, h.source_filter): h for h in hot}
+    stale, fresh = [], []
+    for key, h in wanted.items():
+        if full or stored.get(key) != versions.get(h.source_filter):
+            stale.append(h)
+        else:
+            fresh.append(h)
+    removed = [key for key in stored if key not in wanted]
+
+    semantic = sorted({h.query for h in stale if provider and len(h.query) >= SEMANTIC_MIN_LENGTH})
+    vectors = embed_queries(provider, semantic) if semantic else {}
+    index_distance = DISTANCE_FUNCTIONS[index_metric(conn)] if index_sql(conn) else None
+    aliases = load_aliases() if any(h.query not in vectors for h in stale) else {}
+
+    now = int(time.time() * 1000)
+    executed = []
+    for h in stale:
+        if h.query in vectors:
+            search_type, ids = "semantic", semantic_ids(conn, vectors[h.query], h.source_filter, depth, index_distance)
+        else:
+            search_type, ids = "text", text_ids(conn, h.query, h.source_filter, depth, aliases)
+        executed.append((
+            h.query, h.source_filter, search_type, json.dumps(ids, separators=(",", ":")),
+            h.searches, h.avg_miss_ms, h.reason, versions.get(h.source_filter, ""), now,
+        ))
+
+    conn.executemany(
+        """
+        INSERT INTO precomputed_results
+            (query_key, source_filter, search_type, icon_ids, searches, avg_miss_ms, reason, corpus_version, computed_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(query_key, source_filter) DO UPDATE SET
+            search_type = excluded.search_type,
+            icon_ids = excluded.icon_ids,
+            searches = excluded.searches,
+            avg_miss_ms = excluded.avg_miss_ms,
+            reason = excluded.reason,
+            corpus_version = excluded.corpus_version,
+            computed_at = excluded.computed_at
+        """,
+        executed,
+    )
+    conn.executemany(
+        "UPDATE precomputed_results SET searches = ?, avg_miss_ms = ?, reason = ? WHERE query_key = ? AND source_filter = ?",
+        [(h.searches, h.avg_miss_ms, h.reason, h.query, h.source_filter) for h in fresh],
+    )
+    conn.executemany("DELETE FROM precomputed_results WHERE query_key = ? AND source_filter = ?", removed)
+    conn.commit()
+    return {"executed": len(executed), "kept": len(fresh), "removed": len(removed), "semantic": len(vectors)}
+
+
+def write_warm_list(hot: list[HotQuery], path: Path = WARM_LIST_PATH, days: int = WINDOW_DAYS) -> int:
+    """Regenerate the warm list, hottest first. Returns the number of entries."""
+    warm_list = {
+        "generatedBy": "extractor/precompute_results.py",
+        "generatedAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "windowDays": days,
+        "queries": [
+            {"query": h.query, "source": h.source_filter or None, "searches": h.searches, "reason": h.reason}
+            for h in hot
+        ],
+    }
+    path.write_text(json.dumps(warm_list, indent=2) + "\n")
+    return len(hot)
+
+
+def main():
+    import libsql_experimental as libsql
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Precompute results for the hottest searches in search_analytics")
+    parser.add_argument("--days", type=int, default=WINDOW_DAYS, help=f"Analytics window (default: {WINDOW_DAYS})")
+    parser.add_argument("--top", type=int, default=TOP_QUERIES,
+                        help=f"Highest-volume queries per source filter (default: {TOP_QUERIES})")
+    parser.add_argument("--slowest", type=int, default=SLOWEST_QUERIES,
+                        help=f"Slowest cache-missing queries per source filter (default: {SLOWEST_QUERIES})")
+    parser.add_argument("--min-searches", type=int, default=MIN_SEARCHES,
+                        help=f"Ignore queries searched fewer times (default: {MIN_SEARCHES})")
+    parser.add_argument("--depth", type=int, default=RESULT_DEPTH,
+                        help=f"Ranked ids stored per query, at least {RESULT_DEPTH} (default: {RESULT_DEPTH})")
+    parser.add_argument("--full", action="store_true", help="Re-execute every query, not just stale ones")
+    parser.add_argument("--provider", choices=["openai", "local", "none"], default="openai",
+                        help="Query embedding provider; 'none' precomputes text search only (default: openai)")
+    parser.add_argument("--local-model", type=Path, default=DEFAULT_LOCAL_MODEL_PATH,
+                        help="Local embedder artifact for --provider local")
+    parser.add_argument("--warm-list", type=Path, default=WARM_LIST_PATH,
+                        help="Generated warm list (default: src/lib/warm-queries.json)")
+    parser.add_argument("--show", action="store_true", help="Print the selection without executing anything")
+    parser.add_argument("--db", type=Path,
+                        help="Use a local database file instead of TURSO_DATABASE_URL (required with --provider local)")
+    args = parser.parse_args()
+
+    # The route takes any list shorter than PRECOMPUTED_RESULT_DEPTH as every match there is
+    if args.depth < RESULT_DEPTH:
+        print(f"Error: --depth must be at least {RESULT_DEPTH}, or truncated lists are served as complete")
+        sys.exit(1)
+
+    load_dotenv(Path(__file__).parent.parent / ".env.local")
+
+    api_key = os.environ.get("AI_GATEWAY_API_KEY")
+    gateway_url = os.environ.get("AI_GATEWAY_URL")  # Optional
+
+    # Local query vectors only match a database embedded by embeddings.py --provider local --db
+    if args.provider == "local" and not args.db:
+        print("Error: --provider local only matches locally embedded icons; pass --db with that database file")
+        sys.exit(1)
+
+    if args.db:
+        if not args.db.exists():
+            print(f"Error: {args.db} not found")
+            sys.exit(1)
+        turso_url, auth_token = str(args.db), ""
+    else:
+        turso_url = os.environ.get("TURSO_DATABASE_URL")
+        auth_token = os.environ.get("TURSO_AUTH_TOKEN")
+
+        if not turso_url or not auth_token:
+            print("Error: TURSO_DATABASE_URL and TURSO_AUTH_TOKEN must be set (or pass --db)")
+            sys.exit(1)
+
+    conn = libsql.connect(turso_url, auth_token=auth_token)
+    hot = mine_queries(conn, args.days, args.top, args.slowest, args.min_searches)
+
+    if args.show:
+        print(f"  {'searches':>8} {'miss ms':>8}  {'source':<13} {'reason':<12} query")
+        for h in hot:
+            miss = f"{h.avg_miss_ms:8.0f}" if h.avg_miss_ms is not None else f"{'-':>8}"
+            print(f"  {h.searches:>8} {miss}  {h.source_filter or 'all':<13} {h.reason:<12} {h.query}")
+        return
+
+    if args.provider == "local":
+        if not args.local_model.exists():
+            print(f"Error: {args.local_model} not found (fit it with embeddings.py --provider local)")
+            sys.exit(1)
+        provider = LocalProvider.load(args.local_model)
+    elif args.provider == "openai":
+        if not api_key:
+            print("Error: AI_GATEWAY_API_KEY must be set (or use --provider local / none)")
+            sys.exit(1)
+        provider = OpenAIProvider(api_key, gateway_url)
+    else:
+        provider = None
+
+    print("\n" + "=" * 50)
+    print(f"Precomputing results for {len(hot)} hot queries (last {args.days} days)")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    counts = refresh(conn, provider, hot, full=args.full, depth=args.depth)
+    print(f"✓ Executed {counts['executed']} ({counts['semantic']} semantic), kept {counts['kept']}, "
+          f"removed {counts['removed']} in {time.perf_counter() - start:.1f}s")
+
+    if hot:
+        write_warm_list(hot, args.warm_list, args.days)
+        print(f"✓ Wrote {len(hot)} queries to {args.warm_list}")
+    else:
+        print(f"No queries searched {args.min_searches}+ times in the last {args.days} days; "
+              f"leaving {args.warm_list} as it is")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Compact embedding representations and their effect on search quality.
+
+Next to the full F32 `embedding`, icons carry three smaller encodings of
+the same vector:
+
+    embedding_short   first SHORT_DIMENSIONS dims, renormalized (F32).
+                      Matryoshka-trained models (text-embedding-3-*) and
+                      the local SVD embedder put most signal up front.
+    embedding_int8    per-vector scale (F32) followed by int8 codes,
+                      value ~= code * scale
+    embedding_binary  sign bits, 1 per dimension (np.packbits order)
+
+EmbeddingGenerator writes them alongside each embedding; --backfill
+fills them for rows embedded before they existed. --evaluate measures
+recall@k of each representation against exact F32 search, using a
+sample of icon embeddings as queries.
+
+Usage:
+    python quantize.py --backfill
+    python quantize.py --backfill --evaluate --db ../icons.db  # Local database file
+    python quantize.py --evaluate
+    python quantize.py --evaluate --queries 1000 --k 1 10 50
+"""
+import os
+import sys
+import time
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+import numpy as np
+from related import load_embeddings, normalize_rows, top_k
+
+
+SHORT_DIMENSIONS = 256
+RESCORE_FACTOR = 10  # Binary candidates per result when rescoring with int8
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def truncate(vectors: np.ndarray, dimensions: int) -> np.ndarray:
+    """Keep the first `dimensions` components and renormalize."""
+    return normalize_rows(np.array(vectors[:, :dimensions], dtype=np.float32))
+
+
+def quantize_int8(vectors: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Symmetric scalar quantization with one scale per vector. Returns (codes, scales)."""
+    scales = np.abs(vectors).max(axis=1) / 127
+    scales[scales == 0] = 1
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def binary_codes(vectors: np.ndarray) -> np.ndarray:
+    """Sign bits packed 8 per byte."""
+    return np.packbits(vectors > 0, axis=1)
+
+
+def int8_to_blob(codes: np.ndarray, scale: float) -> bytes:
+    return np.float32(scale).astype("<f4").tobytes() + codes.astype(np.int8).tobytes()
+
+
+def blob_to_int8(blob: bytes) -> tuple[np.ndarray, float]:
+    scale = float(np.frombuffer(blob[:4], dtype="<f4")[0])
+    return np.frombuffer(blob[4:], dtype=np.int8), scale
+
+
+def compact_blobs(embedding_blob: bytes) -> tuple[bytes, bytes, bytes]:
+    """(embedding_short, embedding_int8, embedding_binary) blobs for one F32 embedding blob."""
+    vector = np.frombuffer(embedding_blob, dtype="<f4")[None, :]
+    short = truncate(vector, SHORT_DIMENSIONS)[0].astype("<f4").tobytes()
+    codes, scales = quantize_int8(normalize_rows(vector.astype(np.float32)))
+    return short, int8_to_blob(codes[0], scales[0]), binary_codes(vector)[0].tobytes()
+
+
+def hamming_similarity(query_codes: np.ndarray, codes: np.ndarray, block: int = 8) -> np.ndarray:
+    """Negative Hamming distance between packed codes, (queries, n)."""
+    out = np.empty((len(query_codes), len(codes)), dtype=np.float32)
+    for start in range(0, len(query_codes), block):
+        xor = query_codes[start : start + block, None, :] ^ codes[None, :, :]
+        out[start : start + block] = -POPCOUNT[xor].sum(axis=2, dtype=np.int32)
+    return out
+
+
+@dataclass
+class StorageMode:
+    """One representation: its size and how it scores queries (given as corpus rows)."""
+
+    name: str
+    bytes_per_vector: int
+    score: Callable[[np.ndarray], np.ndarray]  # query rows -> (queries, n) scores
+
+
+def build_modes(vectors: np.ndarray, max_k: int) -> list[StorageMode]:
+    """Every representation worth comparing for these (unit-length) vectors."""
+    n, dims = vectors.shape
+    modes = [StorageMode("f32", dims * 4, lambda rows: vectors[rows] @ vectors.T)]
+
+    for short in (512, SHORT_DIMENSIONS, 128):
+        if short < dims:
+            truncated = truncate(vectors, short)
+            modes.append(StorageMode(
+                f"f32-{short}", short * 4, lambda rows, t=truncated: t[rows] @ t.T
+            ))
+
+    codes, scales = quantize_int8(vectors)
+
+    def int8_scores(rows: np.ndarray) -> np.ndarray:
+        # Asymmetric: full-precision query against quantized corpus
+        return (vectors[rows] @ codes.T.astype(np.float32)) * scales
+
+    modes.append(StorageMode("int8", dims + 4, int8_scores))
+
+    bits = binary_codes(vectors)
+    modes.append(StorageMode("binary", bits.shape[1], lambda rows: hamming_similarity(bits[rows], bits)))
+
+    def binary_rescored(rows: np.ndarray) -> np.ndarray:
+        hamming = hamming_similarity(bits[rows], bits)
+        candidates, _ = top_k(hamming, min(n, max_k * RESCORE_FACTOR + 1))
+        rescored = np.full(hamming.shape, -np.inf, dtype=np.float32)
+        for i, row in enumerate(rows):
+            picked = candidates[i]
+            rescored[i, picked] = (codes[picked].astype(np.float32) @ vectors[row]) * scales[picked]
+        return rescored
+
+    modes.append(StorageMode("binary+int8", bits.shape[1] + dims + 4, binary_rescored))
+    return modes
+
+
+def evaluate(vectors: np.ndarray, query_count: int = 500, ks: tuple[int, ...] = (1, 10, 50),
+             seed: int = 0) -> list[dict]:
+    """
+    Recall@k of each representation against exact F32 search.
+
+    Queries are sampled corpus vectors; each query's own row is excluded
+    from every ranking. A result counts as a hit when its exact score
+    reaches the exact k-th best score, so reordering among tied vectors
+    (icons with identical search texts) is not a miss. Returns one result
+    dict per mode.
+    """
+    n = len(vectors)
+    rng = np.random.default_rng(seed)
+    rows = np.sort(rng.choice(n, size=min(query_count, n), replace=False))
+    max_k = min(max(ks), n - 1)
+
+    def ranking(scores: np.ndarray) -> np.ndarray:
+        scores[np.arange(len(rows)), rows] = -np.inf
+        return top_k(scores, max_k)[0]
+
+    exact = vectors[rows] @ vectors.T
+    truth = ranking(exact.copy())
+    truth_scores = np.take_along_axis(exact, truth, axis=1)
+    results = []
+    for mode in build_modes(vectors, max_k):
+        start = time.perf_counter()
+        scores = mode.score(rows)
+        elapsed = time.perf_counter() - start
+        found = ranking(scores)
+
+        recall = {}
+        for k in ks:
+            k = min(k, max_k)
+            kth_best = truth_scores[:, k - 1 : k] - 1e-6
+            hits = np.take_along_axis(exact, found[:, :k], axis=1) >= kth_best
+            recall[k] = float(hits.mean())
+        results.append({
+            "mode": mode.name,
+            "bytes": mode.bytes_per_vector,
+            "total_mb": mode.bytes_per_vector * n / 1e6,
+            "ms_per_query": elapsed * 1000 / len(rows),
+            "recall": recall,
+        })
+    return results
+
+
+def backfill(conn, batch_size: int = 500) -> int:
+    """Write compact encodings for embedded icons that don't have them yet."""
+    rows = conn.execute(
+        "SELECT id, embedding FROM icons WHERE embedding IS NOT NULL AND embedding_int8 IS NULL"
+    ).fetchall()
+    for start in range(0, len(rows), batch_size):
+        batch = rows[start : start + batch_size]
+        conn.executemany(
+            "UPDATE icons SET embedding_short = ?, embedding_int8 = ?, embedding_binary = ? WHERE id = ?",
+            [(*compact_blobs(blob), icon_id) for icon_id, blob in batch],
+        )
+        conn.commit()
+    return len(rows)
+
+
+def main():
+    import libsql_experimental as libsql
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Compact embedding encodings and recall evaluation")
+    parser.add_argument("--backfill", action="store_true", help="Fill compact columns for existing embeddings")
+    parser.add_argument("--evaluate", action="store_true", help="Measure recall@k of each representation")
+    parser.add_argument("--queries", type=int, default=500, help="Sampled query icons (default: 500)")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 10, 50], help="Cutoffs for recall@k")
+    parser.add_argument("--seed", type=int, default=0, help="Query sampling seed")
+    parser.add_argument("--db", type=Path, help="Use a local database file instead of TURSO_DATABASE_URL")
+    args = parser.parse_args()
+
+    if not args.backfill and not args.evaluate:
+        parser.error("nothing to do: pass --backfill and/or --evaluate")
+
+    if args.db:
+        if not args.db.exists():
+            print(f"Error: {args.db} not found")
+            sys.exit(1)
+        turso_url, auth_token = str(args.db), ""
+    else:
+        load_dotenv(Path(__file__).parent.parent / ".env.local")
+
+        turso_url = os.environ.get("TURSO_DATABASE_URL")
+        auth_token = os.environ.get("TURSO_AUTH_TOKEN")
+
+        if not turso_url or not auth_token:
+            print("Error: TURSO_DATABASE_URL and TURSO_AUTH_TOKEN must be set (or pass --db)")
+            sys.exit(1)
+
+    conn = libsql.connect(turso_url, auth_token=auth_token)
+
+    if args.backfill:
+        print(f"✓ Backfilled compact embeddings for {backfill(conn)} icons")
+
+    if args.evaluate:
+        matrix = load_embeddings(conn)
+        if len(matrix.ids) < 2:
+            print("Error: need at least two embedded icons to evaluate")
+            sys.exit(1)
+
+        n, dims = matrix.vectors.shape
+        print("\n" + "=" * 50)
+        print(f"Recall vs exact F32: {n} icons x {dims}d, {min(args.queries, n)} queries")
+        print("=" * 50)
+
+        results = evaluate(matrix.vectors, args.queries, tuple(args.k), args.seed)
+        header = f"  {'mode':<12} {'bytes':>6} {'total MB':>9} {'ms/query':>9}"
+        header += "".join(f" {'R@' + str(k):>7}" for k in args.k)
+        print(header)
+        for result in results:
+            line = (f"  {result['mode']:<12} {result['bytes']:>6} {result['total_mb']:>9.1f} "
+                    f"{result['ms_per_query']:>9.2f}")
+            line += "".join(f" {result['recall'][min(k, n - 1)]:>7.3f}" for k in args.k)
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,57 @@
 """Database registry for storing extracted icons."""
+import re
 import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import libsql_experimental as libsql
 from extractors.base import ExtractedIcon
+from geometry import IconMetrics, compute_metrics, normalize_geometry
+from fingerprint import compute_fingerprints
+
+
+# Full-text index over icons, kept in sync by triggers (external content:
+# the index stores no copy of the text, only icons.rowid)
+FTS_TABLE = "icons_fts"
+FTS_COLUMNS = ("name", "normalized_name", "tags", "search_text", "category")
+# unicode61 splits on '-', '_' and JSON punctuation, so normalized_name
+# 'arrow-right' indexes 'arrow' and 'right' while name 'ArrowRight'
+# indexes 'arrowright'; prefix indexes serve 'arr*' queries
+FTS_TOKENIZER = "unicode61 remove_diacritics 2"
+FTS_PREFIXES = "2 3 4"
+# bm25() weights, in FTS_COLUMNS order
+FTS_WEIGHTS = (10.0, 10.0, 4.0, 1.0, 2.0)
+
+
+def icon_content_hash(icon: ExtractedIcon) -> str:
+    """Canonical fingerprint of everything that affects how an icon renders.
+
+    Covers content, viewBox and stroke/fill defaults, so it can be used as
+    an ETag for the icon (or variant) and changes only when output would.
+    """
+    canonical = json.dumps(
+        [
+            icon.content,
+            icon.view_box,
+            bool(icon.default_stroke),
+            bool(icon.default_fill),
+            icon.stroke_width,
+        ],
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def hash_icons(icons: list[ExtractedIcon], workers: int | None = None) -> list[str]:
+    """Compute content hashes for many icons on a thread pool (hashlib releases the GIL)."""
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(icon_content_hash, icons))
+
+
+def fts_words(query: str) -> list[str]:
+    """Query words as the FTS5 tokenizer sees them (lowercase alphanumeric runs)."""
+    return re.findall(r"[^\W_]+", query.lower())
 
 
 class IconRegistry:
@@ -11,6 +60,7 @@ class IconRegistry:
     def __init__(self, turso_url: str, auth_token: str):
         self.conn = libsql.connect(turso_url, auth_token=auth_token)
         self._ensure_tables()
+        self.ensure_fts()
 
     def _ensure_tables(self):
         """Verify tables exist (created by Drizzle migrations)."""
@@ -21,6 +71,102 @@ class IconRegistry:
         except Exception as e:
             raise RuntimeError(f"Database tables not found. Run Drizzle migrations first: {e}")
 
+    def ensure_fts(self) -> bool:
+        """Create icons_fts and its sync triggers if missing. Returns True if created (and filled)."""
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (FTS_TABLE,)
+        ).fetchone()
+        columns = ", ".join(FTS_COLUMNS)
+        new_values = ", ".join(f"new.{column}" for column in FTS_COLUMNS)
+        old_values = ", ".join(f"old.{column}" for column in FTS_COLUMNS)
+
+        if not exists:
+            self.conn.execute(
+                f"""
+                CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+                    {columns},
+                    content='icons', content_rowid='rowid',
+                    tokenize='{FTS_TOKENIZER}', prefix='{FTS_PREFIXES}'
+                )
+                """
+            )
+        self.conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON icons BEGIN
+                INSERT INTO {FTS_TABLE} (rowid, {columns}) VALUES (new.rowid, {new_values});
+            END
+            """
+        )
+        self.conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON icons BEGIN
+                INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, {columns}) VALUES ('delete', old.rowid, {old_values});
+            END
+            """
+        )
+        # Only text columns: embedding and geometry updates leave the index alone
+        self.conn.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF {columns} ON icons BEGIN
+                INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, {columns}) VALUES ('delete', old.rowid, {old_values});
+                INSERT INTO {FTS_TABLE} (rowid, {columns}) VALUES (new.rowid, {new_values});
+            END
+            """
+        )
+        self.conn.commit()
+
+        if not exists:
+            self.rebuild_fts()
+            print(f"✓ Created full-text index {FTS_TABLE}")
+        return not exists
+
+    def rebuild_fts(self):
+        """Re-read every icon into icons_fts (after bulk changes made with the triggers missing)."""
+        self.conn.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+        self.conn.commit()
+
+    def optimize_fts(self):
+        """Merge icons_fts b-tree segments into one, for faster queries after many incremental writes."""
+        self.conn.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+        self.conn.commit()
+
+    def check_fts(self) -> bool:
+        """True if icons_fts matches the icons table."""
+        try:
+            self.conn.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rank) VALUES ('integrity-check', 1)")
+        except Exception:
+            return False
+        finally:
+            # The check writes nothing, but its INSERT still opens a write transaction
+            self.conn.rollback()
+        return True
+
+    def search_fts(self, query: str, source_id: str | None = None, limit: int = 50) -> list[tuple[str, float]]:
+        """
+        Icons matching every word of `query`, best bm25() first, as (id, score).
+
+        Words are quoted so FTS5 syntax in user input is taken literally;
+        the last word also matches as a prefix.
+        """
+        words = fts_words(query)
+        if not words:
+            return []
+        match = " ".join(f'"{word}"' for word in words) + "*"
+        weights = ", ".join(str(weight) for weight in FTS_WEIGHTS)
+        source_filter = "AND icons.source_id = ?" if source_id else ""
+        params = (match, source_id, limit) if source_id else (match, limit)
+        return self.conn.execute(
+            f"""
+            SELECT icons.id, bm25({FTS_TABLE}, {weights}) AS score
+            FROM {FTS_TABLE}
+            JOIN icons ON icons.rowid = {FTS_TABLE}.rowid
+            WHERE {FTS_TABLE} MATCH ? {source_filter}
+            ORDER BY score
+            LIMIT ?
+            """,
+            params,
+        ).fetchall()
+
     def insert_source(self, source_id: str, name: str, version: str, license_info: str | None, total: int):
         """Insert or update a source/library."""
         now = int(datetime.now().timestamp())
@@ -38,20 +184,34 @@ class IconRegistry:
         self.conn.commit()
         print(f"✓ Source '{source_id}' registered (v{version}, {total} icons)")
 
-    def insert_icon(self, icon: ExtractedIcon):
+    @staticmethod
+    def row_id(icon: ExtractedIcon) -> str:
+        """Get the icons/variants primary key for an extracted icon."""
+        if icon.variant:
+            return f"{icon.source}:{icon.normalized_name}:{icon.variant}"
+        return f"{icon.source}:{icon.normalized_name}"
+
+    def insert_icon(self, icon: ExtractedIcon, metrics: IconMetrics | None = None, content_hash: str | None = None):
         """Insert a single icon."""
         icon_id = f"{icon.source}:{icon.normalized_name}"
-        
+        content_hash = content_hash or icon_content_hash(icon)
+
         # Handle variant icons differently
         if icon.variant:
-            self._insert_variant(icon)
+            self._insert_variant(icon, content_hash)
             return
 
+        if metrics is None:
+            metrics = self.analyze_geometry([icon])[0]
+        normalized = normalize_geometry(icon.view_box, icon.content, icon.path_data, icon.stroke_width)
+
         self.conn.execute(
             """
             INSERT INTO icons
-            (id, source_id, name, normalized_name, category, tags, view_box, content, path_data, default_stroke, default_fill, stroke_width, brand_color)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            (id, source_id, name, normalized_name, category, tags, view_box, content, path_data, default_stroke, default_fill, stroke_width, brand_color,
+             bbox_min_x, bbox_min_y, bbox_max_x, bbox_max_y, node_count, segment_count, element_count, byte_size, complexity,
+             normalized_content, normalized_path_data, normalized_stroke_width, content_hash, geometry_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ON CONFLICT(id) DO UPDATE SET
                 category = excluded.category,
                 tags = excluded.tags,
@@ -60,7 +220,21 @@ class IconRegistry:
                 default_stroke = excluded.default_stroke,
                 default_fill = excluded.default_fill,
                 stroke_width = excluded.stroke_width,
-                brand_color = excluded.brand_color
+                brand_color = excluded.brand_color,
+                bbox_min_x = excluded.bbox_min_x,
+                bbox_min_y = excluded.bbox_min_y,
+                bbox_max_x = excluded.bbox_max_x,
+                bbox_max_y = excluded.bbox_max_y,
+                node_count = excluded.node_count,
+                segment_count = excluded.segment_count,
+                element_count = excluded.element_count,
+                byte_size = excluded.byte_size,
+                complexity = excluded.complexity,
+                normalized_content = excluded.normalized_content,
+                normalized_path_data = excluded.normalized_path_data,
+                normalized_stroke_width = excluded.normalized_stroke_width,
+                content_hash = excluded.content_hash,
+                geometry_hash = excluded.geometry_hash
             """,
             (
                 icon_id,
@@ -76,21 +250,39 @@ class IconRegistry:
                 1 if icon.default_fill else 0,
                 icon.stroke_width,
                 icon.brand_color,
+                metrics.bbox_min_x,
+                metrics.bbox_min_y,
+                metrics.bbox_max_x,
+                metrics.bbox_max_y,
+                metrics.node_count,
+                metrics.segment_count,
+                metrics.element_count,
+                metrics.byte_size,
+                metrics.complexity,
+                normalized.content,
+                json.dumps(normalized.path_data) if normalized.path_data else None,
+                normalized.stroke_width,
+                content_hash,
+                metrics.geometry_hash,
             ),
         )
 
-    def _insert_variant(self, icon: ExtractedIcon):
+    def _insert_variant(self, icon: ExtractedIcon, content_hash: str):
         """Insert an icon variant (e.g., Phosphor bold, fill)."""
         base_icon_id = f"{icon.source}:{icon.normalized_name}"
         variant_id = f"{icon.source}:{icon.normalized_name}:{icon.variant}"
+        normalized = normalize_geometry(icon.view_box, icon.content, icon.path_data)
 
         self.conn.execute(
             """
-            INSERT INTO variants (id, icon_id, variant, content, path_data)
-            VALUES (?, ?, ?, ?, ?)
+            INSERT INTO variants (id, icon_id, variant, content, path_data, normalized_content, normalized_path_data, content_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
             ON CONFLICT(id) DO UPDATE SET
                 content = excluded.content,
-                path_data = excluded.path_data
+                path_data = excluded.path_data,
+                normalized_content = excluded.normalized_content,
+                normalized_path_data = excluded.normalized_path_data,
+                content_hash = excluded.content_hash
             """,
             (
                 variant_id,
@@ -98,30 +290,111 @@ class IconRegistry:
                 icon.variant,
                 icon.content,
                 json.dumps(icon.path_data) if icon.path_data else None,
+                normalized.content,
+                json.dumps(normalized.path_data) if normalized.path_data else None,
+                content_hash,
             ),
         )
 
+    @staticmethod
+    def analyze_geometry(icons: list[ExtractedIcon]) -> list[IconMetrics]:
+        """Geometry metrics plus geometry hash for a batch of icons."""
+        metrics = compute_metrics([icon.path_data for icon in icons], [icon.content for icon in icons])
+        for icon_metrics, geometry_hash in zip(metrics, compute_fingerprints([icon.path_data for icon in icons])):
+            icon_metrics.geometry_hash = geometry_hash
+        return metrics
+
+    @staticmethod
+    def _row_state(icon: ExtractedIcon, content_hash: str) -> tuple:
+        """Everything an upsert would change, for skipping unchanged rows."""
+        if icon.variant:
+            return (content_hash,)
+        return (content_hash, icon.name, icon.category, tuple(sorted(icon.tags or [])), icon.brand_color)
+
+    def get_stored_state(self, source_id: str) -> dict[str, tuple]:
+        """Get the stored row state of every icon and variant in a source."""
+        state = {}
+        rows = self.conn.execute(
+            "SELECT id, content_hash, name, category, tags, brand_color FROM icons WHERE source_id = ?",
+            (source_id,),
+        ).fetchall()
+        for row in rows:
+            tags = tuple(sorted(json.loads(row[4]))) if row[4] else ()
+            state[row[0]] = (row[1], row[2], row[3], tags, row[5])
+
+        rows = self.conn.execute(
+            "SELECT id, content_hash FROM variants WHERE icon_id LIKE ?", (f"{source_id}:%",)
+        ).fetchall()
+        for row in rows:
+            state[row[0]] = (row[1],)
+        return state
+
     def batch_insert(self, icons: list[ExtractedIcon], batch_size: int = 100):
-        """Insert icons in batches for better performance."""
+        """Insert icons in batches for better performance.
+
+        Icons whose content hash and metadata match the stored row are
+        skipped, and source manifests are only refreshed when something
+        changed.
+        """
         total = len(icons)
         inserted = 0
         errors = 0
 
-        for i in range(0, total, batch_size):
-            batch = icons[i : i + batch_size]
-            for icon in batch:
+        hashes = hash_icons(icons)
+        sources = sorted({icon.source for icon in icons})
+        stored = {}
+        for source_id in sources:
+            stored.update(self.get_stored_state(source_id))
+
+        pending = [
+            (icon, content_hash)
+            for icon, content_hash in zip(icons, hashes)
+            if stored.get(self.row_id(icon)) != self._row_state(icon, content_hash)
+        ]
+        unchanged = total - len(pending)
+
+        # Geometry metrics and fingerprints for the whole list in one vectorized pass
+        metrics = self.analyze_geometry([icon for icon, _ in pending])
+
+        for i in range(0, len(pending), batch_size):
+            batch = pending[i : i + batch_size]
+            for (icon, content_hash), icon_metrics in zip(batch, metrics[i : i + batch_size]):
                 try:
-                    self.insert_icon(icon)
+                    self.insert_icon(icon, icon_metrics, content_hash)
                     inserted += 1
                 except Exception as e:
                     errors += 1
                     print(f"  Error inserting {icon.source}:{icon.normalized_name}: {e}")
 
             self.conn.commit()
-            print(f"  Progress: {min(i + batch_size, total)}/{total}")
+            print(f"  Progress: {min(i + batch_size, len(pending))}/{len(pending)}")
+
+        if inserted:
+            for source_id in sources:
+                self.update_source_manifest(source_id)
+
+        print(f"✓ Inserted {inserted} icons ({unchanged} unchanged, {errors} errors)")
+        return inserted + unchanged, errors
+
+    def update_source_manifest(self, source_id: str) -> str:
+        """Roll icon and variant content hashes up into the source's manifest hash."""
+        rows = self.conn.execute(
+            """
+            SELECT id, content_hash FROM icons WHERE source_id = ?
+            UNION ALL
+            SELECT id, content_hash FROM variants WHERE icon_id LIKE ?
+            """,
+            (source_id, f"{source_id}:%"),
+        ).fetchall()
+
+        digest = hashlib.sha256()
+        for icon_id, content_hash in sorted(rows, key=lambda row: row[0]):
+            digest.update(f"{icon_id}:{content_hash or ''}\n".encode("utf-8"))
+        manifest_hash = digest.hexdigest()
 
-        print(f"✓ Inserted {inserted} icons ({errors} errors)")
-        return inserted, errors
+        self.conn.execute("UPDATE sources SET manifest_hash = ? WHERE id = ?", (manifest_hash, source_id))
+        self.conn.commit()
+        return manifest_hash
 
     def get_icon_count(self, source_id: str | None = None) -> int:
         """Get total icon count, optionally filtered by source."""
@@ -133,6 +406,46 @@ class IconRegistry:
             result = self.conn.execute("SELECT COUNT(*) FROM icons").fetchone()
         return result[0] if result else 0
 
+    def get_source_ids(self) -> list[str]:
+        """Get all registered source ids."""
+        result = self.conn.execute("SELECT id FROM sources ORDER BY id").fetchall()
+        return [row[0] for row in result]
+
+    def get_icons_for_export(self, source_id: str) -> list[dict]:
+        """Get display fields for every icon in a source, ordered by name.
+
+        Rows use the same camelCase shape as the web API's IconData (minus
+        pathData) so exported artifacts can be served as-is.
+        """
+        result = self.conn.execute(
+            """
+            SELECT id, name, normalized_name, source_id, category, tags, view_box, content,
+                   default_stroke, default_fill, stroke_width, brand_color
+            FROM icons
+            WHERE source_id = ?
+            ORDER BY normalized_name, id
+            """,
+            (source_id,),
+        ).fetchall()
+
+        return [
+            {
+                "id": row[0],
+                "name": row[1],
+                "normalizedName": row[2],
+                "sourceId": row[3],
+                "category": row[4],
+                "tags": json.loads(row[5]) if row[5] else [],
+                "viewBox": row[6],
+                "content": row[7],
+                "defaultStroke": bool(row[8]),
+                "defaultFill": bool(row[9]),
+                "strokeWidth": row[10],
+                "brandColor": row[11],
+            }
+            for row in result
+        ]
+
     def clear_source(self, source_id: str):
         """Clear all icons from a source (for re-extraction)."""
         # Delete variants first (foreign key)
@@ -141,5 +454,6 @@ class IconRegistry:
         )
         # Delete icons
         self.conn.execute("DELETE FROM icons WHERE source_id = ?", (source_id,))
+        self.conn.execute("UPDATE sources SET manifest_hash = NULL WHERE id = ?", (source_id,))
         self.conn.commit()
         print(f"✓ Cleared all icons from source '{source_id}'")
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Precompute related icons from embeddings.
+
+Every icon embedding is loaded into one float32 matrix, L2-normalized,
+and multiplied against itself in row blocks sized to a memory budget.
+Each icon keeps its top-k cosine neighbours within its own library
+('similar') and across all other libraries ('alternative').
+
+Runs are incremental: the embedding hash each row was computed from is
+kept in related_icons_state, and only icons whose embedding changed, or
+whose neighbour lists a changed icon could enter or leave, are
+recomputed.
+
+Usage:
+    python related.py                      # Update related icons
+    python related.py --all                # Recompute every icon
+    python related.py --db ../icons.db     # Local database, e.g. after embeddings.py --provider local
+    python related.py --k 12
+    python related.py --benchmark 45000    # Time a synthetic corpus of this size
+"""
+import os
+import sys
+import time
+import hashlib
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+import numpy as np
+
+
+DEFAULT_K = 12
+DEFAULT_BLOCK_BYTES = 64 * 1024 * 1024  # Score matrix budget per block
+
+
+@dataclass
+class EmbeddingMatrix:
+    """Unit-length embeddings with rows grouped by library."""
+
+    ids: list[str]
+    source_ids: list[str]
+    hashes: list[str]
+    vectors: np.ndarray  # (n, dims) float32, L2-normalized
+    source_ranges: dict[str, tuple[int, int]]  # source_id -> [start, end) row range
+
+    @property
+    def row_of(self) -> dict[str, int]:
+        return {icon_id: row for row, icon_id in enumerate(self.ids)}
+
+
+def embedding_hash(blob: bytes) -> str:
+    """Fingerprint an embedding blob."""
+    return hashlib.sha256(blob).hexdigest()
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows in place; zero rows stay zero."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    vectors /= norms
+    return vectors
+
+
+def source_ranges(source_ids: list[str]) -> dict[str, tuple[int, int]]:
+    """Row ranges per source, for rows already sorted by source."""
+    ranges = {}
+    for row, source_id in enumerate(source_ids):
+        start, _ = ranges.get(source_id, (row, row))
+        ranges[source_id] = (start, row + 1)
+    return ranges
+
+
+def load_embeddings(conn) -> EmbeddingMatrix:
+    """
+    Load every icon embedding into one normalized matrix.
+
+    F32 blobs are decoded with np.frombuffer straight into a preallocated
+    matrix (one copy, no Python floats). The dimension is taken from the
+    blobs; rows with a different length than the majority are skipped.
+    """
+    rows = conn.execute(
+        "SELECT id, source_id, embedding FROM icons WHERE embedding IS NOT NULL ORDER BY source_id, id"
+    ).fetchall()
+    if not rows:
+        return EmbeddingMatrix([], [], [], np.zeros((0, 0), dtype=np.float32), {})
+
+    lengths = [len(row[2]) for row in rows]
+    blob_bytes = max(set(lengths), key=lengths.count)
+    rows = [row for row in rows if len(row[2]) == blob_bytes]
+    skipped = len(lengths) - len(rows)
+    if skipped:
+        print(f"  Skipped {skipped} embeddings with unexpected dimensions")
+
+    vectors = np.empty((len(rows), blob_bytes // 4), dtype=np.float32)
+    for i, row in enumerate(rows):
+        vectors[i] = np.frombuffer(row[2], dtype="<f4")
+
+    source_ids = [row[1] for row in rows]
+    return EmbeddingMatrix(
+        ids=[row[0] for row in rows],
+        source_ids=source_ids,
+        hashes=[embedding_hash(row[2]) for row in rows],
+        vectors=normalize_rows(vectors),
+        source_ranges=source_ranges(source_ids),
+    )
+
+
+def block_rows(n: int, max_block_bytes: int) -> int:
+    """Query rows per block so a float32 (rows x n) score block fits the budget."""
+    return max(1, min(n, max_block_bytes // max(1, n * 4)))
+
+
+def top_k(scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Top-k columns per row, best first. Returns (indices, scores)."""
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        empty = np.zeros((scores.shape[0], 0))
+        return empty.astype(np.int64), empty
+    candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_scores, order, axis=1)
+
+
+def compute_neighbors(
+    matrix: EmbeddingMatrix,
+    rows: np.ndarray | None = None,
+    k: int = DEFAULT_K,
+    max_block_bytes: int = DEFAULT_BLOCK_BYTES,
+) -> dict[str, list[tuple[str, str, int, float]]]:
+    """
+    Top-k neighbours for the given rows (default: all).
+
+    Returns {icon_id: [(related_id, kind, rank, score), ...]}. Rows are
+    processed in blocks; since rows are grouped by library, the
+    within-library scores are a contiguous column slice of each block.
+    """
+    vectors = matrix.vectors
+    n = len(matrix.ids)
+    rows = np.arange(n) if rows is None else np.asarray(rows, dtype=np.int64)
+    results: dict[str, list[tuple[str, str, int, float]]] = {}
+    if n == 0 or len(rows) == 0:
+        return results
+
+    step = block_rows(n, max_block_bytes)
+    for block_start in range(0, len(rows), step):
+        block = np.sort(rows[block_start:block_start + step])
+        scores = vectors[block] @ vectors.T
+        scores[np.arange(len(block)), block] = -np.inf  # Never your own neighbour
+
+        # Block rows may span libraries; handle each library's run separately
+        block_sources = [matrix.source_ids[row] for row in block]
+        for source_id, (start, end) in matrix.source_ranges.items():
+            in_source = np.array([s == source_id for s in block_sources])
+            if not in_source.any():
+                continue
+            source_scores = scores[in_source]
+            source_rows = block[in_source]
+
+            similar_idx, similar_scores = top_k(source_scores[:, start:end], k)
+            similar_idx += start
+
+            source_scores[:, start:end] = -np.inf
+            alternative_idx, alternative_scores = top_k(source_scores, k)
+
+            for i, row in enumerate(source_rows.tolist()):
+                entries = []
+                for kind, idx, kind_scores in (
+                    ("similar", similar_idx[i], similar_scores[i]),
+                    ("alternative", alternative_idx[i], alternative_scores[i]),
+                ):
+                    rank = 0
+                    for column, score in zip(idx.tolist(), kind_scores.tolist()):
+                        if score == -np.inf:
+                            continue
+                        rank += 1
+                        entries.append((matrix.ids[column], kind, rank, score))
+                results[matrix.ids[row]] = entries
+
+    return results
+
+
+def find_stale_rows(
+    conn,
+    matrix: EmbeddingMatrix,
+    k: int = DEFAULT_K,
+    max_block_bytes: int = DEFAULT_BLOCK_BYTES,
+) -> tuple[set[int], list[str]]:
+    """
+    Work out which rows need recomputing since the last run.
+
+    A row is stale if its own embedding changed (or is new), if one of its
+    stored neighbours changed or disappeared, or if a changed embedding now
+    scores at least its current k-th neighbour of that kind. Returns the
+    stale rows and the ids of icons whose embeddings are gone.
+    """
+    stored_hashes = {
+        row[0]: row[1] for row in conn.execute("SELECT icon_id, embedding_hash FROM related_icons_state").fetchall()
+    }
+    row_of = matrix.row_of
+    changed = {row for row, icon_id in enumerate(matrix.ids) if stored_hashes.get(icon_id) != matrix.hashes[row]}
+    removed = [icon_id for icon_id in stored_hashes if icon_id not in row_of]
+    if not changed and not removed:
+        return set(), removed
+
+    changed_ids = {matrix.ids[row] for row in changed} | set(removed)
+    stale = set(changed)
+
+    # Weakest kept score per (icon, kind), and lists that reference changed icons
+    floors: dict[tuple[str, str], float] = {}
+    counts: dict[tuple[str, str], int] = {}
+    for icon_id, related_id, kind, score in conn.execute(
+        "SELECT icon_id, related_id, kind, score FROM related_icons"
+    ).fetchall():
+        if icon_id not in row_of:
+            continue
+        if related_id in changed_ids:
+            stale.add(row_of[icon_id])
+        key = (icon_id, kind)
+        floors[key] = min(score, floors.get(key, np.inf))
+        counts[key] = counts.get(key, 0) + 1
+
+    # Could a changed embedding enter an unchanged row's list?
+    changed_rows = np.array(sorted(changed), dtype=np.int64)
+    if len(changed_rows):
+        changed_vectors = matrix.vectors[changed_rows]
+        changed_sources = np.array([matrix.source_ids[row] for row in changed_rows])
+        step = block_rows(len(changed_rows), max_block_bytes)
+        for start in range(0, len(matrix.ids), step):
+            block = np.arange(start, min(start + step, len(matrix.ids)))
+            scores = matrix.vectors[block] @ changed_vectors.T
+            for i, row in enumerate(block.tolist()):
+                if row in stale:
+                    continue
+                icon_id = matrix.ids[row]
+                same = changed_sources == matrix.source_ids[row]
+                for kind, mask in (("similar", same), ("alternative", ~same)):
+                    if not mask.any():
+                        continue
+                    key = (icon_id, kind)
+                    floor = floors.get(key, -np.inf) if counts.get(key, 0) >= k else -np.inf
+                    if scores[i][mask].max() >= floor:
+                        stale.add(row)
+                        break
+
+    return stale, removed
+
+
+def save_neighbors(conn, neighbors: dict[str, list[tuple[str, str, int, float]]],
+                   hashes: dict[str, str], removed: list[str], batch_size: int = 500):
+    """Replace related rows for the recomputed icons and record their embedding hashes."""
+    stale_ids = [(icon_id,) for icon_id in list(neighbors) + removed]
+    conn.executemany("DELETE FROM related_icons WHERE icon_id = ?", stale_ids)
+    conn.executemany("DELETE FROM related_icons_state WHERE icon_id = ?", [(icon_id,) for icon_id in removed])
+
+    items = list(neighbors.items())
+    computed_at = int(time.time())
+    for i in range(0, len(items), batch_size):
+        batch = items[i:i + batch_size]
+        conn.executemany(
+            "INSERT INTO related_icons (icon_id, related_id, kind, rank, score) VALUES (?, ?, ?, ?, ?)",
+            [
+                (icon_id, related_id, kind, rank, score)
+                for icon_id, entries in batch
+                for related_id, kind, rank, score in entries
+            ],
+        )
+        conn.executemany(
+            """
+            INSERT INTO related_icons_state (icon_id, embedding_hash, computed_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(icon_id) DO UPDATE SET
+                embedding_hash = excluded.embedding_hash,
+                computed_at = excluded.computed_at
+            """,
+            [(icon_id, hashes[icon_id], computed_at) for icon_id, _ in batch],
+        )
+        conn.commit()
+        print(f"  Progress: {min(i + batch_size, len(items))}/{len(items)}")
+    conn.commit()
+
+
+def update_related(conn, k: int = DEFAULT_K, recompute: bool = False,
+                   max_block_bytes: int = DEFAULT_BLOCK_BYTES) -> int:
+    """Recompute related icons where embeddings changed. Returns the number of icons updated."""
+    start = time.perf_counter()
+    matrix = load_embeddings(conn)
+    print(f"  Loaded {len(matrix.ids)} embeddings ({matrix.vectors.shape[1] if len(matrix.ids) else 0}d) "
+          f"in {time.perf_counter() - start:.2f}s")
+
+    if recompute:
+        stored = {row[0] for row in conn.execute("SELECT icon_id FROM related_icons_state").fetchall()}
+        stale, removed = set(range(len(matrix.ids))), sorted(stored - set(matrix.ids))
+    else:
+        stale, removed = find_stale_rows(conn, matrix, k, max_block_bytes)
+    print(f"  {len(stale)} icons to recompute, {len(removed)} removed")
+
+    if not stale and not removed:
+        return 0
+
+    start = time.perf_counter()
+    neighbors = compute_neighbors(matrix, np.array(sorted(stale), dtype=np.int64), k, max_block_bytes)
+    print(f"  Computed neighbours in {time.perf_counter() - start:.2f}s")
+
+    hashes = dict(zip(matrix.ids, matrix.hashes))
+    save_neighbors(conn, neighbors, hashes, removed)
+    return len(neighbors)
+
+
+def run_benchmark(n: int, dims: int, k: int, max_block_bytes: int, sources: int = 9, seed: int = 0):
+    """Time neighbour computation on a random corpus of n x dims embeddings."""
+    rng = np.random.default_rng(seed)
+    vectors = normalize_rows(rng.standard_normal((n, dims), dtype=np.float32))
+    source_ids = sorted(f"source-{i % sources}" for i in range(n))
+    matrix = EmbeddingMatrix(
+        ids=[f"{source_id}:{i}" for i, source_id in enumerate(source_ids)],
+        source_ids=source_ids,
+        hashes=[""] * n,
+        vectors=vectors,
+        source_ranges=source_ranges(source_ids),
+    )
+
+    print("=" * 50)
+    print(f"Corpus: {n} x {dims}, k={k}, block rows={block_rows(n, max_block_bytes)}")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    neighbors = compute_neighbors(matrix, k=k, max_block_bytes=max_block_bytes)
+    elapsed = time.perf_counter() - start
+
+    pairs = sum(len(entries) for entries in neighbors.values())
+    print(f"  Full recompute: {elapsed:.2f}s ({n / elapsed:.0f} icons/s, {pairs} neighbour rows)")
+    print(f"  Matrix: {vectors.nbytes / 1e6:.0f} MB, score block budget: {max_block_bytes / 1e6:.0f} MB")
+
+    # Incremental case: ~1% of embeddings changed
+    changed = rng.choice(n, size=max(1, n // 100), replace=False)
+    start = time.perf_counter()
+    compute_neighbors(matrix, np.sort(changed), k=k, max_block_bytes=max_block_bytes)
+    elapsed = time.perf_counter() - start
+    print(f"  {len(changed)} changed rows: {elapsed:.2f}s")
+
+
+def main():
+    import libsql_experimental as libsql
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Precompute related icons from embeddings")
+    parser.add_argument("--k", type=int, default=DEFAULT_K, help=f"Neighbours per kind (default: {DEFAULT_K})")
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Recompute every icon, not just those whose embedding changed",
+    )
+    parser.add_argument(
+        "--max-block-mb",
+        type=int,
+        default=DEFAULT_BLOCK_BYTES // (1024 * 1024),
+        help="Memory budget for each block of similarity scores (default: 64)",
+    )
+    parser.add_argument(
+        "--benchmark",
+        type=int,
+        metavar="N",
+        help="Benchmark on N random embeddings instead of touching the database",
+    )
+    parser.add_argument("--dims", type=int, default=1536, help="Embedding dimensions for --benchmark")
+    parser.add_argument("--db", type=Path, help="Use a local database file instead of TURSO_DATABASE_URL")
+    args = parser.parse_args()
+
+    max_block_bytes = args.max_block_mb * 1024 * 1024
+
+    if args.benchmark:
+        run_benchmark(args.benchmark, args.dims, args.k, max_block_bytes)
+        return
+
+    if args.db:
+        if not args.db.exists():
+            print(f"Error: {args.db} not found")
+            sys.exit(1)
+        turso_url, auth_token = str(args.db), ""
+    else:
+        load_dotenv(Path(__file__).parent.parent / ".env.local")
+
+        turso_url = os.environ.get("TURSO_DATABASE_URL")
+        auth_token = os.environ.get("TURSO_AUTH_TOKEN")
+
+        if not turso_url or not auth_token:
+            print("Error: TURSO_DATABASE_URL and TURSO_AUTH_TOKEN must be set (or pass --db)")
+            sys.exit(1)
+
+    conn = libsql.connect(turso_url, auth_token=auth_token)
+
+    print("\n" + "=" * 50)
+    print("Computing related icons...")
+    print("=" * 50)
+
+    total = update_related(conn, k=args.k, recompute=args.all, max_block_bytes=max_block_bytes)
+    print(f"\n✓ Updated related icons for {total} icons")
+
+
+if __name__ == "__main__":
+    main()
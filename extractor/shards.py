@@ -0,0 +1,240 @@
+"""Static JSON shard export for serving library browsing from a CDN."""
+import gzip
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from registry import IconRegistry
+
+try:
+    import brotli
+except ImportError:  # Optional: pip install brotli
+    brotli = None
+
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+
+def content_hash(data: bytes) -> str:
+    """Get the hex SHA-256 of serialized artifact bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def category_slug(category: str) -> str:
+    """Make a category name safe to use as a path segment."""
+    return re.sub(r"[^a-z0-9]+", "-", category.lower()).strip("-") or "uncategorized"
+
+
+def category_slugs(categories) -> dict[str, str]:
+    """
+    Map each category to a unique path segment.
+
+    Categories whose slugs collide (e.g. 'Arrows & Navigation' and
+    'arrows-navigation') each get a short hash of their name appended,
+    so their files never overwrite each other.
+    """
+    by_slug: dict[str, list[str]] = {}
+    for category in sorted(set(categories)):
+        by_slug.setdefault(category_slug(category), []).append(category)
+
+    slugs = {}
+    for slug, named in by_slug.items():
+        for category in named:
+            slugs[category] = slug if len(named) == 1 else f"{slug}-{content_hash(category.encode('utf-8'))[:8]}"
+    return slugs
+
+
+def write_atomic(path: Path, data: bytes):
+    """Write a file via rename so readers never see a partial artifact."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def load_manifest(out_dir: Path) -> dict:
+    """Load the manifest from a previous export, if any."""
+    manifest_path = out_dir / MANIFEST_NAME
+    if not manifest_path.exists():
+        return {}
+    try:
+        return json.loads(manifest_path.read_text())
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def dump_json(value) -> bytes:
+    """Serialize deterministically: sorted keys, no whitespace."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class ShardExporter:
+    """Writes each source, and each source x category, as static JSON shards.
+
+    Layout under the output directory:
+        {source}/all/{part}.json
+        {source}/categories/{category}/{part}.json
+        manifest.json
+
+    Category directories are slugs (see category_slugs); the manifest
+    records each shard's category name. Every shard gets a `.gz` sibling (and `.br` when brotli is installed).
+    Shards whose content hash matches the previous manifest are left
+    untouched so CDN caches stay warm across ingests.
+    """
+
+    DEFAULT_MAX_SHARD_BYTES = 512 * 1024  # Uncompressed; ~60-80 KB gzipped
+
+    def __init__(self, registry: IconRegistry, out_dir: Path, max_shard_bytes: int | None = None,
+                 use_brotli: bool = True):
+        self.registry = registry
+        self.out_dir = Path(out_dir)
+        self.max_shard_bytes = max_shard_bytes or self.DEFAULT_MAX_SHARD_BYTES
+        self.brotli_requested = use_brotli
+        self.use_brotli = use_brotli and brotli is not None
+
+    def split_parts(self, icons: list[dict]) -> list[list[dict]]:
+        """Split icons into consecutive parts that stay under the size budget.
+
+        A single icon larger than the budget still gets a part of its own.
+        """
+        parts: list[list[dict]] = []
+        current: list[dict] = []
+        current_bytes = 0
+
+        for icon in icons:
+            icon_bytes = len(dump_json(icon)) + 1  # Separator
+            if current and current_bytes + icon_bytes > self.max_shard_bytes:
+                parts.append(current)
+                current, current_bytes = [], 0
+            current.append(icon)
+            current_bytes += icon_bytes
+
+        if current:
+            parts.append(current)
+        return parts
+
+    def build_shards(self, source_id: str, icons: list[dict]) -> dict[str, dict]:
+        """Build shard payloads for one source. Returns {relative_path: shard}."""
+        groups: dict[str | None, list[dict]] = {None: icons}
+        for icon in icons:
+            if icon["category"]:
+                groups.setdefault(icon["category"], []).append(icon)
+
+        slugs = category_slugs(category for category in groups if category is not None)
+        shards = {}
+        for category in sorted(groups, key=lambda c: (c is not None, c or "")):
+            if category is None:
+                prefix = f"{source_id}/all"
+            else:
+                prefix = f"{source_id}/categories/{slugs[category]}"
+
+            parts = self.split_parts(groups[category])
+            for index, part in enumerate(parts):
+                shards[f"{prefix}/{index}.json"] = {
+                    "source": source_id,
+                    "category": category,
+                    "part": index,
+                    "parts": len(parts),
+                    "icons": part,
+                }
+        return shards
+
+    def _write_shard(self, rel_path: str, data: bytes, digest: str, previous: dict | None) -> dict:
+        """Write a shard and its compressed siblings unless they are unchanged."""
+        path = self.out_dir / rel_path
+        gz_path = path.with_name(path.name + ".gz")
+        br_path = path.with_name(path.name + ".br")
+
+        unchanged = (
+            previous is not None
+            and previous.get("sha256") == digest
+            and path.exists()
+            and gz_path.exists()
+            and (not self.use_brotli or br_path.exists())
+        )
+        if unchanged:
+            entry = dict(previous)
+            if not self.use_brotli:
+                entry.pop("brotliBytes", None)
+            return entry
+
+        # mtime=0 keeps the gzip bytes deterministic for identical input
+        gz_data = gzip.compress(data, compresslevel=9, mtime=0)
+        write_atomic(path, data)
+        write_atomic(gz_path, gz_data)
+
+        entry = {"sha256": digest, "bytes": len(data), "gzipBytes": len(gz_data)}
+        if self.use_brotli:
+            br_data = brotli.compress(data, quality=11)
+            write_atomic(br_path, br_data)
+            entry["brotliBytes"] = len(br_data)
+        elif br_path.exists():
+            br_path.unlink()
+        return entry
+
+    def export(self, source_ids: list[str] | None = None) -> dict:
+        """Export shards for the given sources (default: all) and write the manifest."""
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        previous_manifest = load_manifest(self.out_dir)
+        previous_shards = previous_manifest.get("shards", {})
+        # A different size budget re-partitions everything, so nothing is reusable
+        reusable = previous_shards if previous_manifest.get("maxShardBytes") == self.max_shard_bytes else {}
+
+        all_sources = self.registry.get_source_ids()
+        exported_sources = source_ids or all_sources
+        if previous_shards and not reusable:
+            exported_sources = all_sources
+
+        # Keep shards of sources we aren't re-exporting this run
+        shards_manifest = {
+            path: entry
+            for path, entry in reusable.items()
+            if entry.get("source") not in exported_sources and entry.get("source") in all_sources
+        }
+
+        written = 0
+        unchanged = 0
+        for source_id in exported_sources:
+            icons = self.registry.get_icons_for_export(source_id)
+            for rel_path, shard in self.build_shards(source_id, icons).items():
+                data = dump_json(shard)
+                digest = content_hash(data)
+                previous = reusable.get(rel_path)
+                entry = self._write_shard(rel_path, data, digest, previous)
+                if previous is not None and previous.get("sha256") == digest:
+                    unchanged += 1
+                else:
+                    written += 1
+                entry.update({
+                    "source": source_id,
+                    "category": shard["category"],
+                    "part": shard["part"],
+                    "icons": len(shard["icons"]),
+                })
+                shards_manifest[rel_path] = entry
+
+        # Remove shards that no longer exist (e.g. a category shrank by a part)
+        removed = 0
+        for rel_path in previous_shards:
+            if rel_path in shards_manifest:
+                continue
+            for suffix in ("", ".gz", ".br"):
+                stale = self.out_dir / (rel_path + suffix)
+                if stale.exists():
+                    stale.unlink()
+            removed += 1
+
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "maxShardBytes": self.max_shard_bytes,
+            "shards": dict(sorted(shards_manifest.items())),
+        }
+        write_atomic(self.out_dir / MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+
+        print(f"✓ Exported {len(shards_manifest)} shards to {self.out_dir} "
+              f"({written} written, {unchanged} unchanged, {removed} removed)")
+        if brotli is None and self.brotli_requested:
+            print("  (brotli not installed, skipped .br files)")
+        return manifest
@@ -0,0 +1,224 @@
+"""SVG sprite sheet generation per library and category."""
+import gzip
+import json
+from concurrent.futures import ThreadPoolExecutor
+from html import escape
+from pathlib import Path
+from registry import IconRegistry
+from shards import MANIFEST_NAME, category_slugs, content_hash, load_manifest, write_atomic
+
+
+INDEX_NAME = "index.json"
+MANIFEST_VERSION = 1
+
+
+def symbol_id(icon: dict) -> str:
+    """Get the <symbol> id for an icon, e.g. 'lucide-arrow-right'."""
+    return f"{icon['sourceId']}-{icon['normalizedName']}"
+
+
+def symbol_attributes(icon: dict) -> str:
+    """Rendering defaults for a symbol, matching getSvgAttributesRaw on the web side."""
+    attrs = [f'viewBox="{escape(icon["viewBox"])}"']
+
+    if icon["defaultFill"] and not icon["defaultStroke"]:
+        attrs.append('fill="currentColor"')
+    else:
+        try:
+            stroke_width = float(icon["strokeWidth"] or "2") or 2
+        except ValueError:
+            stroke_width = 2
+        attrs.extend([
+            'fill="none"',
+            'stroke="currentColor"',
+            f'stroke-width="{stroke_width:g}"',
+            'stroke-linecap="round"',
+            'stroke-linejoin="round"',
+        ])
+    return " ".join(attrs)
+
+
+def render_symbol(icon: dict) -> str:
+    """Render one icon as a <symbol> element."""
+    return f'<symbol id="{escape(symbol_id(icon))}" {symbol_attributes(icon)}>{icon["content"]}</symbol>'
+
+
+class SpriteBuilder:
+    """Builds <symbol> sprite sheets per source and per source x category.
+
+    Layout under the output directory:
+        {source}/all/{part}.svg
+        {source}/categories/{category}/{part}.svg
+        index.json      # icon id -> symbol id and sprite files
+        manifest.json   # sprite hashes and sizes
+
+    Category directories are named as for shards (see shards.category_slugs).
+    Sprites over the size budget are split into parts. Sprites whose hash
+    matches the previous manifest are not rewritten.
+    """
+
+    DEFAULT_MAX_SPRITE_BYTES = 256 * 1024
+
+    def __init__(self, registry: IconRegistry, out_dir: Path, max_sprite_bytes: int | None = None,
+                 workers: int | None = None):
+        self.registry = registry
+        self.out_dir = Path(out_dir)
+        self.max_sprite_bytes = max_sprite_bytes or self.DEFAULT_MAX_SPRITE_BYTES
+        self.workers = workers
+
+    def split_parts(self, symbols: list[tuple[dict, str]]) -> list[list[tuple[dict, str]]]:
+        """Split rendered symbols into parts that stay under the size budget."""
+        parts = []
+        current = []
+        current_bytes = 0
+
+        for icon, markup in symbols:
+            size = len(markup.encode("utf-8"))
+            if current and current_bytes + size > self.max_sprite_bytes:
+                parts.append(current)
+                current, current_bytes = [], 0
+            current.append((icon, markup))
+            current_bytes += size
+
+        if current:
+            parts.append(current)
+        return parts
+
+    def plan_sprites(self, source_id: str, icons: list[dict]) -> dict[str, dict]:
+        """Group a source's icons into sprites. Returns {relative_path: sprite}."""
+        symbols = [(icon, render_symbol(icon)) for icon in icons]
+
+        groups: dict[str | None, list[tuple[dict, str]]] = {None: symbols}
+        for icon, markup in symbols:
+            if icon["category"]:
+                groups.setdefault(icon["category"], []).append((icon, markup))
+
+        slugs = category_slugs(category for category in groups if category is not None)
+        sprites = {}
+        for category in sorted(groups, key=lambda c: (c is not None, c or "")):
+            if category is None:
+                prefix = f"{source_id}/all"
+            else:
+                prefix = f"{source_id}/categories/{slugs[category]}"
+
+            for index, part in enumerate(self.split_parts(groups[category])):
+                sprites[f"{prefix}/{index}.svg"] = {
+                    "source": source_id,
+                    "category": category,
+                    "part": index,
+                    "symbols": part,
+                }
+        return sprites
+
+    def _write_sprite(self, rel_path: str, sprite: dict, previous: dict | None) -> tuple[str, dict, bool]:
+        """Assemble, hash and (if changed) write one sprite. Runs on a worker thread."""
+        body = "".join(markup for _, markup in sprite["symbols"])
+        data = (
+            '<svg xmlns="http://www.w3.org/2000/svg" style="display:none">' + body + "</svg>\n"
+        ).encode("utf-8")
+        digest = content_hash(data)
+
+        path = self.out_dir / rel_path
+        gz_path = path.with_name(path.name + ".gz")
+        unchanged = (
+            previous is not None
+            and previous.get("sha256") == digest
+            and path.exists()
+            and gz_path.exists()
+        )
+
+        if unchanged:
+            gzip_bytes = previous["gzipBytes"]
+        else:
+            gz_data = gzip.compress(data, compresslevel=9, mtime=0)
+            write_atomic(path, data)
+            write_atomic(gz_path, gz_data)
+            gzip_bytes = len(gz_data)
+
+        entry = {
+            "sha256": digest,
+            "bytes": len(data),
+            "gzipBytes": gzip_bytes,
+            "source": sprite["source"],
+            "category": sprite["category"],
+            "part": sprite["part"],
+            "symbols": len(sprite["symbols"]),
+        }
+        return rel_path, entry, not unchanged
+
+    def build(self, source_ids: list[str] | None = None) -> dict:
+        """Build sprites for the given sources (default: all), then the index and manifest."""
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        previous_manifest = load_manifest(self.out_dir)
+        previous_sprites = previous_manifest.get("sprites", {})
+        # A different size budget re-partitions everything, so nothing is reusable
+        reusable = previous_sprites if previous_manifest.get("maxSpriteBytes") == self.max_sprite_bytes else {}
+
+        all_sources = self.registry.get_source_ids()
+        built_sources = source_ids or all_sources
+        if previous_sprites and not reusable:
+            built_sources = all_sources
+
+        planned = {}
+        for source_id in built_sources:
+            planned.update(self.plan_sprites(source_id, self.registry.get_icons_for_export(source_id)))
+
+        sprites_manifest = {
+            path: entry
+            for path, entry in reusable.items()
+            if entry.get("source") not in built_sources and entry.get("source") in all_sources
+        }
+
+        written = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [
+                pool.submit(self._write_sprite, rel_path, sprite, reusable.get(rel_path))
+                for rel_path, sprite in planned.items()
+            ]
+            for future in futures:
+                rel_path, entry, changed = future.result()
+                sprites_manifest[rel_path] = entry
+                written += changed
+
+        removed = 0
+        for rel_path in previous_sprites:
+            if rel_path in sprites_manifest:
+                continue
+            for suffix in ("", ".gz"):
+                stale = self.out_dir / (rel_path + suffix)
+                if stale.exists():
+                    stale.unlink()
+            removed += 1
+
+        # Index: icon id -> symbol id plus the source-wide and category sprites holding it
+        index = {}
+        index_path = self.out_dir / INDEX_NAME
+        if index_path.exists():
+            try:
+                index = {
+                    icon_id: entry
+                    for icon_id, entry in json.loads(index_path.read_text()).items()
+                    if icon_id.split(":", 1)[0] not in built_sources and icon_id.split(":", 1)[0] in all_sources
+                }
+            except (OSError, json.JSONDecodeError):
+                index = {}
+
+        for rel_path, sprite in planned.items():
+            key = "sprite" if sprite["category"] is None else "categorySprite"
+            for icon, _ in sprite["symbols"]:
+                entry = index.setdefault(icon["id"], {"symbol": symbol_id(icon)})
+                entry[key] = rel_path
+
+        write_atomic(index_path, json.dumps(dict(sorted(index.items())), sort_keys=True,
+                                            separators=(",", ":")).encode("utf-8"))
+
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "maxSpriteBytes": self.max_sprite_bytes,
+            "sprites": dict(sorted(sprites_manifest.items())),
+        }
+        write_atomic(self.out_dir / MANIFEST_NAME, json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+
+        print(f"✓ Built {len(sprites_manifest)} sprites in {self.out_dir} "
+              f"({written} written, {len(planned) - written} unchanged, {removed} removed)")
+        return manifest
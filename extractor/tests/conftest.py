@@ -0,0 +1,20 @@
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+DRIZZLE_DIR = Path(__file__).parent.parent.parent / "drizzle"
+
+
+@pytest.fixture
+def migrated_db():
+    """In-memory database with every drizzle migration applied, as the web app sees it."""
+    conn = sqlite3.connect(":memory:")
+    journal = json.loads((DRIZZLE_DIR / "meta" / "_journal.json").read_text())
+    for entry in journal["entries"]:
+        sql = (DRIZZLE_DIR / f"{entry['tag']}.sql").read_text()
+        for statement in sql.split("--> statement-breakpoint"):
+            conn.executescript(statement)
+    yield conn
+    conn.close()
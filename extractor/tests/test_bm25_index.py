@@ -0,0 +1,29 @@
+import json
+
+from bm25_index import BM25Index, build_index
+
+ICONS = [
+    ("lucide:arrow-right", "ArrowRight", "arrow-right", "arrows", json.dumps(["direction", "next"])),
+    ("lucide:arrow-left", "ArrowLeft", "arrow-left", "arrows", json.dumps(["direction", "back"])),
+    ("lucide:house", "House", "house", "buildings", json.dumps(["home"])),
+]
+
+
+def test_term_postings_stay_within_the_term(tmp_path):
+    build_index(ICONS, tmp_path)
+    index = BM25Index(tmp_path)
+
+    ends = [index.lookup(term)[1] for term in index.terms]
+    assert ends[-1] == len(index.postings)
+    assert ends[:-1] == [index.lookup(term)[0] for term in index.terms[1:]]
+
+    docs, counts = index.term_postings("arrow")
+    assert [index.ids[doc] for doc in docs] == ["lucide:arrow-left", "lucide:arrow-right"]
+    assert counts[:, 0].tolist() == [1, 1]
+    assert index.term_postings("missing") is None
+
+
+def test_search_ranks_name_matches(tmp_path):
+    build_index(ICONS, tmp_path)
+    index = BM25Index(tmp_path)
+    assert index.search("house")[0][0] == "lucide:house"
@@ -0,0 +1,36 @@
+import itertools
+
+import pytest
+from rapidfuzz import fuzz
+
+from clusters import BlockingIndex, ConceptEntry
+
+# Pairs at or just above the threshold that an invalid bound used to drop
+CLOSE_PAIRS = [
+    ("beer", "beater"), ("blocks", "lock"), ("cat", "at"), ("edit", "reddit"), ("filter", "file"),
+    ("fuel", "funnel"), ("goal", "global"), ("home", "chrome"), ("pin", "pi"), ("rat", "at"),
+    ("ship", "shrimp"), ("star", "stairs"), ("sun-medium", "sun-dim"), ("wheat", "heart"),
+]
+FILLER = [f"arrow-{direction}" for direction in ("up", "down", "left", "right", "up-right", "down-left")]
+
+
+def entries():
+    names = [a for a, _ in CLOSE_PAIRS] + FILLER
+    others = [b for _, b in CLOSE_PAIRS] + [f"{name}-circle" for name in FILLER]
+    return [ConceptEntry("lucide", name) for name in names] + [ConceptEntry("tabler", name) for name in others]
+
+
+@pytest.mark.parametrize("max_block_size", [500, 4])
+def test_blocking_keeps_every_pair_above_threshold(max_block_size):
+    entries_ = entries()
+    index = BlockingIndex(entries_, threshold=80, max_block_size=max_block_size)
+    candidates = {(a, b) for a in range(len(entries_)) for b in index.candidates(a)}
+
+    for a, b in itertools.combinations(range(len(entries_)), 2):
+        if entries_[a].source_id == entries_[b].source_id:
+            continue
+        if fuzz.ratio(entries_[a].name, entries_[b].name) < 80:
+            continue
+        shared = set(index.entry_qgrams[a]) & set(index.entry_qgrams[b])
+        if any(gram in index.postings for gram in shared):
+            assert (a, b) in candidates, (entries_[a].name, entries_[b].name)
@@ -0,0 +1,169 @@
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from embedding_client import EmbeddingAPIError, EmbeddingClient, StandInHandler, fake_embedding
+
+
+def make_handler(statuses=None, **attributes):
+    """StandInHandler subclass with its own request log and, optionally, scripted error statuses.
+
+    `statuses` maps (request number, texts) to the status to inject, or None to succeed.
+    """
+
+    class Handler(StandInHandler):
+        latency = 0.0
+        error_rate = 0.0
+        log: list[tuple[float, list[str]]] = []
+        in_flight = 0
+        peak_in_flight = 0
+        lock = threading.Lock()
+
+        def do_POST(self):
+            with self.lock:
+                type(self).in_flight += 1
+                type(self).peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                super().do_POST()
+            finally:
+                with self.lock:
+                    type(self).in_flight -= 1
+
+        def injected_status(self, texts):
+            with self.lock:
+                number = len(self.log)
+                self.log.append((time.monotonic(), texts))
+            if statuses is not None:
+                return statuses(number, texts)
+            return super().injected_status(texts)
+
+    for name, value in attributes.items():
+        setattr(Handler, name, value)
+    return Handler
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(handler):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def make_client(base_url, **options):
+    defaults = dict(
+        dimensions=StandInHandler.dimensions,
+        requests_per_minute=None,
+        tokens_per_minute=None,
+        backoff_base=0.01,
+        max_retries=3,
+    )
+    return EmbeddingClient("stand-in", base_url=base_url, **{**defaults, **options})
+
+
+def embed_everything(client, texts):
+    embeddings = [None] * len(texts)
+    failed = []
+    for result in client.embed_all(texts):
+        if result.error is not None:
+            failed.append(result)
+            continue
+        for index, embedding in zip(result.indices, result.embeddings):
+            embeddings[index] = embedding
+    return embeddings, failed
+
+
+def expected(texts):
+    return [fake_embedding(text, StandInHandler.dimensions) for text in texts]
+
+
+def test_batches_run_concurrently_up_to_the_limit(serve):
+    handler = make_handler(latency=0.1)
+    client = make_client(serve(handler), concurrency=4, max_batch_items=2)
+    texts = [f"icon {i}" for i in range(16)]
+
+    embeddings, failed = embed_everything(client, texts)
+
+    assert embeddings == expected(texts)
+    assert not failed
+    assert len(handler.log) == 8
+    assert 1 < handler.peak_in_flight <= 4
+
+
+def test_429_waits_for_retry_after(serve):
+    handler = make_handler(lambda number, texts: 429 if number == 0 else None, retry_after=0.3)
+    client = make_client(serve(handler), concurrency=1)
+    texts = ["arrow left", "arrow right"]
+
+    embeddings, failed = embed_everything(client, texts)
+
+    assert embeddings == expected(texts)
+    assert not failed
+    assert client.stats.retries == 1
+    (first, _), (second, _) = handler.log
+    assert second - first >= 0.3
+
+
+def test_5xx_is_retried(serve):
+    handler = make_handler(lambda number, texts: 503 if number < 2 else None)
+    client = make_client(serve(handler))
+    texts = ["home", "user", "settings"]
+
+    embeddings, failed = embed_everything(client, texts)
+
+    assert embeddings == expected(texts)
+    assert not failed
+    assert client.stats.retries == 2
+    assert client.stats.requests == 3
+
+
+def test_413_splits_the_batch(serve):
+    handler = make_handler(max_inputs=2)
+    client = make_client(serve(handler))
+    texts = [f"chart {i}" for i in range(8)]
+
+    embeddings, failed = embed_everything(client, texts)
+
+    assert embeddings == expected(texts)
+    assert not failed
+    assert client.stats.splits == 3  # 8 -> 4 + 4 -> 2 + 2 + 2 + 2
+    assert [len(sent) for _, sent in handler.log] == [2, 2, 2, 2]
+
+
+def test_failed_batches_are_reported_not_raised(serve):
+    poisoned = lambda number, texts: 400 if any("poison" in text for text in texts) else None
+    handler = make_handler(poisoned)
+    client = make_client(serve(handler), max_batch_items=2)
+    texts = ["cloud", "lock", "poison", "mail", "file", "chart"]
+
+    embeddings, failed = embed_everything(client, texts)
+
+    assert len(failed) == 1
+    assert failed[0].indices == [2, 3]
+    assert isinstance(failed[0].error, EmbeddingAPIError)
+    assert failed[0].error.status == 400
+    assert client.stats.failed_batches == 1
+    assert client.stats.retries == 0  # 400 is permanent
+    assert embeddings[:2] + embeddings[4:] == expected(texts[:2] + texts[4:])
+    assert embeddings[2:4] == [None, None]
+
+
+def test_exhausted_retries_fail_the_batch(serve):
+    handler = make_handler(lambda number, texts: 503)
+    client = make_client(serve(handler), max_retries=2)
+
+    embeddings, failed = embed_everything(client, ["mail"])
+
+    assert embeddings == [None]
+    assert failed[0].error.status == 503
+    assert client.stats.requests == 3
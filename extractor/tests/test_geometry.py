@@ -0,0 +1,17 @@
+from geometry import GridTransform
+
+
+def test_leading_relative_moveto_matches_absolute():
+    transform = GridTransform.for_view_box("0 0 48 24")
+    assert transform.path("M2 2l1 1", True) == "M1 7l0.5 0.5"
+    assert transform.path("m2 2l1 1", True) == "m1 7l0.5 0.5"
+
+
+def test_later_relative_moveto_is_only_scaled():
+    transform = GridTransform.for_view_box("0 0 48 24")
+    assert transform.path("M2 2m2 2", True) == "M1 7m1 1"
+
+
+def test_path_without_offset_only_scales():
+    transform = GridTransform.for_view_box("0 0 48 48")
+    assert transform.path("m2 2h4v-4", False) == "m1 1h2v-2"
@@ -0,0 +1,65 @@
+from mapper import IconMapper
+
+
+def add_icons(conn, *icon_ids):
+    rows = [(icon_id, *icon_id.split(":")) for icon_id in icon_ids]
+    conn.executemany(
+        "INSERT OR IGNORE INTO sources (id, name, version) VALUES (?, ?, '1')",
+        [(source_id, source_id) for _, source_id, _ in rows],
+    )
+    conn.executemany(
+        """
+        INSERT INTO icons (id, source_id, name, normalized_name, view_box, content)
+        VALUES (?, ?, ?, ?, '0 0 24 24', '')
+        """,
+        [(icon_id, source_id, name, name) for icon_id, source_id, name in rows],
+    )
+    conn.commit()
+
+
+def mapping(conn, lucide_id):
+    return conn.execute(
+        "SELECT phosphor_id, hugeicons_id, confidence, needs_review, reviewed, generation FROM mappings WHERE lucide_id = ?",
+        (lucide_id,),
+    ).fetchone()
+
+
+def make_mapper(conn):
+    mapper = IconMapper.__new__(IconMapper)
+    mapper.conn = conn
+    return mapper
+
+
+def test_incremental_run_leaves_reviewed_rows_alone(migrated_db):
+    add_icons(migrated_db, "lucide:sun-dim", "lucide:house", "phosphor:sun-dim", "phosphor:sun", "phosphor:house")
+    mapper = make_mapper(migrated_db)
+    mapper.incremental_map()
+    assert mapping(migrated_db, "lucide:sun-dim")[0] == "phosphor:sun-dim"
+
+    # A human prefers a different match and confirms it
+    migrated_db.execute("UPDATE mappings SET phosphor_id = 'phosphor:sun' WHERE lucide_id = 'lucide:sun-dim'")
+    assert mapper.mark_reviewed(["lucide:sun-dim", "lucide:missing"]) == 1
+    reviewed = mapping(migrated_db, "lucide:sun-dim")
+    assert reviewed[3:5] == (0, 1)
+
+    # New candidates for both rows: only the unreviewed one is recomputed
+    add_icons(migrated_db, "phosphor:sun-dims", "phosphor:houses", "hugeicons:sun-dim", "hugeicons:house")
+    stats = mapper.incremental_map()
+
+    assert mapping(migrated_db, "lucide:sun-dim") == reviewed
+    assert mapping(migrated_db, "lucide:house")[1] == "hugeicons:house"
+    assert stats["reviewed_kept"] == 1
+
+
+def test_removed_icons_never_delete_reviewed_rows(migrated_db):
+    add_icons(migrated_db, "lucide:sun-dim", "phosphor:sun-dim")
+    mapper = make_mapper(migrated_db)
+    mapper.incremental_map()
+    mapper.mark_reviewed(["lucide:sun-dim"])
+
+    migrated_db.execute("DELETE FROM icons WHERE id = 'phosphor:sun-dim'")
+    migrated_db.commit()
+    mapper.incremental_map()
+
+    phosphor_id, _, _, needs_review, reviewed, _ = mapping(migrated_db, "lucide:sun-dim")
+    assert (phosphor_id, needs_review, reviewed) == (None, 1, 1)
@@ -0,0 +1,119 @@
+import json
+import sqlite3
+
+import numpy as np
+import pytest
+
+from offline_catalog import (
+    POSTING_BITSET,
+    POSTING_LIST,
+    CatalogBudgetError,
+    CatalogReader,
+    build_catalog,
+    export_catalog,
+)
+
+ARROW_DIRECTIONS = ["up", "down", "left", "right", "up-left", "up-right", "down-left", "down-right",
+                    "big-up", "big-down", "big-left", "big-right", "up-down", "left-right"]
+
+
+def make_row(source_id, normalized_name, category=None, tags=(), view_box="0 0 24 24",
+             stroke=True, fill=False, stroke_width="2"):
+    name = "".join(part.capitalize() for part in normalized_name.split("-"))
+    content = f'<path d="M{len(normalized_name)} 2h4"/>'
+    return (f"{source_id}:{normalized_name}", source_id, name, normalized_name, category,
+            json.dumps(list(tags)) if tags else None, view_box, content, stroke, fill, stroke_width)
+
+
+ROWS = [
+    make_row("lucide", f"arrow-{direction}", "arrows", ["direction"]) for direction in ARROW_DIRECTIONS
+] + [
+    make_row("lucide", "house", "buildings", ["home", "living"]),
+    make_row("phosphor", "gear-six", None, view_box="0 0 256 256", stroke=False, fill=True, stroke_width=None),
+]
+ALIASES = {"cog": ["gear-six", "settings"]}
+SYNONYMS = {"residence": ["house"]}
+
+
+@pytest.fixture(scope="module")
+def reader():
+    return CatalogReader(build_catalog(ROWS, ALIASES, SYNONYMS))
+
+
+def icon_named(reader, normalized_name):
+    return next(i for i in range(reader.n_icons) if reader.icon(i)["normalizedName"] == normalized_name)
+
+
+def test_header_counts(reader):
+    assert reader.header["icons"] == len(ROWS)
+    assert reader.header["sources"] == ["lucide", "phosphor"]
+    assert reader.header["categories"] == ["arrows", "buildings"]
+
+
+def test_icons_round_trip(reader):
+    for row in ROWS:
+        icon_id, source_id, name, normalized_name, category, tags, view_box, content, stroke, fill, width = row
+        assert reader.icon(icon_named(reader, normalized_name)) == {
+            "id": icon_id,
+            "name": name,
+            "normalizedName": normalized_name,
+            "sourceId": source_id,
+            "viewBox": view_box,
+            "content": content,
+            "category": category,
+            "tags": json.loads(tags) if tags else [],
+            "strokeWidth": width,
+            "defaultStroke": stroke,
+            "defaultFill": fill,
+        }
+
+
+def test_names_and_aliases_resolve(reader):
+    house = icon_named(reader, "house")
+    gear = icon_named(reader, "gear-six")
+    assert [icon for icon, _ in reader.resolve("house")] == [house]
+    assert [icon for icon, _ in reader.resolve(" GearSix ")] == [gear]
+    assert [icon for icon, _ in reader.resolve("cog")] == [gear]
+    assert [icon for icon, _ in reader.resolve("residence")] == [house]
+    assert reader.resolve("missing") == []
+    assert reader.all_keys(reader.names) == sorted(reader.all_keys(reader.names))
+
+
+def test_postings_in_both_encodings(reader):
+    postings = np.frombuffer(reader.sections["terms.postings"], dtype=np.uint8)
+    offsets = reader.terms["offsets"]
+
+    arrow = reader.find(reader.terms, "arrow")
+    living = reader.find(reader.terms, "living")
+    assert postings[offsets[arrow]] == POSTING_BITSET
+    assert postings[offsets[living]] == POSTING_LIST
+
+    arrows = sorted(icon_named(reader, f"arrow-{direction}") for direction in ARROW_DIRECTIONS)
+    assert reader.posting(arrow).tolist() == arrows
+    assert reader.posting(living).tolist() == [icon_named(reader, "house")]
+
+
+def test_search(reader):
+    assert reader.search("arrow right", k=3)[0] == icon_named(reader, "arrow-right")
+    assert set(reader.search("arr", k=50)) == {icon_named(reader, f"arrow-{d}") for d in ARROW_DIRECTIONS}
+    assert reader.search("nothing here") == []
+
+
+def test_budget(tmp_path):
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        """
+        CREATE TABLE icons (id, source_id, name, normalized_name, category, tags, view_box, content,
+                            default_stroke, default_fill, stroke_width)
+        """
+    )
+    conn.executemany("INSERT INTO icons VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", ROWS)
+    path = tmp_path / "catalog.unicat"
+
+    with pytest.raises(CatalogBudgetError):
+        export_catalog(conn, path, max_bytes=1024)
+    assert not path.exists()
+
+    written = export_catalog(conn, path, max_bytes=None)
+    assert path.stat().st_size == written["bytes"]
+    assert CatalogReader.open(path).header["icons"] == len(ROWS)
@@ -0,0 +1,25 @@
+from shards import ShardExporter, category_slugs
+
+
+def make_icon(name, category):
+    return {"id": f"lucide:{name}", "normalizedName": name, "category": category}
+
+
+def test_colliding_category_slugs_get_distinct_paths():
+    slugs = category_slugs(["Arrows & Navigation", "arrows-navigation", "Files"])
+    assert slugs["Files"] == "files"
+    assert slugs["Arrows & Navigation"] != slugs["arrows-navigation"]
+    assert all(slug.startswith("arrows-navigation-") for category, slug in slugs.items() if category != "Files")
+
+
+def test_build_shards_keeps_every_category(tmp_path):
+    icons = [
+        make_icon("arrow-left", "Arrows & Navigation"),
+        make_icon("arrow-right", "arrows-navigation"),
+        make_icon("file", "Files"),
+    ]
+    shards = ShardExporter(None, tmp_path).build_shards("lucide", icons)
+
+    categories = [shard["category"] for path, shard in shards.items() if "/categories/" in path]
+    assert sorted(categories) == ["Arrows & Navigation", "Files", "arrows-navigation"]
+    assert "lucide/categories/files/0.json" in shards
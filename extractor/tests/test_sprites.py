@@ -0,0 +1,17 @@
+from sprites import SpriteBuilder
+
+
+def make_icon(name, category):
+    return {
+        "id": f"lucide:{name}", "sourceId": "lucide", "normalizedName": name, "category": category,
+        "viewBox": "0 0 24 24", "content": '<path d="M4 12h16"/>',
+        "strokeWidth": "2", "defaultStroke": True, "defaultFill": False,
+    }
+
+
+def test_plan_sprites_keeps_every_category(tmp_path):
+    icons = [make_icon("arrow-left", "Arrows & Navigation"), make_icon("arrow-right", "arrows-navigation")]
+    sprites = SpriteBuilder(None, tmp_path).plan_sprites("lucide", icons)
+
+    categories = [sprite["category"] for path, sprite in sprites.items() if "/categories/" in path]
+    assert sorted(categories) == ["Arrows & Navigation", "arrows-navigation"]
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Standalone IVF vector index over icon embeddings.
+
+The index is a directory of plain files that a search service can load
+in milliseconds, with the matrix memory-mapped rather than read:
+
+    vectors.npy       (n, dims) float32, unit-length, grouped by list
+    ids.json          icon id of each row
+    centroids.npy     (nlist, dims) float32 k-means centroids
+    offsets.npy       (nlist + 1,) int64; list i is rows offsets[i]:offsets[i+1]
+    manifest.json     counts, dimensions, model, build time
+
+Rows are stored in posting-list order, so each inverted list is one
+contiguous slice of the matrix and probing it is a single matmul over
+mapped pages. Centroids come from spherical k-means in NumPy.
+
+Usage:
+    python vector_index.py --build                  # Export from the database
+    python vector_index.py --build --db ../icons.db # From a local database file
+    python vector_index.py --evaluate               # Recall and latency per nprobe
+    python vector_index.py --query lucide:arrow-left --nprobe 16
+    python vector_index.py --benchmark 45000        # Synthetic corpus, no database
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+from pathlib import Path
+import numpy as np
+from related import load_embeddings, normalize_rows, top_k
+
+
+DEFAULT_INDEX_DIR = Path(__file__).parent / ".cache" / "vector-index"
+DEFAULT_NPROBE = 8
+TRAINING_POINTS_PER_LIST = 256
+ASSIGN_BLOCK_ROWS = 4096
+
+
+def default_nlist(n: int) -> int:
+    """About sqrt(n) lists: ~sqrt(n) rows each, so probing a few is sub-linear."""
+    return max(1, min(n, int(round(np.sqrt(n)))))
+
+
+def assign_lists(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Nearest centroid (by inner product) for each row."""
+    assignments = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), ASSIGN_BLOCK_ROWS):
+        block = vectors[start : start + ASSIGN_BLOCK_ROWS]
+        assignments[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assignments
+
+
+def train_centroids(vectors: np.ndarray, nlist: int, iterations: int = 10, seed: int = 0) -> np.ndarray:
+    """
+    Spherical k-means on a sample of at most TRAINING_POINTS_PER_LIST rows per list.
+
+    Empty lists are reseeded with the sample points their centroid
+    serves worst, so every list ends up used.
+    """
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), nlist * TRAINING_POINTS_PER_LIST)
+    sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))], dtype=np.float32)
+    centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignments = assign_lists(sample, centroids)
+        order = np.argsort(assignments, kind="stable")
+        counts = np.bincount(assignments, minlength=nlist)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+        sums = np.zeros_like(centroids)
+        used = counts > 0
+        sums[used] = np.add.reduceat(sample[order], starts[used], axis=0)
+        empty = np.flatnonzero(~used)
+        if len(empty):
+            fit = np.einsum("ij,ij->i", sample, centroids[assignments])
+            sums[empty] = sample[np.argsort(fit)[: len(empty)]]
+        centroids = normalize_rows(sums)
+
+    return centroids
+
+
+def build_index(ids: list[str], vectors: np.ndarray, out_dir: Path, nlist: int | None = None,
+                iterations: int = 10, model: str | None = None, seed: int = 0) -> dict:
+    """
+    Train an IVF index over unit-length `vectors` and write it to `out_dir`.
+
+    Files are written to a sibling directory first and swapped in, so a
+    reader never sees a half-written index. Returns the manifest.
+    """
+    n, dims = vectors.shape
+    nlist = default_nlist(n) if nlist is None else max(1, min(nlist, n))
+    centroids = train_centroids(vectors, nlist, iterations, seed)
+    assignments = assign_lists(vectors, centroids)
+
+    order = np.argsort(assignments, kind="stable")
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(assignments, minlength=nlist))]).astype(np.int64)
+    sizes = np.diff(offsets)
+
+    manifest = {
+        "count": n,
+        "dimensions": dims,
+        "nlist": nlist,
+        "metric": "cosine",
+        "model": model,
+        "largest_list": int(sizes.max()) if n else 0,
+        "built_at": int(time.time()),
+    }
+
+    staging = out_dir.with_name(out_dir.name + ".tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    np.save(staging / "vectors.npy", np.ascontiguousarray(vectors[order], dtype=np.float32))
+    np.save(staging / "centroids.npy", centroids.astype(np.float32))
+    np.save(staging / "offsets.npy", offsets)
+    (staging / "ids.json").write_text(json.dumps([ids[row] for row in order]))
+    (staging / "manifest.json").write_text(json.dumps(manifest, indent=2))
+
+    previous = out_dir.with_name(out_dir.name + ".old")
+    shutil.rmtree(previous, ignore_errors=True)
+    if out_dir.exists():
+        out_dir.rename(previous)
+    staging.rename(out_dir)
+    shutil.rmtree(previous, ignore_errors=True)
+    return manifest
+
+
+def export_index(conn, out_dir: Path = DEFAULT_INDEX_DIR, nlist: int | None = None, model: str | None = None,
+                 model_dimensions: int | None = None) -> dict:
+    """
+    Build the index from every embedding in the database.
+
+    Stored embeddings don't record their model, so `model` is only
+    written to the manifest when the vectors have `model_dimensions`.
+    """
+    matrix = load_embeddings(conn)
+    if not matrix.ids:
+        raise ValueError("no embeddings to index")
+    if model_dimensions is not None and matrix.vectors.shape[1] != model_dimensions:
+        model = None
+    return build_index(matrix.ids, matrix.vectors, out_dir, nlist=nlist, model=model)
+
+
+class VectorIndex:
+    """Read side of an exported index; the matrix stays memory-mapped."""
+
+    def __init__(self, path: Path = DEFAULT_INDEX_DIR):
+        path = Path(path)
+        self.manifest = json.loads((path / "manifest.json").read_text())
+        self.vectors = np.load(path / "vectors.npy", mmap_mode="r")
+        self.centroids = np.load(path / "centroids.npy")
+        self.offsets = np.load(path / "offsets.npy")
+        self.ids: list[str] = json.loads((path / "ids.json").read_text())
+        self._row_of: dict[str, int] | None = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def vector(self, icon_id: str) -> np.ndarray:
+        """Stored vector of an indexed icon (KeyError if absent)."""
+        if self._row_of is None:
+            self._row_of = {icon_id: row for row, icon_id in enumerate(self.ids)}
+        return np.array(self.vectors[self._row_of[icon_id]])
+
+    def search(self, queries: np.ndarray, k: int = 10, nprobe: int = DEFAULT_NPROBE,
+               exact: bool = False) -> list[list[tuple[str, float]]]:
+        """
+        Top-k (icon_id, cosine) per query, best first.
+
+        Probes the `nprobe` lists whose centroids are closest to each
+        query; `exact=True` scans every row instead (for validation).
+        """
+        return [
+            [(self.ids[row], score) for row, score in zip(rows.tolist(), scores.tolist())]
+            for rows, scores in self.search_rows(queries, k, nprobe, exact)
+        ]
+
+    def search_rows(self, queries: np.ndarray, k: int = 10, nprobe: int = DEFAULT_NPROBE,
+                    exact: bool = False) -> list[tuple[np.ndarray, np.ndarray]]:
+        """Like search(), returning (rows, scores) arrays per query."""
+        queries = normalize_rows(np.atleast_2d(np.array(queries, dtype=np.float32)))
+        if exact:
+            scores = queries @ self.vectors.T
+            rows, top_scores = top_k(scores, k)
+            return list(zip(rows, top_scores))
+
+        nprobe = min(nprobe, len(self.centroids))
+        probes, _ = top_k(queries @ self.centroids.T, nprobe)
+        results = []
+        for query, lists in zip(queries, probes):
+            ranges = [(self.offsets[i], self.offsets[i + 1]) for i in lists.tolist()]
+            candidates = np.concatenate([np.arange(start, end) for start, end in ranges])
+            scores = np.concatenate([self.vectors[start:end] @ query for start, end in ranges])
+            best, best_scores = top_k(scores[None, :], k)
+            results.append((candidates[best[0]], best_scores[0]))
+        return results
+
+    def scanned_fraction(self, queries: np.ndarray, nprobe: int) -> float:
+        """Mean share of rows scored per query at this nprobe."""
+        queries = normalize_rows(np.atleast_2d(np.array(queries, dtype=np.float32)))
+        probes, _ = top_k(queries @ self.centroids.T, min(nprobe, len(self.centroids)))
+        sizes = np.diff(self.offsets)
+        return float(sizes[probes].sum(axis=1).mean()) / max(1, len(self.ids))
+
+
+def evaluate(index: VectorIndex, query_count: int = 500, k: int = 10,
+             nprobes: tuple[int, ...] = (1, 2, 4, 8, 16, 32), seed: int = 0) -> list[dict]:
+    """
+    Recall@k against exact search, per-query latency and rows scanned per nprobe.
+
+    Queries are sampled indexed vectors. A result counts as a hit when its
+    exact score reaches the exact k-th best, so ties don't count as misses.
+    """
+    rng = np.random.default_rng(seed)
+    rows = np.sort(rng.choice(len(index), size=min(query_count, len(index)), replace=False))
+    queries = np.array(index.vectors[rows])
+
+    # One query at a time for every mode, as a search service would see them
+    start = time.perf_counter()
+    truth = [index.search_rows(query, k, exact=True)[0] for query in queries]
+    exact_ms = (time.perf_counter() - start) * 1000 / len(rows)
+    kth_best = np.array([scores[-1] for _, scores in truth]) - 1e-6
+
+    results = [{"nprobe": "exact", "recall": 1.0, "ms_per_query": exact_ms, "scanned": 1.0}]
+    for nprobe in nprobes:
+        if nprobe > len(index.centroids):
+            break
+        start = time.perf_counter()
+        found = [index.search_rows(query, k, nprobe)[0] for query in queries]
+        elapsed = time.perf_counter() - start
+
+        hits = [
+            np.count_nonzero(found_scores >= kth_best[i]) / len(truth[i][0])
+            for i, (_, found_scores) in enumerate(found)
+        ]
+        results.append({
+            "nprobe": nprobe,
+            "recall": float(np.mean(hits)),
+            "ms_per_query": elapsed * 1000 / len(rows),
+            "scanned": index.scanned_fraction(queries, nprobe),
+        })
+    return results
+
+
+def print_evaluation(index: VectorIndex, query_count: int, k: int):
+    manifest = index.manifest
+    print(f"  {manifest['count']} vectors x {manifest['dimensions']}d, {manifest['nlist']} lists "
+          f"(largest {manifest['largest_list']})")
+    print(f"  {'nprobe':>6} {'R@' + str(k):>7} {'ms/query':>9} {'scanned':>8}")
+    for result in evaluate(index, query_count, k):
+        print(f"  {result['nprobe']:>6} {result['recall']:>7.3f} {result['ms_per_query']:>9.3f} "
+              f"{result['scanned']:>7.1%}")
+
+
+def run_benchmark(n: int, dims: int, k: int, out_dir: Path, seed: int = 0):
+    """Build, load and evaluate an index over a clustered synthetic corpus."""
+    rng = np.random.default_rng(seed)
+    topics = normalize_rows(rng.standard_normal((max(1, n // 50), dims), dtype=np.float32))
+    vectors = topics[rng.integers(0, len(topics), n)] + 1.2 * rng.standard_normal((n, dims), dtype=np.float32) / np.sqrt(dims)
+    vectors = normalize_rows(vectors.astype(np.float32))
+    ids = [f"synthetic:{i}" for i in range(n)]
+
+    print("=" * 50)
+    print(f"Synthetic corpus: {n} x {dims}")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    build_index(ids, vectors, out_dir)
+    print(f"  Build: {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    index = VectorIndex(out_dir)
+    print(f"  Load:  {(time.perf_counter() - start) * 1000:.1f}ms")
+    print_evaluation(index, 500, k)
+
+
+def main():
+    import libsql_experimental as libsql
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Export and query the IVF vector index")
+    parser.add_argument("--index", type=Path, default=DEFAULT_INDEX_DIR,
+                        help="Index directory (default: extractor/.cache/vector-index)")
+    parser.add_argument("--build", action="store_true", help="Export the index from the database")
+    parser.add_argument("--nlist", type=int, help="Inverted lists (default: ~sqrt(icons))")
+    parser.add_argument("--evaluate", action="store_true", help="Recall vs exact search for several nprobe values")
+    parser.add_argument("--query", metavar="ICON_ID", help="Show the nearest neighbours of an indexed icon")
+    parser.add_argument("--nprobe", type=int, default=DEFAULT_NPROBE,
+                        help=f"Lists probed per query (default: {DEFAULT_NPROBE})")
+    parser.add_argument("--exact", action="store_true", help="Brute-force --query instead of probing lists")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours per query (default: 10)")
+    parser.add_argument("--queries", type=int, default=500, help="Sampled queries for --evaluate")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="Synthetic corpus of N vectors, no database")
+    parser.add_argument("--dims", type=int, default=1536, help="Dimensions for --benchmark")
+    parser.add_argument("--db", type=Path, help="Use a local database file instead of TURSO_DATABASE_URL")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark(args.benchmark, args.dims, args.k, args.index)
+        return
+
+    if args.build:
+        if args.db:
+            if not args.db.exists():
+                print(f"Error: {args.db} not found")
+                sys.exit(1)
+            turso_url, auth_token = str(args.db), ""
+        else:
+            load_dotenv(Path(__file__).parent.parent / ".env.local")
+
+            turso_url = os.environ.get("TURSO_DATABASE_URL")
+            auth_token = os.environ.get("TURSO_AUTH_TOKEN")
+
+            if not turso_url or not auth_token:
+                print("Error: TURSO_DATABASE_URL and TURSO_AUTH_TOKEN must be set (or pass --db)")
+                sys.exit(1)
+
+        conn = libsql.connect(turso_url, auth_token=auth_token)
+        start = time.perf_counter()
+        manifest = export_index(conn, args.index, nlist=args.nlist)
+        print(f"✓ Indexed {manifest['count']} embeddings in {manifest['nlist']} lists "
+              f"({time.perf_counter() - start:.1f}s): {args.index}")
+
+    if not args.index.exists():
+        if args.evaluate or args.query:
+            print(f"Error: no index at {args.index} (run with --build)")
+            sys.exit(1)
+        return
+
+    start = time.perf_counter()
+    index = VectorIndex(args.index)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    if args.evaluate:
+        print("\n" + "=" * 50)
+        print(f"IVF index (loaded in {load_ms:.1f}ms)")
+        print("=" * 50)
+        print_evaluation(index, args.queries, args.k)
+
+    if args.query:
+        try:
+            query = index.vector(args.query)
+        except KeyError:
+            print(f"Error: {args.query} is not in the index")
+            sys.exit(1)
+        mode = "exact" if args.exact else f"nprobe={args.nprobe}"
+        print(f"\nNearest to {args.query} ({mode}):")
+        for icon_id, score in index.search(query, args.k + 1, args.nprobe, args.exact)[0]:
+            if icon_id != args.query:
+                print(f"  {score:.3f}  {icon_id}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,56 +2,33 @@
  * Cache warming script for post-deployment
  *
  * Warms both edge cache (HTTP) and serverless instance cache by making
- * requests to the most popular search queries.
+ * requests to the most popular search queries (src/lib/warm-queries.json).
  *
  * Usage:
  *   tsx scripts/warm-cache.ts
  *   tsx scripts/warm-cache.ts --url https://unicon.sh
  */
 
-const POPULAR_QUERIES = [
-  "home",
-  "user",
-  "settings",
-  "search",
-  "notification",
-  "menu",
-  "close",
-  "check",
-  "arrow",
-  "heart",
-  "star",
-  "upload",
-  "download",
-  "edit",
-  "delete",
-  "calendar",
-  "mail",
-  "phone",
-  "location",
-  "lock",
-  "share",
-  "copy",
-  "file",
-  "folder",
-  "image",
-  "video",
-  "play",
-  "pause",
-  "stop",
-  "refresh",
-];
+import warmList from "../src/lib/warm-queries.json";
+
+/**
+ * Hottest queries, generated from search analytics by
+ * extractor/precompute_results.py (hottest first).
+ */
+const WARM_QUERIES: { query: string; source: string | null }[] = warmList.queries;
 
 async function warmCache(baseUrl: string) {
   console.log(`🔥 Warming cache for ${baseUrl}...`);
-  console.log(`   Queries: ${POPULAR_QUERIES.length}`);
+  console.log(`   Queries: ${WARM_QUERIES.length}`);
   console.log();
 
   let successCount = 0;
   let errorCount = 0;
 
-  for (const query of POPULAR_QUERIES) {
-    const url = `${baseUrl}/api/icons?q=${encodeURIComponent(query)}&limit=20`;
+  for (const { query, source } of WARM_QUERIES) {
+    const sourceParam = source ? `&source=${encodeURIComponent(source)}` : "";
+    const url = `${baseUrl}/api/icons?q=${encodeURIComponent(query)}${sourceParam}&limit=20`;
+    const label = source ? `${query} [${source}]` : query;
 
     try {
       const startTime = Date.now();
@@ -60,14 +37,14 @@ async function warmCache(baseUrl: string) {
 
       if (response.ok) {
         const data = await response.json();
-        console.log(`✓ ${query.padEnd(15)} ${duration}ms (${data.icons?.length || 0} icons, ${data.searchType})`);
+        console.log(`✓ ${label.padEnd(15)} ${duration}ms (${data.icons?.length || 0} icons, ${data.searchType})`);
         successCount++;
       } else {
-        console.log(`✗ ${query.padEnd(15)} HTTP ${response.status}`);
+        console.log(`✗ ${label.padEnd(15)} HTTP ${response.status}`);
         errorCount++;
       }
     } catch (error) {
-      console.log(`✗ ${query.padEnd(15)} ${error instanceof Error ? error.message : 'Error'}`);
+      console.log(`✗ ${label.padEnd(15)} ${error instanceof Error ? error.message : 'Error'}`);
       errorCount++;
     }
 
@@ -77,7 +54,7 @@ async function warmCache(baseUrl: string) {
 
   console.log();
   console.log(`✅ Cache warming complete`);
-  console.log(`   Success: ${successCount}/${POPULAR_QUERIES.length}`);
+  console.log(`   Success: ${successCount}/${WARM_QUERIES.length}`);
   console.log(`   Errors: ${errorCount}`);
 
   if (errorCount > 0) {
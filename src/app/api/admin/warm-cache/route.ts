@@ -1,36 +1,15 @@
 import { NextRequest, NextResponse } from "next/server";
 import { getEmbedding, embeddingToVectorString, setCachedSearchResults, generateSearchCacheKey } from "@/lib/ai";
-import { db } from "@/lib/db";
-import { sql } from "drizzle-orm";
 import type { IconData } from "@/types/icon";
 import { logger } from "@/lib/logger";
+import { nearestIcons } from "@/lib/vector-search";
+import warmList from "@/lib/warm-queries.json";
 
 /**
- * Popular search queries to pre-warm the cache.
- * These are common icon searches that benefit most from caching.
+ * Hottest search queries (and their source filter) to pre-warm the cache,
+ * generated from search analytics by extractor/precompute_results.py.
  */
-const POPULAR_QUERIES = [
-  "home",
-  "user",
-  "settings",
-  "search",
-  "notification",
-  "menu",
-  "close",
-  "check",
-  "arrow",
-  "heart",
-  "star",
-  "upload",
-  "download",
-  "edit",
-  "delete",
-  "calendar",
-  "mail",
-  "phone",
-  "location",
-  "lock",
-];
+const WARM_QUERIES: { query: string; source: string | null }[] = warmList.queries;
 
 /**
  * POST /api/admin/warm-cache
@@ -55,10 +34,10 @@ export async function POST(request: NextRequest) {
     const { searchParams } = new URL(request.url);
     const customQueries = searchParams.get("queries");
 
-    // Use custom queries if provided, otherwise use popular queries
+    // Use custom queries if provided, otherwise use the generated warm list
     const queries = customQueries
-      ? customQueries.split(",").map(q => q.trim()).filter(Boolean)
-      : POPULAR_QUERIES;
+      ? customQueries.split(",").map(q => q.trim()).filter(Boolean).map(query => ({ query, source: null }))
+      : WARM_QUERIES;
 
     logger.log(`Warming cache for ${queries.length} queries...`);
 
@@ -66,28 +45,18 @@ export async function POST(request: NextRequest) {
     const limit = 50; // Cache first 50 results for each query
     const offset = 0;
 
-    for (const query of queries) {
+    for (const { query, source } of queries) {
+      const sourceId = source ?? undefined;
       try {
         // Generate embedding for the query
         const embedding = await getEmbedding(query);
         const vectorString = embeddingToVectorString(embedding);
 
         // Fetch results from database (same logic as aiSemanticSearch)
-        const semanticResults = await db.all(sql`
-          SELECT
-            id, name, normalized_name as normalizedName, source_id as sourceId,
-            category, tags, view_box as viewBox, content, path_data as pathData,
-            default_stroke as defaultStroke, default_fill as defaultFill,
-            stroke_width as strokeWidth, brand_color as brandColor,
-            vector_distance_cos(embedding, vector32(${vectorString})) as distance
-          FROM icons
-          WHERE embedding IS NOT NULL
-          ORDER BY distance ASC
-          LIMIT ${limit} OFFSET ${offset}
-        `);
+        const semanticResults = await nearestIcons(vectorString, { sourceId, limit, offset });
 
         // Convert to IconData format
-        const icons: IconData[] = (semanticResults as Array<Record<string, unknown>>).map((row) => {
+        const icons: IconData[] = semanticResults.map((row) => {
           let tags: string[];
           try {
             tags = typeof row.tags === "string" ? JSON.parse(row.tags) : (row.tags ?? []);
@@ -120,7 +89,7 @@ export async function POST(request: NextRequest) {
         });
 
         // Cache the results
-        const cacheKey = generateSearchCacheKey({ query, limit, offset });
+        const cacheKey = generateSearchCacheKey({ query, ...(sourceId ? { sourceId } : {}), limit, offset });
         setCachedSearchResults(cacheKey, {
           icons,
           searchType: "semantic",
@@ -160,7 +129,8 @@ export async function POST(request: NextRequest) {
  */
 export async function GET() {
   return NextResponse.json({
-    popularQueries: POPULAR_QUERIES,
-    count: POPULAR_QUERIES.length,
+    popularQueries: WARM_QUERIES,
+    count: WARM_QUERIES.length,
+    generatedAt: warmList.generatedAt,
   });
 }
@@ -0,0 +1,35 @@
+import { NextRequest, NextResponse } from "next/server";
+import { getAutocompleteSuggestions } from "@/lib/queries";
+import { logger } from "@/lib/logger";
+
+/** Most suggestions returned per request */
+const MAX_SUGGESTIONS = 50;
+
+/**
+ * GET /api/autocomplete?q=arr&limit=10
+ *
+ * Type-ahead suggestions from the tables materialized at ingest
+ * (extractor/autocomplete.py): one indexed range read per request.
+ */
+export async function GET(request: NextRequest) {
+  const { searchParams } = new URL(request.url);
+  const query = searchParams.get("q") ?? "";
+  const limit = Math.min(Math.max(parseInt(searchParams.get("limit") ?? "10", 10) || 10, 1), MAX_SUGGESTIONS);
+
+  try {
+    const suggestions = await getAutocompleteSuggestions(query, limit);
+
+    return NextResponse.json(
+      { suggestions },
+      {
+        headers: {
+          // Suggestions only change when the extractor re-syncs the tables
+          "Cache-Control": "public, s-maxage=3600, stale-while-revalidate=86400",
+        },
+      }
+    );
+  } catch (error) {
+    logger.error("Error fetching autocomplete suggestions:", error);
+    return NextResponse.json({ error: "Failed to fetch suggestions" }, { status: 500 });
+  }
+}
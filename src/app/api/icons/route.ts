@@ -1,30 +1,11 @@
 import { NextRequest, NextResponse } from "next/server";
-import { searchIcons, getIconsByNames } from "@/lib/queries";
-import { db } from "@/lib/db";
+import { searchIcons, getIconsByNames, getPrecomputedResults } from "@/lib/queries";
 import { getEmbedding, embeddingToVectorString, expandQueryWithAI, generateSearchCacheKey, getCachedSearchResults, setCachedSearchResults } from "@/lib/ai";
-import { sql } from "drizzle-orm";
 import type { IconData } from "@/types/icon";
 import { logger } from "@/lib/logger";
+import { nearestIcons } from "@/lib/vector-search";
 import { logSearch } from "@/lib/analytics";
 
-/** Row type for vector search results */
-interface VectorSearchRow {
-  id: string;
-  name: string;
-  normalizedName: string;
-  sourceId: string;
-  category: string | null;
-  tags: string | string[] | null;
-  viewBox: string;
-  content: string;
-  pathData: string | null;
-  defaultStroke: number | boolean | null;
-  defaultFill: number | boolean | null;
-  strokeWidth: string | null;
-  brandColor: string | null;
-  distance: number;
-}
-
 export async function GET(request: NextRequest) {
   const startTime = Date.now();
   const { searchParams } = new URL(request.url);
@@ -32,17 +13,18 @@ export async function GET(request: NextRequest) {
   const queryParam = searchParams.get("q");
   const sourceParam = searchParams.get("source");
   const categoryParam = searchParams.get("category");
-  const namesParam = searchParams.get("names"); // Comma-separated list of exact names
+  const namesParam = searchParams.get("names"); // Comma-separated list of icon names
   const limit = parseInt(searchParams.get("limit") ?? "100", 10);
   const offset = parseInt(searchParams.get("offset") ?? "0", 10);
   const useAI = searchParams.get("ai") !== "false"; // AI search enabled by default
 
   try {
-    // If names parameter is provided, fetch icons by exact name match
+    // If names parameter is provided, resolve icons by name (exact, PascalCase, alias or synonym)
     if (namesParam) {
       const names = namesParam.split(",").map((n) => n.trim()).filter(Boolean);
-      const icons = await getIconsByNames(names);
-      
+      // One entry per icon, even when several requested names resolve to it
+      const icons = [...new Map((await getIconsByNames(names)).map((icon) => [icon.id, icon])).values()];
+
       return NextResponse.json(
         { icons, hasMore: false, searchType: "exact" },
         {
@@ -52,6 +34,43 @@ export async function GET(request: NextRequest) {
         }
       );
     }
+    // Hot queries are precomputed offline from search analytics (extractor/precompute_results.py).
+    // Only serve rows computed the way the live request would be: semantic for AI search, text
+    // otherwise. Semantic rows embed the raw query, so they are skipped while the live search
+    // embeds the AI-expanded query instead.
+    const liveSearchType = useAI && queryParam && queryParam.trim().length >= 3 ? "semantic" : "text";
+    const precomputable = liveSearchType === "text" || !process.env.ANTHROPIC_API_KEY;
+    if (queryParam && queryParam.trim() && precomputable && (!categoryParam || categoryParam === "all")) {
+      const sourceFilter = sourceParam && sourceParam !== "all" ? sourceParam : undefined;
+      const precomputed = await getPrecomputedResults({
+        query: queryParam,
+        sourceId: sourceFilter,
+        limit: Math.min(limit, 320),
+        offset,
+      });
+
+      if (precomputed && precomputed.searchType === liveSearchType) {
+        await logSearch({
+          query: queryParam.trim(),
+          searchType: precomputed.searchType as "semantic" | "text",
+          sourceFilter,
+          resultCount: precomputed.icons.length,
+          cacheHit: true,
+          responseTimeMs: Date.now() - startTime,
+        });
+
+        return NextResponse.json(
+          { icons: precomputed.icons, hasMore: precomputed.icons.length === limit, searchType: precomputed.searchType },
+          {
+            headers: {
+              "Cache-Control": "public, s-maxage=1800, stale-while-revalidate=3600",
+              "Vary": "Accept-Encoding",
+            },
+          }
+        );
+      }
+    }
+
     // If there's a search query, use AI-powered semantic search
     if (queryParam && queryParam.trim().length >= 3 && useAI) {
       const aiResults = await aiSemanticSearch(
@@ -215,33 +234,8 @@ async function aiSemanticSearch(
   // Convert embedding to Turso vector format
   const vectorString = embeddingToVectorString(queryEmbedding);
 
-  // Use Turso's native vector_distance_cos for database-level similarity search
-  // Apply LIMIT and OFFSET at the database level for efficient pagination
-  const semanticResults = (sourceId
-    ? await db.all(sql`
-        SELECT
-          id, name, normalized_name as normalizedName, source_id as sourceId,
-          category, tags, view_box as viewBox, content, path_data as pathData,
-          default_stroke as defaultStroke, default_fill as defaultFill,
-          stroke_width as strokeWidth, brand_color as brandColor,
-          vector_distance_cos(embedding, vector32(${vectorString})) as distance
-        FROM icons
-        WHERE embedding IS NOT NULL AND source_id = ${sourceId}
-        ORDER BY distance ASC
-        LIMIT ${limit} OFFSET ${offset}
-      `)
-    : await db.all(sql`
-        SELECT
-          id, name, normalized_name as normalizedName, source_id as sourceId,
-          category, tags, view_box as viewBox, content, path_data as pathData,
-          default_stroke as defaultStroke, default_fill as defaultFill,
-          stroke_width as strokeWidth, brand_color as brandColor,
-          vector_distance_cos(embedding, vector32(${vectorString})) as distance
-        FROM icons
-        WHERE embedding IS NOT NULL
-        ORDER BY distance ASC
-        LIMIT ${limit} OFFSET ${offset}
-      `)) as VectorSearchRow[];
+  // Native vector index lookup; LIMIT and OFFSET are applied in the database
+  const semanticResults = await nearestIcons(vectorString, { sourceId, limit, offset });
 
   // Convert to IconData
   const icons: IconData[] = semanticResults.map((row) => {
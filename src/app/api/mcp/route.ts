@@ -701,13 +701,14 @@ Returns:
 
       // Batch fetch all icons (eliminates N+1)
       const fetchedIcons = await getIconsByNames(pack.iconNames);
+      // Keyed by the lookup key each icon matched, so aliases and PascalCase names resolve
       const iconsByName = new Map(
-        fetchedIcons.map((icon) => [icon.normalizedName.toLowerCase(), icon])
+        fetchedIcons.map((icon) => [icon.matchedName, icon])
       );
 
       // Get ordered list of found icons (preserving pack order)
       const orderedIcons = pack.iconNames
-        .map((name) => iconsByName.get(name.toLowerCase()))
+        .map((name) => iconsByName.get(name.trim().toLowerCase()))
         .filter((icon): icon is NonNullable<typeof icon> => icon !== undefined);
 
       // Bundle mode: single file output (70% smaller)
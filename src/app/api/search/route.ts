@@ -6,29 +6,12 @@ import { expandQueryWithSynonyms, hasSynonyms } from "@/lib/synonyms";
 import { sql, eq, or, like, asc } from "drizzle-orm";
 import type { IconData } from "@/types/icon";
 import { logger } from "@/lib/logger";
+import { nearestIcons } from "@/lib/vector-search";
 
 interface SearchResult extends IconData {
   score: number;
 }
 
-/** Row type for vector search results */
-interface VectorSearchRow {
-  id: string;
-  name: string;
-  normalizedName: string;
-  sourceId: string;
-  category: string | null;
-  tags: string | string[] | null;
-  viewBox: string;
-  content: string;
-  pathData: string | null;
-  defaultStroke: number | boolean | null;
-  defaultFill: number | boolean | null;
-  strokeWidth: string | null;
-  brandColor: string | null;
-  distance: number;
-}
-
 /** Timeout helper for async operations */
 function withTimeout<T>(promise: Promise<T>, ms: number, fallback: T): Promise<T> {
   return Promise.race([
@@ -234,7 +217,7 @@ function calculateExactMatchBoost(icon: {
 
 /**
  * Perform hybrid search combining semantic similarity with exact match boosting.
- * Uses Turso's native vector_distance_cos for database-level similarity search.
+ * Uses the native libSQL vector index (see nearestIcons) for similarity search.
  *
  * @param originalQuery - The user's original query (for exact matching)
  * @param expandedQuery - The synonym-expanded query (for semantic search)
@@ -257,38 +240,12 @@ async function hybridSearch(
   const queryLower = originalQuery.toLowerCase();
   const queryTokens = queryLower.split(/\s+/).filter(Boolean);
 
-  // Use Turso's native vector_distance_cos for database-level similarity search
   // Fetch more than needed to allow for re-ranking with exact match boost
   // We need to fetch enough results to properly rank up to offset + limit
   const fetchLimit = Math.min((offset + limit) * 2, 1000);
 
-  // Query with native vector distance calculation
   // vector_distance_cos returns distance (1 - similarity), so lower is better
-  const semanticResults = (sourceId
-    ? await db.all(sql`
-        SELECT 
-          id, name, normalized_name as normalizedName, source_id as sourceId,
-          category, tags, view_box as viewBox, content, path_data as pathData,
-          default_stroke as defaultStroke, default_fill as defaultFill,
-          stroke_width as strokeWidth, brand_color as brandColor,
-          vector_distance_cos(embedding, vector32(${vectorString})) as distance
-        FROM icons
-        WHERE embedding IS NOT NULL AND source_id = ${sourceId}
-        ORDER BY distance ASC
-        LIMIT ${fetchLimit}
-      `)
-    : await db.all(sql`
-        SELECT 
-          id, name, normalized_name as normalizedName, source_id as sourceId,
-          category, tags, view_box as viewBox, content, path_data as pathData,
-          default_stroke as defaultStroke, default_fill as defaultFill,
-          stroke_width as strokeWidth, brand_color as brandColor,
-          vector_distance_cos(embedding, vector32(${vectorString})) as distance
-        FROM icons
-        WHERE embedding IS NOT NULL
-        ORDER BY distance ASC
-        LIMIT ${fetchLimit}
-      `)) as VectorSearchRow[];
+  const semanticResults = await nearestIcons(vectorString, { sourceId, limit: fetchLimit });
 
   // Re-rank with hybrid scoring (semantic + exact match)
   const scored: SearchResult[] = [];
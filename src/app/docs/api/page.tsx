@@ -20,7 +20,7 @@ Search and retrieve icons.
 | Parameter | Type | Description |
 |-----------|------|-------------|
 | q | string | Search query (AI-powered semantic search) |
-| names | string | Comma-separated icon IDs for exact lookup |
+| names | string | Comma-separated icon names (PascalCase names and aliases resolve too) |
 | source | string | Filter by library (lucide, phosphor, etc.) |
 | category | string | Filter by category |
 | limit | number | Max results (default: 50, max: 200) |
@@ -65,6 +65,19 @@ curl "https://unicon.sh/api/icons?q=arrow&source=lucide"
 curl "https://unicon.sh/api/icons?q=social&limit=20&offset=40"
 \`\`\`
 
+## GET /api/autocomplete
+
+Type-ahead suggestions for a partial query, best first.
+
+| Parameter | Type | Description |
+|-----------|------|-------------|
+| q | string | Partial query, e.g. \`arr\` |
+| limit | number | Max suggestions (default: 10, max: 50) |
+
+\`\`\`json
+{ "suggestions": [{ "term": "arrow-right", "iconId": "lucide:arrow-right" }] }
+\`\`\`
+
 ## POST /api/search
 
 Advanced search with more control.
@@ -289,7 +302,7 @@ export default function APIDocsPage() {
                     { name: "q", type: "string", description: "Search query (AI search if 3+ characters)" },
                     { name: "source", type: "string", description: "Filter by library (lucide, phosphor, etc.)", default: "all" },
                     { name: "category", type: "string", description: "Filter by category", default: "all" },
-                    { name: "names", type: "string", description: "Comma-separated exact icon names" },
+                    { name: "names", type: "string", description: "Comma-separated icon names (PascalCase names and aliases resolve too)" },
                     { name: "limit", type: "number", description: "Results per page (max: 320)", default: "100" },
                     { name: "offset", type: "number", description: "Pagination offset", default: "0" },
                     { name: "ai", type: "boolean", description: "Enable AI search", default: "true" },
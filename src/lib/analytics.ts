@@ -35,6 +35,9 @@ export async function logSearch(params: LogSearchParams): Promise<void> {
 
 /**
  * Get search analytics statistics
+ * Reads the hourly (or, once retention has pruned them past the window,
+ * daily) rollups written by extractor/analytics_rollup.py, plus raw rows
+ * not rolled up yet. Table choice matches summary_table() there.
  */
 export async function getSearchStats(days = 7) {
   const sinceDate = new Date();
@@ -42,28 +45,47 @@ export async function getSearchStats(days = 7) {
 
   try {
     const timestampMs = sinceDate.getTime();
+    // Hourly rows cover the window unless retention has deleted its start
+    const [{ oldest }] = (await db.all(sql`
+      SELECT MIN(bucket_start) as oldest FROM search_analytics_hourly
+    `)) as { oldest: number | null }[];
+    const hourly = oldest === null || oldest <= timestampMs;
+    const bucketMs = hourly ? 3600 * 1000 : 24 * 3600 * 1000;
+    const rollupTable = sql.raw(hourly ? "search_analytics_hourly" : "search_analytics_daily");
+
+    // One row per rolled-up bucket/query/type/filter, and one per search past the watermark
+    const searches = sql`
+      SELECT query, search_type, searches, cache_hits, result_sum, latency_count, latency_sum
+      FROM ${rollupTable}
+      WHERE bucket_start >= ${timestampMs - (timestampMs % bucketMs)}
+      UNION ALL
+      SELECT
+        lower(trim(query)), search_type, 1, cache_hit, result_count,
+        CASE WHEN response_time_ms IS NULL THEN 0 ELSE 1 END, COALESCE(response_time_ms, 0)
+      FROM search_analytics
+      WHERE id > COALESCE((SELECT last_id FROM search_analytics_rollup WHERE name = 'search_analytics'), 0)
+        AND timestamp >= ${timestampMs}
+    `;
 
     const stats = await db.all(sql`
       SELECT
-        COUNT(*) as total_searches,
+        COALESCE(SUM(searches), 0) as total_searches,
         COUNT(DISTINCT query) as unique_queries,
-        SUM(CASE WHEN search_type = 'semantic' THEN 1 ELSE 0 END) as semantic_searches,
-        SUM(CASE WHEN search_type = 'text' THEN 1 ELSE 0 END) as text_searches,
-        SUM(CASE WHEN cache_hit = 1 THEN 1 ELSE 0 END) as cache_hits,
-        AVG(response_time_ms) as avg_response_time_ms,
-        AVG(result_count) as avg_results
-      FROM search_analytics
-      WHERE timestamp >= ${timestampMs}
+        SUM(CASE WHEN search_type = 'semantic' THEN searches ELSE 0 END) as semantic_searches,
+        SUM(CASE WHEN search_type = 'text' THEN searches ELSE 0 END) as text_searches,
+        SUM(cache_hits) as cache_hits,
+        SUM(latency_sum) * 1.0 / NULLIF(SUM(latency_count), 0) as avg_response_time_ms,
+        SUM(result_sum) * 1.0 / NULLIF(SUM(searches), 0) as avg_results
+      FROM (${searches})
     `);
 
     const popularQueries = await db.all(sql`
       SELECT
         query,
-        COUNT(*) as search_count,
-        AVG(result_count) as avg_results,
+        SUM(searches) as search_count,
+        SUM(result_sum) * 1.0 / SUM(searches) as avg_results,
         search_type
-      FROM search_analytics
-      WHERE timestamp >= ${timestampMs}
+      FROM (${searches})
       GROUP BY query
       ORDER BY search_count DESC
       LIMIT 20
@@ -1,6 +1,6 @@
 import { db } from "./db";
-import { icons, sources } from "./schema";
-import { eq, like, or, sql, asc } from "drizzle-orm";
+import { icons, sources, nameLookup, autocompletePrefixes, autocompleteTerms, precomputedResults } from "./schema";
+import { eq, like, or, sql, asc, desc, and, gte, lt } from "drizzle-orm";
 import type { IconData, SourceData } from "@/types/icon";
 import { expandSearchQuery } from "./icon-aliases";
 
@@ -150,41 +150,70 @@ export async function getIconById(id: string): Promise<IconData | null> {
   return mapIconRow(first);
 }
 
+/** An icon resolved by getIconsByNames, with the lookup key that matched it */
+export interface NamedIconData extends IconData {
+  matchedName: string; // Requested name, lowercased and trimmed
+}
+
 /**
- * Get icons by their normalized names (for starter packs).
- * Returns icons matching any of the provided names.
+ * Get icons by name (for starter packs).
+ * Names resolve through the precomputed name_lookup table, so PascalCase
+ * names, aliases ("cog") and synonyms work too, in one indexed query.
+ * Each source contributes its best-ranked match per name. Names the
+ * lookup doesn't know (e.g. before the extractor has filled it) fall
+ * back to an exact normalized-name match.
  * Prefers Lucide icons when the same name exists in multiple libraries.
  */
-export async function getIconsByNames(names: string[], preferredSource: string = "lucide"): Promise<IconData[]> {
+export async function getIconsByNames(names: string[], preferredSource: string = "lucide"): Promise<NamedIconData[]> {
   if (names.length === 0) return [];
 
-  // Normalize names for matching
-  const normalizedNames = names.map((n) => n.toLowerCase());
+  // Lookup keys are stored lowercased and trimmed (extractor/name_lookup.py)
+  const lookupNames = [...new Set(names.map((n) => n.trim().toLowerCase()))];
+
+  const columns = {
+    id: icons.id,
+    name: icons.name,
+    normalizedName: icons.normalizedName,
+    sourceId: icons.sourceId,
+    category: icons.category,
+    tags: icons.tags,
+    viewBox: icons.viewBox,
+    content: icons.content,
+    defaultStroke: icons.defaultStroke,
+    defaultFill: icons.defaultFill,
+    strokeWidth: icons.strokeWidth,
+    brandColor: icons.brandColor,
+  };
 
-  // Use SQL IN clause for exact matching
-  // Order by source priority: preferred source comes LAST so it overwrites in Map
   const results = await db
-    .select({
-      id: icons.id,
-      name: icons.name,
-      normalizedName: icons.normalizedName,
-      sourceId: icons.sourceId,
-      category: icons.category,
-      tags: icons.tags,
-      viewBox: icons.viewBox,
-      content: icons.content,
-      defaultStroke: icons.defaultStroke,
-      defaultFill: icons.defaultFill,
-      strokeWidth: icons.strokeWidth,
-      brandColor: icons.brandColor,
-    })
-    .from(icons)
-    .where(sql`lower(${icons.normalizedName}) IN ${normalizedNames}`)
-    .orderBy(
-      // Sort preferred source LAST so it wins in Map deduplication
-      sql`CASE WHEN ${icons.sourceId} = ${preferredSource} THEN 1 ELSE 0 END`,
-      asc(icons.normalizedName)
+    .selectDistinct({ ...columns, matchedName: nameLookup.name })
+    .from(nameLookup)
+    .innerJoin(icons, eq(icons.id, nameLookup.iconId))
+    .where(
+      sql`${nameLookup.name} IN ${lookupNames} AND ${nameLookup.rank} = (
+        SELECT MIN(best.rank) FROM name_lookup best
+        WHERE best.name = ${nameLookup.name} AND best.source_id = ${nameLookup.sourceId}
+      )`
+    );
+
+  const resolved = new Set(results.map((row) => row.matchedName));
+  const unresolved = lookupNames.filter((name) => !resolved.has(name));
+  if (unresolved.length > 0) {
+    results.push(
+      ...(await db
+        .select({ ...columns, matchedName: sql<string>`lower(${icons.normalizedName})` })
+        .from(icons)
+        .where(sql`lower(${icons.normalizedName}) IN ${unresolved}`))
     );
+  }
+
+  // Sort preferred source LAST so it wins in Map deduplication
+  const priority = (sourceId: string) => (sourceId === preferredSource ? 1 : 0);
+  results.sort(
+    (a, b) =>
+      priority(a.sourceId) - priority(b.sourceId) ||
+      (a.normalizedName < b.normalizedName ? -1 : a.normalizedName > b.normalizedName ? 1 : 0)
+  );
 
   return results.map((row) => ({
     id: row.id,
@@ -200,9 +229,83 @@ export async function getIconsByNames(names: string[], preferredSource: string =
     defaultFill: row.defaultFill ?? false,
     strokeWidth: row.strokeWidth,
     brandColor: row.brandColor ?? null,
+    matchedName: row.matchedName,
   }));
 }
 
+// Ranked ids stored per precomputed query (RESULT_DEPTH in extractor/precompute_results.py)
+const PRECOMPUTED_RESULT_DEPTH = 100;
+
+/**
+ * Results of a hot search, executed offline from search analytics
+ * (extractor/precompute_results.py): one primary-key read of the ranked
+ * ids, then the page's icons by id, in rank order.
+ * Returns null when the query isn't precomputed or the page runs past
+ * the stored ids.
+ */
+export async function getPrecomputedResults(params: {
+  query: string;
+  sourceId?: string | undefined;
+  limit: number;
+  offset: number;
+}): Promise<{ icons: IconData[]; searchType: string } | null> {
+  const { limit, offset } = params;
+  // Keys are lowercased, trimmed and single-spaced (query_key in the extractor)
+  const queryKey = params.query.trim().toLowerCase().replace(/\s+/g, " ");
+
+  const rows = await db
+    .select({ searchType: precomputedResults.searchType, iconIds: precomputedResults.iconIds })
+    .from(precomputedResults)
+    .where(and(eq(precomputedResults.queryKey, queryKey), eq(precomputedResults.sourceFilter, params.sourceId ?? "")))
+    .limit(1);
+
+  const row = rows[0];
+  if (!row) return null;
+
+  // A full list was cut at the stored depth, so later pages need the live search
+  if (offset + limit > row.iconIds.length && row.iconIds.length >= PRECOMPUTED_RESULT_DEPTH) return null;
+
+  const pageIds = row.iconIds.slice(offset, offset + limit);
+  const byId = new Map((await getIconsByIds(pageIds)).map((icon) => [icon.id, icon]));
+  const pageIcons = pageIds.flatMap((id) => byId.get(id) ?? []);
+
+  return { icons: pageIcons, searchType: row.searchType };
+}
+
+// Longest prefix stored in autocomplete_prefixes (PREFIX_LENGTH in extractor/autocomplete.py)
+const AUTOCOMPLETE_PREFIX_LENGTH = 8;
+
+/**
+ * Type-ahead suggestions for a partial query (GET /api/autocomplete).
+ * Reads the precomputed autocomplete_prefixes table (extractor/autocomplete.py):
+ * one range of its covering (prefix, score, term, icon_id) index, best first.
+ * Input longer than the stored prefixes falls back to a term range.
+ */
+export async function getAutocompleteSuggestions(
+  query: string,
+  limit: number = 10
+): Promise<{ term: string; iconId: string }[]> {
+  // Terms are kebab-case: 'Arrow Right' -> 'arrow-right'
+  const key = query.trim().toLowerCase().replace(/[\s_-]+/g, "-");
+  if (!key) return [];
+
+  if (key.length <= AUTOCOMPLETE_PREFIX_LENGTH) {
+    return db
+      .select({ term: autocompletePrefixes.term, iconId: autocompletePrefixes.iconId })
+      .from(autocompletePrefixes)
+      .where(eq(autocompletePrefixes.prefix, key))
+      .orderBy(desc(autocompletePrefixes.score), desc(autocompletePrefixes.term))
+      .limit(limit);
+  }
+
+  return db
+    .select({ term: autocompleteTerms.term, iconId: autocompleteTerms.iconId })
+    .from(autocompleteTerms)
+    .where(and(gte(autocompleteTerms.term, key), lt(autocompleteTerms.term, key + "\uffff")))
+    .orderBy(desc(autocompleteTerms.score), desc(autocompleteTerms.term))
+    .limit(limit);
+}
+
 /**
  * Get icons by their IDs (batch query for MCP get_multiple_icons).
  * Returns icons matching any of the provided IDs in format 'source:name'.
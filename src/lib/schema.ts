@@ -1,4 +1,16 @@
-import { sqliteTable, text, integer, index, blob } from "drizzle-orm/sqlite-core";
+import { sql } from "drizzle-orm";
+import { sqliteTable, text, integer, real, index, uniqueIndex, primaryKey, blob, customType } from "drizzle-orm/sqlite-core";
+
+/** Must match EMBEDDING_DIMENSIONS in src/lib/ai.ts */
+const EMBEDDING_COLUMN_DIMENSIONS = 3072;
+
+// libSQL vector column (raw little-endian F32 blob), as typed by extractor/native_vectors.py --migrate.
+// Declared here so drizzle-kit push sees the live type instead of rebuilding the column as a plain blob.
+const f32Blob = customType<{ data: Buffer; driverData: Buffer; config: { dimensions: number }; configRequired: true }>({
+  dataType(config) {
+    return `F32_BLOB(${config.dimensions})`;
+  },
+});
 
 // Icon sources/libraries (lucide, phosphor, hugeicons)
 export const sources = sqliteTable("sources", {
@@ -8,6 +20,7 @@ export const sources = sqliteTable("sources", {
   license: text("license"),
   totalIcons: integer("total_icons"),
   extractedAt: integer("extracted_at", { mode: "timestamp" }),
+  manifestHash: text("manifest_hash"), // Rollup of all icon/variant content hashes, for skipping unchanged libraries
 });
 
 // Main icons table
@@ -35,18 +48,56 @@ export const icons = sqliteTable(
 
     // AI search
     searchText: text("search_text"), // Combined text for embedding: "arrow left back previous navigation"
-    embedding: blob("embedding", { mode: "buffer" }), // Vector embedding (F32_BLOB)
+    embedding: f32Blob("embedding", { dimensions: EMBEDDING_COLUMN_DIMENSIONS }), // Vector embedding (extractor/native_vectors.py)
+    // Compact encodings of the same vector (extractor/quantize.py)
+    embeddingShort: blob("embedding_short", { mode: "buffer" }), // First 256 dims, renormalized (F32)
+    embeddingInt8: blob("embedding_int8", { mode: "buffer" }), // F32 scale + int8 codes
+    embeddingBinary: blob("embedding_binary", { mode: "buffer" }), // Sign bits, 1 per dimension
 
     // Brand icons (Simple Icons)
     brandColor: text("brand_color"), // Hex color for brand icons, e.g. '#1DA1F2'
+
+    // Geometry metrics (computed at ingest by extractor/geometry.py)
+    bboxMinX: real("bbox_min_x"),
+    bboxMinY: real("bbox_min_y"),
+    bboxMaxX: real("bbox_max_x"),
+    bboxMaxY: real("bbox_max_y"),
+    nodeCount: integer("node_count"), // Anchor + control points
+    segmentCount: integer("segment_count"), // Lines, curves and arcs drawn
+    elementCount: integer("element_count"), // Path/shape elements
+    byteSize: integer("byte_size"), // UTF-8 size of content
+    complexity: real("complexity"), // Weighted render-complexity score
+    geometryHash: text("geometry_hash"), // 64-bit perceptual outline hash (hex), for near-duplicate lookups
+
+    // Geometry rescaled onto a 24x24 grid (viewBox "0 0 24 24"), for mixed-library bundles
+    normalizedContent: text("normalized_content"),
+    normalizedPathData: text("normalized_path_data", { mode: "json" }).$type<PathElement[]>(),
+    normalizedStrokeWidth: text("normalized_stroke_width"),
+
+    // SHA-256 of content, viewBox and stroke/fill defaults (ETag)
+    contentHash: text("content_hash"),
+
+    // Mapping generation that first saw this icon (null = not mapped yet)
+    mappedGeneration: integer("mapped_generation"),
   },
   (table) => [
     index("icons_source_idx").on(table.sourceId),
+    // Keyset paging within a source (extractor/embeddings.py)
+    index("icons_source_keyset_idx").on(table.sourceId, table.id),
     index("icons_normalized_name_idx").on(table.normalizedName),
     index("icons_category_idx").on(table.category),
+    index("icons_complexity_idx").on(table.complexity),
+    index("icons_geometry_hash_idx").on(table.geometryHash),
+    // DiskANN index read by vector_top_k (src/lib/vector-search.ts); options must match native_vectors.py defaults
+    index("icons_embedding_idx").on(
+      sql`libsql_vector_idx(${table.embedding}, 'metric=cosine', 'compress_neighbors=float8')`
+    ),
   ]
 );
 
+// icons_fts: FTS5 index over name, normalized_name, tags, search_text and
+// category, created and kept in sync by triggers from extractor/registry.py
+
 // Icon variants (for Phosphor weights: bold, fill, duotone, etc.)
 export const variants = sqliteTable(
   "variants",
@@ -58,6 +109,9 @@ export const variants = sqliteTable(
     variant: text("variant").notNull(), // 'bold', 'fill', 'duotone'
     content: text("content").notNull(),
     pathData: text("path_data", { mode: "json" }).$type<PathElement[]>(),
+    normalizedContent: text("normalized_content"), // Rescaled onto the 24x24 grid
+    normalizedPathData: text("normalized_path_data", { mode: "json" }).$type<PathElement[]>(),
+    contentHash: text("content_hash"), // SHA-256 of content, viewBox and stroke/fill defaults (ETag)
   },
   (table) => [
     index("variants_icon_idx").on(table.iconId),
@@ -76,10 +130,172 @@ export const mappings = sqliteTable(
     hugeiconsId: text("hugeicons_id").references(() => icons.id),
     confidence: integer("confidence"), // 0-100 match confidence
     needsReview: integer("needs_review", { mode: "boolean" }),
+    reviewed: integer("reviewed", { mode: "boolean" }).notNull().default(false), // Human-confirmed; never overwritten
+    generation: integer("generation"), // Mapping run that last wrote this row
+  },
+  (table) => [
+    index("mappings_canonical_idx").on(table.canonicalName),
+    uniqueIndex("mappings_lucide_idx").on(table.lucideId),
+  ]
+);
+
+// Cross-library concept clusters (one icon per library, plus style siblings)
+export const conceptClusters = sqliteTable(
+  "concept_clusters",
+  {
+    id: integer("id").primaryKey({ autoIncrement: true }),
+    canonicalName: text("canonical_name").notNull(), // 'arrow-right'
+    canonicalIconId: text("canonical_icon_id")
+      .notNull()
+      .references(() => icons.id, { onDelete: "cascade" }),
+    size: integer("size").notNull(), // Member icons
+    sourceCount: integer("source_count").notNull(), // Libraries represented
+    confidence: real("confidence").notNull(), // Weakest match that joined the cluster (0-100)
+  },
+  (table) => [index("concept_clusters_canonical_idx").on(table.canonicalName)]
+);
+
+export const conceptClusterMembers = sqliteTable(
+  "concept_cluster_members",
+  {
+    clusterId: integer("cluster_id")
+      .notNull()
+      .references(() => conceptClusters.id, { onDelete: "cascade" }),
+    iconId: text("icon_id")
+      .notNull()
+      .references(() => icons.id, { onDelete: "cascade" }),
+    sourceId: text("source_id").notNull(),
+    score: real("score").notNull(), // Match score when it joined the cluster
+  },
+  (table) => [
+    primaryKey({ columns: [table.clusterId, table.iconId] }),
+    uniqueIndex("concept_cluster_members_icon_idx").on(table.iconId),
+    index("concept_cluster_members_source_idx").on(table.sourceId),
+  ]
+);
+
+// Precomputed embedding neighbours (extractor/related.py)
+export const relatedIcons = sqliteTable(
+  "related_icons",
+  {
+    iconId: text("icon_id")
+      .notNull()
+      .references(() => icons.id, { onDelete: "cascade" }),
+    relatedId: text("related_id")
+      .notNull()
+      .references(() => icons.id, { onDelete: "cascade" }),
+    kind: text("kind").notNull(), // 'similar' (same library) | 'alternative' (other libraries)
+    rank: integer("rank").notNull(), // 1 = closest
+    score: real("score").notNull(), // Cosine similarity
+  },
+  (table) => [
+    primaryKey({ columns: [table.iconId, table.kind, table.rank] }),
+    index("related_icons_related_idx").on(table.relatedId),
+  ]
+);
+
+// Embedding each icon's related rows were computed from, for incremental runs
+export const relatedIconsState = sqliteTable("related_icons_state", {
+  iconId: text("icon_id")
+    .primaryKey()
+    .references(() => icons.id, { onDelete: "cascade" }),
+  embeddingHash: text("embedding_hash").notNull(), // SHA-256 of the embedding blob
+  computedAt: integer("computed_at", { mode: "timestamp" }).notNull(),
+});
+
+// Every name a client may ask for, resolved to icons per source (extractor/name_lookup.py)
+export const nameLookup = sqliteTable(
+  "name_lookup",
+  {
+    name: text("name").notNull(), // Lowercased: 'arrow-right', 'arrowright', 'cog', ...
+    sourceId: text("source_id").notNull(),
+    iconId: text("icon_id")
+      .notNull()
+      .references(() => icons.id, { onDelete: "cascade" }),
+    rank: integer("rank").notNull(), // Lower wins within a source: name < PascalCase < style < alias < synonym
+    kind: text("kind").notNull(), // 'name' | 'pascal' | 'style' | 'alias' | 'synonym'
+  },
+  (table) => [
+    primaryKey({ columns: [table.name, table.sourceId, table.iconId] }),
+    // Covering index: a batch of names resolves without touching the table
+    index("name_lookup_resolve_idx").on(table.name, table.sourceId, table.rank, table.iconId),
+    index("name_lookup_icon_idx").on(table.iconId),
+  ]
+);
+
+// Autocomplete terms (names, style-stripped names, aliases, synonyms), scored by recent searches
+export const autocompleteTerms = sqliteTable("autocomplete_terms", {
+  term: text("term").primaryKey(), // Kebab-case: 'arrow-right'
+  kind: text("kind").notNull(), // 'name' | 'style' | 'alias' | 'synonym'
+  iconId: text("icon_id")
+    .notNull()
+    .references(() => icons.id, { onDelete: "cascade" }), // Best-ranked icon, shown beside the suggestion
+  iconCount: integer("icon_count").notNull(),
+  searches: integer("searches").notNull().default(0), // Searches with results in the last 90 days
+  score: real("score").notNull(),
+});
+
+// Edge n-grams of each term and of each word in it, best terms per prefix only
+export const autocompletePrefixes = sqliteTable(
+  "autocomplete_prefixes",
+  {
+    prefix: text("prefix").notNull(),
+    term: text("term")
+      .notNull()
+      .references(() => autocompleteTerms.term, { onDelete: "cascade" }),
+    score: real("score").notNull(),
+    iconId: text("icon_id").notNull(),
+  },
+  (table) => [
+    primaryKey({ columns: [table.prefix, table.term] }),
+    // Covering index: a suggestion list is one range scan, already in score order
+    index("autocomplete_prefixes_lookup_idx").on(table.prefix, table.score, table.term, table.iconId),
+    index("autocomplete_prefixes_term_idx").on(table.term),
+  ]
+);
+
+// Trigrams of ' term ' for infix and misspelled input
+export const autocompleteTrigrams = sqliteTable(
+  "autocomplete_trigrams",
+  {
+    trigram: text("trigram").notNull(),
+    term: text("term")
+      .notNull()
+      .references(() => autocompleteTerms.term, { onDelete: "cascade" }),
+    trigramCount: integer("trigram_count").notNull(), // Distinct trigrams in the term, for similarity
+    score: real("score").notNull(),
   },
-  (table) => [index("mappings_canonical_idx").on(table.canonicalName)]
+  (table) => [
+    primaryKey({ columns: [table.trigram, table.term] }),
+    // Covering index: match counting never touches the table
+    index("autocomplete_trigrams_lookup_idx").on(table.trigram, table.term, table.trigramCount, table.score),
+    index("autocomplete_trigrams_term_idx").on(table.term),
+  ]
 );
 
+// Checkpoint of each embedding job ('<source or all>:<model>'), so a killed run resumes
+export const embeddingJobs = sqliteTable("embedding_jobs", {
+  jobKey: text("job_key").primaryKey(),
+  lastIconId: text("last_icon_id").notNull().default(""), // Icons up to this id are done
+  embedded: integer("embedded").notNull().default(0),
+  failed: integer("failed").notNull().default(0),
+  startedAt: integer("started_at", { mode: "timestamp" }).notNull(),
+  updatedAt: integer("updated_at", { mode: "timestamp" }).notNull(),
+  finishedAt: integer("finished_at", { mode: "timestamp" }), // null while the run is incomplete
+});
+
+// Icons whose embedding failed; skipped by the embedding job after too many attempts
+export const embeddingQuarantine = sqliteTable("embedding_quarantine", {
+  iconId: text("icon_id")
+    .primaryKey()
+    .references(() => icons.id, { onDelete: "cascade" }),
+  model: text("model").notNull(),
+  error: text("error").notNull(),
+  attempts: integer("attempts").notNull().default(1),
+  firstFailedAt: integer("first_failed_at", { mode: "timestamp" }).notNull(),
+  lastFailedAt: integer("last_failed_at", { mode: "timestamp" }).notNull(),
+});
+
 // Search analytics for tracking query performance and usage
 export const searchAnalytics = sqliteTable(
   "search_analytics",
@@ -99,6 +315,56 @@ export const searchAnalytics = sqliteTable(
   ]
 );
 
+// search_analytics rolled up per hour / day (extractor/analytics_rollup.py)
+function searchAnalyticsRollup(name: string) {
+  return sqliteTable(
+    name,
+    {
+      bucketStart: integer("bucket_start").notNull(), // ms, UTC hour or day start
+      query: text("query").notNull(), // Lowercased, trimmed, single-spaced
+      searchType: text("search_type").notNull(),
+      sourceFilter: text("source_filter").notNull().default(""), // '' for all sources
+      searches: integer("searches").notNull(),
+      cacheHits: integer("cache_hits").notNull(),
+      zeroResults: integer("zero_results").notNull(),
+      resultSum: integer("result_sum").notNull(),
+      latencyCount: integer("latency_count").notNull(),
+      latencySum: integer("latency_sum").notNull(),
+      missLatencyCount: integer("miss_latency_count").notNull(),
+      missLatencySum: integer("miss_latency_sum").notNull(),
+      latencySketch: blob("latency_sketch", { mode: "buffer" }).notNull(), // (u16 bucket, u32 count) pairs, 1% buckets
+    },
+    (table) => [primaryKey({ columns: [table.bucketStart, table.query, table.searchType, table.sourceFilter] })]
+  );
+}
+
+export const searchAnalyticsHourly = searchAnalyticsRollup("search_analytics_hourly");
+export const searchAnalyticsDaily = searchAnalyticsRollup("search_analytics_daily");
+
+// Rollup watermark: raw rows up to last_id are in the hourly and daily tables
+export const searchAnalyticsRollupState = sqliteTable("search_analytics_rollup", {
+  name: text("name").primaryKey(), // 'search_analytics'
+  lastId: integer("last_id").notNull().default(0),
+  updatedAt: integer("updated_at").notNull(), // ms
+});
+
+// Ranked results of the hottest searches, executed offline (extractor/precompute_results.py)
+export const precomputedResults = sqliteTable(
+  "precomputed_results",
+  {
+    queryKey: text("query_key").notNull(), // Lowercased, trimmed, single-spaced query
+    sourceFilter: text("source_filter").notNull().default(""), // '' for all sources
+    searchType: text("search_type").notNull(), // 'semantic' | 'text'
+    iconIds: text("icon_ids", { mode: "json" }).notNull().$type<string[]>(), // Ranked, best first
+    searches: integer("searches").notNull(), // Searches in the analytics window
+    avgMissMs: real("avg_miss_ms"), // Mean response time of cache misses
+    reason: text("reason").notNull(), // 'volume' | 'slow' | 'volume+slow'
+    corpusVersion: text("corpus_version").notNull(), // Model + source manifests; re-executed when it changes
+    computedAt: integer("computed_at").notNull(), // ms
+  },
+  (table) => [primaryKey({ columns: [table.queryKey, table.sourceFilter] })]
+);
+
 // Types
 export interface PathElement {
   tag: string;
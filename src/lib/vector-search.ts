@@ -0,0 +1,136 @@
+/**
+ * Nearest-neighbour queries over icon embeddings.
+ *
+ * Goes through libSQL's DiskANN index (vector_top_k) when it exists
+ * (built by extractor/native_vectors.py) and falls back to an exact
+ * scan of every embedding otherwise. Source-filtered queries always
+ * scan: the index only returns the global top k, which can hold too
+ * few icons from a small library, and the filtered scan is cheap.
+ */
+
+import { sql } from "drizzle-orm";
+import { db } from "@/lib/db";
+import { logger } from "@/lib/logger";
+
+/** Must match INDEX_NAME in extractor/native_vectors.py */
+const VECTOR_INDEX_NAME = "icons_embedding_idx";
+
+/** Largest k requested from the index */
+const MAX_INDEX_CANDIDATES = 2000;
+
+/** Distance function per index metric (DISTANCE_FUNCTIONS in extractor/native_vectors.py) */
+const DISTANCE_FUNCTIONS: Record<string, string> = {
+  cosine: "vector_distance_cos",
+  l2: "vector_distance_l2",
+};
+
+/** How long to skip the index after it turned out to be missing */
+const INDEX_RETRY_MS = 10 * 60 * 1000;
+
+let indexMissingUntil = 0;
+let indexDistance: string | null = null;
+
+/** Row type for vector search results */
+export interface VectorSearchRow {
+  id: string;
+  name: string;
+  normalizedName: string;
+  sourceId: string;
+  category: string | null;
+  tags: string | string[] | null;
+  viewBox: string;
+  content: string;
+  pathData: string | null;
+  defaultStroke: number | boolean | null;
+  defaultFill: number | boolean | null;
+  strokeWidth: string | null;
+  brandColor: string | null;
+  distance: number;
+}
+
+interface NearestIconsOptions {
+  sourceId?: string;
+  limit: number;
+  offset?: number;
+}
+
+/**
+ * Icons closest to a query vector, lower distance first. Index hits are
+ * ranked by the index's metric; `distance` is always the cosine distance.
+ *
+ * @param vectorString - Query vector in Turso format (see embeddingToVectorString)
+ */
+export async function nearestIcons(
+  vectorString: string,
+  { sourceId, limit, offset = 0 }: NearestIconsOptions
+): Promise<VectorSearchRow[]> {
+  if (!sourceId && Date.now() >= indexMissingUntil) {
+    try {
+      return await indexedNearestIcons(vectorString, limit, offset);
+    } catch (error) {
+      indexMissingUntil = Date.now() + INDEX_RETRY_MS;
+      indexDistance = null;
+      logger.warn(`Vector index ${VECTOR_INDEX_NAME} unavailable, scanning embeddings instead:`, error);
+    }
+  }
+  return scannedNearestIcons(vectorString, sourceId, limit, offset);
+}
+
+async function indexedNearestIcons(
+  vectorString: string,
+  limit: number,
+  offset: number
+): Promise<VectorSearchRow[]> {
+  const candidates = Math.min(offset + limit, MAX_INDEX_CANDIDATES);
+  const distance = sql.raw(await getIndexDistance());
+
+  return (await db.all(sql`
+    SELECT
+      i.id, i.name, i.normalized_name as normalizedName, i.source_id as sourceId,
+      i.category, i.tags, i.view_box as viewBox, i.content, i.path_data as pathData,
+      i.default_stroke as defaultStroke, i.default_fill as defaultFill,
+      i.stroke_width as strokeWidth, i.brand_color as brandColor,
+      vector_distance_cos(i.embedding, vector32(${vectorString})) as distance
+    FROM vector_top_k(${VECTOR_INDEX_NAME}, vector32(${vectorString}), ${candidates}) AS top
+    JOIN icons i ON i.rowid = top.id
+    ORDER BY ${distance}(i.embedding, vector32(${vectorString})) ASC
+    LIMIT ${limit} OFFSET ${offset}
+  `)) as VectorSearchRow[];
+}
+
+/** Distance function matching the index's metric, read from its definition once */
+async function getIndexDistance(): Promise<string> {
+  if (indexDistance === null) {
+    const [index] = (await db.all(sql`
+      SELECT sql FROM sqlite_master WHERE type = 'index' AND name = ${VECTOR_INDEX_NAME}
+    `)) as { sql: string }[];
+    if (!index) {
+      throw new Error(`index ${VECTOR_INDEX_NAME} does not exist`);
+    }
+    const metric = /metric=(\w+)/.exec(index.sql)?.[1] ?? "cosine";
+    indexDistance = DISTANCE_FUNCTIONS[metric] ?? DISTANCE_FUNCTIONS.cosine;
+  }
+  return indexDistance;
+}
+
+async function scannedNearestIcons(
+  vectorString: string,
+  sourceId: string | undefined,
+  limit: number,
+  offset: number
+): Promise<VectorSearchRow[]> {
+  const sourceFilter = sourceId ? sql`AND source_id = ${sourceId}` : sql``;
+
+  return (await db.all(sql`
+    SELECT
+      id, name, normalized_name as normalizedName, source_id as sourceId,
+      category, tags, view_box as viewBox, content, path_data as pathData,
+      default_stroke as defaultStroke, default_fill as defaultFill,
+      stroke_width as strokeWidth, brand_color as brandColor,
+      vector_distance_cos(embedding, vector32(${vectorString})) as distance
+    FROM icons
+    WHERE embedding IS NOT NULL ${sourceFilter}
+    ORDER BY distance ASC
+    LIMIT ${limit} OFFSET ${offset}
+  `)) as VectorSearchRow[];
+}